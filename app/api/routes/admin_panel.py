@@ -18,23 +18,15 @@ def get_platform_overview(
     admin_user: User = Depends(require_superadmin)
 ):
     from app.models import ContentItem
-    import json
+    from app.services.quran_ingestion import QURAN_VERSE_COUNT, load_sync_status
     
-    # Check if synced (manifested Surah 114)
+    # Check if synced (surahs finish in parallel, so count every verse)
     fully_synced = db.query(ContentItem).filter(
-        ContentItem.item_type == "quran",
-        ContentItem.title.like("Surah 114, Verse %")
-    ).count() > 0
+        ContentItem.item_type == "quran"
+    ).count() >= QURAN_VERSE_COUNT
     
     # Read background status
-    sync_status = {}
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    status_file = os.path.join(base_dir, "sync_status.json")
-    if os.path.exists(status_file):
-        try:
-            with open(status_file, "r") as f:
-                sync_status = json.load(f)
-        except: pass
+    sync_status = load_sync_status()
 
     return {
         "ok": True,
@@ -190,7 +182,8 @@ def get_diagnostics(
     admin_user: User = Depends(require_superadmin)
 ):
     """System heartbeat and environment check."""
-    from app.services.scheduler import _global_scheduler
+    from app.services import scheduler
+    _global_scheduler = scheduler._global_scheduler
     
     scheduler_running = False
     active_jobs = 0
@@ -203,6 +196,7 @@ def get_diagnostics(
         "scheduler": {
             "status": "running" if scheduler_running else "stopped",
             "active_jobs": active_jobs,
+            "role": "leader" if _global_scheduler else ("standby" if scheduler._global_leader else "stopped"),
             "timestamp": datetime.now(timezone.utc).isoformat()
         },
         "environment": {
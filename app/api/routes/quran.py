@@ -61,13 +61,14 @@ async def api_get_surah_detail(
 async def api_search_quran(
     q: str = Query(..., min_length=2),
     limit: int = Query(15, ge=1, le=50),
+    prefix: bool = Query(True, description="Typeahead: the last word also matches longer words"),
     db: Session = Depends(get_db),
     user: User = Depends(require_user)
 ):
     from app.services.quran_service import resolve_quran_input
     
     try:
-        data = resolve_quran_input(q, db)
+        data = resolve_quran_input(q, db, limit=limit, prefix=prefix)
         
         # If it's a direct reference dict, wrap in a list for the UI list view
         if isinstance(data, dict):
@@ -35,6 +35,7 @@ class Settings(BaseSettings):
         super().__init__(**kwargs)
         import os
         self.uploads_dir = self.resolve_abs_path(self.uploads_dir)
+        self.hadith_cache_dir = self.resolve_abs_path(self.hadith_cache_dir)
         print("\n" + "!"*64)
         print(f"🚀 [INIT] ABSOLUTE MEDIA SHIELD ACTIVE")
         print(f"!!! [RESOLVED UPLOADS DIR]: {self.uploads_dir}")
@@ -64,6 +65,13 @@ class Settings(BaseSettings):
 
     admin_api_key: str | None = Field(default=None, env="ADMIN_API_KEY")
     openai_api_key: str | None = Field(default=None, env="OPENAI_API_KEY")
+    # Shared OpenAI gateway (pooled HTTP connections, see app/services/llm_gateway.py)
+    openai_timeout_seconds: float = Field(default=60.0, env="OPENAI_TIMEOUT_SECONDS")
+    openai_connect_timeout_seconds: float = Field(default=10.0, env="OPENAI_CONNECT_TIMEOUT_SECONDS")
+    openai_max_retries: int = Field(default=2, env="OPENAI_MAX_RETRIES")
+    openai_max_connections: int = Field(default=20, env="OPENAI_MAX_CONNECTIONS")
+    # Relevance gate verdict cache (relevance_verdicts table)
+    relevance_cache_ttl_days: int = Field(default=30, env="RELEVANCE_CACHE_TTL_DAYS")
     gemini_api_key: str | None = Field(default=None)
 
     # Auth & security
@@ -101,6 +109,9 @@ class Settings(BaseSettings):
     qf_client_id: str | None = Field(default=None, env="QF_CLIENT_ID")
     qf_client_secret: str | None = Field(default=None, env="QF_CLIENT_SECRET")
     qf_env: str = Field(default="prod", env="QF_ENV")
+    # Full-Quran sync: parallel surah fetches, throttled across all workers
+    qf_max_workers: int = Field(default=8, env="QF_MAX_WORKERS")
+    qf_requests_per_second: float = Field(default=10.0, env="QF_REQUESTS_PER_SECOND")
 
     # Hadith API
     # Default: fawazahmed0 CDN (free, no key, no rate limits)
@@ -110,9 +121,63 @@ class Settings(BaseSettings):
         default="https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1",
         env="HADITH_API_BASE_URL"
     )
+    # Local copy of CDN editions (fallback provider search + reference lookups)
+    hadith_cache_dir: str = Field(default="cache/hadith", env="HADITH_CACHE_DIR")
     # Phase 2 gate: Hadith in automations (enabled)
     hadith_in_automations_enabled: bool = Field(default=True, env="HADITH_IN_AUTOMATIONS_ENABLED")
 
+    # Publishing worker pool (scheduler publish tick)
+    publish_max_workers: int = Field(default=8, env="PUBLISH_MAX_WORKERS")
+    publish_batch_size: int = Field(default=50, env="PUBLISH_BATCH_SIZE")
+    publish_claim_timeout_minutes: int = Field(default=15, env="PUBLISH_CLAIM_TIMEOUT_MINUTES")
+
+    # Scheduler: one leader across all workers / replicas (Postgres advisory lock)
+    scheduler_leader_election: bool = Field(default=True, env="SCHEDULER_LEADER_ELECTION")
+    scheduler_leader_poll_seconds: int = Field(default=10, env="SCHEDULER_LEADER_POLL_SECONDS")
+    scheduler_resync_minutes: int = Field(default=5, env="SCHEDULER_RESYNC_MINUTES")
+
+    # Batch day planning (automations with planning_mode="batch_daily")
+    automation_plan_lead_minutes: int = Field(default=60, env="AUTOMATION_PLAN_LEAD_MINUTES")
+    automation_plan_jitter_seconds: int = Field(default=300, env="AUTOMATION_PLAN_JITTER_SECONDS")
+    automation_plan_max_workers: int = Field(default=3, env="AUTOMATION_PLAN_MAX_WORKERS")
+
+    # Topic rotation ledger: rows older than this (or the longest avoid window) are pruned daily
+    rotation_ledger_retention_days: int = Field(default=90, env="ROTATION_LEDGER_RETENTION_DAYS")
+
+    # Rendered page fragments (account switcher, planner board, dashboard feed)
+    fragment_cache_ttl_seconds: int = Field(default=120, env="FRAGMENT_CACHE_TTL_SECONDS")
+    fragment_cache_max_entries: int = Field(default=2000, env="FRAGMENT_CACHE_MAX_ENTRIES")
+
+    # Library topic dictionary (/library/topic-suggest); other workers pick up changes after the TTL
+    topic_dictionary_ttl_seconds: int = Field(default=600, env="TOPIC_DICTIONARY_TTL_SECONDS")
+
+    # Media registry: follow the uploads directory for files added/removed outside the app (needs watchfiles)
+    media_registry_watch: bool = Field(default=True, env="MEDIA_REGISTRY_WATCH")
+
+    # Media storage (content-addressed): "local" (UPLOADS_DIR) or "s3" (any S3-compatible store, e.g. MinIO).
+    # The S3 driver reuses S3_ACCESS_KEY / S3_SECRET_KEY / S3_REGION.
+    media_storage_backend: str = Field(default="local", env="MEDIA_STORAGE_BACKEND")
+    media_s3_bucket: str | None = Field(default=None, env="MEDIA_S3_BUCKET")  # default: S3_BUCKET_NAME
+    media_s3_endpoint_url: str | None = Field(default=None, env="MEDIA_S3_ENDPOINT_URL")
+    media_s3_prefix: str = Field(default="media/", env="MEDIA_S3_PREFIX")
+    media_s3_public_base_url: str | None = Field(default=None, env="MEDIA_S3_PUBLIC_BASE_URL")  # default: endpoint/bucket
+    media_multipart_chunk_mb: int = Field(default=8, env="MEDIA_MULTIPART_CHUNK_MB")
+    # Push locally stored media to Cloudinary in the background (when configured)
+    media_cdn_push: bool = Field(default=True, env="MEDIA_CDN_PUSH")
+    # Scheduler retries of pushes that failed or were lost to a restart
+    media_cdn_retry_minutes: int = Field(default=10, env="MEDIA_CDN_RETRY_MINUTES")
+    media_cdn_max_attempts: int = Field(default=5, env="MEDIA_CDN_MAX_ATTEMPTS")
+    # Released media is deleted by a sweep once it has stayed unreferenced this long
+    media_release_grace_minutes: int = Field(default=60, env="MEDIA_RELEASE_GRACE_MINUTES")
+    media_release_sweep_minutes: int = Field(default=15, env="MEDIA_RELEASE_SWEEP_MINUTES")
+
+    # Resolved auth principals (token / API key -> user, org memberships)
+    principal_cache_ttl_seconds: int = Field(default=30, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_max_entries: int = Field(default=10000, env="PRINCIPAL_CACHE_MAX_ENTRIES")
+
+    # In-memory Quran corpus (reloaded after a sync, or by other workers after the TTL)
+    quran_store_ttl_seconds: int = Field(default=3600, env="QURAN_STORE_TTL_SECONDS")
+
     # Email Service (Resend)
     resend_api_key: str | None = Field(default=None, env="RESEND_API_KEY")
     resend_from_email: str | None = Field(default="onboarding@resend.dev", env="RESEND_FROM_EMAIL")
@@ -124,23 +189,26 @@ def build_public_media_url(filename: str, local_path: str | None = None) -> str:
     """
     Standardized way to generate production-ready URLs for Instagram/Meta.
 
-    If Cloudinary is configured and local_path is provided, the file is uploaded
-    to Cloudinary and its CDN URL is returned. This guarantees Instagram's crawler
-    can always reach the image.
+    If local_path is provided, the file is handed to media_storage: stored once
+    under its content hash (local disk or S3-compatible bucket) and its public
+    URL returned. Locally stored files are pushed to Cloudinary in the
+    background when it is configured; publish_to_instagram switches to the CDN
+    URL once the push lands.
 
-    If Cloudinary is not configured, falls back to the existing Railway public URL.
+    Otherwise builds the existing Railway public /uploads/ URL for `filename`.
     """
     import os
 
-    # 1. Try Cloudinary first (preferred for Instagram compatibility)
+    # 1. Content-addressed storage
     if local_path and os.path.exists(local_path):
         try:
-            from app.services.cloudinary_service import upload_to_cloudinary
-            cdn_url = upload_to_cloudinary(local_path)
-            if cdn_url:
-                return cdn_url
+            from app.services.media_storage import store_file
+            return store_file(local_path).url
         except Exception as e:
-            print(f"⚠️ [CONFIG] Cloudinary upload failed, falling back to local URL: {e}")
+            print(f"⚠️ [CONFIG] Media storage failed, falling back to local URL: {e}")
+            if os.path.exists(local_path):
+                from app.services import media_registry
+                media_registry.register(local_path)
 
     # 2. Fallback: Railway / public domain URL
     base = settings.public_base_url.rstrip("/")
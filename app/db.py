@@ -5,6 +5,7 @@ import os
 import time
 import logging
 from sqlalchemy import create_engine, text, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
@@ -18,7 +19,7 @@ except ImportError:
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-def _create_engine_with_retries(db_url: str):
+def _normalize_db_url(db_url: str) -> str:
     if not db_url or "postgresql" not in db_url and "postgres" not in db_url:
         logger.error("CRITICAL: DATABASE_URL is missing or does not point to a PostgreSQL instance.")
         # We allow it to fail here, but the app will crash on startup check.
@@ -30,6 +31,10 @@ def _create_engine_with_retries(db_url: str):
     if db_url.startswith("postgresql://") and "+psycopg" not in db_url:
         # Defaulting to psycopg (preferred for PG 16+)
         db_url = db_url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return db_url
+
+def _create_engine_with_retries(db_url: str):
+    db_url = _normalize_db_url(db_url)
 
     # Production-grade pooling
     engine = create_engine(
@@ -81,6 +86,21 @@ except Exception as e:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- ASYNC LAYER (psycopg 3 async driver) ---
+# For `async def` handlers: queries are awaited instead of blocking the event loop.
+# Same URL and pool sizing as the sync engine; connections open lazily on first use.
+async_engine = create_async_engine(
+    _normalize_db_url(DATABASE_URL),
+    pool_size=15,
+    max_overflow=25,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    connect_args={"connect_timeout": 10}
+)
+
+# expire_on_commit=False: attribute access after commit would need an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def sync_database_schema(log_func=None):
     """
     Perform a resilient, granular schema sync for PostgreSQL.
@@ -96,6 +116,11 @@ def sync_database_schema(log_func=None):
     ts_type = "TIMESTAMP WITH TIME ZONE"
     
     missing_cols = {
+        "media_assets": [
+            ("last_used_at", ts_type),
+            ("media_key", "VARCHAR"),
+            ("tags_backfilled_at", ts_type)
+        ],
         "posts": [
             ("intent_type", "VARCHAR"),
             ("target_audience", "VARCHAR"),
@@ -158,6 +183,7 @@ def sync_database_schema(log_func=None):
             ("media_asset_id", "INTEGER"),
             ("media_tag_query", json_type),
             ("media_rotation_mode", "VARCHAR DEFAULT 'random'"),
+            ("last_media_asset_id", "INTEGER"),
             ("content_profile_id", "INTEGER"),
             ("creativity_level", "INTEGER DEFAULT 3"),
             ("content_seed", "TEXT"),
@@ -167,6 +193,7 @@ def sync_database_schema(log_func=None):
             ("cadence", "VARCHAR DEFAULT 'daily'"),
             ("posts_per_day", "INTEGER DEFAULT 1"),
             ("post_spacing_hours", "INTEGER DEFAULT 4"),
+            ("planning_mode", "VARCHAR DEFAULT 'per_slot'"),
             ("content_seed_text", "TEXT"),
             ("items_per_post", "INTEGER DEFAULT 1"),
             ("selection_mode", "VARCHAR DEFAULT 'random'"),
@@ -208,7 +235,8 @@ def sync_database_schema(log_func=None):
             ("used_source_id", "INTEGER"),
             ("used_content_item_ids", json_type),
             ("created_at", ts_type + " DEFAULT CURRENT_TIMESTAMP"),
-            ("updated_at", ts_type + " DEFAULT CURRENT_TIMESTAMP")
+            ("updated_at", ts_type + " DEFAULT CURRENT_TIMESTAMP"),
+            ("media_key", "VARCHAR")
         ],
         "content_items": [
             ("owner_user_id", "INTEGER"),
@@ -223,7 +251,11 @@ def sync_database_schema(log_func=None):
             ("source_id", "INTEGER"),
             ("text", "TEXT"),
             ("last_used_at", ts_type),
-            ("use_count", "INTEGER DEFAULT 0")
+            ("use_count", "INTEGER DEFAULT 0"),
+            ("search_vector", "TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED")
+        ],
+        "source_chunks": [
+            ("search_vector", "TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', coalesce(chunk_text, ''))) STORED")
         ],
         "content_sources": [
             ("category", "VARCHAR"),
@@ -263,9 +295,53 @@ def sync_database_schema(log_func=None):
             _log("SUCCESS: org_id nullability updated")
     except Exception as e:
         _log(f"DETAIL: Nullability update error: {e}")
-    
+
+    # Retrieval indexes (content providers and library retrieval rank candidates in SQL)
+    search_indexes = [
+        ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+        ("ix_content_items_topics_slugs_gin",
+         "CREATE INDEX IF NOT EXISTS ix_content_items_topics_slugs_gin "
+         "ON content_items USING GIN (topics_slugs)"),
+        ("ix_content_items_text_trgm",
+         "CREATE INDEX IF NOT EXISTS ix_content_items_text_trgm "
+         "ON content_items USING GIN (lower(text) gin_trgm_ops)"),
+        ("ix_content_items_search_vector",
+         "CREATE INDEX IF NOT EXISTS ix_content_items_search_vector "
+         "ON content_items USING GIN (search_vector)"),
+        ("ix_content_items_source_org_id",
+         "CREATE INDEX IF NOT EXISTS ix_content_items_source_org_id "
+         "ON content_items (source_id, org_id, id)"),
+        ("uq_content_items_quran_verse",
+         "CREATE UNIQUE INDEX IF NOT EXISTS uq_content_items_quran_verse "
+         "ON content_items (source_id, title) WHERE item_type = 'quran'"),
+        ("ix_source_chunks_search_vector",
+         "CREATE INDEX IF NOT EXISTS ix_source_chunks_search_vector "
+         "ON source_chunks USING GIN (search_vector)"),
+        # Content keys of stored media (media_storage reference checks), backfilled from the URLs
+        ("ix_posts_media_key", "CREATE INDEX IF NOT EXISTS ix_posts_media_key ON posts (media_key)"),
+        ("ix_media_assets_media_key",
+         "CREATE INDEX IF NOT EXISTS ix_media_assets_media_key ON media_assets (media_key)"),
+        ("posts.media_key backfill",
+         "UPDATE posts SET media_key = substring(media_url from '/([0-9a-f]{64}(?:\\.[0-9a-z]+)?)/*$') "
+         "WHERE media_key IS NULL AND media_url ~ '/[0-9a-f]{64}(\\.[0-9a-z]+)?/*$'"),
+        ("media_assets.media_key backfill",
+         "UPDATE media_assets SET media_key = substring(url from '/([0-9a-f]{64}(?:\\.[0-9a-z]+)?)/*$') "
+         "WHERE media_key IS NULL AND url ~ '/[0-9a-f]{64}(\\.[0-9a-z]+)?/*$'"),
+    ]
+    for name, ddl in search_indexes:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            _log(f"SUCCESS: {name} created/verified")
+        except Exception as e:
+            _log(f"DETAIL: {name} skip or error: {str(e)[:100]}")
+
     _log("PostgreSQL native sync complete.")
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_db():
     db = SessionLocal()
     try:
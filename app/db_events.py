@@ -0,0 +1,77 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Commit-Time Cache Invalidation
+===============================================
+One set of Session listeners (every Session, including the sync side of
+AsyncSession) shared by the in-process caches. A cache registers the model
+classes it depends on and a callback:
+
+  - after_flush:     new / dirty / deleted instances of a tracked class are
+                     passed to the cache's `collect`, which adds keys to a set
+  - do_orm_execute:  a bulk UPDATE/DELETE on a tracked class adds EVERYTHING
+                     (unless the cache's `skip_bulk` says it is irrelevant)
+  - after_commit:    the cache's `on_commit(changes)` runs with what was collected
+  - after_rollback:  collected changes are discarded
+
+Kept apart from app.db so caches can register without opening the engine.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+EVERYTHING = object()
+
+_PENDING = "invalidation_changes"
+_registrations: list = []  # (tracked_classes, on_commit, collect, skip_bulk)
+
+
+def _collect_everything(obj, kind: str, changes: set) -> None:
+    changes.add(EVERYTHING)
+
+
+def register_invalidation(tracked_classes, on_commit, collect=None, skip_bulk=None) -> None:
+    """
+    Calls `on_commit(changes)` after a commit that changed `tracked_classes`.
+    `collect(obj, kind, changes)` gets each flushed instance (kind is "new",
+    "dirty" or "deleted") and adds hashable keys to `changes`; by default every
+    change adds EVERYTHING. `skip_bulk(orm_execute_state)` returning True
+    ignores a bulk statement. `on_commit` is not called when nothing was collected.
+    """
+    _registrations.append((tuple(tracked_classes), on_commit, collect or _collect_everything, skip_bulk))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    groups = (("new", list(session.new)), ("dirty", list(session.dirty)), ("deleted", list(session.deleted)))
+    for index, (tracked, _, collect, _) in enumerate(_registrations):
+        for kind, objs in groups:
+            for obj in objs:
+                if isinstance(obj, tracked):
+                    collect(obj, kind, session.info.setdefault(_PENDING, {}).setdefault(index, set()))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_statements(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    for index, (tracked, _, _, skip_bulk) in enumerate(_registrations):
+        if issubclass(mapper.class_, tracked) and not (skip_bulk and skip_bulk(orm_execute_state)):
+            orm_execute_state.session.info.setdefault(_PENDING, {}).setdefault(index, set()).add(EVERYTHING)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    pending = session.info.pop(_PENDING, None)
+    for index, changes in (pending or {}).items():
+        if changes:
+            _registrations[index][1](changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_PENDING, None)
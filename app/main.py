@@ -76,6 +76,66 @@ def run_startup_tasks():
     except Exception as e:
         log_startup(f"STARTUP_TASKS: Style DNA seeding failed: {e}")
 
+    # Retire expired / outdated-prompt relevance verdicts
+    try:
+        from app.services.relevance_engine import purge_stale_verdicts
+        db = SessionLocal()
+        try:
+            purged = purge_stale_verdicts(db)
+        finally:
+            db.close()
+        log_startup(f"STARTUP_TASKS: Relevance cache purge complete ({purged} stale verdicts).")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Relevance cache purge failed: {e}")
+
+    # Index tags of media assets created before media_asset_tags existed
+    try:
+        from app.services.media_library import backfill_asset_tags
+        db = SessionLocal()
+        try:
+            backfilled = backfill_asset_tags(db)
+        finally:
+            db.close()
+        log_startup(f"STARTUP_TASKS: Media tag backfill complete ({backfilled} assets).")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Media tag backfill failed: {e}")
+
+    # Fingerprinted static bundles for the app shell
+    try:
+        from app.services.static_bundles import build_static_bundles
+        bundles = build_static_bundles()
+        log_startup(f"STARTUP_TASKS: Static bundles built ({', '.join(b.filename for b in bundles.values())}).")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Static bundle build failed: {e}")
+
+    # Compile the page and fragment templates before the first request
+    try:
+        from app.services.page_fragments import warm_templates
+        log_startup(f"STARTUP_TASKS: Compiled {warm_templates()} page templates.")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Fragment template compile failed: {e}")
+
+    # Index the uploads directory for publish preflight, then follow it
+    try:
+        from app.services import media_registry
+        indexed = media_registry.warm()
+        watching = media_registry.start_watch()
+        log_startup(f"STARTUP_TASKS: Media registry indexed {indexed} uploads (watch={'on' if watching else 'off'}).")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Media registry warm-up failed: {e}")
+
+    # Load the Quran verse store and build its search index before the first search
+    try:
+        from app.services import quran_store
+        db = SessionLocal()
+        try:
+            indexed = quran_store.warm(db)
+        finally:
+            db.close()
+        log_startup(f"STARTUP_TASKS: Quran verse store warmed ({indexed} verses indexed).")
+    except Exception as e:
+        log_startup(f"STARTUP_TASKS: Quran verse store warm-up failed: {e}")
+
 # -------------------------------------------------
 
 # Startup validation checks
@@ -388,6 +448,15 @@ async def serve_upload_forced(filename: str):
     from fastapi.responses import FileResponse
     full_path = os.path.join(settings.uploads_dir, filename)
     if not os.path.exists(full_path):
+        from app.services.media_storage import cdn_url, is_content_key
+        if is_content_key(filename):
+            # Wiped from local storage (e.g. after a redeploy): serve the CDN copy if one landed
+            from fastapi.concurrency import run_in_threadpool
+            from fastapi.responses import RedirectResponse
+            url = await run_in_threadpool(cdn_url, f"/uploads/{filename}")
+            if url:
+                return RedirectResponse(url, status_code=302)
+
         # DEEP 404 DIAGNOSTIC (Black Box logging for Railway)
         print(f"❌ [MEDIA_404] File not found: {full_path}")
         print(f"   - Current Working Directory: {os.getcwd()}")
@@ -407,8 +476,30 @@ async def serve_upload_forced(filename: str):
         "Pragma": "no-cache",
         "Expires": "0"
     }
+    from app.services.media_storage import is_content_key
+    if is_content_key(filename):
+        # Content-addressed: the bytes behind this name never change
+        from app.services.static_bundles import IMMUTABLE_CACHE_CONTROL
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
     return FileResponse(full_path, media_type=content_type, headers=headers)
 
+# Fingerprinted app-shell bundles (studio JS/markup, layout CSS): immutable, precompressed
+@app.get("/static/dist/{filename}")
+async def serve_static_bundle(filename: str, request: Request):
+    from fastapi.responses import Response
+    from app.services.static_bundles import IMMUTABLE_CACHE_CONTROL, get_bundle, negotiate_encoding
+
+    bundle = get_bundle(filename)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Bundle not found")
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": bundle.etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == bundle.etag:
+        return Response(status_code=304, headers=headers)
+    body, encoding = negotiate_encoding(bundle, request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=bundle.content_type, headers=headers)
+
 app.mount("/uploads", StaticFiles(directory=uploads_absolute_path), name="uploads")
 app.mount("/static", StaticFiles(directory=static_absolute_path), name="static")
 print(f"📁 [System] Media mounted: {uploads_absolute_path}")
@@ -572,6 +663,13 @@ def on_startup():
     log_startup(f"STARTUP: OpenAI Key present: {bool(settings.openai_api_key)}")
     log_startup("STARTUP: Readiness check complete.")
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.llm_gateway import close_clients
+    from app.db import async_engine
+    await close_clients()
+    await async_engine.dispose()
+
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
@@ -1,9 +1,12 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Boolean, UniqueConstraint
+import re
+
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, JSON, ForeignKey, Boolean, UniqueConstraint, Computed, Index, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 # from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, deferred
 from sqlalchemy.sql import func
 
 Base = declarative_base()
@@ -128,6 +131,7 @@ class Post(Base):
 
     # MUST be a public https URL for Instagram publishing
     media_url = Column(Text, nullable=True)
+    media_key = Column(String, nullable=True, index=True)  # content key of media_url (set from it)
 
     caption = Column(Text, nullable=True)
     hashtags = Column(JSON, nullable=True)
@@ -264,6 +268,7 @@ class TopicAutomation(Base):
     
     posts_per_day = Column(Integer, default=1)
     post_spacing_hours = Column(Integer, default=4)
+    planning_mode = Column(String, default="per_slot") # "per_slot" | "batch_daily" (all of a day's posts in one pass)
     
     enabled = Column(Boolean, default=False)
     last_run_at = Column(DateTime(timezone=True), nullable=True)
@@ -286,7 +291,8 @@ class TopicAutomation(Base):
     # NEW: Media Fields
     media_asset_id = Column(Integer, ForeignKey("media_assets.id"), nullable=True)
     media_tag_query = Column(JSON, nullable=True) # e.g. ["ramadan","masjid"]
-    media_rotation_mode = Column(String, default="random") # "random" | "round_robin"
+    media_rotation_mode = Column(String, default="random") # "random" | "lru" | "round_robin"
+    last_media_asset_id = Column(Integer, nullable=True) # round-robin cursor over tagged media
     
     # NEW: Islamic Content Automation Engine
     pillars = Column(JSON, nullable=False, default=list) # e.g. ["quran", "hadith"]
@@ -357,6 +363,9 @@ class ContentItem(Base):
     use_count = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Full-text search vector maintained by Postgres (ranked library retrieval)
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(text, ''))", persisted=True)))
     
     org = relationship("Org", back_populates="content_items")
     usages = relationship("ContentUsage", back_populates="content_item")
@@ -389,6 +398,19 @@ class ContentUsage(Base):
     post = relationship("Post", back_populates="content_usage")
     content_item = relationship("ContentItem", back_populates="usages")
 
+class RotationRecord(Base):
+    """One topic pick of an automation (rotation_engine no-repeat window)."""
+    __tablename__ = "rotation_ledger"
+    id = Column(Integer, primary_key=True)
+    automation_id = Column(Integer, ForeignKey("topic_automations.id", ondelete="CASCADE"), nullable=False)
+    topic_hash = Column(BigInteger, nullable=False)  # rotation_engine.topic_hash(topic)
+    style_id = Column(Integer, nullable=True)
+    used_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_rotation_ledger_automation_topic_used", "automation_id", "topic_hash", "used_at"),
+    )
+
 class SourceItem(Base):
     __tablename__ = "source_items"
     id = Column(Integer, primary_key=True, index=True)
@@ -418,14 +440,48 @@ class MediaAsset(Base):
     ig_account_id = Column(Integer, ForeignKey("ig_accounts.id"), nullable=True)
     
     url = Column(Text, nullable=False) # Public path
+    media_key = Column(String, nullable=True, index=True)  # content key of url (set from it)
     storage_path = Column(Text, nullable=True) # Internal path
     tags = Column(JSON, nullable=False, default=list) # e.g. ["nature", "islamic"]
+    last_used_at = Column(DateTime(timezone=True), nullable=True) # least-recently-used rotation
+    tags_backfilled_at = Column(DateTime(timezone=True), nullable=True) # media_library.backfill_asset_tags ran on it
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     org = relationship("Org", back_populates="media_assets")
     ig_account = relationship("IGAccount", back_populates="media_assets")
     posts = relationship("Post", back_populates="media_asset")
+    tag_rows = relationship("MediaAssetTag", cascade="all, delete-orphan", passive_deletes=True)
+
+class MediaAssetTag(Base):
+    """Normalized (lowercased) copy of MediaAsset.tags, indexed for tag lookups."""
+    __tablename__ = "media_asset_tags"
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("media_assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    org_id = Column(Integer, ForeignKey("orgs.id"), nullable=False)
+    tag = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("asset_id", "tag", name="uq_media_asset_tag"),
+        Index("ix_media_asset_tags_org_tag", "org_id", "tag"),
+    )
+
+class MediaCdnCopy(Base):
+    """CDN copy of a locally stored media object (media_storage background push)."""
+    __tablename__ = "media_cdn_copies"
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False, unique=True)  # media_storage content key
+    cdn_url = Column(Text, nullable=True)              # NULL until a push lands
+    attempts = Column(Integer, nullable=False, default=0)  # failed pushes
+    pushed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class MediaRelease(Base):
+    """Stored media object with no references left, deleted by media_storage's sweep."""
+    __tablename__ = "media_releases"
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False, unique=True)  # media_storage content key
+    released_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
 class ContactMessage(Base):
     __tablename__ = "contact_messages"
@@ -460,4 +516,38 @@ class SourceChunk(Base):
     chunk_metadata = Column(JSON, nullable=True) # e.g. {"page": 1}
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    document = relationship("SourceDocument", back_populates="chunks")
\ No newline at end of file
+    # Full-text search vector maintained by Postgres (ranked library retrieval)
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(chunk_text, ''))", persisted=True)))
+
+    document = relationship("SourceDocument", back_populates="chunks")
+
+class RelevanceVerdict(Base):
+    """Cached relevance-gate verdicts, keyed by a hash of (topic, reference, text, prompt version)."""
+    __tablename__ = "relevance_verdicts"
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    prompt_version = Column(String(32), nullable=False, index=True)
+    topic = Column(String, nullable=True)
+    reference = Column(String, nullable=True)
+    accepted = Column(Boolean, nullable=False)
+    confidence = Column(String, nullable=True)
+    reason = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+# Content key (media_storage: "<sha256><ext>") at the end of a stored media URL.
+# Kept in Post.media_key / MediaAsset.media_key so reference checks are index lookups.
+_MEDIA_KEY_RE = re.compile(r"/([0-9a-f]{64}(?:\.[0-9a-z]+)?)$")
+
+def media_key_of(url: str | None) -> str | None:
+    match = _MEDIA_KEY_RE.search((url or "").rstrip("/"))
+    return match.group(1) if match else None
+
+@event.listens_for(Post.media_url, "set")
+def _set_post_media_key(target, value, oldvalue, initiator):
+    target.media_key = media_key_of(value)
+
+@event.listens_for(MediaAsset.url, "set")
+def _set_asset_media_key(target, value, oldvalue, initiator):
+    target.media_key = media_key_of(value)
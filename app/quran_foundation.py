@@ -1,6 +1,8 @@
 import requests
+import threading
 import time
 from typing import Any, Optional
+from requests.adapters import HTTPAdapter
 from app.config import settings
 
 # --- Configuration ---
@@ -23,18 +25,51 @@ _TOKEN_CACHE = {
     "token": None,
     "expires_at": 0
 }
+_TOKEN_LOCK = threading.Lock()
+
+# One pooled session for every QF call (keep-alive across pages / surahs / threads)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=max(settings.qf_max_workers, 10)))
+
+
+class _RateLimiter:
+    """Spaces requests at least 1/rate seconds apart, across all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_LIMITER = _RateLimiter(settings.qf_requests_per_second)
 
 def get_access_token() -> Optional[str]:
     """
     Authenticates with the Quran Foundation API using Client Credentials flow.
     Caches the token until it expires.
     """
-    global _TOKEN_CACHE
-    
     # Return cached token if still valid (with 60s buffer)
     if _TOKEN_CACHE["token"] and _TOKEN_CACHE["expires_at"] > time.time() + 60:
         return _TOKEN_CACHE["token"]
 
+    # Parallel sync workers: only one of them fetches a new token
+    with _TOKEN_LOCK:
+        if _TOKEN_CACHE["token"] and _TOKEN_CACHE["expires_at"] > time.time() + 60:
+            return _TOKEN_CACHE["token"]
+        return _fetch_access_token()
+
+
+def _fetch_access_token() -> Optional[str]:
     if not settings.qf_client_id or not settings.qf_client_secret:
         print("⚠️  [QF] Missing QF_CLIENT_ID or QF_CLIENT_SECRET in .env")
         return None
@@ -43,7 +78,7 @@ def get_access_token() -> Optional[str]:
     auth_url = f"{AUTH_BASE.rstrip('/')}/oauth2/token" 
     try:
         # Use Basic Auth for the token request as per OIDC standards
-        response = requests.post(
+        response = _SESSION.post(
             auth_url,
             auth=(settings.qf_client_id, settings.qf_client_secret),
             data={
@@ -65,9 +100,12 @@ def get_access_token() -> Optional[str]:
             print(f"   Response: {e.response.text}")
         return None
 
-def qf_get(path: str, params: dict = None) -> dict:
+def qf_get(path: str, params: dict = None, raise_errors: bool = False) -> dict:
     """
     Wrapper for authenticated GET requests to the Quran Foundation API.
+    Requests share one pooled session and the QF_REQUESTS_PER_SECOND budget;
+    a 429 is retried once after its Retry-After. Errors return {} unless
+    `raise_errors` is set.
     """
     url = f"{CONTENT_BASE.rstrip('/')}/{path.lstrip('/')}"
     
@@ -84,11 +122,18 @@ def qf_get(path: str, params: dict = None) -> dict:
     }
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
+        for attempt in range(2):
+            _LIMITER.wait()
+            response = _SESSION.get(url, params=params, headers=headers, timeout=15)
+            if response.status_code != 429 or attempt:
+                break
+            time.sleep(min(float(response.headers.get("Retry-After") or 1), 30))
         response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"❌ [QF] Request to {path} failed: {e}")
+        if raise_errors:
+            raise
         return {}
 
 def get_translations_catalog() -> list:
@@ -98,13 +143,16 @@ def get_translations_catalog() -> list:
     data = qf_get("/resources/translations")
     return data.get("translations", [])
 
-def get_surah_verses(chapter_number: int, translation_ids: str = "20") -> list:
+def get_surah_verses(chapter_number: int, translation_ids: str = "20", strict: bool = False) -> list:
     """
     Fetches all verses for a specific chapter (Surah), handling pagination.
     Default translation: Sahih International (ID 131).
+    With `strict`, a failed page or a short result raises instead of
+    returning a partial surah.
     """
     all_verses = []
     current_page = 1
+    total_records = None
     
     while True:
         params = {
@@ -114,7 +162,7 @@ def get_surah_verses(chapter_number: int, translation_ids: str = "20") -> list:
             "per_page": 50,
             "page": current_page
         }
-        data = qf_get(f"/verses/by_chapter/{chapter_number}", params=params)
+        data = qf_get(f"/verses/by_chapter/{chapter_number}", params=params, raise_errors=strict)
         verses = data.get("verses", [])
         if not verses:
             break
@@ -122,10 +170,14 @@ def get_surah_verses(chapter_number: int, translation_ids: str = "20") -> list:
         all_verses.extend(verses)
         
         pagination = data.get("pagination", {})
+        total_records = pagination.get("total_records", total_records)
         if not pagination.get("next_page"):
             break
             
         current_page += 1
+
+    if strict and (not all_verses or (total_records and len(all_verses) < total_records)):
+        raise RuntimeError(f"Surah {chapter_number}: got {len(all_verses)} of {total_records or '?'} verses")
         
     return all_verses
 
@@ -4,12 +4,14 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_, and_
-from app.db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, and_, update
+from app.db import get_db, get_async_db
 from app.models import User, Org, OrgMember, IGAccount, Post, TopicAutomation, ContentProfile
 from app.security.auth import require_user, optional_user
 from app.services.prebuilt_loader import load_prebuilt_packs
 from app.services.automation_runner import run_automation_once
+from app.services.page_fragments import fragment_key, fragment_macros, get_fragment, render_fragment, set_fragment
 from app.security.rbac import get_current_org_id
 from typing import Optional
 from pydantic import BaseModel
@@ -626,9 +628,33 @@ def get_active_context(db: Session, user: User, org_id: int):
         
     return active_acc, accs, True
 
-def render_app_page(title, content, user, org, active_tab, db: Session = None, extras=None):
-    from .ui_assets import APP_LAYOUT_HTML, STUDIO_COMPONENTS_HTML, STUDIO_SCRIPTS_JS, CONNECT_INSTAGRAM_MODAL_HTML
+async def get_active_context_async(db: AsyncSession, user: User, org_id: int):
+    """get_active_context for handlers running on the async session."""
+    accs = (await db.scalars(select(IGAccount).where(IGAccount.org_id == org_id))).all()
+    if not accs:
+        return None, [], False
+
+    active_acc = next((a for a in accs if a.active), None)
+
+    # Auto-healing: ensure at least one is active if any exist
+    if not active_acc and accs:
+        active_acc = accs[0]
+        active_acc.active = True
+        await db.commit()
+
+    return active_acc, accs, True
+
+async def load_switcher_accounts(db: AsyncSession, user: User) -> list:
+    """Accounts across all of the user's orgs, for render_app_page(accounts=...)."""
+    user_org_ids = select(OrgMember.org_id).where(OrgMember.user_id == user.id)
+    return (await db.scalars(
+        select(IGAccount).where(IGAccount.org_id.in_(user_org_ids)).order_by(IGAccount.active.desc())
+    )).all()
+
+def render_app_page(title, content, user, org, active_tab, db: Session = None, extras=None, accounts=None):
+    from .ui_assets import CONNECT_INSTAGRAM_MODAL_HTML
     from app.models import IGAccount
+    from app.services.static_bundles import layout_template, studio_components_tag, studio_scripts_tag
     
     # Active state map
     active_map = {
@@ -644,120 +670,33 @@ def render_app_page(title, content, user, org, active_tab, db: Session = None, e
     # --- Fetch Accounts for Switcher ---
     switcher_html = ""
     active_acc = None
-    fallback_avatar_base = "https://ui-avatars.com/api/?background=0F3D2E&color=fff&bold=true&name="
-    if db and user:
-        # Get all orgs the user belongs to to ensure we find their connected accounts
-        user_orgs = db.query(OrgMember.org_id).filter(OrgMember.user_id == user.id).all()
-        user_org_ids = [o[0] for o in user_orgs]
-        
-        # Query accounts across all those orgs
-        accs = db.query(IGAccount).filter(IGAccount.org_id.in_(user_org_ids)).order_by(IGAccount.active.desc()).all()
+    if (db or accounts is not None) and user:
+        if accounts is not None:
+            # Preloaded by an async handler (load_switcher_accounts)
+            accs = accounts
+        else:
+            # Get all orgs the user belongs to to ensure we find their connected accounts
+            user_orgs = db.query(OrgMember.org_id).filter(OrgMember.user_id == user.id).all()
+            user_org_ids = [o[0] for o in user_orgs]
+            
+            # Query accounts across all those orgs
+            accs = db.query(IGAccount).filter(IGAccount.org_id.in_(user_org_ids)).order_by(IGAccount.active.desc()).all()
         
         active_acc = next((a for a in accs if a.active), accs[0] if accs else None)
-        
-        if accs:
-            acc_list_items = ""
-            for a in accs:
-                is_active = active_acc and a.id == active_acc.id
-                active_indicator = '<div class="w-1.5 h-1.5 rounded-full bg-emerald-500 shadow-[0_0_8px_rgba(16,185,129,0.5)]"></div>' if is_active else ""
-                
-                safe_name = a.username or "Studio"
-                acc_avatar = a.profile_picture_url if (a.profile_picture_url and "http" in a.profile_picture_url) else f"{fallback_avatar_base}{safe_name}"
-                
-                acc_list_items += f"""
-                <div onclick="setActiveAccount('{a.id}')" class="flex items-center justify-between p-3 rounded-xl hover:bg-brand/5 cursor-pointer transition-all group">
-                    <div class="flex items-center gap-3">
-                        <img src="{acc_avatar}" onerror="this.src='{fallback_avatar_base}{safe_name}'" class="w-8 h-8 rounded-full border border-brand/10 shadow-sm object-cover">
-                        <div class="flex flex-col">
-                            <span class="text-[11px] font-black text-brand group-hover:translate-x-0.5 transition-transform">@{a.username}</span>
-                            <span class="text-[9px] font-bold text-brand/30 uppercase tracking-widest leading-none">{(a.name[:15] + '...') if a.name and len(a.name) > 15 else (a.name or 'Sabeel Platform')}</span>
-                        </div>
-                    </div>
-                    {active_indicator}
-                </div>
-                """
-            
-            active_avatar = active_acc.profile_picture_url if (active_acc and active_acc.profile_picture_url and "http" in active_acc.profile_picture_url) else f"{fallback_avatar_base}{active_acc.username if active_acc else 'Studio'}"
-            switcher_html = f"""
-            <div class="relative inline-block text-left" id="accountSwitcherRoot" style="z-index: 99999;">
-                <button onclick="toggleAccountSwitcher(event)" type="button" id="switcherToggleButton" class="relative flex items-center gap-3 p-2 pr-4 bg-white border border-brand/10 rounded-2xl transition-all shadow-sm group hover:border-brand/30">
-                    <div class="relative">
-                        <img src="{active_avatar}" onerror="this.src='{fallback_avatar_base}{active_acc.username if active_acc else 'Studio'}'" class="w-9 h-9 rounded-full border-2 border-brand/5 shadow-inner object-cover bg-brand/5">
-                        <div class="absolute -bottom-0.5 -right-0.5 w-3 h-3 bg-emerald-500 border-2 border-white rounded-full"></div>
-                    </div>
-                    <div class="hidden md:flex flex-col items-start pr-2">
-                        <span class="text-[10px] font-black text-brand tracking-tight">@{active_acc.username if active_acc else 'Studio'}</span>
-                        <span class="text-[8px] font-bold text-brand/30 uppercase tracking-widest">Active Platform</span>
-                    </div>
-                    <svg class="w-3.5 h-3.5 text-brand/30 group-hover:text-brand/60 transition-colors" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M19 9l-7 7-7-7" stroke-linecap="round" stroke-linejoin="round" stroke-width="3"/></svg>
-                </button>
 
-                <div id="accountSwitcherDropdown" class="hidden absolute right-0 mt-3 w-72 bg-white border border-brand/5 rounded-3xl shadow-2xl z-[9000] p-3 animate-in fade-in zoom-in-95 duration-200">
-                    <div class="px-3 py-2 text-[9px] font-black text-text-muted uppercase tracking-[0.2em] mb-2">Connected Platforms</div>
-                    <div class="space-y-1.5">
-                        {acc_list_items}
-                    </div>
-                    <div class="mt-4 pt-4 border-t border-brand/5">
-                        <div class="flex items-center gap-2">
-                            <button onclick="window.location.href='/auth/instagram/login'" class="flex-1 flex items-center gap-3 p-3 rounded-xl hover:bg-brand/5 transition-all group">
-                                <div class="w-8 h-8 rounded-full bg-brand/5 flex items-center justify-center text-brand/40 group-hover:bg-brand/10 group-hover:text-brand transition-all">
-                                    <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M12 4v16m8-8H4" stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5"/></svg>
-                                </div>
-                                <span class="text-[11px] font-black text-brand italic">Connect Another</span>
-                            </button>
-                            <button onclick="event.stopPropagation(); document.getElementById('dropdownIgHelp').classList.toggle('hidden')" class="w-8 h-8 shrink-0 rounded-full bg-brand/5 text-brand/50 hover:text-brand hover:bg-brand/10 flex items-center justify-center text-[10px] font-black transition-all focus:outline-none" title="Connection Requirements">?</button>
-                        </div>
-                        
-                        <!-- Help Popover -->
-                        <div id="dropdownIgHelp" class="hidden mt-3 bg-brand/5 border border-brand/10 rounded-xl p-3.5 relative transition-all animate-in fade-in zoom-in-95 duration-200">
-                            <button onclick="event.stopPropagation(); document.getElementById('dropdownIgHelp').classList.add('hidden')" class="absolute top-2.5 right-2.5 text-brand/40 hover:text-brand transition-colors focus:outline-none">
-                                <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path></svg>
-                            </button>
-                            <h4 class="text-[9px] font-bold text-brand uppercase tracking-widest mb-2 border-b border-brand/5 pb-2">Requirements</h4>
-                            <ul class="text-[9px] text-brand/70 space-y-1.5 list-none p-0 m-0 font-medium leading-tight">
-                                <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Need <strong>Business/Creator</strong> IG.</span></li>
-                                <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Must link a <strong>Facebook Page</strong>.</span></li>
-                                <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Grant <strong>all permissions</strong>.</span></li>
-                            </ul>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """
-            
+        # Same accounts, same org generations -> same markup
+        key = fragment_key("account_switcher", {a.org_id for a in accs}, tuple(a.id for a in accs))
+        switcher_html = get_fragment(key)
+        if switcher_html is None:
+            switcher_html = set_fragment(key, render_fragment("account_switcher.html", accounts=accs, active_acc=active_acc))
+
+        if accs:
             # Global account options for modals
             account_options = "".join([f'<option value="{a.id}" {"selected" if active_acc and a.id == active_acc.id else ""}>@{a.username} ({a.name or "Sabeel Studio"})</option>' for a in accs])
         else:
-            switcher_html = f"""
-            <div class="flex items-center gap-2 relative z-[9999]">
-                <button onclick="window.location.href='/auth/instagram/login'" type="button" class="relative flex items-center gap-3 p-2 pr-4 bg-brand/[0.03] hover:bg-brand/[0.06] border border-brand/10 rounded-2xl transition-all group">
-                    <div class="w-9 h-9 rounded-full bg-brand/5 flex items-center justify-center text-brand/30 group-hover:text-brand transition-colors">
-                        <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M12 4v16m8-8H4" stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5"/></svg>
-                    </div>
-                    <div class="flex flex-col items-start pr-2">
-                        <span class="text-[10px] font-black text-brand tracking-tight">Connect Account</span>
-                        <span class="text-[8px] font-bold text-brand/30 uppercase tracking-widest">Setup Platform</span>
-                    </div>
-                </button>
-                <button onclick="document.getElementById('headerIgHelp').classList.toggle('hidden')" class="w-8 h-8 shrink-0 rounded-full bg-brand/5 text-brand/50 hover:text-brand hover:bg-brand/10 flex items-center justify-center text-[10px] font-black transition-all focus:outline-none" title="Connection Requirements">?</button>
-                
-                <!-- Help Popover -->
-                <div id="headerIgHelp" class="hidden absolute top-full right-0 mt-3 w-64 bg-white border border-brand/5 rounded-2xl shadow-2xl p-4 text-left animate-in fade-in zoom-in-95 duration-200">
-                    <button onclick="document.getElementById('headerIgHelp').classList.add('hidden')" class="absolute top-3 right-3 text-brand/40 hover:text-brand transition-colors focus:outline-none">
-                        <svg class="w-3.5 h-3.5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path></svg>
-                    </button>
-                    <h4 class="text-[10px] font-bold text-brand uppercase tracking-widest mb-2 border-b border-brand/5 pb-2">Connection Rules</h4>
-                    <ul class="text-[9px] text-brand/70 space-y-2 list-none p-0 m-0 font-medium leading-tight">
-                        <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Must be a <strong>Business</strong> or <strong>Creator</strong> IG account.</span></li>
-                        <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Must be linked to a <strong>Facebook Page</strong>.</span></li>
-                        <li class="flex items-start gap-1.5"><span class="text-accent shrink-0">→</span><span>Grant <strong>all requested permissions</strong> in the Meta popup.</span></li>
-                    </ul>
-                </div>
-            </div>
-            """
             account_options = '<option value="">No accounts connected</option>'
 
-    return APP_LAYOUT_HTML.format(
+    return layout_template().format(
         title=title,
         content=content,
         user_name=user.name or user.email,
@@ -768,8 +707,8 @@ def render_app_page(title, content, user, org, active_tab, db: Session = None, e
         active_automations=active_map["automations"],
         active_library=active_map["library"],
         active_media=active_map["media"],
-        studio_modal=STUDIO_COMPONENTS_HTML.replace("{account_options}", account_options),
-        studio_js=STUDIO_SCRIPTS_JS,
+        studio_modal=studio_components_tag(account_options),
+        studio_js=studio_scripts_tag(),
         connected_account_info=(extras.get("connected_account_info", "") if extras else ""),
         connect_instagram_modal=CONNECT_INSTAGRAM_MODAL_HTML,
         navbar_account_switcher=switcher_html,
@@ -781,7 +720,7 @@ def render_app_page(title, content, user, org, active_tab, db: Session = None, e
 @router.get("/app", response_class=HTMLResponse)
 async def app_dashboard_page(
     user: User = Depends(require_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # REDIRECT LOGIC
     # REMOVED FORCED ONBOARDING REDIRECT
@@ -789,51 +728,51 @@ async def app_dashboard_page(
     # Fetch User's Active Org
     org_id = user.active_org_id
     if not org_id:
-        membership = db.query(OrgMember).filter(OrgMember.user_id == user.id).first()
+        membership = (await db.scalars(select(OrgMember).where(OrgMember.user_id == user.id).limit(1))).first()
         if not membership:
             # Create a default org if missing to prevent total breakage
             new_org = Org(name=f"{user.name or 'User'}'s Workspace")
             db.add(new_org)
-            db.flush()
+            await db.flush()
             membership = OrgMember(org_id=new_org.id, user_id=user.id, role="owner")
             db.add(membership)
             org_id = new_org.id
-            user.active_org_id = org_id
-            db.commit()
         else:
             org_id = membership.org_id
-            user.active_org_id = org_id
-            db.commit()
+        # `user` belongs to the auth dependency's (sync) session: persist through this one
+        user.active_org_id = org_id
+        await db.execute(update(User).where(User.id == user.id).values(active_org_id=org_id))
+        await db.commit()
 
-    org = db.query(Org).filter(Org.id == org_id).first()
+    org = await db.get(Org, org_id)
     
     # --- Unified Account Context ---
-    active_acc, all_accs, is_connected = get_active_context(db, user, org_id)
+    active_acc, all_accs, is_connected = await get_active_context_async(db, user, org_id)
     active_acc_id = active_acc.id if active_acc else 0
     
     # Stats Calculation (Filtered by Active Account)
-    weekly_post_count = db.query(func.count(Post.id)).filter(
+    weekly_post_count = await db.scalar(select(func.count(Post.id)).where(
         Post.org_id == org_id,
         Post.ig_account_id == active_acc_id,
         Post.created_at >= datetime.now(timezone.utc) - timedelta(days=7)
-    ).scalar() or 0
+    )) or 0
     
     account_count = len(all_accs)
     
-    # Accounts for modal
-    accounts = db.query(IGAccount).filter(IGAccount.org_id == org_id).all()
+    # Accounts for modal (same org accounts as the active context)
+    accounts = all_accs
     account_options = "".join([f'<option value="{a.id}">{a.name} (@{a.ig_user_id})</option>' for a in accounts])
     if not accounts:
         account_options = '<option value="">No accounts connected</option>'
     
     # Next Post (Filtered by Active Account)
     now_utc = datetime.now(timezone.utc)
-    next_post = db.query(Post).filter(
+    next_post = (await db.scalars(select(Post).where(
         Post.org_id == org_id,
         Post.ig_account_id == active_acc_id,
         Post.status == "scheduled",
         Post.scheduled_time > now_utc
-    ).order_by(Post.scheduled_time.asc()).first()
+    ).order_by(Post.scheduled_time.asc()).limit(1))).first()
 
     next_post_countdown = "No posts scheduled"
     next_post_time = "--:--"
@@ -862,178 +801,67 @@ async def app_dashboard_page(
             next_post_media = f'<img src="{next_post.media_url}" class="w-full h-full object-cover">'
 
     # Content Pipeline (Next 7 Days)
-    calendar_headers = ""
-    calendar_days = ""
     today = datetime.now(timezone.utc)
-    for i in range(7):
-        day = today + timedelta(days=i)
-        is_today = (i == 0)
-        day_label = day.strftime("%a")
-        
-        calendar_headers += f'<div class="py-3 text-[9px] font-black text-center uppercase tracking-[0.3em] {"text-brand" if is_today else "text-text-muted/40"}">{day_label}</div>'
-        
-        # Count posts for this day (Filtered by Active Account)
-        day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
-        day_end = day_start + timedelta(days=1)
-        post_count = db.query(func.count(Post.id)).filter(
+    week_key = fragment_key("dashboard_week", [org_id], active_acc_id, today.date())
+    cached_week = get_fragment(week_key)
+    if cached_week is None:
+        # One query for the whole week (Filtered by Active Account), bucketed per day below
+        window_start = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+        window_end = window_start + timedelta(days=7)
+        week_times = (await db.execute(select(Post.scheduled_time, Post.published_time).where(
             Post.org_id == org_id,
             Post.ig_account_id == active_acc_id,
             or_(
-                and_(Post.scheduled_time >= day_start, Post.scheduled_time < day_end),
-                and_(Post.published_time >= day_start, Post.published_time < day_end)
+                and_(Post.scheduled_time >= window_start, Post.scheduled_time < window_end),
+                and_(Post.published_time >= window_start, Post.published_time < window_end)
             )
-        ).scalar() or 0
-        
-        state_html = ""
-        if post_count > 0:
-            state_html = f"""
-            <div class="flex flex-col items-center gap-1.5">
-                <div class="text-[14px] font-black text-brand">{post_count}</div>
-                <div class="w-full h-1.5 rounded-full bg-brand shadow-sm shadow-brand/20"></div>
-            </div>
-            """
-        else:
-            state_html = f"""
-            <div class="flex flex-col items-center gap-1.5 opacity-10">
-                <div class="text-[14px] font-black text-brand">0</div>
-                <div class="w-full h-1.5 rounded-full bg-brand/20"></div>
-            </div>
-            """
-            
-        calendar_days += f"""
-        <div class="flex flex-col items-center justify-center p-3 rounded-2xl transition-all {"bg-brand/[0.03] border border-brand/5 shadow-inner" if is_today else "hover:bg-brand/[0.01]"}">
-          <span class="text-[8px] font-black {"text-brand" if is_today else "text-text-muted/30"} uppercase tracking-widest mb-3">{day.day}</span>
-          {state_html}
-        </div>
-        """
+        ))).all()
+
+        week_days = []
+        for i in range(7):
+            day = today + timedelta(days=i)
+            day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            day_end = day_start + timedelta(days=1)
+            post_count = sum(
+                1 for sched, pub in week_times
+                if (sched and day_start <= sched < day_end) or (pub and day_start <= pub < day_end)
+            )
+            week_days.append((day, post_count))
+
+        week_macros = fragment_macros("dashboard_week.html")
+        cached_week = set_fragment(week_key, (str(week_macros.headers(week_days)), str(week_macros.cells(week_days))))
+    calendar_headers, calendar_days = cached_week
 
     # Intelligence Feed (Dashboard Sections)
-    posts = db.query(Post).filter(
-        Post.org_id == org_id,
-        Post.ig_account_id == active_acc_id
-    ).order_by(Post.created_at.desc()).limit(30).all()
-    
-    sections = {
-        "Needs Attention": {"posts": [], "icon": '<svg class="w-4 h-4 text-rose-500" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"/></svg>'},
-        "Drafts & Ideas": {"posts": [], "icon": '<svg class="w-4 h-4 text-accent" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"/></svg>'},
-        "Scheduled Queue": {"posts": [], "icon": '<svg class="w-4 h-4 text-brand" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z"/></svg>'},
-        "Recently Shared": {"posts": [], "icon": '<svg class="w-4 h-4 text-emerald-600" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"/></svg>'}
-    }
-    
-    for p in posts:
-        if p.status in ["failed", "needs_review"]:
-            sections["Needs Attention"]["posts"].append(p)
-        elif p.status in ["draft", "drafted", "ready"]:
-            sections["Drafts & Ideas"]["posts"].append(p)
-        elif p.status == "scheduled":
-            sections["Scheduled Queue"]["posts"].append(p)
-        elif p.status in ["published", "shared"]:
-            sections["Recently Shared"]["posts"].append(p)
-            
-    dashboard_feed_sections = ""
-    for sec_title, sec_data in sections.items():
-        if not sec_data["posts"]:
-            continue
-            
-        cards_html = ""
-        for p in sec_data["posts"][:6]: # Limit 6 per section for UI balance
-            # Determine Type
-            cap = p.caption or ""
-            p_type = "REFLECTION"
-            if any(x in cap for x in ["Surah", "Verse", "Ayah", "Quran"]): p_type = "QURAN"
-            elif any(x in cap for x in ["Hadith", "Prophet", "Sahih", "Bukhari", "Muslim"]): p_type = "HADITH"
-            
-            status_color = "text-text-muted"
-            status_bg = "bg-brand/5"
-            status_label = "Reflection Draft" if p.status == "draft" else p.status.capitalize()
-            
-            if p.status in ["published", "shared"]: 
-                status_color = "text-emerald-600"
-                status_bg = "bg-emerald-50"
-                status_label = "Shared"
-            elif p.status == "scheduled": 
-                status_color = "text-brand"
-                status_bg = "bg-brand/10"
-                status_label = "Planned"
-            elif p.status == "ready":
-                status_color = "text-accent"
-                status_bg = "bg-accent/10"
-                status_label = "Review Ready"
-            elif p.status in ["failed", "needs_review"]:
-                status_color = "text-rose-600"
-                status_bg = "bg-rose-50"
-            
-            caption_json = html.escape(json.dumps(p.caption or ""), quote=True)
-            date_str = p.created_at.strftime("%b %d")
-            
-            # Action Buttons based on status
-            actions_html = ""
-            refine_btn = f"""<button onclick="openEditPostModal('{p.id}', {caption_json}, '{p.scheduled_time.isoformat() if p.scheduled_time else ''}')" class="flex-1 py-3 bg-white border border-brand/10 rounded-xl text-[10px] font-bold uppercase tracking-widest text-text-muted hover:text-brand hover:border-brand/30 transition-all shadow-sm">Refine</button>"""
-            
-            share_btn = f"""<button onclick="approvePost('{p.id}', event)" class="flex-1 py-3 bg-brand text-white rounded-xl font-bold text-[10px] uppercase tracking-widest hover:scale-[1.02] transition-all shadow-xl shadow-brand/20">Share Now</button>"""
-            
-            retry_btn = f"""<button onclick="approvePost('{p.id}', event)" class="flex-1 py-3 bg-rose-500 text-white rounded-xl font-bold text-[10px] uppercase tracking-widest hover:bg-rose-600 transition-all shadow-xl shadow-rose-500/20">Retry Share</button>"""
-            
-            delete_btn = f"""<button onclick="deletePost('{p.id}', event)" class="p-3 text-gray-400 hover:text-rose-600 hover:bg-rose-50 rounded-xl transition-all border border-transparent hover:border-rose-100">
-                <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16" stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5"/></svg>
-            </button>"""
-            
-            if sec_title == "Needs Attention":
-                actions_html = refine_btn + retry_btn + delete_btn
-            elif sec_title == "Drafts & Ideas":
-                schedule_btn = f"""<button onclick="openScheduleModal('{p.id}', event)" class="flex-1 py-3 bg-brand/5 border border-brand/10 rounded-xl text-[10px] font-bold uppercase tracking-widest text-brand hover:bg-brand hover:text-white transition-all shadow-sm">Schedule</button>"""
-                actions_html = refine_btn + schedule_btn + share_btn + delete_btn
-            elif sec_title == "Scheduled Queue":
-                actions_html = refine_btn + delete_btn
-            else: # Published
-                actions_html = delete_btn
-                
-            # Card UI
-            cards_html += f"""
-            <div class="card bg-white border border-brand/5 shadow-sm hover:shadow-xl hover:shadow-brand/[0.02] transition-all duration-300 flex flex-col group overflow-hidden">
-                <!-- Visual Banner -->
-                <div class="h-32 w-full bg-cream relative border-b border-brand/5 overflow-hidden flex items-center justify-center">
-                    {f'<img src="{p.media_url}" class="w-full h-full object-cover group-hover:scale-105 transition-transform duration-700">' if p.media_url else '<svg class="w-8 h-8 text-brand/10" fill="currentColor" viewBox="0 0 24 24"><path d="M12 2.163c3.204 0 3.584.012 4.85.07 3.252.148 4.771 1.691 4.919 4.919.058 1.265.069 1.645.069 4.849 0 3.205-.012 3.584-.069 4.849-.149 3.225-1.664 4.771-4.919 4.919-1.266.058-1.644.07-4.85.07-3.204 0-3.584-.012-4.849-.07-3.26-.149-4.771-1.699-4.919-4.92-.058-1.265-.07-1.644-.07-4.849 0-3.204.013-3.583.07-4.849.149-3.227 1.664-4.771 4.919-4.919 1.266-.057 1.645-.069 4.849-.069zm0-2.163c-3.259 0-3.667.014-4.947.072-4.358.2-6.78 2.618-6.98 6.98-.059 1.281-.073 1.689-.073 4.948 0 3.259.014 3.668.072 4.948.2 4.358 2.618 6.78 6.98 6.98 1.281.058 1.689.072 4.948.072 3.259 0 3.668-.014 4.948-.072 4.354-.2 6.782-2.618 6.979-6.98.059-1.28.073-1.689.073-4.948 0-3.259-.014-3.667-.072-4.948.2 4.358 2.618 6.78 6.98 6.98 1.281.058 1.689.072 4.948.072 3.259 0 3.668-.014 4.948-.072 4.354-.2 6.782-2.618 6.979-6.98.059-1.28.073-1.689.073-4.948 0-3.259-.014-3.667-.072-4.947-.196-4.354-2.617-6.78-6.979-6.98-1.281-.058-1.69-.073-4.949-.073zm0 5.838c-3.403 0-6.162 2.759-6.162 6.162s2.759 6.163 6.162 6.163 6.162-2.759 6.162-6.163c0-3.403-2.759-6.162-6.162-6.162zm0 10.162c-2.209 0-4-1.791-4-4 0-2.209 1.791-4 4-4s4 1.791 4 4c0 2.209-1.791 4-4 4zm6.406-11.845c-.796 0-1.441.645-1.441 1.44s.645 1.44 1.441 1.44c.795 0 1.439-.645 1.439-1.44s-.644-1.44-1.439-1.44z"/></svg>'}
-                    <div class="absolute top-4 right-4 px-2.5 py-1 {status_bg} {status_color} backdrop-blur-md rounded-lg text-[8px] font-black uppercase tracking-[0.2em] shadow-sm">{status_label}</div>
-                </div>
-                
-                <div class="p-6 flex flex-col flex-1 gap-5">
-                    <!-- Header -->
-                    <div class="flex items-center justify-between">
-                        <div class="badge-premium !text-[9px]">{p_type}</div>
-                        <div class="text-[9px] font-bold text-text-muted uppercase tracking-[0.2em]">{date_str}</div>
-                    </div>
-                    
-                    <!-- Content -->
-                    <div class="flex-1">
-                        <p class="text-[13px] font-medium text-text-main leading-relaxed line-clamp-3 italic opacity-90">
-                            "{p.caption[:120] if p.caption else "Suggested Reminder"}"
-                        </p>
-                    </div>
-                    
-                    <!-- Actions -->
-                    <div class="flex items-center gap-3 pt-4 border-t border-brand/5 mt-auto">
-                        {actions_html}
-                    </div>
-                </div>
-            </div>
-            """
-            
-        dashboard_feed_sections += f"""
-        <div class="space-y-6">
-            <div class="flex items-center gap-3 border-b border-brand/5 pb-4">
-                {sec_data['icon']}
-                <h2 class="text-[11px] font-black uppercase tracking-[0.3em] text-brand/80">{sec_title}</h2>
-                <span class="ml-2 px-2 py-0.5 bg-brand/5 rounded-md text-[9px] font-bold text-brand">{{len(sec_data['posts'])}}</span>
-            </div>
-            <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {cards_html}
-            </div>
-        </div>
-        """
+    feed_key = fragment_key("dashboard_feed", [org_id], active_acc_id)
+    dashboard_feed_sections = get_fragment(feed_key)
+    if dashboard_feed_sections is None:
+        posts = (await db.scalars(select(Post).where(
+            Post.org_id == org_id,
+            Post.ig_account_id == active_acc_id
+        ).order_by(Post.created_at.desc()).limit(30))).all()
+        
+        sections = {
+            "Needs Attention": {"posts": [], "icon": '<svg class="w-4 h-4 text-rose-500" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"/></svg>'},
+            "Drafts & Ideas": {"posts": [], "icon": '<svg class="w-4 h-4 text-accent" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"/></svg>'},
+            "Scheduled Queue": {"posts": [], "icon": '<svg class="w-4 h-4 text-brand" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z"/></svg>'},
+            "Recently Shared": {"posts": [], "icon": '<svg class="w-4 h-4 text-emerald-600" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"/></svg>'}
+        }
         
-    if not dashboard_feed_sections:
-        dashboard_feed_sections = '<div class="text-center py-16 text-[10px] font-black uppercase text-text-muted italic border-dashed border-2 border-brand/10 rounded-[2rem] bg-brand/[0.01]">No recent activity in your studio</div>'
+        for p in posts:
+            if p.status in ["failed", "needs_review"]:
+                sections["Needs Attention"]["posts"].append(p)
+            elif p.status in ["draft", "drafted", "ready"]:
+                sections["Drafts & Ideas"]["posts"].append(p)
+            elif p.status == "scheduled":
+                sections["Scheduled Queue"]["posts"].append(p)
+            elif p.status in ["published", "shared"]:
+                sections["Recently Shared"]["posts"].append(p)
+
+        dashboard_feed_sections = set_fragment(feed_key, render_fragment(
+            "dashboard_feed.html",
+            sections=[(title, data["icon"], data["posts"]) for title, data in sections.items()],
+        ))
     
     # Connection CTA for empty states
     connection_cta = ""
@@ -1054,17 +882,22 @@ async def app_dashboard_page(
     # Check if superadmin for admin link and prominent CTA
     admin_link = ""
     # --- GET STARTED CHECKLIST LOGIC ---
-    automation_count = db.query(func.count(TopicAutomation.id)).filter(TopicAutomation.org_id == org_id).scalar() or 0
-    primary_acc = db.query(IGAccount).filter(IGAccount.org_id == org_id).first()
-    is_connected = primary_acc is not None
+    automation_count = await db.scalar(select(func.count(TopicAutomation.id)).where(TopicAutomation.org_id == org_id)) or 0
+    is_connected = bool(all_accs)
     
     # Update user flags if they have activity
+    flag_updates = {}
     if weekly_post_count > 0 and not user.has_created_first_post:
-        user.has_created_first_post = True
+        flag_updates["has_created_first_post"] = True
     if automation_count > 0 and not user.has_created_first_automation:
-        user.has_created_first_automation = True
+        flag_updates["has_created_first_automation"] = True
     if is_connected and not user.has_connected_instagram:
-        user.has_connected_instagram = True
+        flag_updates["has_connected_instagram"] = True
+    if flag_updates:
+        for k, v in flag_updates.items():
+            setattr(user, k, v)
+        await db.execute(update(User).where(User.id == user.id).values(**flag_updates))
+        await db.commit()
     
     # Connected account info for header (Shows Active Account)
     if is_connected and active_acc:
@@ -1122,7 +955,7 @@ async def app_dashboard_page(
                                    .replace("{org_id}", str(org_id))
     
     # --- GET ACCOUNT OPTIONS FOR STUDIO MODAL ---
-    accs = db.query(IGAccount).filter(IGAccount.org_id == org_id).all()
+    accs = all_accs
     account_options = "".join([f'<option value="{a.id}" {"selected" if a.id == active_acc_id else ""}>@{a.username} ({a.name or "Sabeel Studio"})</option>' for a in accs])
     if not accs:
         account_options = '<option value="">No accounts connected</option>'
@@ -1133,7 +966,7 @@ async def app_dashboard_page(
         user=user,
         org=org,
         active_tab="dashboard",
-        db=db,
+        accounts=await load_switcher_accounts(db, user),
         extras={
             "connected_account_info": connected_account_info,
             "extra_js": f'<script>window.hasConnectedInstagram = {"true" if is_connected else "false"};</script>'
@@ -1151,13 +984,13 @@ async def app_select_account_page(
 @router.get("/app/calendar", response_class=HTMLResponse)
 async def app_calendar_page(
     user: User = Depends(require_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # REMOVED FORCED ONBOARDING REDIRECT
-    org = db.query(Org).filter(Org.id == user.active_org_id).first()
+    org = await db.get(Org, user.active_org_id)
     
     # --- Unified Account Context ---
-    active_acc, all_accs, is_connected = get_active_context(db, user, org.id)
+    active_acc, all_accs, is_connected = await get_active_context_async(db, user, org.id)
     active_acc_id = active_acc.id if active_acc else 0
 
     admin_link = '<a href="/admin" class="text-[10px] font-black uppercase tracking-widest nav-link py-5 text-rose-400 hover:text-white transition-colors">Admin</a>' if user.is_superadmin else ""
@@ -1177,151 +1010,37 @@ async def app_calendar_page(
     else:
         month_end = datetime(year, month + 1, 1)
 
-    # Use a wider range to avoid TZ boundary issues
-    query_start = month_start - timedelta(days=1)
-    query_end = month_end + timedelta(days=1)
-        
-    # Filter by Active Account
-    posts = db.query(Post).filter(
-        Post.org_id == org.id,
-        Post.ig_account_id == active_acc_id,
-        or_(
-            and_(Post.scheduled_time >= query_start, Post.scheduled_time < query_end),
-            and_(Post.published_time >= query_start, Post.published_time < query_end)
-        )
-    ).all()
-    
-    # Map posts to days
-    post_map = {}
-    for p in posts:
-        dt = p.scheduled_time or p.published_time
-        if not dt: continue
-        day = dt.day
-        if day not in post_map: post_map[day] = []
-        post_map[day].append(p)
-        
-    calendar_html = ""
-    headers = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-    for h in headers:
-        calendar_html += f'<div class="py-5 text-[9px] font-black uppercase tracking-[0.4em] text-brand/40 text-center">{h}</div>'
+    board_key = fragment_key("calendar_board", [org.id], active_acc_id, today.date())
+    calendar_board = get_fragment(board_key)
+    if calendar_board is None:
+        # Use a wider range to avoid TZ boundary issues
+        query_start = month_start - timedelta(days=1)
+        query_end = month_end + timedelta(days=1)
+            
+        # Filter by Active Account
+        posts = (await db.scalars(select(Post).where(
+            Post.org_id == org.id,
+            Post.ig_account_id == active_acc_id,
+            or_(
+                and_(Post.scheduled_time >= query_start, Post.scheduled_time < query_end),
+                and_(Post.published_time >= query_start, Post.published_time < query_end)
+            )
+        ))).all()
         
-    for week in month_days:
-        for day in week:
-            if day == 0:
-                # Ghost cell for padding days (softer)
-                calendar_html += '<div class="min-h-[140px] rounded-3xl bg-brand/[0.01] opacity-50"></div>'
-            else:
-                day_posts = post_map.get(day, [])
-                posts_html = ""
-                for dp in day_posts[:2]: # Show max 2 to keep it clean
-                    # Determine type
-                    cap = dp.caption or ""
-                    p_type = "REFLECTION"
-                    if any(x in cap for x in ["Surah", "Verse", "Ayah", "Quran"]): p_type = "QURAN"
-                    elif any(x in cap for x in ["Hadith", "Prophet", "Sahih", "Bukhari", "Muslim"]): p_type = "HADITH"
-                    elif "Story" in cap: p_type = "STORY"
-                    
-                    # Status logic (Stronger Visuals)
-                    if dp.status == "published": 
-                        status_badge = "bg-emerald-100 text-emerald-800"
-                        border_color = "border-l-emerald-500"
-                        display_status = "Shared"
-                    elif dp.status == "scheduled": 
-                        status_badge = "bg-brand text-white shadow-md shadow-brand/20"
-                        border_color = "border-l-brand"
-                        display_status = "Planned"
-                    elif dp.status == "failed":
-                        status_badge = "bg-rose-100 text-rose-800"
-                        border_color = "border-l-rose-500"
-                        display_status = "Failed"
-                    else: # draft
-                        status_badge = "bg-amber-100 text-amber-800"
-                        border_color = "border-l-amber-400"
-                        display_status = "Draft"
-                    
-                    # Preview (approx 8-12 words in 40-50 chars)
-                    preview = (cap[:45] + "...") if len(cap) > 45 else (cap if cap else "Suggested Reminder")
-                    
-                    time_display = ""
-                    if dp.status == "scheduled" and dp.scheduled_time:
-                        t_str = dp.scheduled_time.strftime("%I:%M %p").lstrip("0").lower()
-                        time_display = f'<div class="text-[8px] font-black text-brand/40 uppercase tracking-widest mb-1.5 flex items-center gap-1.5"><svg class="w-3 h-3 text-brand/30" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5" d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z"/></svg>{t_str}</div>'
-                    
-                    # Ensure scheduled_time string is safe for JS
-                    sched_time_str = dp.scheduled_time.isoformat() if dp.scheduled_time else ""
-
-                    posts_html += f"""
-                    <div class="p-4 rounded-[1.25rem] bg-white border border-brand/5 border-l-[4px] {border_color} flex flex-col gap-1 overflow-hidden group/post cursor-pointer hover:shadow-md hover:-translate-y-1 hover:border-brand/10 transition-all shadow-sm" 
-                         onclick="openEditPostModal('{dp.id}', {html.escape(json.dumps(dp.caption or 'Suggested Reminder'))}, '{sched_time_str}')">
-                        <div class="flex justify-between items-start mb-1">
-                            {time_display}
-                            <span class="px-2 py-1 rounded-md {status_badge} text-[7px] font-black uppercase tracking-[0.2em] leading-none ml-auto">{display_status}</span>
-                        </div>
-                        <div class="text-[7px] font-black uppercase tracking-[0.25em] text-accent/50 mb-0.5">{p_type}</div>
-                        <p class="text-[11px] font-bold text-brand leading-snug line-clamp-2 transition-colors">"{html.escape(preview)}"</p>
-                    </div>
-                    """
-                
-                is_today = (day == today.day and month == today.month and year == today.year)
-                has_posts = len(day_posts) > 0
-                
-                # Hierarchy styling
-                if is_today:
-                    cell_class = "border-brand bg-brand/[0.03] shadow-md ring-4 ring-brand/5"
-                    day_color = "text-brand"
-                elif has_posts:
-                    cell_class = "border-brand/10 bg-white shadow-sm hover:border-brand/30"
-                    day_color = "text-brand"
-                else:
-                    cell_class = "border-transparent bg-brand/[0.01] hover:bg-white hover:border-brand/10 hover:shadow-sm group/empty"
-                    day_color = "text-brand/30 group-hover/empty:text-brand/60"
-                
-                # Empty state content
-                empty_html = '<div class="flex-1 flex items-center justify-center opacity-0 group-hover/empty:opacity-[0.04] transition-opacity"><svg class="w-8 h-8 text-brand" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M12 6v6m0 0v6m0-6h6m-6 0H6" stroke-linecap="round" stroke-linejoin="round" stroke-width="2"/></svg></div>'
-                
-                calendar_html += f"""
-                <div class="min-h-[160px] card border rounded-[2rem] p-4 flex flex-col gap-3 transition-all duration-300 {cell_class}">
-                    <div class="flex justify-between items-center mb-1">
-                        <span class="text-sm font-black {day_color} transition-colors">{day}</span>
-                        { '<span class="px-2 py-1 bg-emerald-500 text-white rounded-lg text-[8px] font-black uppercase tracking-widest shadow-lg shadow-emerald-500/20">Today</span>' if is_today else '' }
-                    </div>
-                    <div class="flex flex-col gap-3 flex-1">
-                        {posts_html or empty_html}
-                    </div>
-                </div>
-                """
+        # Map posts to days
+        post_map = {}
+        for p in posts:
+            dt = p.scheduled_time or p.published_time
+            if not dt: continue
+            post_map.setdefault(dt.day, []).append(p)
 
-    # Map posts to a list of HTML snippets
-    scheduled_posts_html = []
-    # Upcoming reminders (from now onwards)
-    upcoming_posts = [p for p in posts if p.status == "scheduled" and p.scheduled_time and p.scheduled_time >= today]
-    upcoming_posts.sort(key=lambda x: x.scheduled_time)
-    
-    for p in upcoming_posts[:7]:
-        caption = p.caption[:60] if p.caption else "Untitled Post"
-        time_str = p.scheduled_time.strftime("%b %d, %I:%M %p").lstrip("0").replace(" 0", " ")
-        sched_time_str = p.scheduled_time.isoformat() if p.scheduled_time else ""
-        scheduled_posts_html.append(f"""
-            <div class="flex items-start gap-4 p-4 bg-brand/[0.01] rounded-2xl border border-transparent hover:bg-white hover:shadow-sm hover:border-brand/10 transition-all duration-300 group cursor-pointer" onclick="openEditPostModal('{p.id}', {html.escape(json.dumps(p.caption or 'Suggested Reminder'))}, '{sched_time_str}')">
-                <div class="w-2 h-2 mt-2 rounded-full bg-brand shrink-0 group-hover:scale-125 transition-transform shadow-sm shadow-brand/30"></div>
-                <div class="flex flex-col gap-1.5 min-w-0">
-                    <div class="text-[9px] font-black text-brand/40 uppercase tracking-[0.2em]">{time_str}</div>
-                    <span class="text-[11px] font-bold text-brand line-clamp-2 leading-relaxed">"{html.escape(caption)}..."</span>
-                </div>
-            </div>
-        """)
-        
-    scheduled_list_html = "".join(scheduled_posts_html)
-    if not scheduled_list_html:
-        scheduled_list_html = """
-            <div class="py-16 flex flex-col items-center space-y-4 text-center">
-                <div class="w-16 h-16 bg-brand/5 rounded-2xl flex items-center justify-center text-brand/20 mb-2">
-                    <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z" stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5"/></svg>
-                </div>
-                <div class="text-[10px] font-black uppercase tracking-[0.4em] text-brand/20">No Recent Activity</div>
-                <p class="text-xs text-text-muted opacity-50 font-medium">Schedule your first piece of guidance to see it here.</p>
-            </div>
-        """
+        # Upcoming reminders (from now onwards)
+        upcoming_posts = [p for p in posts if p.status == "scheduled" and p.scheduled_time and p.scheduled_time >= today]
+        upcoming_posts.sort(key=lambda x: x.scheduled_time)
+
+        calendar_board = set_fragment(board_key, render_fragment(
+            "calendar_board.html", weeks=month_days, post_map=post_map, today=today, upcoming=upcoming_posts[:7],
+        ))
 
     content = f"""
     <div class="space-y-8 pb-20 max-w-[1600px] mx-auto">
@@ -1344,33 +1063,7 @@ async def app_calendar_page(
             </div>
         </div>
         
-        <div class="grid grid-cols-1 xl:grid-cols-4 gap-8 items-start">
-            <!-- Main Calendar Area -->
-            <div class="xl:col-span-3 space-y-4">
-                <!-- Calendar Grid -->
-                <div class="grid grid-cols-7 gap-3">
-                    {calendar_html}
-                </div>
-            </div>
-            
-            <!-- Side Agenda Panel -->
-            <div class="xl:col-span-1 space-y-6 sticky top-8">
-                <div class="bg-white rounded-[2rem] border border-brand/5 p-6 shadow-sm flex flex-col min-h-[500px]">
-                    <div class="flex items-center justify-between mb-8">
-                        <div class="flex items-center gap-3">
-                            <div class="w-8 h-8 rounded-xl bg-brand/5 flex items-center justify-center text-brand">
-                                <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2.5" d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2m-6 9l2 2 4-4"/></svg>
-                            </div>
-                            <h3 class="text-sm font-black text-brand tracking-tight uppercase tracking-widest">Agenda</h3>
-                        </div>
-                    </div>
-                    
-                    <div class="flex flex-col gap-2 flex-1">
-                        {scheduled_list_html if len(scheduled_posts_html) > 0 else f'<div class="flex-1 flex flex-col items-center justify-center text-center opacity-40 py-10"><svg class="w-8 h-8 mb-4 text-brand" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z" stroke-linecap="round" stroke-linejoin="round" stroke-width="2"/></svg><span class="text-[9px] font-black uppercase tracking-widest">No upcoming<br>reminders</span></div>'}
-                    </div>
-                </div>
-            </div>
-        </div>
+        {calendar_board}
     </div>
     """
     
@@ -1393,7 +1086,7 @@ async def app_calendar_page(
         user=user,
         org=org,
         active_tab="calendar",
-        db=db,
+        accounts=await load_switcher_accounts(db, user),
         extras={
             "connected_account_info": connected_account_info,
             "extra_js": f'<script>window.hasConnectedInstagram = {"true" if is_connected else "false"};</script>'
@@ -1769,6 +1462,6 @@ async def api_refine_content(
     payload: RefineRequest,
     user: User = Depends(require_user)
 ):
-    from app.services.llm import refine_caption
-    refined = refine_caption(payload.text, payload.type)
+    from app.services.llm import arefine_caption
+    refined = await arefine_caption(payload.text, payload.type)
     return {"refined": refined}
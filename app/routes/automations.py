@@ -66,7 +66,7 @@ def create_automation(
     db.add(new_auto)
     db.commit()
     db.refresh(new_auto)
-    reload_automation_jobs(lambda: db)
+    reload_automation_jobs()
     return new_auto
 
 @router.get("/meta/style-presets")
@@ -165,12 +165,24 @@ def run_scheduler_now(
     org_id: int = Depends(get_current_org_id)
 ):
     from app.services.scheduler import publish_due_posts
+    from app.db import SessionLocal
     try:
-        count = publish_due_posts(lambda: db)
+        # Worker threads need their own sessions (a request session is not thread-safe)
+        count = publish_due_posts(SessionLocal)
         return {"ok": True, "published": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/plan-day")
+def plan_org_day_now(
+    db: Session = Depends(get_db),
+    org_id: int = Depends(get_current_org_id)
+):
+    """Plans today's remaining slots for every enabled automation of the org in one pass."""
+    from app.services.automation_planner import plan_org_day
+    planned = plan_org_day(db, org_id)
+    return {"ok": True, "planned": {a_id: [p.id for p in posts] for a_id, posts in planned.items()}}
+
 @router.get("/{id}", response_model=List[TopicAutomationOut] if False else TopicAutomationOut) # Shadow prevention
 def get_automation(
     id: int,
@@ -202,7 +214,7 @@ def update_automation(
     
     db.commit()
     db.refresh(auto)
-    reload_automation_jobs(lambda: db)
+    reload_automation_jobs()
     return auto
 
 @router.delete("/{id}")
@@ -217,7 +229,7 @@ def delete_automation(
     
     db.delete(auto)
     db.commit()
-    reload_automation_jobs(lambda: db)
+    reload_automation_jobs()
     return {"ok": True}
 
 @router.post("/{id}/run-once", response_model=PostOut)
@@ -250,6 +262,22 @@ def trigger_automation(
 
     return result.post
 
+@router.post("/{id}/plan-day", response_model=List[PostOut])
+def plan_automation_day_now(
+    id: int,
+    db: Session = Depends(get_db),
+    org_id: int = Depends(get_current_org_id)
+):
+    """Generates all of today's remaining posts for the automation as scheduled drafts."""
+    from app.services.automation_planner import plan_automation_day
+    auto = db.query(TopicAutomation).filter(
+        TopicAutomation.id == id, TopicAutomation.org_id == org_id
+    ).first()
+    if not auto:
+        raise HTTPException(status_code=404, detail="Automation not found")
+
+    return plan_automation_day(db, auto.id)
+
 @router.get("/{id}/history", response_model=List[PostOut])
 def automation_history(
     id: int,
@@ -3,9 +3,10 @@
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db import get_db
-from sqlalchemy import or_, func
+from app.db import get_db, get_async_db
+from sqlalchemy import or_, func, select
 from app.security.rbac import get_current_org_id, require_superadmin
 from app.models import SourceDocument, ContentSource, ContentItem, LibraryTopicSynonym
 from app.schemas import (
@@ -286,7 +287,7 @@ def suggest_library_entries_endpoint(
     from sqlalchemy.sql.expression import false
     
     suggestions = suggest_library_topics(db, data.text, data.max)
-    slugs = [s.slug for s in suggestions]
+    slugs = [s["slug"] for s in suggestions]
     
     if not slugs:
         return []
@@ -475,27 +476,39 @@ async def track_user_interaction(
         print(f"Failed to track interaction: {e}")
         return {"status": "failed", "error": str(e)}
 
+def _library_item_dict(r: ContentItem) -> dict:
+    # We must format to match ContentItemOut but with simple dictionary
+    return {
+        "id": r.id, "org_id": r.org_id, "source_id": r.source_id,
+        "item_type": r.item_type, "title": r.title, "text": r.text,
+        "arabic_text": r.arabic_text, "translation": r.translation,
+        "url": r.url, "meta": r.meta, "tags": r.tags,
+        "created_at": r.created_at.isoformat() if r.created_at else None
+    }
+
+def _visible_items(org_id: int | None):
+    return select(ContentItem).where(
+        or_(
+            ContentItem.org_id == org_id if org_id else False,
+            ContentItem.org_id == None
+        )
+    )
+
 @router.get("/recommendations")
 async def get_library_recommendations(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(require_user)
 ):
     from app.models import UserInteraction
     # 1. Get user's recent interacted topics
-    recent_interactions = db.query(UserInteraction).filter(
-        UserInteraction.user_id == user.id,
-        UserInteraction.action_type == "selected_topic"
-    ).order_by(UserInteraction.created_at.desc()).limit(10).all()
-    
-    recent_topics = list(set([i.entity_id for i in recent_interactions if i.entity_id]))
+    recent_topics = list(set((await db.scalars(
+        select(UserInteraction.entity_id).where(
+            UserInteraction.user_id == user.id,
+            UserInteraction.action_type == "selected_topic"
+        ).order_by(UserInteraction.created_at.desc()).limit(10)
+    )).all()) - {None, ""})
     
-    org_id = user.active_org_id
-    base_q = db.query(ContentItem).filter(
-        or_(
-            ContentItem.org_id == org_id if org_id else False,
-            ContentItem.org_id == None
-        )
-    )
+    base_q = _visible_items(user.active_org_id)
     
     recommendations = []
     
@@ -503,74 +516,45 @@ async def get_library_recommendations(
     if recent_topics:
         for t in recent_topics:
             # We match by looking inside the JSON tags or performing an ILIKE
-            matches = base_q.filter(
+            matches = (await db.scalars(base_q.where(
                 or_(
                     ContentItem.text.ilike(f"%{t}%"),
                     ContentItem.title.ilike(f"%{t}%")
                 )
-            ).order_by(ContentItem.use_count.desc()).limit(3).all()
+            ).order_by(ContentItem.use_count.desc()).limit(3))).all()
             for m in matches:
                 if m not in recommendations:
                     recommendations.append(m)
                     
     # 3. Fill the rest with System Defaults
     if len(recommendations) < 6:
-        defaults = db.query(ContentItem).filter(
-            ContentItem.org_id == None
-        ).order_by(ContentItem.use_count.desc()).limit(10).all()
+        defaults = (await db.scalars(
+            select(ContentItem).where(ContentItem.org_id == None).order_by(ContentItem.use_count.desc()).limit(10)
+        )).all()
         for d in defaults:
             if d not in recommendations and len(recommendations) < 6:
                 recommendations.append(d)
                 
-    # We must format to match ContentItemOut but with simple dictionary
-    res_dicts = []
-    for r in recommendations[:6]:
-        r_dict = {
-            "id": r.id, "org_id": r.org_id, "source_id": r.source_id,
-            "item_type": r.item_type, "title": r.title, "text": r.text,
-            "arabic_text": r.arabic_text, "translation": r.translation,
-            "url": r.url, "meta": r.meta, "tags": r.tags,
-            "created_at": r.created_at.isoformat() if r.created_at else None
-        }
-        res_dicts.append(r_dict)
-    return res_dicts
+    return [_library_item_dict(r) for r in recommendations[:6]]
 
 @router.get("/suggest")
 async def suggest_library_entries(
     query: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(require_user)
 ):
     if not query or len(query.strip()) < 2:
         return []
     
-    org_id = user.active_org_id
-    base_q = db.query(ContentItem).filter(
-        or_(
-            ContentItem.org_id == org_id if org_id else False,
-            ContentItem.org_id == None
-        )
-    )
-    
     # Simple heuristic
-    matches = base_q.filter(
+    matches = (await db.scalars(_visible_items(user.active_org_id).where(
         or_(
             ContentItem.text.ilike(f"%{query}%"),
             ContentItem.title.ilike(f"%{query}%")
         )
-    ).order_by(ContentItem.use_count.desc()).limit(5).all()
+    ).order_by(ContentItem.use_count.desc()).limit(5))).all()
     
-    res_dicts = []
-    for r in matches:
-        r_dict = {
-            "id": r.id, "org_id": r.org_id, "source_id": r.source_id,
-            "item_type": r.item_type, "title": r.title, "text": r.text,
-            "arabic_text": r.arabic_text, "translation": r.translation,
-            "url": r.url, "meta": r.meta, "tags": r.tags,
-            "created_at": r.created_at.isoformat() if r.created_at else None
-        }
-        res_dicts.append(r_dict)
-    return res_dicts
+    return [_library_item_dict(r) for r in matches]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1,15 +1,17 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
-import os, shutil
+import os
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from ..db import get_db
 from ..config import settings
-from ..models import MediaAsset
+from ..models import MediaAsset, MediaAssetTag
 from ..schemas import MediaAssetOut, MediaAssetCreate
 from ..security.rbac import get_current_org_id
+from ..services import media_registry, media_storage
+from ..services.media_library import set_asset_tags
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/media-assets", tags=["media"])
@@ -32,12 +34,13 @@ def list_media(
     if ig_account_id:
         stmt = stmt.where(MediaAsset.ig_account_id == ig_account_id)
     
-    # Simple tag filtering
-    assets = db.execute(stmt).scalars().all()
     if tag:
-        assets = [a for a in assets if tag in (a.tags or [])]
+        # Indexed lookup on the normalized tag rows
+        stmt = stmt.where(MediaAsset.id.in_(
+            select(MediaAssetTag.asset_id).where(MediaAssetTag.org_id == org_id, MediaAssetTag.tag == tag.strip().lower())
+        ))
     
-    return assets
+    return db.execute(stmt).scalars().all()
 
 @router.post("", response_model=MediaAssetOut)
 def upload_media_asset(
@@ -50,13 +53,8 @@ def upload_media_asset(
     import json
     _ensure_uploads_dir()
     
-    filename = f"lib_{int(_utcnow().timestamp())}_{image.filename}"
-    local_path = os.path.join(settings.uploads_dir, filename)
-
-    with open(local_path, "wb") as f:
-        shutil.copyfileobj(image.file, f)
-
-    public_url = f"{settings.public_base_url}/uploads/{filename}"
+    stored = media_storage.store_stream(image.file, image.filename)
+    public_url = f"{settings.public_base_url}/uploads/{stored.key}" if stored.local_path else stored.url
     
     try:
         tags_list = json.loads(tags)
@@ -67,9 +65,9 @@ def upload_media_asset(
         org_id=org_id,
         ig_account_id=ig_account_id,
         url=public_url,
-        storage_path=local_path,
-        tags=tags_list
+        storage_path=stored.local_path,
     )
+    set_asset_tags(db, new_asset, tags_list if isinstance(tags_list, list) else [])
     db.add(new_asset)
     db.commit()
     db.refresh(new_asset)
@@ -85,11 +83,19 @@ def delete_media_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    if asset.storage_path and os.path.exists(asset.storage_path):
+    if media_storage.is_content_key(os.path.basename(asset.url or "")):
+        # Shared by every upload of the same bytes: only removed with its last reference
+        try:
+            media_storage.release(db, asset.url, asset_id=asset.id)
+        except Exception as e:
+            print(f"Error removing file: {e}")
+    elif asset.storage_path and os.path.exists(asset.storage_path):
         try:
             os.remove(asset.storage_path)
         except Exception as e:
             print(f"Error removing file: {e}")
+    if asset.storage_path:
+        media_registry.forget(os.path.basename(asset.storage_path))
 
     db.delete(asset)
     db.commit()
@@ -16,6 +16,7 @@ from ..schemas import PostOut, ApproveIn, GenerateOut, PostUpdate
 from ..services.llm import generate_draft, generate_ai_image
 import requests
 from ..services.policy import keyword_flags
+from ..services import media_registry, media_storage
 from ..services.publisher import publish_to_instagram
 from ..services.automation_runner import resolve_media_url
 from ..security.rbac import get_current_org_id
@@ -135,13 +136,8 @@ def intake_post(
         if image.content_type not in ("image/png", "image/jpeg", "image/jpg", "image/webp"):
             raise HTTPException(status_code=400, detail=f"File type '{image.content_type}' is not supported. Use PNG, JPG, or WEBP.")
         
-        filename = f"{int(_utcnow().timestamp())}_{image.filename}"
-        local_path = os.path.join(settings.uploads_dir, filename)
         try:
-            with open(local_path, "wb") as f:
-                shutil.copyfileobj(image.file, f)
-            from app.config import build_public_media_url
-            public_url = build_public_media_url(filename, local_path=local_path)
+            public_url = media_storage.store_stream(image.file, image.filename).url
             print(f"[INTAKE] Upload saved. media_url={public_url}")
         except Exception as e:
             print(f"FAILED FILE SAVE: {e}")
@@ -521,11 +517,8 @@ def attach_media(
         raise HTTPException(status_code=404, detail="Post not found")
     
     _ensure_uploads_dir()
-    filename = f"manual_{int(_utcnow().timestamp())}_{image.filename}"
-    local_path = os.path.join(settings.uploads_dir, filename)
-    with open(local_path, "wb") as f:
-        shutil.copyfileobj(image.file, f)
-    public_url = f"{settings.public_base_url}/uploads/{filename}"
+    stored = media_storage.store_stream(image.file, image.filename)
+    public_url = f"{settings.public_base_url}/uploads/{stored.key}" if stored.local_path else stored.url
     post.media_url = public_url
     
     db.commit()
@@ -763,8 +756,10 @@ def check_media_integrity(
 
     if "/uploads/" in post.media_url:
         local_filename = post.media_url.split("/uploads/")[-1]
-        local_path = os.path.join(settings.uploads_dir, local_filename)
-        if not os.path.exists(local_path):
+        if media_registry.locate(local_filename, verify=True) is None:
+             cdn_url = media_storage.cdn_url(post.media_url)
+             if cdn_url:
+                 return {"stale": False, "url": cdn_url}
              return {"stale": True, "reason": "file_not_on_disk"}
     
     return {"stale": False, "url": post.media_url}
@@ -812,12 +807,19 @@ def delete_post(
         db.query(ContentUsage).filter(ContentUsage.post_id == post.id).delete()
         
         # 2. Media File Cleanup
-        if post.media_url and "uploads" in post.media_url:
+        if post.media_url and media_storage.is_content_key(post.media_url.split("/")[-1]):
+            # Shared by every post/asset with the same bytes: only removed with its last reference
+            try:
+                media_storage.release(db, post.media_url, post_id=post.id)
+            except Exception as e:
+                print(f"Error deleting file for post {post_id}: {e}")
+        elif post.media_url and "uploads" in post.media_url:
             try:
                 filename = post.media_url.split("/")[-1]
                 local_path = os.path.join(settings.uploads_dir, filename)
                 if os.path.exists(local_path):
                     os.remove(local_path)
+                media_registry.forget(filename)
             except Exception as e:
                 print(f"Error deleting file for post {post_id}: {e}")
         
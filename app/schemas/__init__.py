@@ -187,6 +187,7 @@ class TopicAutomationOut(BaseModel):
     cadence: str = "daily"
     posts_per_day: int = 1
     post_spacing_hours: int = 4
+    planning_mode: str = "per_slot"
     posts_generated: int = 0  # Computed at list time — not a DB column
 
     class Config:
@@ -253,6 +254,7 @@ class TopicAutomationCreate(BaseModel):
     cadence: str = "daily"
     posts_per_day: int = 1
     post_spacing_hours: int = 4
+    planning_mode: str = "per_slot"
     enabled: bool = False
 
     media_asset_id: int | None = None
@@ -309,6 +311,7 @@ class TopicAutomationUpdate(BaseModel):
     cadence: str | None = None
     posts_per_day: int | None = None
     post_spacing_hours: int | None = None
+    planning_mode: str | None = None
     enabled: bool | None = None
 
     media_asset_id: int | None = None
@@ -2,6 +2,7 @@
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
 import hashlib
+import time
 from typing import Annotated
 from datetime import datetime, timedelta, timezone as dt_timezone
 import jwt
@@ -11,6 +12,8 @@ from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import User, ApiKey, OrgMember
 from app.config import settings
+from app.security import principal_cache
+from app.security.principal_cache import principal_key
 
 ALGORITHM = "HS256"
 
@@ -50,31 +53,21 @@ def get_current_user(
     if not token:
         x_api_key = request.headers.get("X-API-Key")
         if x_api_key:
-            # Superadmin bypass
-            if settings.admin_api_key and x_api_key == settings.admin_api_key:
-                superadmin = db.query(User).filter(User.is_superadmin == True).first()
-                if superadmin:
-                    return superadmin
-            
-            # Legacy API key lookup
-            hashed_key = hashlib.sha256(x_api_key.encode()).hexdigest()
-            api_key_record = db.query(ApiKey).filter(
-                ApiKey.key_hash == hashed_key, 
-                ApiKey.revoked_at == None
-            ).first()
-            
-            if api_key_record:
-                request.state.api_key_org_id = api_key_record.org_id
-                # Find any user in that org to act as the authenticated user
-                org_member = db.query(OrgMember).filter(OrgMember.org_id == api_key_record.org_id).first()
-                if org_member:
-                    return db.query(User).filter(User.id == org_member.user_id).first()
-                
-                # Fallback to superadmin if org has no users
-                superadmin = db.query(User).filter(User.is_superadmin == True).first()
-                return superadmin
+            key = principal_key("api_key:" + x_api_key)
+            hit, user, api_key_org_id = principal_cache.get_user(db, key)
+            if not hit:
+                user, api_key_org_id = _resolve_api_key(db, x_api_key)
+                principal_cache.put_user(key, user, api_key_org_id)
+            if api_key_org_id is not None:
+                request.state.api_key_org_id = api_key_org_id
+            return user
         return None
 
+    key = principal_key(token)
+    hit, user, _ = principal_cache.get_user(db, key)
+    if hit:
+        return user
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
@@ -86,9 +79,42 @@ def get_current_user(
     user = db.query(User).filter(User.id == int(user_id)).first()
     if not user or not user.is_active:
         return None
-        
+
+    # Never serve a cached principal past the token's own expiry
+    expires_at = None
+    if payload.get("exp"):
+        expires_at = time.monotonic() + (payload["exp"] - time.time())
+    principal_cache.put_user(key, user, expires_at=expires_at)
     return user
 
+def _resolve_api_key(db: Session, x_api_key: str) -> tuple[User | None, int | None]:
+    """(acting user, org_id) for an X-API-Key; org_id is None for the admin key or an unknown key."""
+    # Superadmin bypass
+    if settings.admin_api_key and x_api_key == settings.admin_api_key:
+        superadmin = db.query(User).filter(User.is_superadmin == True).first()
+        if superadmin:
+            return superadmin, None
+
+    # Legacy API key lookup: key, its org and any member of that org, in one query
+    hashed_key = hashlib.sha256(x_api_key.encode()).hexdigest()
+    row = db.query(ApiKey.org_id, User).outerjoin(
+        OrgMember, OrgMember.org_id == ApiKey.org_id
+    ).outerjoin(
+        User, User.id == OrgMember.user_id
+    ).filter(
+        ApiKey.key_hash == hashed_key,
+        ApiKey.revoked_at == None
+    ).order_by(OrgMember.id).first()
+    if not row:
+        return None, None
+
+    org_id, member_user = row
+    if member_user is not None:
+        return member_user, org_id
+
+    # Fallback to superadmin if org has no users
+    return db.query(User).filter(User.is_superadmin == True).first(), org_id
+
 def require_user(user: User | None = Depends(get_current_user)) -> User:
     if not user:
         raise HTTPException(
@@ -0,0 +1,183 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Short-TTL, in-process cache of resolved principals.
+
+get_current_user resolves every request from a JWT (one User query) or an
+X-API-Key (key, membership and user queries); get_current_org_id adds a
+membership query when X-Org-Id is sent. Entries here let repeat requests
+from the same token / key skip those round-trips:
+
+  - users:       sha256(token or key) -> detached User snapshot (+ API-key org)
+  - memberships: (user_id, org_id) -> is member
+  - first orgs:  user_id -> org to fall back to when no active org applies
+
+A hit re-attaches the snapshot to the request session with merge(load=False),
+so handlers still get a session-bound User they can modify and commit.
+
+Committed changes to User, OrgMember, ApiKey or Org rows drop the affected
+entries (bulk UPDATE/DELETE on those tables drops everything). Other worker
+processes see the change once the TTL (PRINCIPAL_CACHE_TTL_SECONDS) expires.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.db_events import EVERYTHING, register_invalidation
+from app.models import ApiKey, Org, OrgMember, User
+
+_lock = threading.Lock()
+_users: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, user_id, snapshot, api_key_org_id)
+_memberships: dict[tuple[int, int], tuple[float, bool]] = {}
+_first_orgs: dict[int, tuple[float, int | None]] = {}  # user_id -> (expires_at, org_id)
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def principal_key(secret: str) -> str:
+    """Cache key for a bearer token / API key; the raw secret is never stored."""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def _snapshot(user: User) -> User:
+    snap = User(**{k: getattr(user, k) for k in _USER_COLUMNS})
+    make_transient_to_detached(snap)
+    return snap
+
+
+def _attach(db: Session, snapshot: User) -> User:
+    existing = db.identity_map.get(inspect(snapshot).key)
+    if existing is not None:
+        return existing
+    return db.merge(snapshot, load=False)
+
+
+def get_user(db: Session, key: str):
+    """
+    Returns (hit, user, api_key_org_id). `user` is bound to `db` (or None for a
+    cached negative lookup of an API key).
+    """
+    with _lock:
+        entry = _users.get(key)
+        if entry is None:
+            return False, None, None
+        if entry[0] < time.monotonic():
+            del _users[key]
+            return False, None, None
+        _users.move_to_end(key)
+    _, _, snapshot, api_key_org_id = entry
+    return True, (_attach(db, snapshot) if snapshot is not None else None), api_key_org_id
+
+
+def put_user(key: str, user: User | None, api_key_org_id: int | None = None, expires_at: float | None = None) -> None:
+    """Caches the principal for `key`. `expires_at` (monotonic) caps the TTL, e.g. at the JWT's exp."""
+    deadline = time.monotonic() + settings.principal_cache_ttl_seconds
+    if expires_at is not None:
+        deadline = min(deadline, expires_at)
+    snapshot = _snapshot(user) if user is not None else None
+    with _lock:
+        _users[key] = (deadline, user.id if user is not None else None, snapshot, api_key_org_id)
+        _users.move_to_end(key)
+        while len(_users) > settings.principal_cache_max_entries:
+            _users.popitem(last=False)
+
+
+def is_member(db: Session, user_id: int, org_id: int) -> bool:
+    """Whether the user belongs to an existing org (one joined query on a miss)."""
+    now = time.monotonic()
+    with _lock:
+        hit = _memberships.get((user_id, org_id))
+        if hit is not None and hit[0] >= now:
+            return hit[1]
+    member = db.query(OrgMember.id).join(Org, Org.id == OrgMember.org_id).filter(
+        OrgMember.user_id == user_id,
+        OrgMember.org_id == org_id,
+    ).first() is not None
+    with _lock:
+        if len(_memberships) >= settings.principal_cache_max_entries:
+            _memberships.clear()
+        _memberships[(user_id, org_id)] = (now + settings.principal_cache_ttl_seconds, member)
+    return member
+
+
+def first_org_id(db: Session, user: User) -> int | None:
+    """
+    Fallback org of a user: their first membership, or the first org of the
+    platform for a superadmin. None if there is none.
+    """
+    now = time.monotonic()
+    with _lock:
+        hit = _first_orgs.get(user.id)
+        if hit is not None and hit[0] >= now:
+            return hit[1]
+    if user.is_superadmin:
+        row = db.query(Org.id).order_by(Org.id.asc()).first()
+    else:
+        row = db.query(OrgMember.org_id).filter(OrgMember.user_id == user.id).order_by(OrgMember.id).first()
+    org_id = row[0] if row else None
+    with _lock:
+        if len(_first_orgs) >= settings.principal_cache_max_entries:
+            _first_orgs.clear()
+        _first_orgs[user.id] = (now + settings.principal_cache_ttl_seconds, org_id)
+    return org_id
+
+
+def invalidate_users(user_ids) -> None:
+    """Drops cached principals, memberships and fallback orgs of `user_ids`."""
+    user_ids = set(user_ids)
+    with _lock:
+        for key in [k for k, entry in _users.items() if entry[1] in user_ids]:
+            del _users[key]
+        for pair in [p for p in _memberships if p[0] in user_ids]:
+            del _memberships[pair]
+        for user_id in user_ids & _first_orgs.keys():
+            del _first_orgs[user_id]
+
+
+def invalidate_api_keys() -> None:
+    """Drops every API-key principal (their acting user depends on keys and memberships)."""
+    with _lock:
+        for key in [k for k, entry in _users.items() if entry[3] is not None or entry[1] is None]:
+            del _users[key]
+
+
+def clear() -> None:
+    with _lock:
+        _users.clear()
+        _memberships.clear()
+        _first_orgs.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INVALIDATION HOOKS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _collect(obj, kind: str, changes: set) -> None:
+    if isinstance(obj, User):
+        changes.add(("user", obj.id))
+    elif isinstance(obj, OrgMember):
+        changes.add(("user", obj.user_id))
+        changes.add(("api_keys", None))
+    elif isinstance(obj, ApiKey):
+        changes.add(("api_keys", None))
+    else:
+        changes.add(EVERYTHING)
+
+
+def _invalidate(changes: set) -> None:
+    if EVERYTHING in changes:
+        clear()
+        return
+    invalidate_users(uid for kind, uid in changes if kind == "user")
+    if ("api_keys", None) in changes:
+        invalidate_api_keys()
+
+
+register_invalidation((User, OrgMember, ApiKey, Org), _invalidate, collect=_collect)
@@ -1,17 +1,44 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
-from fastapi import Request, HTTPException, Depends, Header, status
+from fastapi import BackgroundTasks, Request, HTTPException, Depends, Header, status
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models import User, OrgMember, Org
+from sqlalchemy.orm.attributes import set_committed_value
+from app.db import SessionLocal, get_db
+from app.models import User
+from app.security import principal_cache
 from app.security.auth import require_user
 
+def _persist_active_org(user_id: int, org_id: int) -> None:
+    """Stores the sticky active_org_id in its own session, after the response."""
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user and user.active_org_id != org_id:
+            user.active_org_id = org_id
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ [RBAC] Could not persist active org {org_id} for user {user_id}: {e}")
+    finally:
+        db.close()
+
+def _remember_active_org(user: User, org_id: int, background_tasks: BackgroundTasks | None) -> None:
+    if user.active_org_id == org_id:
+        return
+    # Visible to the rest of this request without dirtying the request session
+    set_committed_value(user, "active_org_id", org_id)
+    if background_tasks is not None:
+        background_tasks.add_task(_persist_active_org, user.id, org_id)
+    else:
+        _persist_active_org(user.id, org_id)
+
 def get_current_org_id(
     request: Request,
     user: User = Depends(require_user),
     org_id: str | None = Header(default=None, alias="X-Org-Id"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks = None,
 ) -> int:
     """
     Drop-in replacement for require_api_key.
@@ -33,16 +60,9 @@ def get_current_org_id(
         if user.is_superadmin:
             return target_org_id
         
-        membership = db.query(OrgMember).filter(
-            OrgMember.user_id == user.id,
-            OrgMember.org_id == target_org_id
-        ).first()
-        
-        if membership:
+        if principal_cache.is_member(db, user.id, target_org_id):
             # Sticky update for convenience
-            if user.active_org_id != target_org_id:
-                user.active_org_id = target_org_id
-                db.commit()
+            _remember_active_org(user, target_org_id, background_tasks)
             return target_org_id
         else:
             raise HTTPException(
@@ -50,32 +70,25 @@ def get_current_org_id(
                 detail="You do not have access to this organization"
             )
 
-    # 3. Use active_org_id if set
-    if user.active_org_id:
+    # 3. Use active_org_id if set (and still valid; both checks are cached)
+    if user.active_org_id and (user.is_superadmin or principal_cache.is_member(db, user.id, user.active_org_id)):
         return user.active_org_id
 
     # 4. Fallback behavior: return the first org the user belongs to
-    if user.is_superadmin:
-        first_org = db.query(Org).order_by(Org.id.asc()).first()
-        if first_org:
-            user.active_org_id = first_org.id
-            db.commit()
-            return first_org.id
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No organizations exist in the system"
-        )
-        
-    first_membership = db.query(OrgMember).filter(OrgMember.user_id == user.id).first()
-    if not first_membership:
+    first_org_id = principal_cache.first_org_id(db, user)
+    if first_org_id is None:
+        if user.is_superadmin:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No organizations exist in the system"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not belong to any organizations"
         )
-    
-    user.active_org_id = first_membership.org_id
-    db.commit()
-    return first_membership.org_id
+
+    _remember_active_org(user, first_org_id, background_tasks)
+    return first_org_id
 
 def require_superadmin(user: User = Depends(require_user)) -> User:
     """
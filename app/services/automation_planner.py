@@ -0,0 +1,215 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Automation Day Planner
+=======================================
+Batch planning mode: produces all of a day's posts for an automation (or an
+org) in one pass instead of one full pipeline run per slot.
+
+The pass shares work across slots:
+  - topics are picked once per slot with cross-slot exclusion, and their
+    variations come from a single batched LLM request;
+  - retrieval/grounding runs per slot but never hands the same content item
+    to two slots;
+  - generic captions come from one structured LLM request, Quran/Hadith
+    captions from their grounded services in a small worker pool.
+
+Each draft is stored as a Post with its slot's scheduled_time, so the
+scheduler's publish tick only has to publish it.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+import pytz
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_setup import log_event
+from app.models import IGAccount, Post, TopicAutomation
+from app.services.automation_runner import (
+    _generate_caption,
+    _materialize_post,
+    _prepare_post_context,
+    _select_topic_base,
+    _topic_caption_kwargs,
+    get_lock_for_automation,
+)
+from app.services.llm import generate_topic_captions_batch, generate_topic_variations_batch
+from app.services.rotation_engine import read_topic_history
+
+
+def plan_slot_times(ig_account: IGAccount, automation: TopicAutomation, run_date: date | None = None) -> list[datetime]:
+    """
+    UTC publish times of the automation's slots on `run_date` (local calendar day):
+    post_time_local, then every post_spacing_hours, posts_per_day times.
+    """
+    tz = pytz.timezone(automation.timezone or ig_account.timezone or "UTC")
+    time_str = automation.post_time_local or ig_account.daily_post_time or "09:00"
+    hour, minute = map(int, time_str.split(":"))
+    run_date = run_date or datetime.now(tz).date()
+
+    first = tz.localize(datetime(run_date.year, run_date.month, run_date.day, hour, minute))
+    spacing = automation.post_spacing_hours or 4
+    return [
+        (first + timedelta(hours=i * spacing)).astimezone(timezone.utc)
+        for i in range(max(automation.posts_per_day or 1, 1))
+    ]
+
+
+def _planned_slots(db: Session, automation_id: int, slots: list[datetime]) -> set[datetime]:
+    """Slots that already have a (non-failed) post, so re-running a plan is idempotent."""
+    rows = db.query(Post.scheduled_time).filter(
+        Post.automation_id == automation_id,
+        Post.scheduled_time.in_(slots),
+        Post.status != "failed",
+    ).all()
+    planned = set()
+    for (scheduled,) in rows:
+        if scheduled.tzinfo is None:
+            scheduled = scheduled.replace(tzinfo=timezone.utc)
+        planned.add(scheduled)
+    return planned
+
+
+def _generate_captions(automation: TopicAutomation, contexts: list) -> list:
+    """Captions for every prepared slot, in order. Failed slots get the raised exception instead."""
+    results: list = [None] * len(contexts)
+
+    topic_slots = [i for i, ctx in enumerate(contexts) if ctx.caption_route == "topic"]
+    if topic_slots:
+        try:
+            batch = generate_topic_captions_batch([_topic_caption_kwargs(automation, contexts[i]) for i in topic_slots])
+            for i, result in zip(topic_slots, batch):
+                results[i] = _generate_caption(automation, contexts[i], precomputed=result)
+        except Exception as e:
+            for i in topic_slots:
+                results[i] = e
+
+    grounded_slots = [i for i, ctx in enumerate(contexts) if ctx.caption_route != "topic"]
+    if grounded_slots:
+        with ThreadPoolExecutor(max_workers=max(1, min(settings.automation_plan_max_workers, len(grounded_slots)))) as pool:
+            futures = {i: pool.submit(_generate_caption, automation, contexts[i]) for i in grounded_slots}
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = e
+    return results
+
+
+def plan_automation_day(
+    db: Session,
+    automation_id: int,
+    run_date: date | None = None,
+    topic_history: dict | None = None,
+) -> list[Post]:
+    """
+    Plans every remaining slot of `run_date` (default: today in the automation's timezone,
+    or tomorrow once today's slots are over) for one automation. Slots in the past or
+    already holding a post are skipped. Returns the created posts.
+
+    `topic_history` is the automation's rotation history (rotation_engine.load_topic_history),
+    loaded here when not given.
+    """
+    lock = get_lock_for_automation(automation_id)
+    if not lock.acquire(blocking=False):
+        print(f"🔒 [LOCK] Automation {automation_id} is already in progress. Skipping day plan.")
+        return []
+
+    t0 = time.perf_counter()
+    try:
+        automation = db.query(TopicAutomation).filter(TopicAutomation.id == automation_id).first()
+        if not automation or not automation.enabled:
+            return []
+        acc = db.get(IGAccount, automation.ig_account_id)
+        if not acc:
+            return []
+
+        now = datetime.now(timezone.utc)
+        slots = plan_slot_times(acc, automation, run_date)
+        if run_date is None and slots[-1] <= now:
+            # Planning job fired after today's last slot (e.g. lead time before midnight): plan tomorrow
+            tomorrow = slots[0].astimezone(pytz.timezone(automation.timezone or acc.timezone or "UTC")).date() + timedelta(days=1)
+            slots = plan_slot_times(acc, automation, tomorrow)
+        planned = _planned_slots(db, automation.id, slots)
+        open_slots = [s for s in slots if s > now and s not in planned]
+        if not open_slots:
+            log_event("automation_plan_skipped", automation_id=automation.id, slots=len(slots), planned=len(planned))
+            return []
+
+        # 1. Topics: one pick per slot (no repeats inside the pass), one batched variation request
+        used_topics: set = set()
+        if topic_history is None:
+            topic_history = read_topic_history(
+                [automation.id], db, automation.avoid_repeat_days or 30
+            )[automation.id]
+        topic_bases = [
+            _select_topic_base(db, automation, exclude_topics=used_topics, topic_history=topic_history)
+            for _ in open_slots
+        ]
+        variations = generate_topic_variations_batch(topic_bases, count=5)
+
+        # 2. Retrieval + grounding, never reusing a content item across slots
+        used_items: set = set()
+        prepared = []
+        for slot, topic_base in zip(open_slots, topic_bases):
+            ctx = _prepare_post_context(
+                db, automation, topic_base,
+                topic_variations=variations.get(topic_base),
+                exclude_item_ids=used_items,
+            )
+            if ctx is None:
+                print(f"[PLAN] Slot {slot.isoformat()} skipped: no grounded content for '{topic_base}'")
+                continue
+            if ctx.primary_item is not None:
+                used_items.add(ctx.primary_item.original_id)
+            prepared.append((slot, ctx))
+
+        if not prepared:
+            return []
+
+        # 3. Captions (loaded attributes up front: worker threads must not lazy-load on this session)
+        db.refresh(automation)
+        captions = _generate_captions(automation, [ctx for _, ctx in prepared])
+
+        # 4. Posts, scheduled at their slot; the publish tick takes it from here
+        posts = []
+        for (slot, ctx), result in zip(prepared, captions):
+            if isinstance(result, Exception):
+                print(f"[PLAN] LLM Generation failed for slot {slot.isoformat()}: {result}")
+                automation.last_error = f"LLM Generation failed: {str(result)}"
+                db.commit()
+                continue
+            post = _materialize_post(db, automation, ctx, result, scheduled_time=slot, allow_publish=False)
+            if post is not None:
+                posts.append(post)
+
+        log_event("automation_plan_complete", automation_id=automation.id, slots=len(slots),
+                  planned=len(posts), skipped=len(slots) - len(open_slots),
+                  duration_ms=round((time.perf_counter() - t0) * 1000, 1))
+        return posts
+    except Exception as e:
+        import traceback
+        db.rollback()
+        log_event("automation_plan_exception", automation_id=automation_id, error=str(e), traceback=traceback.format_exc(limit=3))
+        print(f"[PLAN] ERROR planning automation_id={automation_id}: {repr(e)}")
+        return []
+    finally:
+        lock.release()
+
+
+def plan_org_day(db: Session, org_id: int, run_date: date | None = None) -> dict[int, list[Post]]:
+    """
+    Plans the day for every enabled automation of an org. Returns {automation_id: posts}.
+    The rotation history of all of them comes from one ledger query.
+    """
+    windows = dict(
+        db.query(TopicAutomation.id, TopicAutomation.avoid_repeat_days).filter(
+            TopicAutomation.org_id == org_id, TopicAutomation.enabled == True
+        ).all()
+    )
+    history = read_topic_history(list(windows), db, max((d or 30 for d in windows.values()), default=30))
+    return {a_id: plan_automation_day(db, a_id, run_date, topic_history=history[a_id]) for a_id in windows}
@@ -2,6 +2,7 @@
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
 import logging
+from dataclasses import dataclass
 from typing import Any
 from datetime import datetime, timezone as dt_timezone, timedelta
 from sqlalchemy.orm import Session
@@ -14,6 +15,7 @@ from app.services.library_retrieval import retrieve_relevant_chunks
 from app.services.prebuilt_loader import load_prebuilt_packs
 from app.services.image_card import create_quote_card
 from app.services.image_renderer import render_quote_card, render_minimal_quote_card
+from app.services.scheduler_leader import try_advisory_lock
 
 # Maps Style DNA family string → renderer style preset (shared with Studio/scheduled-post system)
 FAMILY_TO_RENDER_STYLE: dict[str, str] = {
@@ -50,12 +52,13 @@ FAMILY_TO_SCENE_KEY: dict[str, str] = {
     "ocean_depth":          "ocean_depth",
     "warm_copper":          "warm_copper",
 }
-from app.services.relevance_engine import validate_source_relevance
+from app.services.relevance_engine import audit_candidates
 from app.config import settings
 import pytz
 import os
 import requests
 from app.services.content_sources import select_items_for_automation, mark_items_used
+from app.services.media_library import pick_tagged_asset, set_asset_tags
 from app.logging_setup import log_event
 
 logger = logging.getLogger(__name__)
@@ -141,17 +144,13 @@ def pick_media_url(db: Session, org_id: int, ig_account_id: int, automation: Any
             if asset: return asset.url
             
         if automation.media_tag_query:
-            query = db.query(MediaAsset).filter(MediaAsset.org_id == org_id)
-            assets = query.all()
-            requested_tags = [t.lower() for t in (automation.media_tag_query or [])]
-            matching = []
-            for a in assets:
-                asset_tags = [at.lower() for at in (a.tags or [])]
-                if any(rt in asset_tags for rt in requested_tags):
-                    matching.append(a)
-            if matching:
-                import random
-                asset = random.choice(matching)
+            asset = pick_tagged_asset(
+                db, org_id, automation.media_tag_query,
+                rotation_mode=getattr(automation, "media_rotation_mode", None) or "random",
+                automation_id=automation.id,
+            )
+            if asset:
+                db.commit()
                 return asset.url
     return None
 
@@ -229,11 +228,13 @@ def resolve_media_url(
     automation_id: int | None = None,
     media_asset_id: int | None = None,
     media_tag_query: list[str] | None = None,
-    content_concept: str | None = None
+    content_concept: str | None = None,
+    rotation_mode: str = "random"
 ) -> str | None:
     """
     One-stop shop for finding or generating a media URL.
     Handles library, reuse, and AI generation.
+    Tagged library picks follow `rotation_mode` ("random" | "lru" | "round_robin").
     """
     # 1. Reuse logic
     if image_mode == "reuse_last_upload":
@@ -255,17 +256,9 @@ def resolve_media_url(
             if asset: return asset.url
             
         if media_tag_query:
-            query = db.query(MediaAsset).filter(MediaAsset.org_id == org_id)
-            assets = query.all()
-            requested_tags = [t.lower() for t in (media_tag_query or [])]
-            matching = []
-            for a in assets:
-                asset_tags = [at.lower() for at in (a.tags or [])]
-                if any(rt in asset_tags for rt in requested_tags):
-                    matching.append(a)
-            if matching:
-                import random
-                asset = random.choice(matching)
+            asset = pick_tagged_asset(db, org_id, media_tag_query, rotation_mode=rotation_mode,
+                                      automation_id=automation_id)
+            if asset:
                 return asset.url
         return None
 
@@ -297,17 +290,18 @@ def resolve_media_url(
                 if res.status_code == 200:
                     with open(file_path, "wb") as f:
                         f.write(res.content)
-                    from app.config import build_public_media_url
-                    final_url = build_public_media_url(filename, local_path=file_path)
+                    from app.services.media_storage import store_file
+                    stored = store_file(file_path)
+                    final_url = stored.url
                     
                     # Also register it in Media for future reuse/filter
                     new_asset = MediaAsset(
                         org_id=org_id,
                         ig_account_id=ig_account_id,
                         url=final_url,
-                        storage_path=file_path,
-                        tags=["ai_generated", image_mode, topic[:30]]
+                        storage_path=stored.local_path,
                     )
+                    set_asset_tags(db, new_asset, ["ai_generated", image_mode, topic[:30]])
                     db.add(new_asset)
                     db.commit()
                     return final_url
@@ -316,720 +310,871 @@ def resolve_media_url(
                 
     return None
 
-def run_automation_once(db: Session, automation_id: int, force_publish: bool = False) -> Post | None:
+def _select_topic_base(
+    db: Session,
+    automation: TopicAutomation,
+    exclude_topics: set | None = None,
+    topic_history: dict | None = None,
+) -> str:
     """
-    Core engine to run one automation cycle using the decoupled Content Provider architecture.
+    Picks the run's base topic (no-repeat pool rotation + pillar prefix).
+    `exclude_topics` (batch planning) is avoided when possible and receives the picked pool topic.
+    `topic_history` (batch planning) is the automation's entry of rotation_engine.load_topic_history,
+    so several picks share one ledger query.
     """
-    lock = get_lock_for_automation(automation_id)
-    if not lock.acquire(blocking=False):
-        print(f"🔒 [LOCK] Automation {automation_id} is already in progress. Skipping duplicate execution.")
-        return None
-    
+    # 1. Intelligent Topic Pool Rotation (rotation_engine)
+    from app.services.rotation_engine import choose_topic, pick_topic
+
+    pool = automation.topic_pool or []
+    if exclude_topics:
+        # Batch planning: don't hand the same pool topic to two slots of one pass
+        pool = [t for t in pool if t not in exclude_topics] or pool
+    avoid_days = getattr(automation, "avoid_repeat_days", 30) or 30
+
+    if pool and topic_history is not None:
+        topic_base = choose_topic(pool, topic_history, avoid_days)
+    elif pool:
+        topic_base = pick_topic(
+            topic_pool=pool,
+            automation_id=automation.id,
+            db=db,
+            avoid_days=avoid_days,
+        )
+    else:
+        topic_base = automation.topic_prompt
+    if exclude_topics is not None:
+        exclude_topics.add(topic_base)
+
+    log_event("automation_topic_selected", automation_id=automation.id, topic=topic_base,
+              pool_size=len(pool), avoid_days=avoid_days)
+    print(f"[ROTATION] Selected topic: '{topic_base}' (pool size={len(pool)}, avoid_days={avoid_days})")
+
+    # 2. Pillar Rotation Logic (kept for backwards compat)
+    pillars = automation.pillars or []
+    if pillars:
+        import random as _rnd
+        # Exclude most recently used pillar if multiple exist
+        last_pillar = (automation.flags or {}).get("last_pillar")
+        pillar_candidates = [p for p in pillars if p != last_pillar] or pillars
+        selected_pillar = _rnd.choice(pillar_candidates)
+        topic_base = f"{selected_pillar}: {topic_base}" if topic_base else selected_pillar
+        # Persist last pillar to flags
+        _flags = dict(automation.flags or {})
+        _flags["last_pillar"] = selected_pillar
+        automation.flags = _flags
+        log_event("automation_pillar_selected", automation_id=automation.id, pillar=selected_pillar)
+
+    return topic_base
+
+
+@dataclass
+class PostContext:
+    """Everything one automation post carries from content selection to Post creation."""
+    topic_base: str
+    topic: str
+    style_dna_spec: Any
+    pooled_items: list
+    primary_item: Any
+    fallback_mode: bool
+    relevance_results: dict
+    content_profile_prompt: str | None
+    final_reference: str
+    uncleaned_text: str
+    quote_text_cleaned: str
+    context_payload: dict
+
+    @property
+    def caption_route(self) -> str:
+        """Caption service grounding this post: "hadith", "quran" or the generic "topic" prompt."""
+        if self.primary_item and not self.fallback_mode:
+            if self.primary_item.type == "hadith":
+                return "hadith"
+            if "quran" in (self.primary_item.provider or "").lower():
+                return "quran"
+        return "topic"
+
+
+def _prepare_post_context(
+    db: Session,
+    automation: TopicAutomation,
+    topic_base: str,
+    topic_variations: list[str] | None = None,
+    exclude_item_ids: set | None = None,
+) -> PostContext | None:
+    """
+    Topic variation, provider retrieval, relevance audits and grounding for one post.
+    Returns None (with automation.last_error set where relevant) when the run must stop.
+    """
+    # 3. Load Style DNA with intelligent back-to-back prevention
+    from app.services.automation_service import get_automation_style_dna
+    style_dna_spec = get_automation_style_dna(db, automation)
+
+    log_event("automation_run_start", automation_id=automation.id, topic=topic_base, style=automation.style_preset)
+    print(f"[STYLE_DNA] preset loaded: {style_dna_spec.family} (Atmosphere: {style_dna_spec.atmosphere})")
+
+    # 1. Topic Variations
     try:
-        automation = db.query(TopicAutomation).filter(TopicAutomation.id == automation_id).first()
-        if not automation or not automation.enabled:
-            return None
-        
-        # 1. Intelligent Topic Pool Rotation (rotation_engine)
-        from app.services.rotation_engine import pick_topic, pick_style, record_topic_used
-        
-        pool = automation.topic_pool or []
-        avoid_days = getattr(automation, "avoid_repeat_days", 30) or 30
+        variations = topic_variations or generate_topic_variations(topic_base, count=5)
+        import random
+        topic = random.choice(variations)
+        log_event("automation_topic_variation", automation_id=automation.id, original=topic_base, selected=topic)
+    except Exception as e:
+        print(f"[AUTO] Topic variation failed: {e}")
+        topic = topic_base
 
-        if pool:
-            topic_base = pick_topic(
-                topic_pool=pool,
-                automation_id=automation.id,
-                db=db,
-                avoid_days=avoid_days,
-            )
-        else:
-            topic_base = automation.topic_prompt
-
-        log_event("automation_topic_selected", automation_id=automation.id, topic=topic_base,
-                  pool_size=len(pool), avoid_days=avoid_days)
-        print(f"[ROTATION] Selected topic: '{topic_base}' (pool size={len(pool)}, avoid_days={avoid_days})")
-
-        # 2. Pillar Rotation Logic (kept for backwards compat)
-        pillars = automation.pillars or []
-        if pillars:
-            import random as _rnd
-            # Exclude most recently used pillar if multiple exist
-            last_pillar = (automation.flags or {}).get("last_pillar")
-            pillar_candidates = [p for p in pillars if p != last_pillar] or pillars
-            selected_pillar = _rnd.choice(pillar_candidates)
-            topic_base = f"{selected_pillar}: {topic_base}" if topic_base else selected_pillar
-            # Persist last pillar to flags
-            _flags = dict(automation.flags or {})
-            _flags["last_pillar"] = selected_pillar
-            automation.flags = _flags
-            log_event("automation_pillar_selected", automation_id=automation.id, pillar=selected_pillar)
-
-        # 3. Load Style DNA with intelligent back-to-back prevention
-        from app.services.automation_service import get_automation_style_dna
-        style_dna_spec = get_automation_style_dna(db, automation)
-
-        log_event("automation_run_start", automation_id=automation.id, topic=topic_base, style=automation.style_preset)
-        print(f"[STYLE_DNA] preset loaded: {style_dna_spec.family} (Atmosphere: {style_dna_spec.atmosphere})")
-        
-        # 1. Topic Variations
-        try:
-            variations = generate_topic_variations(topic_base, count=5)
-            import random
-            topic = random.choice(variations)
-            log_event("automation_topic_variation", automation_id=automation.id, original=topic_base, selected=topic)
-        except Exception as e:
-            print(f"[AUTO] Topic variation failed: {e}")
-            topic = topic_base
+    # 2. Modular Content Provider Polling
+    from app.services.content_providers import UserLibraryProvider, SystemLibraryProvider
 
-        # 2. Modular Content Provider Polling
-        from app.services.content_providers import UserLibraryProvider, SystemLibraryProvider
-        
-        provider_scope = getattr(automation, "content_provider_scope", "all_sources")
-        active_providers = []
-        
-        if provider_scope in ["all_sources", "user_library"]:
-            active_providers.append(UserLibraryProvider())
-            
-        if provider_scope in ["all_sources", "system_library"]:
-            active_providers.append(SystemLibraryProvider())
-            
-        pooled_items = []
-        target_limit = 5 # Fetch more for filtering pool
-        
-        # ── Phase 1 Safety Gate: Hadith in automations is disabled ──────────
-        # Hadith integration is Phase 2. This gate prevents untested Hadith
-        # content from entering the automation pipeline before verification.
-        _hadith_enabled = getattr(settings, "hadith_in_automations_enabled", False)
-        if not _hadith_enabled:
-            # Silently filter out any Hadith items that content providers may return
-            # This does not affect Quran or Library content.
-            pass  # Gate enforced below after pooled_items are collected
-        # ────────────────────────────────────────────────────────────────────
-        
-        # Dual-pass logic: Try the variation first, then the base topic
-        attempts = [topic, topic_base] if topic != topic_base else [topic]
-        
-        for search_query in attempts:
-            if pooled_items: break # Found enough in first pass
-            
-            for provider in active_providers:
-                needed = target_limit - len(pooled_items)
-                if needed <= 0: break
-                
+    provider_scope = getattr(automation, "content_provider_scope", "all_sources")
+    active_providers = []
+
+    if provider_scope in ["all_sources", "user_library"]:
+        active_providers.append(UserLibraryProvider())
+
+    if provider_scope in ["all_sources", "system_library"]:
+        active_providers.append(SystemLibraryProvider())
+
+    pooled_items = []
+    target_limit = 5 + len(exclude_item_ids or ()) # Fetch more for filtering pool
+
+    # ── Phase 1 Safety Gate: Hadith in automations is disabled ──────────
+    # Hadith integration is Phase 2. This gate prevents untested Hadith
+    # content from entering the automation pipeline before verification.
+    _hadith_enabled = getattr(settings, "hadith_in_automations_enabled", False)
+    if not _hadith_enabled:
+        # Silently filter out any Hadith items that content providers may return
+        # This does not affect Quran or Library content.
+        pass  # Gate enforced below after pooled_items are collected
+    # ────────────────────────────────────────────────────────────────────
+
+    # Dual-pass logic: Try the variation first, then the base topic
+    attempts = [topic, topic_base] if topic != topic_base else [topic]
+
+    for search_query in attempts:
+        if pooled_items: break # Found enough in first pass
+
+        for provider in active_providers:
+            needed = target_limit - len(pooled_items)
+            if needed <= 0: break
+
+            try:
+                items = provider.get_content(db, automation.org_id, search_query, limit=needed)
+                pooled_items.extend(items)
+                if items:
+                    log_event("provider_content_sourced", 
+                              automation_id=automation.id, 
+                              provider=provider.provider_name, 
+                              count=len(items),
+                              query=search_query)
+            except Exception as e:
+                print(f"[PROVIDER] Error in {provider.provider_name}: {e}")
+
+    # Apply Hadith feature flag gate (Phase 1)
+    if not getattr(settings, "hadith_in_automations_enabled", False):
+        before_count = len(pooled_items)
+        pooled_items = [i for i in pooled_items if getattr(i, "provider", "") != "hadith"]
+        if len(pooled_items) < before_count:
+            print(f"[HADITH] Phase 1 gate: filtered {before_count - len(pooled_items)} Hadith items from automation pool")
+
+    # Batch planning: items already given to another slot of the same pass are skipped
+    if exclude_item_ids:
+        pooled_items = [i for i in pooled_items if i.original_id not in exclude_item_ids]
+
+    # 1.45 Relevance Filtering Gate (v2 Integrity)
+    primary_item = None
+    relevance_results = {}
+    fallback_mode = False
+
+    # We audit up to the first 3 candidates (cached verdicts first, misses concurrently)
+    audit_pool = pooled_items[:3]
+    audits = audit_candidates(topic_base, [(c.text, c.reference) for c in audit_pool])
+    for candidate, audit in zip(audit_pool, audits):
+        relevance_results[candidate.original_id] = audit
+
+        if audit["accepted"]:
+            # QUALITY GATE FIX: Ensure Arabic exists for Quran posts
+            is_quran = "quran" in (candidate.provider or "").lower()
+            if is_quran and (not candidate.arabic_text or len(candidate.arabic_text) < 10):
+                print(f"📡 [QURAN_ARABIC] fetching Arabic for confirmed Quran candidate: {candidate.reference}")
                 try:
-                    items = provider.get_content(db, automation.org_id, search_query, limit=needed)
-                    pooled_items.extend(items)
-                    if items:
-                        log_event("provider_content_sourced", 
-                                  automation_id=automation.id, 
-                                  provider=provider.provider_name, 
-                                  count=len(items),
-                                  query=search_query)
-                except Exception as e:
-                    print(f"[PROVIDER] Error in {provider.provider_name}: {e}")
-
-        # Apply Hadith feature flag gate (Phase 1)
-        if not getattr(settings, "hadith_in_automations_enabled", False):
-            before_count = len(pooled_items)
-            pooled_items = [i for i in pooled_items if getattr(i, "provider", "") != "hadith"]
-            if len(pooled_items) < before_count:
-                print(f"[HADITH] Phase 1 gate: filtered {before_count - len(pooled_items)} Hadith items from automation pool")
-                
-        # 1.45 Relevance Filtering Gate (v2 Integrity)
-        primary_item = None
-        relevance_results = {}
-        fallback_mode = False
-        
-        # We audit up to the first 3 candidates
-        for candidate in pooled_items[:3]:
-            audit = validate_source_relevance(topic_base, candidate.text, candidate.reference)
-            relevance_results[candidate.original_id] = audit
-            
-            if audit["accepted"]:
-                # QUALITY GATE FIX: Ensure Arabic exists for Quran posts
-                is_quran = "quran" in (candidate.provider or "").lower()
-                if is_quran and (not candidate.arabic_text or len(candidate.arabic_text) < 10):
-                    print(f"📡 [QURAN_ARABIC] fetching Arabic for confirmed Quran candidate: {candidate.reference}")
-                    try:
-                        from app.services.quran_service import get_verse_by_reference
-                        item = get_verse_by_reference(db, candidate.reference)
-                        if item and item.arabic_text:
-                            candidate.arabic_text = item.arabic_text
-                            print(f"📡 [QURAN_ARABIC] loaded")
-                        else:
-                            print(f"⚠️ [QURAN_ARABIC] fetch failed for {candidate.reference}. Rejecting.")
-                            continue
-                    except Exception as e:
-                        print(f"⚠️ [QURAN_ARABIC] fetch error: {e}")
+                    from app.services.quran_service import get_verse_by_reference
+                    item = get_verse_by_reference(db, candidate.reference)
+                    if item and item.arabic_text:
+                        candidate.arabic_text = item.arabic_text
+                        print(f"📡 [QURAN_ARABIC] loaded")
+                    else:
+                        print(f"⚠️ [QURAN_ARABIC] fetch failed for {candidate.reference}. Rejecting.")
                         continue
+                except Exception as e:
+                    print(f"⚠️ [QURAN_ARABIC] fetch error: {e}")
+                    continue
 
-                primary_item = candidate
-                log_event("quran_relevance_passed", automation_id=automation.id, reference=candidate.reference, reason=audit["reason"])
-                break
-            else:
-                log_event("quran_relevance_rejected", automation_id=automation.id, reference=candidate.reference, reason=audit["reason"])
-
-        if not primary_item:
-            # FALLBACK: No highly relevant verse found -> Switch to Reflection Mode
-            fallback_mode = True
-            log_event("automation_relevance_fallback", automation_id=automation.id, topic=topic_base)
-            print(f"⚠️ [RELEVANCE] No high-confidence match found for '{topic_base}'. Falling back to Reflection Mode.")
-            # Use the first item anyway if it's not empty, but mark as reflection
-            primary_item = pooled_items[0] if pooled_items else None
-
-        # [SAFETY] Guardrail: Abort if exactly 0 items found
-        if not primary_item:
-            log_event("automation_no_content_found", automation_id=automation.id, topic=topic, scope=provider_scope)
-            automation.last_error = "No verified content found across chosen providers."
+            primary_item = candidate
+            log_event("quran_relevance_passed", automation_id=automation.id, reference=candidate.reference, reason=audit["reason"])
+            break
+        else:
+            log_event("quran_relevance_rejected", automation_id=automation.id, reference=candidate.reference, reason=audit["reason"])
+
+    if not primary_item:
+        # FALLBACK: No highly relevant verse found -> Switch to Reflection Mode
+        fallback_mode = True
+        log_event("automation_relevance_fallback", automation_id=automation.id, topic=topic_base)
+        print(f"⚠️ [RELEVANCE] No high-confidence match found for '{topic_base}'. Falling back to Reflection Mode.")
+        # Use the first item anyway if it's not empty, but mark as reflection
+        primary_item = pooled_items[0] if pooled_items else None
+
+    # [SAFETY] Guardrail: Abort if exactly 0 items found
+    if not primary_item:
+        log_event("automation_no_content_found", automation_id=automation.id, topic=topic, scope=provider_scope)
+        automation.last_error = "No verified content found across chosen providers."
+        db.commit()
+        return None
+
+    # QUALITY GATE FIX: Re-check Arabic for Quran posts again to be absolutely sure
+    if not fallback_mode and "quran" in (primary_item.provider or "").lower():
+        if not primary_item.arabic_text:
+            print(f"❌ [QUALITY_GATE] BLOCKING: Arabic missing for confirmed Quran post {primary_item.reference}.")
+            automation.last_error = f"Arabic source missing for {primary_item.reference}. Re-run needed."
             db.commit()
             return None
 
-        # QUALITY GATE FIX: Re-check Arabic for Quran posts again to be absolutely sure
-        if not fallback_mode and "quran" in (primary_item.provider or "").lower():
-            if not primary_item.arabic_text:
-                print(f"❌ [QUALITY_GATE] BLOCKING: Arabic missing for confirmed Quran post {primary_item.reference}.")
-                automation.last_error = f"Arabic source missing for {primary_item.reference}. Re-run needed."
-                db.commit()
-                return None
+    # ── Hadith Automation Safety Pass (Validation Gate) ─────────────────────────
+    if not fallback_mode and primary_item and primary_item.type == "hadith":
+        has_reference = bool(primary_item.reference and primary_item.reference.strip())
+        has_text = bool(primary_item.arabic_text or primary_item.text)
 
-        # ── Hadith Automation Safety Pass (Validation Gate) ─────────────────────────
-        if not fallback_mode and primary_item and primary_item.type == "hadith":
-            has_reference = bool(primary_item.reference and primary_item.reference.strip())
-            has_text = bool(primary_item.arabic_text or primary_item.text)
-            
-            if not has_reference or not has_text:
-                print(f"❌ [HADITH_AUTOMATION][BLOCKED] reason=missing_critical_metadata ref={primary_item.reference}")
-                log_event("hadith_automation_blocked", automation_id=automation.id, reason="missing_critical_metadata", reference=primary_item.reference)
-                automation.last_error = "Hadith source integrity failed: missing reference or text."
-                db.commit()
-                return None
-            else:
-                print(f"✅ [HADITH_AUTOMATION] source validated ref={primary_item.reference}")
-                log_event("hadith_automation_validated", automation_id=automation.id, reference=primary_item.reference)
-
-        # 1.5 Content Profile Injection
-        content_profile_prompt = None
-        if getattr(automation, "content_profile_id", None):
-            from app.models import ContentProfile
-            profile = db.query(ContentProfile).filter(ContentProfile.id == automation.content_profile_id).first()
-            if profile:
-                prompt_parts = []
-                if profile.niche_category: prompt_parts.append(f"You are generating content for a {profile.niche_category} brand.")
-                if profile.focus_description: prompt_parts.append(f"Focus: {profile.focus_description}")
-                if profile.content_goals: prompt_parts.append(f"Goal: {profile.content_goals}")
-                if profile.tone_style: prompt_parts.append(f"Tone: {profile.tone_style}")
-                if profile.allowed_topics: prompt_parts.append(f"Core Topics to Discuss: {', '.join(profile.allowed_topics)}")
-                if profile.banned_topics: prompt_parts.append(f"AVOID Discussing: {', '.join(profile.banned_topics)}")
-                content_profile_prompt = "\\n".join(prompt_parts)
-
-        # 2. Build Context payload & Generate
-        import random
-        chosen_variation = random.choice(style_dna_spec.variation_pool) if style_dna_spec.variation_pool else "standard"
-        print(f"[STYLE_DNA] variation chosen: {chosen_variation}")
-        print(f"[STYLE_DNA] visual payload built")
-
-        # 1.6 Source Selection & Grounding (v2 Consistency Fix)
-        # Determine the definitive reference for the entire post
-        if fallback_mode:
-            final_reference = f"{topic_base.split(':')[0].strip().capitalize()} Reflection"
+        if not has_reference or not has_text:
+            print(f"❌ [HADITH_AUTOMATION][BLOCKED] reason=missing_critical_metadata ref={primary_item.reference}")
+            log_event("hadith_automation_blocked", automation_id=automation.id, reason="missing_critical_metadata", reference=primary_item.reference)
+            automation.last_error = "Hadith source integrity failed: missing reference or text."
+            db.commit()
+            return None
         else:
-            final_reference = (primary_item.reference if primary_item else "").strip()
-            
-        if not final_reference: final_reference = "Sacred Guidance"
-        # Clean text for visual cards but keep original for caption if needed
-        uncleaned_text = primary_item.text if primary_item else topic
-        quote_text_cleaned = clean_translation_for_card(uncleaned_text)
-
-        print(f"[POST_SOURCE] selected source: {final_reference}")
-
-        context_payload = {
-            "topic": topic,
-            "style": style_dna_spec.family,
-            "tone": automation.tone or "medium",
-            "language": automation.language or "english",
-            "mode": "grounded_library",  # FORCE GROUNDING
-            "snippet": {
-                "item_type": "quran" if "quran" in (primary_item.provider if primary_item else "").lower() else "reference",
-                "text": uncleaned_text,
-                "reference": final_reference
-            },
-            "banned_phrases": automation.banned_phrases if isinstance(automation.banned_phrases, list) else None,
-            "source_items": [
-                {
-                    "title": item.source, 
-                    "text": item.text, 
-                    "reference": item.reference, 
-                    "arabic_text": item.arabic_text,
-                    "id": item.original_id,
-                    "provider": item.provider
-                }
-                for item in pooled_items
-            ],
-            "content_profile_prompt": content_profile_prompt,
-            "creativity_level": getattr(automation, "creativity_level", 3),
-            "source_mode": "strict", # Enforce single source
-            "tone_style": style_dna_spec.tone_style,
-            "verification_mode": getattr(automation, "verification_mode", "standard"),
-            "instructions": [
-                "Do NOT output the topic label literally.",
-                "Do NOT output 'AUTO: <name>' literally as the caption.",
-                f"You MUST use the provided GROUNDED SNIPPET (ref: {final_reference}) as your primary source.",
-                f"The citation in your caption MUST EXACTLY match: {final_reference}.",
-                "DO NOT hallucinate other verses.",
-                f"TONE STYLE: {getattr(automation, 'tone_style', 'deep')}."
-            ],
+            print(f"✅ [HADITH_AUTOMATION] source validated ref={primary_item.reference}")
+            log_event("hadith_automation_validated", automation_id=automation.id, reference=primary_item.reference)
+
+    # 1.5 Content Profile Injection
+    content_profile_prompt = None
+    if getattr(automation, "content_profile_id", None):
+        from app.models import ContentProfile
+        profile = db.query(ContentProfile).filter(ContentProfile.id == automation.content_profile_id).first()
+        if profile:
+            prompt_parts = []
+            if profile.niche_category: prompt_parts.append(f"You are generating content for a {profile.niche_category} brand.")
+            if profile.focus_description: prompt_parts.append(f"Focus: {profile.focus_description}")
+            if profile.content_goals: prompt_parts.append(f"Goal: {profile.content_goals}")
+            if profile.tone_style: prompt_parts.append(f"Tone: {profile.tone_style}")
+            if profile.allowed_topics: prompt_parts.append(f"Core Topics to Discuss: {', '.join(profile.allowed_topics)}")
+            if profile.banned_topics: prompt_parts.append(f"AVOID Discussing: {', '.join(profile.banned_topics)}")
+            content_profile_prompt = "\\n".join(prompt_parts)
+
+    # 2. Build Context payload & Generate
+    import random
+    chosen_variation = random.choice(style_dna_spec.variation_pool) if style_dna_spec.variation_pool else "standard"
+    print(f"[STYLE_DNA] variation chosen: {chosen_variation}")
+    print(f"[STYLE_DNA] visual payload built")
+
+    # 1.6 Source Selection & Grounding (v2 Consistency Fix)
+    # Determine the definitive reference for the entire post
+    if fallback_mode:
+        final_reference = f"{topic_base.split(':')[0].strip().capitalize()} Reflection"
+    else:
+        final_reference = (primary_item.reference if primary_item else "").strip()
+
+    if not final_reference: final_reference = "Sacred Guidance"
+    # Clean text for visual cards but keep original for caption if needed
+    uncleaned_text = primary_item.text if primary_item else topic
+    quote_text_cleaned = clean_translation_for_card(uncleaned_text)
+
+    print(f"[POST_SOURCE] selected source: {final_reference}")
+
+    context_payload = {
+        "topic": topic,
+        "style": style_dna_spec.family,
+        "tone": automation.tone or "medium",
+        "language": automation.language or "english",
+        "mode": "grounded_library",  # FORCE GROUNDING
+        "snippet": {
+            "item_type": "quran" if "quran" in (primary_item.provider if primary_item else "").lower() else "reference",
+            "text": uncleaned_text,
+            "reference": final_reference
+        },
+        "banned_phrases": automation.banned_phrases if isinstance(automation.banned_phrases, list) else None,
+        "source_items": [
+            {
+                "title": item.source, 
+                "text": item.text, 
+                "reference": item.reference, 
+                "arabic_text": item.arabic_text,
+                "id": item.original_id,
+                "provider": item.provider
+            }
+            for item in pooled_items
+        ],
+        "content_profile_prompt": content_profile_prompt,
+        "creativity_level": getattr(automation, "creativity_level", 3),
+        "source_mode": "strict", # Enforce single source
+        "tone_style": style_dna_spec.tone_style,
+        "verification_mode": getattr(automation, "verification_mode", "standard"),
+        "instructions": [
+            "Do NOT output the topic label literally.",
+            "Do NOT output 'AUTO: <name>' literally as the caption.",
+            f"You MUST use the provided GROUNDED SNIPPET (ref: {final_reference}) as your primary source.",
+            f"The citation in your caption MUST EXACTLY match: {final_reference}.",
+            "DO NOT hallucinate other verses.",
+            f"TONE STYLE: {getattr(automation, 'tone_style', 'deep')}."
+        ],
+    }
+
+    return PostContext(
+        topic_base=topic_base,
+        topic=topic,
+        style_dna_spec=style_dna_spec,
+        pooled_items=pooled_items,
+        primary_item=primary_item,
+        fallback_mode=fallback_mode,
+        relevance_results=relevance_results,
+        content_profile_prompt=content_profile_prompt,
+        final_reference=final_reference,
+        uncleaned_text=uncleaned_text,
+        quote_text_cleaned=quote_text_cleaned,
+        context_payload=context_payload,
+    )
+
+
+def _topic_caption_kwargs(automation: TopicAutomation, ctx: PostContext) -> dict:
+    """generate_topic_caption arguments for a post on the generic (non Quran/Hadith) route."""
+    return dict(
+        topic=ctx.topic,
+        style=ctx.style_dna_spec.family,
+        tone=automation.tone or "medium",
+        language=automation.language or "english",
+        banned_phrases=automation.banned_phrases if isinstance(automation.banned_phrases, list) else None,
+        content_profile_prompt=ctx.content_profile_prompt,
+        creativity_level=getattr(automation, "creativity_level", 3),
+        extra_context=ctx.context_payload
+    )
+
+
+def _generate_caption(automation: TopicAutomation, ctx: PostContext, precomputed: dict | None = None) -> dict:
+    """
+    Caption, hashtags and alt text for a prepared post. Raises on LLM failure.
+    `precomputed` is a generate_topic_caption-shaped result from a batched request (topic route only).
+    """
+    primary_item = ctx.primary_item
+    fallback_mode = ctx.fallback_mode
+    final_reference = ctx.final_reference
+    quote_text_cleaned = ctx.quote_text_cleaned
+    uncleaned_text = ctx.uncleaned_text
+    topic = ctx.topic
+
+    print(f"[AUTO] Generating for automation_id={automation.id} topic='{topic}'")
+
+    if primary_item and primary_item.type == "hadith" and not fallback_mode:
+        # Bypass generic LLM for Hadith to ensure STRICT GROUNDING
+        from app.services.hadith_caption_service import generate_hadith_caption
+
+        # Support extracting narrator from meta if available in UnifiedContent or elsewhere
+        narrator_val = ""
+        if hasattr(primary_item, "meta") and isinstance(primary_item.meta, dict):
+            narrator_val = primary_item.meta.get("narrator", "")
+
+        payload = {
+            "reference": final_reference,
+            "translation_text": primary_item.text,
+            "narrator": narrator_val
+        }
+        caption = generate_hadith_caption(payload, tone=automation.tone or "calm")
+        hashtags = automation.hashtag_set or ["#Hadith", "#PropheticWisdom", "#IslamicReminder"]
+        alt_text = f"Hadith quote: {quote_text_cleaned}"
+
+        result = {"caption": caption, "hashtags": hashtags, "alt_text": alt_text}
+        print(f"✅ [HADITH_AUTOMATION] routed to strict generate_hadith_caption service")
+    elif primary_item and "quran" in (primary_item.provider or "").lower() and not fallback_mode:
+        # ── QURAN: use the SAME caption service as Studio/scheduled posts ──────────
+        # This ensures Arabic + English appear in the post text, matching scheduled post behavior.
+        from app.services.quran_caption_service import generate_ai_caption_from_quran
+        tone_style = automation.tone or "reflective"
+        quran_payload = {
+            "reference": final_reference,
+            "arabic_text": primary_item.arabic_text or "",
+            "translation_text": primary_item.text or uncleaned_text,
         }
+        caption = generate_ai_caption_from_quran(quran_payload, style=tone_style)
+        hashtags = automation.hashtag_set or ["#Quran", "#IslamicReminder", "#DailyReminder"]
+        alt_text = f"Quranic verse: {quote_text_cleaned}"
+        result = {"caption": caption, "hashtags": hashtags, "alt_text": alt_text}
+        print(f"✅ [QURAN_AUTOMATION] routed to generate_ai_caption_from_quran (bilingual: arabic+english)")
+    else:
+        result = precomputed if precomputed is not None else generate_topic_caption(**_topic_caption_kwargs(automation, ctx))
+    return result if isinstance(result, dict) else {"caption": (result or "").strip()}
+
+
+def _materialize_post(
+    db: Session,
+    automation: TopicAutomation,
+    ctx: PostContext,
+    result: dict,
+    force_publish: bool = False,
+    scheduled_time: datetime | None = None,
+    allow_publish: bool = True,
+) -> Post | None:
+    """
+    Media resolution, Post creation, guardrails, usage tracking and optional immediate publish.
+    `scheduled_time` overrides the next-run slot (batch planning); `allow_publish=False` leaves
+    publishing to the scheduler's publish tick.
+    """
+    from app.services.rotation_engine import record_topic_used
 
-        print(f"[AUTO] Generating for automation_id={automation.id} topic='{topic}'")
-        
-        try:
-            if primary_item and primary_item.type == "hadith" and not fallback_mode:
-                # Bypass generic LLM for Hadith to ensure STRICT GROUNDING
-                from app.services.hadith_caption_service import generate_hadith_caption
-                
-                # Support extracting narrator from meta if available in UnifiedContent or elsewhere
-                narrator_val = ""
-                if hasattr(primary_item, "meta") and isinstance(primary_item.meta, dict):
-                    narrator_val = primary_item.meta.get("narrator", "")
+    topic_base = ctx.topic_base
+    topic = ctx.topic
+    style_dna_spec = ctx.style_dna_spec
+    pooled_items = ctx.pooled_items
+    primary_item = ctx.primary_item
+    fallback_mode = ctx.fallback_mode
+    relevance_results = ctx.relevance_results
+    final_reference = ctx.final_reference
+    uncleaned_text = ctx.uncleaned_text
+    quote_text_cleaned = ctx.quote_text_cleaned
 
-                payload = {
-                    "reference": final_reference,
-                    "translation_text": primary_item.text,
-                    "narrator": narrator_val
-                }
-                caption = generate_hadith_caption(payload, tone=automation.tone or "calm")
-                hashtags = automation.hashtag_set or ["#Hadith", "#PropheticWisdom", "#IslamicReminder"]
-                alt_text = f"Hadith quote: {quote_text_cleaned}"
-                
-                result = {"caption": caption, "hashtags": hashtags, "alt_text": alt_text}
-                print(f"✅ [HADITH_AUTOMATION] routed to strict generate_hadith_caption service")
-            elif primary_item and "quran" in (primary_item.provider or "").lower() and not fallback_mode:
-                # ── QURAN: use the SAME caption service as Studio/scheduled posts ──────────
-                # This ensures Arabic + English appear in the post text, matching scheduled post behavior.
-                from app.services.quran_caption_service import generate_ai_caption_from_quran
-                tone_style = automation.tone or "reflective"
-                quran_payload = {
-                    "reference": final_reference,
-                    "arabic_text": primary_item.arabic_text or "",
-                    "translation_text": primary_item.text or uncleaned_text,
-                }
-                caption = generate_ai_caption_from_quran(quran_payload, style=tone_style)
-                hashtags = automation.hashtag_set or ["#Quran", "#IslamicReminder", "#DailyReminder"]
-                alt_text = f"Quranic verse: {quote_text_cleaned}"
-                result = {"caption": caption, "hashtags": hashtags, "alt_text": alt_text}
-                print(f"✅ [QURAN_AUTOMATION] routed to generate_ai_caption_from_quran (bilingual: arabic+english)")
-            else:
-                result = generate_topic_caption(
-                    topic=topic,
-                    style=style_dna_spec.family,
-                    tone=automation.tone or "medium",
-                    language=automation.language or "english",
-                    banned_phrases=automation.banned_phrases if isinstance(automation.banned_phrases, list) else None,
-                    content_profile_prompt=content_profile_prompt,
-                    creativity_level=getattr(automation, "creativity_level", 3),
-                    extra_context=context_payload
-                )
-            caption = result.get("caption", "").strip() if isinstance(result, dict) else (result or "").strip()
-            hashtags = result.get("hashtags", []) if isinstance(result, dict) else []
-            alt_text = result.get("alt_text", "") if isinstance(result, dict) else ""
-        except Exception as e:
-            print(f"[AUTO] LLM Generation failed: {e}")
-            automation.last_error = f"LLM Generation failed: {str(e)}"
-            db.commit()
-            return None
-            
-        if automation.hashtag_set:
-            hashtags = automation.hashtag_set
-            
-        # CamelCase Formatting for clean footer
-        hashtags = format_hashtags(hashtags)
-            
-        log_event("automation_caption_generated", automation_id=automation.id, caption_len=len(caption), hashtags_count=len(hashtags))
-        
-        # 3. Resolve Media & Recovery Recipe Ingredients
-        concepts = primary_item.topic_tags[0] if primary_item and primary_item.topic_tags else None
-        
-        # Use early-defined ingredients
-        quote_text = quote_text_cleaned
-        reference = final_reference
-        
-        media_url = None
-        
-        # SPECIAL: Quote Card Mode (v9.0 Premium Upgrade)
-        if automation.image_mode == "quote_card":
-            
-            # 1. Resolve Background
+    caption = result.get("caption", "").strip()
+    hashtags = result.get("hashtags", [])
+    alt_text = result.get("alt_text", "")
+
+    if automation.hashtag_set:
+        hashtags = automation.hashtag_set
+
+    # CamelCase Formatting for clean footer
+    hashtags = format_hashtags(hashtags)
+
+    log_event("automation_caption_generated", automation_id=automation.id, caption_len=len(caption), hashtags_count=len(hashtags))
+
+    # 3. Resolve Media & Recovery Recipe Ingredients
+    concepts = primary_item.topic_tags[0] if primary_item and primary_item.topic_tags else None
+
+    # Use early-defined ingredients
+    quote_text = quote_text_cleaned
+    reference = final_reference
+
+    media_url = None
+
+    # SPECIAL: Quote Card Mode (v9.0 Premium Upgrade)
+    if automation.image_mode == "quote_card":
+
+        # 1. Resolve Background
+        bg_url = resolve_media_url(
+            db=db, org_id=automation.org_id, ig_account_id=automation.ig_account_id,
+            image_mode="use_library_image", media_asset_id=automation.media_asset_id,
+            media_tag_query=automation.media_tag_query, automation_id=automation.id,
+            rotation_mode=automation.media_rotation_mode or "random"
+        )
+        if not bg_url:
             bg_url = resolve_media_url(
                 db=db, org_id=automation.org_id, ig_account_id=automation.ig_account_id,
-                image_mode="use_library_image", media_asset_id=automation.media_asset_id,
-                media_tag_query=automation.media_tag_query
+                image_mode="ai_nature_photo", topic=topic, automation_id=automation.id
             )
-            if not bg_url:
-                bg_url = resolve_media_url(
-                    db=db, org_id=automation.org_id, ig_account_id=automation.ig_account_id,
-                    image_mode="ai_nature_photo", topic=topic, automation_id=automation.id
-                )
-            
-            # 2. Build structured card_message — IDENTICAL structure to Studio/image_card.py
-            try:
-                from app.services.image_card import generate_quote_card
-
-                is_quran  = "quran"  in (primary_item.provider if primary_item else "").lower() and not fallback_mode
-                is_hadith = primary_item and primary_item.type == "hadith" and not fallback_mode
-
-                # Build card_message in the same schema as build_quran/hadith_quote_message
-                # so image_card.py handles Arabic reshaping + ZONE_SIZES + is_arabic flags correctly
-                if is_quran:
-                    # [INTEGRITY CHECK] If Arabic is missing from payload, attempt auto-recovery
-                    arabic_text = primary_item.arabic_text or ""
-
-                    if not arabic_text:
-                        print(f"⚠️ [AUTO_QURAN] Missing Arabic text for {reference}. Attempting recovery...")
-                        if reference:
-                            from app.services.quran_service import get_verse_by_reference
-                            from app.services.quran_serialization import normalize_quran_verse
-                            verse = get_verse_by_reference(db, reference)
-                            if verse:
-                                norm = normalize_quran_verse(verse)
-                                arabic_text = norm.get("arabic_text") or ""
-                                print(f"✅ [AUTO_QURAN] Recovery successful for {reference}: arabic resolved={bool(arabic_text)}")
-
-                    # [STRICT GATE] Block generation if integrity cannot be satisfied
-                    if not arabic_text:
-                        print(f"❌ [AUTO_QURAN][FAIL] missing Arabic for render: {reference}")
-                        automation.last_error = f"Source Integrity Violation: Cannot generate Quran card without Arabic text for {reference}"
-                        db.commit()
-                        return None
-
-                    # ── Studio-parity: generate thematic eyebrow + supporting reflection ──
-                    # Studio's build_quran_quote_message calls generate_card_framing_from_source
-                    # (GPT-4o) to produce a contextual eyebrow (e.g. "DIVINE MERCY") and a
-                    # 1-2 sentence reflection at the bottom of the card. We replicate that here.
-                    try:
-                        from app.services.llm import generate_card_framing_from_source
-                        _tone_for_framing = automation.tone or "calm"
-                        _intent_for_framing = getattr(automation, "intent_type", None) or "wisdom"
-                        framing = generate_card_framing_from_source(
-                            source_text=quote_text,
-                            intent=_intent_for_framing,
-                            tone=_tone_for_framing,
-                            custom_prompt="",
-                            source_type="quran",
-                            reference=reference,
-                        )
-                        _eyebrow = framing.get("eyebrow") or reference
-                        _supporting = framing.get("supporting_text") or ""
-                        print(f"📝 [AUTO_QURAN] Card framing generated: eyebrow='{_eyebrow[:40]}'")
-                    except Exception as _frame_err:
-                        print(f"⚠️ [AUTO_QURAN] Card framing failed (non-fatal), using reference as eyebrow: {_frame_err}")
-                        _eyebrow = reference
-                        _supporting = ""
-
-                    card_message = {
-                        "eyebrow":          _eyebrow,
-                        "arabic_text":      arabic_text,
-                        "headline":         quote_text,
-                        "supporting_text":  _supporting,
-                    }
-                elif is_hadith:
-                    was_excerpted = len(quote_text) < len(uncleaned_text) * 0.9 if uncleaned_text else False
-                    if was_excerpted:
-                        print(f"✂️ [HADITH_AUTOMATION] excerpted (original={len(uncleaned_text)}, card={len(quote_text)})")
-                        log_event("hadith_automation_excerpted", automation_id=automation.id, reference=reference)
-                    narrator_val = ""
-                    if hasattr(primary_item, "meta") and isinstance(getattr(primary_item, "meta", None), dict):
-                        narrator_val = primary_item.meta.get("narrator", "")
-                    # ── Studio-parity: generate thematic eyebrow + supporting reflection ──
-                    try:
-                        from app.services.llm import generate_card_framing_from_source
-                        _h_tone = automation.tone or "calm"
-                        _h_intent = getattr(automation, "intent_type", None) or "wisdom"
-                        _h_framing = generate_card_framing_from_source(
-                            source_text=quote_text,
-                            intent=_h_intent,
-                            tone=_h_tone,
-                            custom_prompt="",
-                            source_type="hadith",
-                            reference=reference,
-                        )
-                        _h_eyebrow = _h_framing.get("eyebrow") or reference
-                        # Narrator always takes precedence in supporting_text; framing used as fallback
-                        _h_supporting = f"Narrated {narrator_val}" if narrator_val else (_h_framing.get("supporting_text") or "")
-                        print(f"📝 [HADITH_AUTOMATION] Card framing generated: eyebrow='{_h_eyebrow[:40]}'")
-                    except Exception as _hf_err:
-                        print(f"⚠️ [HADITH_AUTOMATION] Card framing failed (non-fatal): {_hf_err}")
-                        _h_eyebrow = reference
-                        _h_supporting = f"Narrated {narrator_val}" if narrator_val else ""
-                    card_message = {
-                        "eyebrow":              _h_eyebrow,
-                        "arabic_text":          primary_item.arabic_text or "",
-                        "headline":             quote_text,
-                        "supporting_text":      _h_supporting,
-                        "was_excerpted":        was_excerpted,
-                        "hadith_narrator":      narrator_val or None,
-                        "hadith_collection":    getattr(primary_item, "collection", ""),
-                    }
-                else:
-                    card_message = {
-                        "eyebrow":          reference,
-                        "arabic_text":      "",
-                        "headline":         quote_text,
-                        "supporting_text":  "",
-                    }
-
-                # Resolve scene key from Style DNA family
-                _family     = style_dna_spec.family if style_dna_spec.family else "sacred_black"
-                _scene_key  = FAMILY_TO_SCENE_KEY.get(_family, "sacred_black")
-                _has_prompt = bool(style_dna_spec.visual_prompt and style_dna_spec.visual_prompt.strip())
-                _render_mode = "custom" if _has_prompt else "scene"
-
-                print(f"📡 [v9.0] Routing via generate_quote_card — family={_family}, scene={_scene_key}, mode={_render_mode}, arabic={bool(card_message.get('arabic_text'))}")
-
-                # CALL generate_quote_card — same function Studio/scheduled posts use.
-                # This ensures: Arabic reshaping, ZONE_SIZES, is_arabic flags, scene variation all match.
-                media_url = generate_quote_card(
-                    style=_scene_key,
-                    visual_prompt=style_dna_spec.visual_prompt if _has_prompt else None,
-                    mode=_render_mode,
-                    text_style_prompt=style_dna_spec.glow_aura or "",
-                    readability_priority=True,
-                    experimental_mode=False,
-                    engine="dalle",
-                    glossy=False,
-                    card_message=card_message,
-                )
 
-                # Source mismatch guardrail
-                reference_clean = reference.replace("Qur'an", "").replace("Quran", "").strip()
-                if reference_clean.lower() not in caption.lower() and ":" in reference:
-                    print(f"❌ [POST_SOURCE_MISMATCH] reference {reference} not in caption")
-                    automation.last_error = f"Source mismatch: Card={reference}, Caption source missing."
+        # 2. Build structured card_message — IDENTICAL structure to Studio/image_card.py
+        try:
+            from app.services.image_card import generate_quote_card
+
+            is_quran  = "quran"  in (primary_item.provider if primary_item else "").lower() and not fallback_mode
+            is_hadith = primary_item and primary_item.type == "hadith" and not fallback_mode
+
+            # Build card_message in the same schema as build_quran/hadith_quote_message
+            # so image_card.py handles Arabic reshaping + ZONE_SIZES + is_arabic flags correctly
+            if is_quran:
+                # [INTEGRITY CHECK] If Arabic is missing from payload, attempt auto-recovery
+                arabic_text = primary_item.arabic_text or ""
+
+                if not arabic_text:
+                    print(f"⚠️ [AUTO_QURAN] Missing Arabic text for {reference}. Attempting recovery...")
+                    if reference:
+                        from app.services.quran_service import get_verse_by_reference
+                        from app.services.quran_serialization import normalize_quran_verse
+                        verse = get_verse_by_reference(db, reference)
+                        if verse:
+                            norm = normalize_quran_verse(verse)
+                            arabic_text = norm.get("arabic_text") or ""
+                            print(f"✅ [AUTO_QURAN] Recovery successful for {reference}: arabic resolved={bool(arabic_text)}")
+
+                # [STRICT GATE] Block generation if integrity cannot be satisfied
+                if not arabic_text:
+                    print(f"❌ [AUTO_QURAN][FAIL] missing Arabic for render: {reference}")
+                    automation.last_error = f"Source Integrity Violation: Cannot generate Quran card without Arabic text for {reference}"
                     db.commit()
                     return None
 
-            except Exception as e:
-                print(f"[AUTO] Premium Quote card rendering failed: {e}")
-                import traceback; traceback.print_exc()
-                log_event("automation_media_error", automation_id=automation.id, error=str(e))
-        else:
-            try:
-                media_url = resolve_media_url(
-                    db=db,
-                    org_id=automation.org_id,
-                    ig_account_id=automation.ig_account_id,
-                    image_mode=automation.image_mode,
-                    topic=topic,
-                    automation_id=automation.id,
-                    media_asset_id=automation.media_asset_id,
-                    media_tag_query=automation.media_tag_query,
-                    content_concept=concepts
-                )
-            except Exception as e:
-                print(f"[AUTO] Media resolution error: {e}")
-
-        # FALLBACK: If all primary modes failed, force a high-quality Quote Card via same pipeline
-        if not media_url:
-            print(f"[AUTO] Forced fallback to quote_card for automation {automation.id}")
-            try:
-                from app.services.image_card import generate_quote_card
-                _fallback_family    = style_dna_spec.family if style_dna_spec.family else "sacred_black"
-                _fallback_scene_key = FAMILY_TO_SCENE_KEY.get(_fallback_family, "sacred_black")
-                _fallback_has_prompt = bool(style_dna_spec.visual_prompt and style_dna_spec.visual_prompt.strip())
-                # Carry Arabic through to fallback so it never silently drops to English-only
-                _fallback_arabic = (primary_item.arabic_text or "") if primary_item else ""
-                _fallback_card_msg = {
+                # ── Studio-parity: generate thematic eyebrow + supporting reflection ──
+                # Studio's build_quran_quote_message calls generate_card_framing_from_source
+                # (GPT-4o) to produce a contextual eyebrow (e.g. "DIVINE MERCY") and a
+                # 1-2 sentence reflection at the bottom of the card. We replicate that here.
+                try:
+                    from app.services.llm import generate_card_framing_from_source
+                    _tone_for_framing = automation.tone or "calm"
+                    _intent_for_framing = getattr(automation, "intent_type", None) or "wisdom"
+                    framing = generate_card_framing_from_source(
+                        source_text=quote_text,
+                        intent=_intent_for_framing,
+                        tone=_tone_for_framing,
+                        custom_prompt="",
+                        source_type="quran",
+                        reference=reference,
+                    )
+                    _eyebrow = framing.get("eyebrow") or reference
+                    _supporting = framing.get("supporting_text") or ""
+                    print(f"📝 [AUTO_QURAN] Card framing generated: eyebrow='{_eyebrow[:40]}'")
+                except Exception as _frame_err:
+                    print(f"⚠️ [AUTO_QURAN] Card framing failed (non-fatal), using reference as eyebrow: {_frame_err}")
+                    _eyebrow = reference
+                    _supporting = ""
+
+                card_message = {
+                    "eyebrow":          _eyebrow,
+                    "arabic_text":      arabic_text,
+                    "headline":         quote_text,
+                    "supporting_text":  _supporting,
+                }
+            elif is_hadith:
+                was_excerpted = len(quote_text) < len(uncleaned_text) * 0.9 if uncleaned_text else False
+                if was_excerpted:
+                    print(f"✂️ [HADITH_AUTOMATION] excerpted (original={len(uncleaned_text)}, card={len(quote_text)})")
+                    log_event("hadith_automation_excerpted", automation_id=automation.id, reference=reference)
+                narrator_val = ""
+                if hasattr(primary_item, "meta") and isinstance(getattr(primary_item, "meta", None), dict):
+                    narrator_val = primary_item.meta.get("narrator", "")
+                # ── Studio-parity: generate thematic eyebrow + supporting reflection ──
+                try:
+                    from app.services.llm import generate_card_framing_from_source
+                    _h_tone = automation.tone or "calm"
+                    _h_intent = getattr(automation, "intent_type", None) or "wisdom"
+                    _h_framing = generate_card_framing_from_source(
+                        source_text=quote_text,
+                        intent=_h_intent,
+                        tone=_h_tone,
+                        custom_prompt="",
+                        source_type="hadith",
+                        reference=reference,
+                    )
+                    _h_eyebrow = _h_framing.get("eyebrow") or reference
+                    # Narrator always takes precedence in supporting_text; framing used as fallback
+                    _h_supporting = f"Narrated {narrator_val}" if narrator_val else (_h_framing.get("supporting_text") or "")
+                    print(f"📝 [HADITH_AUTOMATION] Card framing generated: eyebrow='{_h_eyebrow[:40]}'")
+                except Exception as _hf_err:
+                    print(f"⚠️ [HADITH_AUTOMATION] Card framing failed (non-fatal): {_hf_err}")
+                    _h_eyebrow = reference
+                    _h_supporting = f"Narrated {narrator_val}" if narrator_val else ""
+                card_message = {
+                    "eyebrow":              _h_eyebrow,
+                    "arabic_text":          primary_item.arabic_text or "",
+                    "headline":             quote_text,
+                    "supporting_text":      _h_supporting,
+                    "was_excerpted":        was_excerpted,
+                    "hadith_narrator":      narrator_val or None,
+                    "hadith_collection":    getattr(primary_item, "collection", ""),
+                }
+            else:
+                card_message = {
                     "eyebrow":          reference,
-                    "arabic_text":      _fallback_arabic,
+                    "arabic_text":      "",
                     "headline":         quote_text,
                     "supporting_text":  "",
                 }
-                media_url = generate_quote_card(
-                    style=_fallback_scene_key,
-                    visual_prompt=style_dna_spec.visual_prompt if _fallback_has_prompt else None,
-                    mode="custom" if _fallback_has_prompt else "scene",
-                    readability_priority=True,
-                    engine="dalle",
-                    glossy=False,
-                    card_message=_fallback_card_msg,
-                )
-            except Exception as e:
-                print(f"[AUTO] Forced fallback rendering failed: {e}")
 
-        # 4. Create Post
-        status = "scheduled"
-        if automation.approval_mode == "needs_manual_approve":
-            status = "drafted"
-            
-        source_text = f"AUTO: {automation.name} | topic={topic}"
-        if primary_item:
-            source_text += f" | provider={primary_item.provider} | ref={primary_item.original_id}"
-
-        new_post = Post(
-            org_id=automation.org_id,
-            ig_account_id=automation.ig_account_id,
-            is_auto_generated=True,
-            automation_id=automation.id,
-            content_item_id=int(primary_item.original_id) if primary_item and primary_item.original_id and primary_item.original_id.isdigit() else None,
-            used_source_id=None,
-            used_content_item_ids=[it.original_id for it in pooled_items if it.original_id],
-            status=status,
-            source_type="automation",
-            source_text=source_text,
-            media_url=media_url,
-            caption=caption,
-            hashtags=hashtags,
-            alt_text=alt_text,
-            scheduled_time=compute_next_run_time(db.get(IGAccount, automation.ig_account_id), automation) if status == "scheduled" else None,
-            # RECOVERY RECIPE: Store ingredients for just-in-time regeneration
-            source_metadata={
-                "recovery_recipe": {
-                    "quote_text": quote_text,
-                    "reference": final_reference,
-                    "bg_url": bg_url if 'bg_url' in locals() else None,
-                    "visual_mode": automation.image_mode if not fallback_mode else "quote_card",
-                    "style": automation.style_preset
-                },
-                "is_fallback_reflection": fallback_mode,
-                "relevance_audit": relevance_results.get(primary_item.original_id) if primary_item else None
-            },
-            flags={"relevance_check": "fallback" if fallback_mode else "passed"}
-        )
-        
-        # 5. Guardrail & Validation
-        auto_str = f"AUTO: {automation.name}"
-        caption_lower = caption.lower()
-        filler_indicators = ["enhance your daily reminder", "welcome to our page", "here is your caption"]
-        
-        is_filler = any(f in caption_lower for f in filler_indicators)
-        is_too_short = len(caption) < 20
-        is_default = caption.strip() == topic.strip() or caption.strip() == auto_str or caption.strip() == automation.name
-        
-        validation_failed = result.get("validation_failed", False)
-        fail_reason = result.get("fail_reason", "invalid_caption")
-        
-        if validation_failed or not caption or is_default or is_filler or is_too_short:
-            reason = "invalid_generated_caption"
-            detail_reason = fail_reason
-            if is_filler: detail_reason = "filler_detected"
-            if is_too_short: detail_reason = "too_short"
-            if is_default: detail_reason = "default_text_echo"
-            
-            print(f"[AUTO] FAILED GUARDRAIL: {detail_reason}")
-            log_event("automation_guardrail_failed", automation_id=automation.id, reason=detail_reason)
-            new_post.status = "failed"
-            new_post.flags = {"automation_error": f"LLM returned invalid/filler caption: {caption}", "reason": reason, "detail_reason": detail_reason}
-            automation.last_error = f"Guardrail check failed: {detail_reason}"
-            db.add(new_post)
-            db.commit()
-            return new_post
+            # Resolve scene key from Style DNA family
+            _family     = style_dna_spec.family if style_dna_spec.family else "sacred_black"
+            _scene_key  = FAMILY_TO_SCENE_KEY.get(_family, "sacred_black")
+            _has_prompt = bool(style_dna_spec.visual_prompt and style_dna_spec.visual_prompt.strip())
+            _render_mode = "custom" if _has_prompt else "scene"
+
+            print(f"📡 [v9.0] Routing via generate_quote_card — family={_family}, scene={_scene_key}, mode={_render_mode}, arabic={bool(card_message.get('arabic_text'))}")
+
+            # CALL generate_quote_card — same function Studio/scheduled posts use.
+            # This ensures: Arabic reshaping, ZONE_SIZES, is_arabic flags, scene variation all match.
+            media_url = generate_quote_card(
+                style=_scene_key,
+                visual_prompt=style_dna_spec.visual_prompt if _has_prompt else None,
+                mode=_render_mode,
+                text_style_prompt=style_dna_spec.glow_aura or "",
+                readability_priority=True,
+                experimental_mode=False,
+                engine="dalle",
+                glossy=False,
+                card_message=card_message,
+            )
 
-        if not media_url:
-            new_post.status = "failed"
-            new_post.flags = {"automation_error": "media_url is missing/generation failed"}
-            automation.last_error = "Media generation failed or asset missing"
-            db.add(new_post)
-            db.commit()
-            return new_post
+            # Source mismatch guardrail
+            reference_clean = reference.replace("Qur'an", "").replace("Quran", "").strip()
+            if reference_clean.lower() not in caption.lower() and ":" in reference:
+                print(f"❌ [POST_SOURCE_MISMATCH] reference {reference} not in caption")
+                automation.last_error = f"Source mismatch: Card={reference}, Caption source missing."
+                db.commit()
+                return None
+
+        except Exception as e:
+            print(f"[AUTO] Premium Quote card rendering failed: {e}")
+            import traceback; traceback.print_exc()
+            log_event("automation_media_error", automation_id=automation.id, error=str(e))
+    else:
+        try:
+            media_url = resolve_media_url(
+                db=db,
+                org_id=automation.org_id,
+                ig_account_id=automation.ig_account_id,
+                image_mode=automation.image_mode,
+                topic=topic,
+                automation_id=automation.id,
+                media_asset_id=automation.media_asset_id,
+                media_tag_query=automation.media_tag_query,
+                content_concept=concepts,
+                rotation_mode=automation.media_rotation_mode or "random"
+            )
+        except Exception as e:
+            print(f"[AUTO] Media resolution error: {e}")
+
+    # FALLBACK: If all primary modes failed, force a high-quality Quote Card via same pipeline
+    if not media_url:
+        print(f"[AUTO] Forced fallback to quote_card for automation {automation.id}")
+        try:
+            from app.services.image_card import generate_quote_card
+            _fallback_family    = style_dna_spec.family if style_dna_spec.family else "sacred_black"
+            _fallback_scene_key = FAMILY_TO_SCENE_KEY.get(_fallback_family, "sacred_black")
+            _fallback_has_prompt = bool(style_dna_spec.visual_prompt and style_dna_spec.visual_prompt.strip())
+            # Carry Arabic through to fallback so it never silently drops to English-only
+            _fallback_arabic = (primary_item.arabic_text or "") if primary_item else ""
+            _fallback_card_msg = {
+                "eyebrow":          reference,
+                "arabic_text":      _fallback_arabic,
+                "headline":         quote_text,
+                "supporting_text":  "",
+            }
+            media_url = generate_quote_card(
+                style=_fallback_scene_key,
+                visual_prompt=style_dna_spec.visual_prompt if _fallback_has_prompt else None,
+                mode="custom" if _fallback_has_prompt else "scene",
+                readability_priority=True,
+                engine="dalle",
+                glossy=False,
+                card_message=_fallback_card_msg,
+            )
+        except Exception as e:
+            print(f"[AUTO] Forced fallback rendering failed: {e}")
+
+    # 4. Create Post
+    status = "scheduled"
+    if automation.approval_mode == "needs_manual_approve":
+        status = "drafted"
+
+    source_text = f"AUTO: {automation.name} | topic={topic}"
+    if primary_item:
+        source_text += f" | provider={primary_item.provider} | ref={primary_item.original_id}"
+
+    new_post = Post(
+        org_id=automation.org_id,
+        ig_account_id=automation.ig_account_id,
+        is_auto_generated=True,
+        automation_id=automation.id,
+        content_item_id=int(primary_item.original_id) if primary_item and primary_item.original_id and primary_item.original_id.isdigit() else None,
+        used_source_id=None,
+        used_content_item_ids=[it.original_id for it in pooled_items if it.original_id],
+        status=status,
+        source_type="automation",
+        source_text=source_text,
+        media_url=media_url,
+        caption=caption,
+        hashtags=hashtags,
+        alt_text=alt_text,
+        scheduled_time=(scheduled_time or compute_next_run_time(db.get(IGAccount, automation.ig_account_id), automation)) if status == "scheduled" else scheduled_time,
+        # RECOVERY RECIPE: Store ingredients for just-in-time regeneration
+        source_metadata={
+            "recovery_recipe": {
+                "quote_text": quote_text,
+                "reference": final_reference,
+                "bg_url": bg_url if 'bg_url' in locals() else None,
+                "visual_mode": automation.image_mode if not fallback_mode else "quote_card",
+                "style": automation.style_preset
+            },
+            "is_fallback_reflection": fallback_mode,
+            "relevance_audit": relevance_results.get(primary_item.original_id) if primary_item else None
+        },
+        flags={"relevance_check": "fallback" if fallback_mode else "passed"}
+    )
+
+    # 5. Guardrail & Validation
+    auto_str = f"AUTO: {automation.name}"
+    caption_lower = caption.lower()
+    filler_indicators = ["enhance your daily reminder", "welcome to our page", "here is your caption"]
+
+    is_filler = any(f in caption_lower for f in filler_indicators)
+    is_too_short = len(caption) < 20
+    is_default = caption.strip() == topic.strip() or caption.strip() == auto_str or caption.strip() == automation.name
+
+    validation_failed = result.get("validation_failed", False)
+    fail_reason = result.get("fail_reason", "invalid_caption")
+
+    if validation_failed or not caption or is_default or is_filler or is_too_short:
+        reason = "invalid_generated_caption"
+        detail_reason = fail_reason
+        if is_filler: detail_reason = "filler_detected"
+        if is_too_short: detail_reason = "too_short"
+        if is_default: detail_reason = "default_text_echo"
+
+        print(f"[AUTO] FAILED GUARDRAIL: {detail_reason}")
+        log_event("automation_guardrail_failed", automation_id=automation.id, reason=detail_reason)
+        new_post.status = "failed"
+        new_post.flags = {"automation_error": f"LLM returned invalid/filler caption: {caption}", "reason": reason, "detail_reason": detail_reason}
+        automation.last_error = f"Guardrail check failed: {detail_reason}"
+        db.add(new_post)
+        db.commit()
+        return new_post
 
+    if not media_url:
+        new_post.status = "failed"
+        new_post.flags = {"automation_error": "media_url is missing/generation failed"}
+        automation.last_error = "Media generation failed or asset missing"
         db.add(new_post)
-        db.flush() 
-        
-        # 6. Track Usage (Updated for decoupled items)
-        for it in pooled_items:
-            if it.original_id and it.original_id.isdigit():
-                usage = ContentUsage(
-                    org_id=automation.org_id,
-                    ig_account_id=automation.ig_account_id,
-                    automation_id=automation.id,
-                    post_id=new_post.id,
-                    content_item_id=int(it.original_id),
-                    used_at=datetime.now(dt_timezone.utc),
-                    status="selected"
-                )
-                db.add(usage)
-            
-            if it.original_id and it.original_id.isdigit():
-                db_item = db.get(ContentItem, int(it.original_id))
-                if db_item:
-                    db_item.use_count += 1
-                    db_item.last_used_at = datetime.now(dt_timezone.utc)
-
-        # 7. Immediate Publishing if configured OR forced
-        should_publish = force_publish or (automation.posting_mode == "publish_now" and automation.approval_mode == "auto_approve")
-        
-        if should_publish:
-            log_event("automation_publish_attempt", automation_id=automation.id, post_id=new_post.id, forced=force_publish)
-            acc = db.get(IGAccount, automation.ig_account_id)
-            
-            if force_publish:
-                print(f"🚀 [SHARE_NOW] Triggered for automation_id={automation.id}")
+        db.commit()
+        return new_post
 
-            print(f"📡 [IG_PUBLISH] Starting for post_id={new_post.id}")
-            print(f"🔍 [MEDIA_PREFLIGHT] Checking integrity of {new_post.media_url}")
+    db.add(new_post)
+    db.flush() 
 
-            pub_res = publish_to_instagram(
-                caption=f"{new_post.caption}\n\n" + " ".join(new_post.hashtags or []),
-                media_url=new_post.media_url,
-                ig_user_id=acc.ig_user_id,
-                access_token=acc.access_token
+    # 6. Track Usage (Updated for decoupled items)
+    for it in pooled_items:
+        if it.original_id and it.original_id.isdigit():
+            usage = ContentUsage(
+                org_id=automation.org_id,
+                ig_account_id=automation.ig_account_id,
+                automation_id=automation.id,
+                post_id=new_post.id,
+                content_item_id=int(it.original_id),
+                used_at=datetime.now(dt_timezone.utc),
+                status="selected"
             )
-            
-            # --- AUTO-RECOVERY RETRY LOOP ---
-            if not pub_res.get("ok") and pub_res.get("error") in ["media_asset_stale", "MEDIA_STALE_OR_MISSING"]:
-                print(f"🔄 [MEDIA_RECOVERY] Stale media detected. Attempting automatic regeneration...")
-                recovery_success = recover_stale_media(new_post, db)
-                
-                if recovery_success:
-                    print(f"✅ [MEDIA_RECOVERY] Regeneration successful. Retrying publish...")
-                    print(f"🔍 [MEDIA_PREFLIGHT] Retry check for {new_post.media_url}")
-                    pub_res = publish_to_instagram(
-                        caption=f"{new_post.caption}\n\n" + " ".join(new_post.hashtags or []),
-                        media_url=new_post.media_url,
-                        ig_user_id=acc.ig_user_id,
-                        access_token=acc.access_token
-                    )
-                else:
-                    print(f"❌ [MEDIA_RECOVERY] Regeneration failed. Blocking publish.")
+            db.add(usage)
+
+        if it.original_id and it.original_id.isdigit():
+            db_item = db.get(ContentItem, int(it.original_id))
+            if db_item:
+                db_item.use_count += 1
+                db_item.last_used_at = datetime.now(dt_timezone.utc)
+
+    # 7. Immediate Publishing if configured OR forced
+    should_publish = force_publish or (allow_publish and automation.posting_mode == "publish_now" and automation.approval_mode == "auto_approve")
 
-            if pub_res.get("ok"):
-                print(f"✨ [IG_PUBLISH] Success! Post shared to Instagram.")
-                new_post.status = "published"
-                new_post.published_time = datetime.now(dt_timezone.utc)
+    if should_publish:
+        log_event("automation_publish_attempt", automation_id=automation.id, post_id=new_post.id, forced=force_publish)
+        acc = db.get(IGAccount, automation.ig_account_id)
+
+        if force_publish:
+            print(f"🚀 [SHARE_NOW] Triggered for automation_id={automation.id}")
+
+        print(f"📡 [IG_PUBLISH] Starting for post_id={new_post.id}")
+        print(f"🔍 [MEDIA_PREFLIGHT] Checking integrity of {new_post.media_url}")
+
+        pub_res = publish_to_instagram(
+            caption=f"{new_post.caption}\n\n" + " ".join(new_post.hashtags or []),
+            media_url=new_post.media_url,
+            ig_user_id=acc.ig_user_id,
+            access_token=acc.access_token
+        )
+
+        # --- AUTO-RECOVERY RETRY LOOP ---
+        if not pub_res.get("ok") and pub_res.get("error") in ["media_asset_stale", "MEDIA_STALE_OR_MISSING"]:
+            print(f"🔄 [MEDIA_RECOVERY] Stale media detected. Attempting automatic regeneration...")
+            recovery_success = recover_stale_media(new_post, db)
+
+            if recovery_success:
+                print(f"✅ [MEDIA_RECOVERY] Regeneration successful. Retrying publish...")
+                print(f"🔍 [MEDIA_PREFLIGHT] Retry check for {new_post.media_url}")
+                pub_res = publish_to_instagram(
+                    caption=f"{new_post.caption}\n\n" + " ".join(new_post.hashtags or []),
+                    media_url=new_post.media_url,
+                    ig_user_id=acc.ig_user_id,
+                    access_token=acc.access_token
+                )
             else:
-                new_post.status = "failed"
-                publish_err = pub_res.get("error")
-                
-                if publish_err in ["media_asset_stale", "MEDIA_STALE_OR_MISSING"]:
-                    publish_err = "Media asset wiped from ephemeral storage (stale). Please regenerate manually."
-                elif isinstance(publish_err, dict):
-                    publish_err = publish_err.get("message") or str(publish_err)
-                
-                new_post.flags = {**new_post.flags, "publish_error": publish_err}
-                automation.last_error = f"Publish failed: {publish_err}"
-                print(f"❌ [IG_PUBLISH] Failed: {publish_err}")
+                print(f"❌ [MEDIA_RECOVERY] Regeneration failed. Blocking publish.")
 
-        automation.last_run_at = datetime.now(dt_timezone.utc)
-        automation.last_post_id = new_post.id
-        automation.last_error = None
+        if pub_res.get("ok"):
+            print(f"✨ [IG_PUBLISH] Success! Post shared to Instagram.")
+            new_post.status = "published"
+            new_post.published_time = datetime.now(dt_timezone.utc)
+        else:
+            new_post.status = "failed"
+            publish_err = pub_res.get("error")
 
-        # Record topic + style usage for the no-repeat rotation engine
-        try:
-            used_style_id = (automation.flags or {}).get("last_style_id")
-            record_topic_used(
-                automation_id=automation.id,
-                topic=topic_base,
-                style_id=used_style_id,
-                db=db,
-            )
-            log_event("rotation_recorded", automation_id=automation.id, topic=topic_base, style_id=used_style_id)
-        except Exception as rec_err:
-            print(f"[ROTATION] record_topic_used failed (non-fatal): {rec_err}")
+            if publish_err in ["media_asset_stale", "MEDIA_STALE_OR_MISSING"]:
+                publish_err = "Media asset wiped from ephemeral storage (stale). Please regenerate manually."
+            elif isinstance(publish_err, dict):
+                publish_err = publish_err.get("message") or str(publish_err)
 
-        db.commit()
-        db.refresh(new_post)
-        return new_post
+            new_post.flags = {**new_post.flags, "publish_error": publish_err}
+            automation.last_error = f"Publish failed: {publish_err}"
+            print(f"❌ [IG_PUBLISH] Failed: {publish_err}")
+
+    automation.last_run_at = datetime.now(dt_timezone.utc)
+    automation.last_post_id = new_post.id
+    automation.last_error = None
 
+    # Record topic + style usage for the no-repeat rotation engine
+    try:
+        used_style_id = style_dna_spec.style_dna_id
+        record_topic_used(
+            automation_id=automation.id,
+            topic=topic_base,
+            style_id=used_style_id,
+            db=db,
+        )
+        log_event("rotation_recorded", automation_id=automation.id, topic=topic_base, style_id=used_style_id)
+    except Exception as rec_err:
+        print(f"[ROTATION] record_topic_used failed (non-fatal): {rec_err}")
+
+    db.commit()
+    db.refresh(new_post)
+    return new_post
+
+
+def run_automation_once(db: Session, automation_id: int, force_publish: bool = False) -> Post | None:
+    """
+    Core engine to run one automation cycle using the decoupled Content Provider architecture.
+    """
+    lock = get_lock_for_automation(automation_id)
+    if not lock.acquire(blocking=False):
+        print(f"🔒 [LOCK] Automation {automation_id} is already in progress. Skipping duplicate execution.")
+        return None
+
+    try:
+        # The threading lock only covers this process; other workers / replicas hold the advisory lock
+        with try_advisory_lock(db.get_bind(), "automation_run", automation_id) as held:
+            if not held:
+                print(f"🔒 [LOCK] Automation {automation_id} is running in another process. Skipping duplicate execution.")
+                return None
+            return _run_automation_cycle(db, automation_id, force_publish)
+    finally:
+        lock.release()
+
+
+def _run_automation_cycle(db: Session, automation_id: int, force_publish: bool) -> Post | None:
+    try:
+        automation = db.query(TopicAutomation).filter(TopicAutomation.id == automation_id).first()
+        if not automation or not automation.enabled:
+            return None
+
+        topic_base = _select_topic_base(db, automation)
+        ctx = _prepare_post_context(db, automation, topic_base)
+        if ctx is None:
+            return None
+
+        try:
+            result = _generate_caption(automation, ctx)
+        except Exception as e:
+            print(f"[AUTO] LLM Generation failed: {e}")
+            automation.last_error = f"LLM Generation failed: {str(e)}"
+            db.commit()
+            return None
+
+        return _materialize_post(db, automation, ctx, result, force_publish=force_publish)
     except Exception as e:
         import traceback
         log_event("automation_run_exception", automation_id=automation_id, error=str(e), traceback=traceback.format_exc(limit=3))
@@ -1044,8 +1189,7 @@ def run_automation_once(db: Session, automation_id: int, force_publish: bool = F
         except:
             pass
         return None
-    finally:
-        lock.release()
+
 
 def recover_stale_media(post: Post, db: Session) -> bool:
     """
@@ -63,6 +63,7 @@ class StyleDNASpec:
     locked_traits: dict = field(default_factory=dict)
     visual_prompt: Optional[str] = None
     glow_aura: Optional[str] = None
+    style_dna_id: Optional[int] = None  # StyleDNA row it was loaded from (recorded in the rotation ledger)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -255,10 +256,10 @@ def get_automation_style_dna(db: Session, automation: TopicAutomation) -> StyleD
     Returns a StyleDNASpec (always — uses 'islamic_reminder' as fallback).
     """
     from app.models import StyleDNA, Post
-    from app.services.rotation_engine import pick_style
+    from app.services.rotation_engine import last_style_id as load_last_style_id, pick_style
 
     pool = getattr(automation, "style_dna_pool", []) or []
-    last_style_id = (getattr(automation, "flags", {}) or {}).get("last_style_id")
+    last_style_id = load_last_style_id(automation.id, db) if len(pool) > 1 else None
 
     # Intelligent pick: avoid back-to-back same style
     selected_dna_id = pick_style(pool, last_style_id=last_style_id)
@@ -278,7 +279,8 @@ def get_automation_style_dna(db: Session, automation: TopicAutomation) -> StyleD
                 ornament_level=db_obj.ornament_level,
                 tone_style=db_obj.tone_style,
                 variation_pool=db_obj.variation_pool or [],
-                locked_traits=db_obj.locked_traits or {}
+                locked_traits=db_obj.locked_traits or {},
+                style_dna_id=db_obj.id,
             )
 
     preset_key = getattr(automation, "style_preset", "islamic_reminder") or "islamic_reminder"
@@ -434,7 +436,7 @@ def enable_automation(db: Session, automation_id: int, org_id: int) -> bool:
         return False
     automation.enabled = True
     db.commit()
-    _reload_scheduler(db)
+    _reload_scheduler()
     log_event("automation_service_enabled", automation_id=automation_id)
     return True
 
@@ -449,7 +451,7 @@ def disable_automation(db: Session, automation_id: int, org_id: int) -> bool:
         return False
     automation.enabled = False
     db.commit()
-    _reload_scheduler(db)
+    _reload_scheduler()
     log_event("automation_service_disabled", automation_id=automation_id)
     return True
 
@@ -472,7 +474,7 @@ def simulate_growth_plan(
     import random
     from app.services.library_retrieval import retrieve_relevant_chunks
     from app.services.quran_service import search_quran, normalize_quran_verse
-    from app.services.relevance_engine import validate_source_relevance
+    from app.services.relevance_engine import audit_candidates
     from app.services.llm import generate_topic_caption
     from app.services.image_renderer import render_minimal_quote_card
     from app.config import settings
@@ -549,10 +551,10 @@ def simulate_growth_plan(
         relevance_audit = None
         
         if pooled_items:
-            for cand in pooled_items:
-                # Audit - Use cand.title as ContentItem doesn't have .reference
-                cand_ref = getattr(cand, "reference", getattr(cand, "title", "Quran"))
-                audit = validate_source_relevance(topic, cand.text, cand_ref)
+            # Audit - Use cand.title as ContentItem doesn't have .reference
+            cand_refs = [getattr(cand, "reference", getattr(cand, "title", "Quran")) for cand in pooled_items]
+            audits = audit_candidates(topic, [(cand.text, ref) for cand, ref in zip(pooled_items, cand_refs)])
+            for cand, cand_ref, audit in zip(pooled_items, cand_refs, audits):
                 if audit["accepted"]:
                     # Ensure Arabic text exists - Fetch if missing
                     if not cand.arabic_text:
@@ -577,8 +579,8 @@ def simulate_growth_plan(
             # Try general library logic if Quran check was too strict or failed
             chunks = retrieve_relevant_chunks(db, org_id, query=topic, k=3)
             if chunks:
-                for c in chunks:
-                    audit = validate_source_relevance(topic, c.get("text", ""), c.get("source", ""))
+                audits = audit_candidates(topic, [(c.get("text", ""), c.get("source", "")) for c in chunks])
+                for c, audit in zip(chunks, audits):
                     if audit["accepted"]:
                         # Convert chunk to pseudo-item
                         from types import SimpleNamespace
@@ -688,14 +690,7 @@ def simulate_growth_plan(
                     visual_prompt=style.visual_prompt if hasattr(style, "visual_prompt") else None,
                     mode="custom" if hasattr(style, "visual_prompt") and style.visual_prompt else "preset"
                 )
-                # Mark as preview
-                if visual_url and "/uploads/" in visual_url:
-                    basename = visual_url.split("/")[-1]
-                    new_name = f"preview_{basename}"
-                    os.rename(os.path.join(settings.uploads_dir, basename), os.path.join(settings.uploads_dir, new_name))
-                    from app.config import build_public_media_url
-                    visual_url = build_public_media_url(new_name)
-                    
+                # No "preview_" rename: renders are stored under their content key, shared with identical renders
             except Exception as ve:
                 logger.error(f"Visual preview generation failed: {ve}")
 
@@ -721,10 +716,10 @@ def simulate_growth_plan(
 # HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _reload_scheduler(db: Session) -> None:
+def _reload_scheduler() -> None:
     """Reload APScheduler jobs after automation changes."""
     try:
         from app.services.scheduler import reload_automation_jobs
-        reload_automation_jobs(lambda: db)
+        reload_automation_jobs()
     except Exception as e:
         logger.warning(f"[AutomationService] Scheduler reload failed (non-fatal): {e}")
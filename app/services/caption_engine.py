@@ -55,7 +55,7 @@ Only output the final caption.
 import requests
 import re
 import html
-from openai import OpenAI
+from app.services.llm_gateway import get_openai_client as get_shared_openai_client
 from app.config import settings
 from app.db import SessionLocal
 from app.models import ContentItem
@@ -135,9 +135,7 @@ def fetch_quran_verse(topic: str):
 # OpenAI Client
 # -------------------------------
 def get_openai_client():
-    if not settings.openai_api_key:
-        return None
-    return OpenAI(api_key=settings.openai_api_key)
+    return get_shared_openai_client()
 
 
 # -------------------------------
@@ -1,7 +1,7 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 import logging
 import json
-from openai import OpenAI
+from app.services.llm_gateway import get_openai_client
 from typing import Optional, Dict, Any, List
 from app.config import settings
 
@@ -70,7 +70,7 @@ def generate_caption_from_source(
             "hashtags": ["#TrustAllah", "#Islam"]
         }
 
-    client = OpenAI(api_key=settings.openai_api_key)
+    client = get_openai_client()
     prompt = SOCIAL_CAPTION_PROMPT.format(
         source_type=source_type,
         reference=reference,
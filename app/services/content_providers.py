@@ -2,9 +2,10 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-import random
+from sqlalchemy import or_, func
+from sqlalchemy.dialects.postgresql import array
 from app.services.content_sources import expand_topic_keywords
+from app.services.library_service import generate_topics_slugs
 
 from app.models import ContentItem
 
@@ -20,6 +21,32 @@ class UnifiedContent(BaseModel):
     original_id: Optional[str] = None
     meta: Optional[dict] = {}
 
+def find_matching_items(db: Session, scope_filter, topic: str, limit: int) -> List[ContentItem]:
+    """
+    Selects up to `limit` random ContentItems in scope that match the expanded topic.
+
+    Candidate selection runs in SQL: topic keywords are matched against the GIN-indexed
+    `topics_slugs` column and against `lower(text)` (pg_trgm index), then sampled
+    server-side so only the chosen rows are loaded.
+    """
+    keywords = expand_topic_keywords(topic.lower().strip())
+    if not keywords or limit <= 0:
+        return []
+
+    slugs = generate_topics_slugs(None, keywords)
+    text_lower = func.lower(ContentItem.text)
+    match_clauses = [text_lower.contains(kw, autoescape=True) for kw in keywords]
+    if slugs:
+        match_clauses.append(ContentItem.topics_slugs.has_any(array(slugs)))
+
+    return (
+        db.query(ContentItem)
+        .filter(scope_filter, or_(*match_clauses))
+        .order_by(func.random())
+        .limit(limit)
+        .all()
+    )
+
 class BaseContentProvider(ABC):
     @property
     @abstractmethod
@@ -50,38 +77,11 @@ class SystemLibraryProvider(BaseContentProvider):
 
     def get_content(self, db: Session, org_id: int, topic: str, limit: int = 1) -> List[UnifiedContent]:
         """Fetch from global system default packs where org_id is NULL"""
-        norm_topic = topic.lower().strip()
-        
         # We query items with NO org_id (system wide)
-        query = db.query(ContentItem).filter(ContentItem.org_id == None)
-        items = query.all()
-        
-        match_pool = []
-        for item in items:
-            item_topics = [t.lower() for t in (item.topics or [])]
-            item_text = (item.text or "").lower()
-            item_meta = item.meta or {}
-            
-            # Flexible keyword matching (v2 Expansion)
-            keywords = expand_topic_keywords(norm_topic)
-            match_found = False
-            
-            # Check topics (explicit tags)
-            if any(kw in item_topics for kw in keywords):
-                match_found = True
-            
-            # Check text (content)
-            elif any(kw in item_text for kw in keywords):
-                match_found = True
-                    
-            if match_found:
-                match_pool.append(item)
-                
-        if not match_pool:
+        selected = find_matching_items(db, ContentItem.org_id == None, topic, limit)
+        if not selected:
             return []
             
-        selected = random.sample(match_pool, min(limit, len(match_pool)))
-        
         results = []
         for s in selected:
             meta = s.meta or {}
@@ -115,36 +115,10 @@ class UserLibraryProvider(BaseContentProvider):
 
     def get_content(self, db: Session, org_id: int, topic: str, limit: int = 1) -> List[UnifiedContent]:
         """Fetch from user's specific organization library"""
-        norm_topic = topic.lower().strip()
-        
-        query = db.query(ContentItem).filter(ContentItem.org_id == org_id)
-        items = query.all()
-        
-        match_pool = []
-        for item in items:
-            item_topics = [t.lower() for t in (item.topics or [])]
-            item_text = (item.text or "").lower()
-            
-            # Flexible keyword matching (v2 Expansion)
-            keywords = expand_topic_keywords(norm_topic)
-            match_found = False
-            
-            # Check topics (explicit tags)
-            if any(kw in item_topics for kw in keywords):
-                match_found = True
-            
-            # Check text (content)
-            elif any(kw in item_text for kw in keywords):
-                match_found = True
-                    
-            if match_found:
-                match_pool.append(item)
-                
-        if not match_pool:
+        selected = find_matching_items(db, ContentItem.org_id == org_id, topic, limit)
+        if not selected:
             return []
             
-        selected = random.sample(match_pool, min(limit, len(match_pool)))
-        
         results = []
         for s in selected:
             meta = s.meta or {}
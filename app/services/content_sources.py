@@ -1,11 +1,10 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
-import random
 import logging
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from app.models import ContentSource, ContentItem
 
 logger = logging.getLogger(__name__)
@@ -72,70 +71,65 @@ def select_items_for_automation(
         logger.warning(f"Source {source_id} not found or disabled for org {org_id}")
         return ([], last_item_cursor)
 
-    # Fetch all eligible items
-    q = select(ContentItem).where(
+    base = select(ContentItem).where(
         ContentItem.org_id == org_id,
         ContentItem.source_id == source_id,
     )
 
-    all_items = db.execute(q).scalars().all()
-    if not all_items:
-        logger.warning(f"No content items found for source {source_id}")
-        return ([], last_item_cursor)
-
     if selection_mode == "round_robin":
-        # Deterministic rotation by ID ordering
-        all_items_sorted = sorted(all_items, key=lambda x: x.id)
-        start_idx = 0
-        if last_item_cursor:
-            try:
-                cursor_id = int(last_item_cursor)
-                for i, it in enumerate(all_items_sorted):
-                    if it.id == cursor_id:
-                        start_idx = (i + 1) % len(all_items_sorted)
-                        break
-            except (ValueError, TypeError):
-                start_idx = 0
-                
-        picked = []
-        idx = start_idx
-        for _ in range(min(items_per_post, len(all_items_sorted))):
-            picked.append(all_items_sorted[idx])
-            idx = (idx + 1) % len(all_items_sorted)
-            
-        new_cursor = str(picked[-1].id) if picked else last_item_cursor
-        return (picked, new_cursor)
-
-    # Default: random, prefer least-used / not recently used
-    # weighting by inverse use_count
-    try:
-        weights = []
-        for it in all_items:
-            w = 1.0 / (1.0 + (it.use_count or 0))
-            weights.append(w)
-        
-        # random.choices can pick same item multiple times if k > 1
-        # so we pick one by one to ensure uniqueness if possible
+        # Deterministic rotation by ID: keyset page after the cursor, wrapping to the start
+        try:
+            cursor_id = int(last_item_cursor) if last_item_cursor else None
+        except (ValueError, TypeError):
+            cursor_id = None
+
         picked = []
-        available = list(all_items)
-        for _ in range(min(items_per_post, len(available))):
-            # Recalculate weights for remaining available items
-            current_weights = [1.0 / (1.0 + (it.use_count or 0)) for it in available]
-            choice = random.choices(available, weights=current_weights, k=1)[0]
-            picked.append(choice)
-            available.remove(choice)
-            
-        return (picked, last_item_cursor)
-    except Exception as e:
-        logger.error(f"Error in random item selection: {e}")
-        return (random.sample(all_items, min(items_per_post, len(all_items))), last_item_cursor)
+        if cursor_id is not None:
+            picked = db.execute(
+                base.where(ContentItem.id > cursor_id).order_by(ContentItem.id).limit(items_per_post)
+            ).scalars().all()
+        if len(picked) < items_per_post:
+            wrap = base.order_by(ContentItem.id).limit(items_per_post - len(picked))
+            if cursor_id is not None:
+                wrap = wrap.where(ContentItem.id <= cursor_id)
+            picked = list(picked) + db.execute(wrap).scalars().all()
+
+        if not picked:
+            logger.warning(f"No content items found for source {source_id}")
+            return ([], last_item_cursor)
+        return (picked, str(picked[-1].id))
+
+    # Default: weighted random without replacement, weight = 1 / (1 + use_count),
+    # so least-used items are preferred. Efraimidis–Spirakis: each row gets the key
+    # u^(1/w) (u uniform in (0, 1]) and the k largest keys form the sample. Ordering
+    # by ln(u) / w = ln(u) * (1 + use_count) is equivalent and needs no power.
+    # The keys are ranked over narrow (id, key) rows; only the k winners are loaded.
+    es_key = func.ln(1.0 - func.random()) * (1 + func.coalesce(ContentItem.use_count, 0))
+    sample = (
+        select(ContentItem.id, es_key.label("es_key"))
+        .where(ContentItem.org_id == org_id, ContentItem.source_id == source_id)
+        .order_by(es_key.desc())
+        .limit(items_per_post)
+        .subquery()
+    )
+    picked = db.execute(
+        select(ContentItem).join(sample, sample.c.id == ContentItem.id).order_by(sample.c.es_key.desc())
+    ).scalars().all()
+    if not picked:
+        logger.warning(f"No content items found for source {source_id}")
+    return (picked, last_item_cursor)
 
 def mark_items_used(db: Session, items: list[ContentItem]) -> None:
-    """Updates last_used_at and use_count for the provided items."""
-    now = datetime.now(timezone.utc)
-    for it in items:
-        it.last_used_at = now
-        it.use_count = (it.use_count or 0) + 1
+    """Updates last_used_at and use_count for the provided items (one UPDATE)."""
+    ids = [it.id for it in items]
+    if not ids:
+        return
+    db.execute(
+        update(ContentItem)
+        .where(ContentItem.id.in_(ids))
+        .values(last_used_at=datetime.now(timezone.utc), use_count=func.coalesce(ContentItem.use_count, 0) + 1)
+        .execution_options(synchronize_session="fetch")
+    )
     db.commit()
 
 # ---- Importers ----
@@ -0,0 +1,284 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Hadith Edition Cache
+=====================================
+Local, persistent store of fawazahmed0 CDN editions (fallback provider).
+
+Each `editions/{edition}.min.json` file is downloaded once, written to
+HADITH_CACHE_DIR together with its ETag / Last-Modified validators, and
+revalidated with a conditional GET at most every `_REVALIDATE_AFTER_SECONDS`.
+When the CDN is unreachable the last good copy on disk keeps serving.
+
+Loaded editions are kept in memory with:
+  - a hadith-number index  (O(1) reference lookup)
+  - an inverted token index (ranked keyword search)
+
+SAFETY: hadith records are stored exactly as returned by the CDN.
+Nothing is rewritten here — normalization stays in hadith_service.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HTTP_TIMEOUT = 30.0
+_REVALIDATE_AFTER_SECONDS = 24 * 3600
+_RETRY_AFTER_FAILURE_SECONDS = 60
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens used by both the index and the query side."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass
+class EditionIndex:
+    """In-memory view of one CDN edition with lookup and search indexes."""
+    edition: str
+    metadata: dict
+    hadiths: list[dict]
+    by_number: dict = field(default_factory=dict)      # hadith number -> position
+    postings: dict = field(default_factory=dict)       # token -> {position: term frequency}
+    vocabulary: list[str] = field(default_factory=list)  # sorted tokens (prefix lookup)
+    texts_lower: list[str] = field(default_factory=list)
+    loaded_at: float = 0.0
+
+    @classmethod
+    def build(cls, edition: str, payload: dict) -> "EditionIndex":
+        hadiths = payload.get("hadiths") or []
+        idx = cls(edition=edition, metadata=payload.get("metadata") or {}, hadiths=hadiths, loaded_at=time.time())
+        for pos, h in enumerate(hadiths):
+            num = h.get("hadithnumber")
+            if num is not None:
+                idx.by_number[_number_key(num)] = pos
+            text_lower = (h.get("text") or "").lower()
+            idx.texts_lower.append(text_lower)
+            for token in _TOKEN_RE.findall(text_lower):
+                bucket = idx.postings.setdefault(token, {})
+                bucket[pos] = bucket.get(pos, 0) + 1
+        idx.vocabulary = sorted(idx.postings)
+        return idx
+
+    def get(self, hadith_number) -> Optional[dict]:
+        pos = self.by_number.get(_number_key(hadith_number))
+        return self.hadiths[pos] if pos is not None else None
+
+    def _prefix_postings(self, prefix: str) -> dict:
+        """Merges postings of every vocabulary token starting with `prefix`."""
+        merged: dict = {}
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            for pos, tf in self.postings[token].items():
+                merged[pos] = merged.get(pos, 0) + tf
+        return merged
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """
+        Ranked keyword search. Every query token must match (the last one as a
+        prefix, for typeahead); hits are scored by term frequency with a bonus
+        when the whole query appears verbatim.
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        token_postings = [self.postings.get(t, {}) for t in tokens[:-1]]
+        token_postings.append(self._prefix_postings(tokens[-1]))
+        if any(not p for p in token_postings):
+            return []
+
+        candidates = set(min(token_postings, key=len))
+        for p in token_postings:
+            candidates &= p.keys()
+            if not candidates:
+                return []
+
+        phrase = " ".join(tokens)
+        query_lower = query.lower().strip()
+        scored = []
+        for pos in candidates:
+            score = sum(p[pos] for p in token_postings)
+            text_lower = self.texts_lower[pos]
+            if query_lower and query_lower in text_lower:
+                score += 10
+            elif phrase in text_lower:
+                score += 5
+            scored.append((-score, pos))
+
+        scored.sort()
+        return [self.hadiths[pos] for _, pos in scored[:limit]]
+
+
+def _number_key(num) -> str:
+    """Normalizes 7 / 7.0 / "7" to the same lookup key."""
+    try:
+        f = float(num)
+        return str(int(f)) if f.is_integer() else str(f)
+    except (TypeError, ValueError):
+        return str(num)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DISK STORE
+# ─────────────────────────────────────────────────────────────────────────────
+
+_editions: dict[str, EditionIndex] = {}
+_checked_at: dict[str, float] = {}   # meta "checked_at" of the in-memory edition
+_edition_locks: dict[str, threading.Lock] = {}
+_last_failure: dict[str, float] = {}
+_locks_mutex = threading.Lock()
+
+
+def _lock_for(edition: str) -> threading.Lock:
+    with _locks_mutex:
+        if edition not in _edition_locks:
+            _edition_locks[edition] = threading.Lock()
+        return _edition_locks[edition]
+
+
+def _paths(edition: str) -> tuple[str, str]:
+    cache_dir = settings.hadith_cache_dir
+    return (
+        os.path.join(cache_dir, f"{edition}.min.json"),
+        os.path.join(cache_dir, f"{edition}.meta.json"),
+    )
+
+
+def _read_meta(meta_path: str) -> dict:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _refresh_from_cdn(edition: str, data_path: str, meta_path: str, meta: dict) -> Optional[bool]:
+    """
+    Conditional GET against the CDN.
+    Returns True when new bytes were written, False on 304, None on failure.
+    """
+    headers = {}
+    if meta.get("etag") and os.path.exists(data_path):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified") and os.path.exists(data_path):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    from app.services.hadith_service import _cdn_base  # hadith_service imports this module
+
+    url = f"{_cdn_base()}/editions/{edition}.min.json"
+    try:
+        response = httpx.get(url, headers=headers, timeout=_HTTP_TIMEOUT, follow_redirects=True)
+    except Exception as e:
+        logger.warning(f"[HADITH_CACHE] Fetch failed for {edition}: {e}")
+        return None
+
+    if response.status_code == 304:
+        meta["checked_at"] = time.time()
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        logger.info(f"[HADITH_CACHE] {edition} not modified (304)")
+        return False
+
+    if response.status_code != 200:
+        logger.warning(f"[HADITH_CACHE] HTTP {response.status_code} for {edition}")
+        return None
+
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    _write_atomic(data_path, response.content)
+    new_meta = {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "checked_at": time.time(),
+        "size": len(response.content),
+    }
+    _write_atomic(meta_path, json.dumps(new_meta).encode("utf-8"))
+    logger.info(f"[HADITH_CACHE] {edition} downloaded ({len(response.content)} bytes)")
+    return True
+
+
+def _load_from_disk(edition: str, data_path: str) -> Optional[EditionIndex]:
+    try:
+        with open(data_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"[HADITH_CACHE] Could not read {data_path}: {e}")
+        return None
+    started = time.perf_counter()
+    idx = EditionIndex.build(edition, payload)
+    logger.info(
+        f"[HADITH_CACHE] {edition} indexed: {len(idx.hadiths)} hadiths, "
+        f"{len(idx.vocabulary)} tokens in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return idx
+
+
+def get_edition(edition: str) -> Optional[EditionIndex]:
+    """
+    Returns the indexed edition, downloading or revalidating it when needed.
+    Serves the last good copy if the CDN cannot be reached.
+    """
+    current = _editions.get(edition)
+    if current and time.time() - _checked_at.get(edition, 0) < _REVALIDATE_AFTER_SECONDS:
+        return current
+
+    data_path, meta_path = _paths(edition)
+    with _lock_for(edition):
+        current = _editions.get(edition)
+        meta = _read_meta(meta_path)
+        checked_at = meta.get("checked_at", 0) if os.path.exists(data_path) else 0
+        is_fresh = time.time() - checked_at < _REVALIDATE_AFTER_SECONDS
+        if current and is_fresh:
+            _checked_at[edition] = checked_at
+            return current
+
+        recently_failed = time.time() - _last_failure.get(edition, 0) < _RETRY_AFTER_FAILURE_SECONDS
+        changed = None
+        if not is_fresh and not recently_failed:
+            changed = _refresh_from_cdn(edition, data_path, meta_path, meta)
+            if changed is None:
+                _last_failure[edition] = time.time()
+            else:
+                checked_at = time.time()
+        if current and not changed:
+            _checked_at[edition] = checked_at
+            return current
+
+        idx = _load_from_disk(edition, data_path) if os.path.exists(data_path) else None
+        if idx:
+            _editions[edition] = idx
+            _checked_at[edition] = checked_at
+        return idx or current
+
+
+def invalidate(edition: Optional[str] = None) -> None:
+    """Drops in-memory indexes (all, or one edition). Disk copies are kept."""
+    if edition:
+        _editions.pop(edition, None)
+        _checked_at.pop(edition, None)
+    else:
+        _editions.clear()
+        _checked_at.clear()
@@ -17,7 +17,7 @@ STRICT RULES:
 import logging
 import re
 from typing import Optional, Dict, Any
-from openai import OpenAI
+from app.services.llm_gateway import get_openai_client
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -114,7 +114,7 @@ def generate_hadith_caption(
     )
 
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
+        client = get_openai_client()
         response = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
@@ -54,6 +54,7 @@ import httpx
 from typing import Optional
 
 from app.config import settings
+from app.services.hadith_cache import get_edition
 
 logger = logging.getLogger(__name__)
 
@@ -412,6 +413,19 @@ def _cdn_get_hadith_by_reference(collection_key: str, hadith_number: int) -> Opt
     if not col:
         return None
 
+    # Serve from the local edition store when available (no per-hadith round-trips)
+    eng_edition = get_edition(col["eng_edition"])
+    ara_edition = get_edition(col["ara_edition"])
+    eng_hadith = eng_edition.get(hadith_number) if eng_edition else None
+    ara_hadith = ara_edition.get(hadith_number) if ara_edition else None
+    if eng_hadith or ara_hadith:
+        logger.info(f"[HADITH][fallback_cdn] Served {col['name']} #{hadith_number} from local store")
+        return _normalize_cdn_hadith(
+            {"hadiths": [eng_hadith], "metadata": eng_edition.metadata} if eng_hadith else None,
+            {"hadiths": [ara_hadith]} if ara_hadith else None,
+            collection_key, hadith_number,
+        )
+
     base = _cdn_base()
     eng_url = f"{base}/editions/{col['eng_edition']}/{hadith_number}.json"
     ara_url = f"{base}/editions/{col['ara_edition']}/{hadith_number}.json"
@@ -427,9 +441,12 @@ def _cdn_get_hadith_by_reference(collection_key: str, hadith_number: int) -> Opt
 
 
 def _cdn_search_hadith(query: str, collection_key: Optional[str], limit: int) -> list[dict]:
-    query_lower = query.lower().strip()
+    """
+    Ranked search over locally cached CDN editions (see hadith_cache).
+    Editions are downloaded once and revalidated with ETag/Last-Modified,
+    so a search is an in-memory index lookup rather than a full download.
+    """
     results = []
-    base = _cdn_base()
 
     collections_to_search = (
         [collection_key] if collection_key and collection_key in COLLECTION_REGISTRY
@@ -440,19 +457,16 @@ def _cdn_search_hadith(query: str, collection_key: Optional[str], limit: int) ->
         if len(results) >= limit:
             break
         col = COLLECTION_REGISTRY[col_key]
-        data = _get_json(f"{base}/editions/{col['eng_edition']}.min.json")
-        if not data:
+        edition = get_edition(col["eng_edition"])
+        if not edition:
             continue
-        for h in data.get("hadiths", []):
-            if len(results) >= limit:
-                break
-            if query_lower in (h.get("text") or "").lower():
-                normalized = _normalize_cdn_hadith(
-                    {"hadiths": [h], "metadata": data.get("metadata", {})},
-                    None, col_key, h.get("hadithnumber"), single_hadith=h,
-                )
-                if normalized and validate_hadith_item(normalized):
-                    results.append(normalized)
+        for h in edition.search(query, limit - len(results)):
+            normalized = _normalize_cdn_hadith(
+                {"hadiths": [h], "metadata": edition.metadata},
+                None, col_key, h.get("hadithnumber"), single_hadith=h,
+            )
+            if normalized and validate_hadith_item(normalized):
+                results.append(normalized)
 
     return results[:limit]
 
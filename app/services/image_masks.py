@@ -0,0 +1,85 @@
+"""
+Sabeel Studio — Mask & Gradient Toolkit
+
+Vectorized builders for the alpha masks and colour ramps used by the card
+renderers. Every mask is computed as a NumPy array in one pass and handed to
+PIL as an "L" image, replacing per-pixel `putpixel` loops and per-row /
+per-column `draw.line` / concentric `draw.ellipse` passes.
+
+Profiles are plain callables mapping a normalized coordinate array
+(0.0 at the origin edge / centre, 1.0 at the far edge / radius) to mask
+values in 0..255; results are clipped and truncated to uint8.
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+Profile = Callable[[np.ndarray], np.ndarray]
+
+
+def _to_mask(values: np.ndarray) -> Image.Image:
+    return Image.fromarray(np.clip(values, 0, 255).astype(np.uint8))
+
+
+def vertical_mask(size: tuple, profile: Profile) -> Image.Image:
+    """Mask whose value depends only on the row: profile(y / height)."""
+    w, h = size
+    t = np.arange(h, dtype=np.float32) / float(max(h, 1))
+    column = np.clip(profile(t), 0, 255).astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(column[:, None], (h, w))))
+
+
+def horizontal_mask(size: tuple, profile: Profile) -> Image.Image:
+    """Mask whose value depends only on the column: profile(x / width)."""
+    w, h = size
+    t = np.arange(w, dtype=np.float32) / float(max(w, 1))
+    row = np.clip(profile(t), 0, 255).astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(row[None, :], (h, w))))
+
+
+def radial_mask(size: tuple, profile: Profile, center: Optional[tuple] = None,
+                radius: Optional[float] = None) -> Image.Image:
+    """
+    Mask driven by distance from `center`: profile(distance / radius).
+    Defaults to the image centre and the half-diagonal as radius.
+    """
+    w, h = size
+    cx, cy = center if center is not None else (w // 2, h // 2)
+    if radius is None:
+        radius = float(np.hypot(cx, cy)) + 1
+    xs = (np.arange(w, dtype=np.float32) - cx) ** 2
+    ys = (np.arange(h, dtype=np.float32) - cy) ** 2
+    t = np.sqrt(ys[:, None] + xs[None, :]) / float(max(radius, 1))
+    return _to_mask(profile(t))
+
+
+def edge_fade_profile(edge_fraction: float, peak: float, power: float) -> Profile:
+    """
+    Symmetric curtain profile: `peak` at both side edges falling to 0 at
+    `edge_fraction` of the width inward, shaped by `power`.
+    """
+    def profile(t: np.ndarray) -> np.ndarray:
+        n = t.size
+        x = np.arange(n, dtype=np.float32)
+        cw = max(int(n * edge_fraction), 1)
+        left = np.where(x < cw, peak * np.clip(1 - x / cw, 0, 1) ** power, 0)
+        mirrored = n - 1 - x
+        right = np.where(mirrored < cw, peak * np.clip(1 - mirrored / cw, 0, 1) ** power, 0)
+        return np.maximum(left, right)
+    return profile
+
+
+def blend_colors(size: tuple, color_a: tuple, color_b: tuple, mask: Image.Image) -> Image.Image:
+    """RGB image mixing `color_a` (mask 255) into `color_b` (mask 0)."""
+    a = Image.new("RGB", size, tuple(int(c) for c in color_a[:3]))
+    b = Image.new("RGB", size, tuple(int(c) for c in color_b[:3]))
+    return Image.composite(a, b, mask)
+
+
+def tinted_layer(size: tuple, color: tuple, mask: Image.Image) -> Image.Image:
+    """RGBA layer of a flat colour whose alpha channel is `mask`."""
+    layer = Image.new("RGBA", size, tuple(int(c) for c in color[:3]) + (0,))
+    layer.putalpha(mask)
+    return layer
@@ -18,10 +18,19 @@ import textwrap
 import math
 import random
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 from openai import OpenAI
+from app.services.llm_gateway import get_openai_client as get_shared_openai_client
 from app.config import settings
+from app.services.image_stats import ImageStats
+from app.services.image_masks import (
+    vertical_mask, horizontal_mask, radial_mask, edge_fade_profile, blend_colors, tinted_layer,
+)
 from google import genai
 from google.genai import types
 import base64
@@ -65,12 +74,28 @@ except Exception as _vs_err:
 # ─────────────────────────────────────────────────────────────────────────────
 
 def get_openai_client() -> Optional[OpenAI]:
-    if not settings.openai_api_key:
-        return None
-    return OpenAI(api_key=settings.openai_api_key)
+    return get_shared_openai_client()
+
+# ── Font Cache ────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=256)
+def get_font(font_path: Optional[str], size: int) -> ImageFont.ImageFont:
+    """Process-wide FreeType font cache keyed by (path, size). Falls back to PIL's default font."""
+    try:
+        return ImageFont.truetype(font_path, size)
+    except Exception:
+        return ImageFont.load_default()
 
 # ── Arabic Support ────────────────────────────────────────────────────────────
 ARABIC_FONT_PATH = "assets/fonts/Amiri-Regular.ttf"
+ARABIC_DEBUG = False  # Print per-string reshape/BIDI hex traces
+
+# Configuration for Quranic Uthmani text; one reshaper instance is reused for every call
+_ARABIC_RESHAPER = arabic_reshaper.ArabicReshaper(configuration={
+    'delete_harakat': False,
+    'support_zwj': True,
+    'use_unshaped_instead_of_isolated': True,
+}) if _ARABIC_OK else None
 
 def is_arabic_text(text: str) -> bool:
     """Detects if a string contains Arabic characters, including core, supplement, extended, and presentation forms."""
@@ -85,8 +110,9 @@ def is_arabic_text(text: str) -> bool:
         for c in text
     )
 
+@lru_cache(maxsize=2048)
 def reshape_arabic(text: str) -> str:
-    """Correctly reshapes and reorders Arabic text for RTL rendering in PIL."""
+    """Correctly reshapes and reorders Arabic text for RTL rendering in PIL (memoized)."""
     if not _ARABIC_OK or not text:
         return text
     
@@ -99,14 +125,7 @@ def reshape_arabic(text: str) -> str:
         # Sometimes source data has hidden LTR marks (\u200E) that poisoning the reorderer
         clean_text = text.replace('\u200E', '').replace('\u200F', '').strip()
         
-        # Configuration for Quranic Uthmani text
-        configuration = {
-            'delete_harakat': False,
-            'support_zwj': True,
-            'use_unshaped_instead_of_isolated': True,
-        }
-        reshaper = arabic_reshaper.ArabicReshaper(configuration=configuration)
-        reshaped_text = reshaper.reshape(clean_text)
+        reshaped_text = _ARABIC_RESHAPER.reshape(clean_text)
         
         # BIDI: Force Right-to-Left base direction (v2 Absolute Fix)
         bidi_text = get_display(reshaped_text, base_dir='R')
@@ -121,16 +140,14 @@ def reshape_arabic(text: str) -> str:
             bidi_text = " ".join(reversed(reshaped_text.split()))
             print("🧬 [ArabicEngine] Using Word-Level Failsafe Reorder")
         
-        # LOGGING (Debug): Confirming the reordering for the logs
-        first_orig = clean_text[:5]
-        first_bidi = bidi_text[:5]
-        
-        # Hex codes for deep debug
-        orig_hex = " ".join([hex(ord(c)) for c in first_orig])
-        bidi_hex = " ".join([hex(ord(c)) for c in first_bidi])
-        
-        print(f"🧬 [ArabicEngine] Input: '{first_orig}' ({orig_hex})")
-        print(f"🧬 [ArabicEngine] BIDI : '{first_bidi}' ({bidi_hex})")
+        if ARABIC_DEBUG:
+            # LOGGING (Debug): Confirming the reordering, with hex codes for deep debug
+            first_orig = clean_text[:5]
+            first_bidi = bidi_text[:5]
+            orig_hex = " ".join([hex(ord(c)) for c in first_orig])
+            bidi_hex = " ".join([hex(ord(c)) for c in first_bidi])
+            print(f"🧬 [ArabicEngine] Input: '{first_orig}' ({orig_hex})")
+            print(f"🧬 [ArabicEngine] BIDI : '{first_bidi}' ({bidi_hex})")
         
         return bidi_text
     except Exception as e:
@@ -182,15 +199,8 @@ def draw_top_gradient_band(image: Image.Image, color: tuple, alpha: int, height_
     w, h = image.size
     band_h = int(h * height_percent)
     
-    # Create vertical gradient mask
-    band_mask = Image.new("L", (w, band_h), 0)
-    for y in range(band_h):
-        # Linear falloff from top to bottom
-        v = int(255 * (1.0 - (y / float(band_h))**1.5))
-        for x in range(w):
-            band_mask.putpixel((x, y), v)
-            
-    band_mask = Image.eval(band_mask, lambda x: int(x * (alpha / 255.0)))
+    # Vertical gradient mask: falloff from top to bottom, scaled by alpha
+    band_mask = vertical_mask((w, band_h), lambda t: 255 * (1.0 - t**1.5) * (alpha / 255.0))
     
     band_layer = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     band_color = (int(color[0]), int(color[1]), int(color[2]), 255)
@@ -210,15 +220,8 @@ def draw_bottom_gradient_band(image: Image.Image, color: tuple, alpha: int, heig
     band_h = int(h * height_percent)
     start_y = h - band_h
     
-    # Create vertical gradient mask
-    band_mask = Image.new("L", (w, band_h), 0)
-    for y in range(band_h):
-        # Quadratic falloff from bottom to top
-        v = int(255 * ((y / float(band_h))**1.8))
-        for x in range(w):
-            band_mask.putpixel((x, y), v)
-            
-    band_mask = Image.eval(band_mask, lambda x: int(x * (alpha / 255.0)))
+    # Vertical gradient mask: quadratic falloff from bottom to top, scaled by alpha
+    band_mask = vertical_mask((w, band_h), lambda t: 255 * t**1.8 * (alpha / 255.0))
     
     band_layer = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     band_color = (int(color[0]), int(color[1]), int(color[2]), 255)
@@ -331,6 +334,12 @@ def balanced_text_wrap(text: str, font: ImageFont.FreeTypeFont, max_width: int,
         
     return lines
 
+# Memo of fit_text_to_zone results, keyed by (text, font, zone box, spacing).
+# Layout only depends on font metrics, so re-renders of the same card reuse it.
+_FIT_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_FIT_CACHE_MAX = 512
+_FIT_CACHE_LOCK = threading.Lock()
+
 def fit_text_to_zone(
     text: str, 
     font_path: str, 
@@ -345,8 +354,34 @@ def fit_text_to_zone(
 ):
     """
     Iteratively fits text into a budget using size, tracking, and leading adjustments.
+    Results are memoized (LRU) per text / font / zone box / spacing.
     Returns: (list[str], ImageFont.FreeTypeFont, block_h, final_ls, final_tracking)
     """
+    key = (text, font_path, max_w, max_h, start_size, min_size, base_ls, base_tracking, is_arabic)
+    with _FIT_CACHE_LOCK:
+        hit = _FIT_CACHE.get(key)
+        if hit is not None:
+            _FIT_CACHE.move_to_end(key)
+    if hit is None:
+        hit = _fit_text_to_zone(text, font_path, max_w, max_h, start_size, draw_tmp,
+                                min_size, base_ls, base_tracking, is_arabic)
+        hit = (tuple(hit[0]),) + tuple(hit[1:])
+        with _FIT_CACHE_LOCK:
+            _FIT_CACHE[key] = hit
+            while len(_FIT_CACHE) > _FIT_CACHE_MAX:
+                _FIT_CACHE.popitem(last=False)
+    lines, fnt, block_h, zd_ls, tracking = hit
+    return list(lines), fnt, block_h, zd_ls, tracking
+
+def clear_layout_caches() -> None:
+    """Drops memoized fits, fonts and reshaped strings (e.g. after swapping font files)."""
+    with _FIT_CACHE_LOCK:
+        _FIT_CACHE.clear()
+    get_font.cache_clear()
+    reshape_arabic.cache_clear()
+
+def _fit_text_to_zone(text, font_path, max_w, max_h, start_size, draw_tmp,
+                      min_size, base_ls, base_tracking, is_arabic):
     # MEASUREMENT PREPARATION (v3 Absolute Fix)
     # We use a temporary reshaped string for width measurement only.
     # We DO NOT modify the original 'text' variable because we want to 
@@ -377,10 +412,7 @@ def fit_text_to_zone(
     
     while iterations < max_iterations:
         iterations += 1
-        try:
-            fnt = ImageFont.truetype(font_path, curr_size)
-        except:
-            fnt = ImageFont.load_default()
+        fnt = get_font(font_path, curr_size)
             
         # 1. Wrap
         total_tracking = base_ls + curr_tracking
@@ -794,17 +826,12 @@ def _save_bg_cache(img: Image.Image, prompt_key: str, cache_dir: str) -> None:
         print(f"⚠️  [BG Cache] Could not save ({e})")
 
 
-def _detect_center_brightness(image_rgb, size) -> float:
+def _detect_center_brightness(image_rgb, size, stats: Optional[ImageStats] = None) -> float:
     """
     Returns average pixel brightness (0-255) of the center 50% of the image.
     Used to choose white vs dark text when overlaying on a DALL-E background.
     """
-    W, H     = size
-    px, py   = W // 4, H // 4
-    center   = image_rgb.crop((px, py, W - px, H - py))
-    gray     = center.convert("L")
-    pixels   = list(gray.getdata())
-    return sum(pixels) / len(pixels) if pixels else 128.0
+    return (stats or ImageStats(image_rgb, size)).brightness(0.25, 0.75, 0.25, 0.75)
 
 
 def generate_background(
@@ -1000,20 +1027,10 @@ def generate_dalle_background(
 # PRIMITIVES — BACKGROUNDS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def draw_radial_gradient(draw, size, color_start, color_end):
-    """Smooth radial gradient. Extra steps + post-blur to prevent banding."""
-    W, H  = size
-    cx, cy = W // 2, H // 2
-    md    = int(math.sqrt(cx * cx + cy * cy)) + 1
-    steps = 80   # more steps = smoother color transition
-    for i in range(steps, 0, -1):
-        t  = i / steps
-        r2 = int(md * t)
-        u  = 1 - t
-        r  = int(round(color_start[0] * t + color_end[0] * u))
-        g  = int(round(color_start[1] * t + color_end[1] * u))
-        b  = int(round(color_start[2] * t + color_end[2] * u))
-        draw.ellipse([cx - r2, cy - r2, cx + r2, cy + r2], fill=(r, g, b))
+def draw_radial_gradient(image, size, color_start, color_end):
+    """Smooth radial gradient: color_end at the centre, color_start at the corners."""
+    mask = radial_mask(size, lambda t: 255 * t)
+    image.paste(blend_colors(size, color_start, color_end, mask), (0, 0))
 
 
 def draw_starry_noise(draw, size, density=0.0006, seed=None):
@@ -1302,17 +1319,8 @@ def apply_spiritual_atmosphere(image_rgb, size, accent, intensity=0.72):
 
 
 def apply_vignette(image, intensity=0.65):
-    W, H   = image.size
-    cx, cy = W // 2, H // 2
-    md     = int(math.sqrt(cx*cx + cy*cy)) + 1
-    overlay = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-    draw    = ImageDraw.Draw(overlay)
-    steps   = 38
-    for i in range(steps):
-        t  = i / steps
-        r  = int(md * (1 - t))
-        a  = int((t ** 2.3) * 255 * intensity)
-        draw.ellipse([cx-r, cy-r, cx+r, cy+r], fill=(0, 0, 0, a))
+    mask    = radial_mask(image.size, lambda t: (np.clip(1 - t, 0, 1) ** 2.3) * 255 * intensity)
+    overlay = tinted_layer(image.size, (0, 0, 0), mask)
     return Image.alpha_composite(image.convert("RGBA"), overlay).convert("RGB")
 
 
@@ -1636,23 +1644,16 @@ def _build_adaptive_palette(
     bg_image: "Image.Image",
     size: tuple,
     shadow_boost: int = 0,
+    stats: Optional[ImageStats] = None,
 ) -> list:
     """
     Builds a 3-element text palette by independently sampling the average
     brightness of each text zone in the rendered background image.
     """
-    W, H = size
-
-    def zone_brightness(y1f: float, y2f: float,
-                        x1f: float = 0.12, x2f: float = 0.88) -> float:
-        x1, y1, x2, y2 = int(W*x1f), int(H*y1f), int(W*x2f), int(H*y2f)
-        crop   = bg_image.crop((x1, y1, x2, y2))
-        pixels = list(crop.convert("L").getdata())
-        return sum(pixels) / len(pixels) if pixels else 128.0
-
-    bA = zone_brightness(0.08, 0.25)   # reference row
-    bB = zone_brightness(0.30, 0.70)   # main quote row
-    bC = zone_brightness(0.72, 0.88)   # support row
+    stats = stats or ImageStats(bg_image, size)
+    bA = stats.brightness(0.08, 0.25, 0.12, 0.88)   # reference row
+    bB = stats.brightness(0.30, 0.70, 0.12, 0.88)   # main quote row
+    bC = stats.brightness(0.72, 0.88, 0.12, 0.88)   # support row
 
     def pick_text(brightness: float, accent: bool = False):
         if brightness < 100:
@@ -1704,6 +1705,7 @@ def render_minimal_quote_card(
     vs_spec = None
     typo_spec = None
     dalle_bg = None
+    bg_stats = None
     
     if mode == "custom" and (not visual_prompt or not visual_prompt.strip()):
         mode = "preset"; style = "quran"
@@ -1748,7 +1750,8 @@ def render_minimal_quote_card(
         else:
             bg = dalle_bg
             # Analyze background to detect if it's too bright/busy
-            center_b = _detect_center_brightness(bg, target_size)
+            bg_stats = ImageStats(bg, target_size)
+            center_b = _detect_center_brightness(bg, target_size, stats=bg_stats)
             if center_b > 180:
                 # Add a subtle dark wash to ensure white text pops or switch to dark text
                 # We'll stick to a subtle wash to preserve the aesthetic
@@ -1795,9 +1798,9 @@ def render_minimal_quote_card(
         key = style if style in PRESET_CONFIGS else "quran"
         cfg = PRESET_CONFIGS[key]
         bg = Image.new("RGB", target_size, cfg["bg_start"])
-        draw = ImageDraw.Draw(bg)
         if cfg["bg_start"] != cfg["bg_end"]:
-            draw_radial_gradient(draw, target_size, cfg["bg_start"], cfg["bg_end"])
+            draw_radial_gradient(bg, target_size, cfg["bg_start"], cfg["bg_end"])
+        draw = ImageDraw.Draw(bg)
         
         pat = cfg.get("pattern")
         if pat == "islamic": draw_islamic_pattern(draw, target_size, cfg.get("pattern_col", (190, 150, 40, 30)))
@@ -1824,18 +1827,9 @@ def render_minimal_quote_card(
             bg = Image.alpha_composite(bg.convert("RGBA"), celestial.filter(ImageFilter.GaussianBlur(140))).convert("RGB")
         elif atm == "arch_veil":
             # Scene-Based Arch Veil: deep soft side curtains that frame the center stage
-            # Left curtain — deep gradient from left edge toward center
-            arch = Image.new("RGBA", target_size, (0, 0, 0, 0))
-            ad = ImageDraw.Draw(arch)
-            curtain_w = int(W * 0.38)
-            for x in range(curtain_w):
-                fade = int(200 * (1 - (x / curtain_w)) ** 1.8)
-                ad.line([(x, 0), (x, H)], fill=(0, 0, 0, fade))
-            # Right curtain — mirror
-            for x in range(curtain_w):
-                rx = W - 1 - x
-                fade = int(200 * (1 - (x / curtain_w)) ** 1.8)
-                ad.line([(rx, 0), (rx, H)], fill=(0, 0, 0, fade))
+            # Deep gradient from each side edge toward center (left curtain + mirrored right)
+            curtain_mask = horizontal_mask(target_size, edge_fade_profile(0.38, 200, 1.8))
+            arch = tinted_layer(target_size, (0, 0, 0), curtain_mask)
             arch = arch.filter(ImageFilter.GaussianBlur(32))
             bg = Image.alpha_composite(bg.convert("RGBA"), arch).convert("RGB")
             
@@ -1850,15 +1844,19 @@ def render_minimal_quote_card(
         palette = PRESET_TEXT.get(key, PRESET_TEXT["quran"])
         glow_rgba = cfg.get("glow")
 
+    # One downsampled pass over the finished background serves every analysis below
+    if bg_stats is None:
+        bg_stats = ImageStats(bg, target_size)
+
     # 2. Typography Adaptation (Visual System v8.5+)
     if _VS_OK:
         text_style = vs_interpret_text(text_style_prompt, experimental=experimental_mode)
-        analysis   = vs_analyze(bg, target_size)
+        analysis   = vs_analyze(bg, target_size, stats=bg_stats)
         typo_spec  = vs_adapt(analysis, vs_spec if mode == "custom" else None, text_style=text_style, readability_priority=readability_priority)
         print(f"   🎨 [Adapt] risk={typo_spec.readability_risk} theme={typo_spec.typography_mode}")
 
     if typo_spec is None:
-        palette = _build_adaptive_palette(bg, target_size)
+        palette = _build_adaptive_palette(bg, target_size, stats=bg_stats)
         glow_rgba = (255, 255, 255, 40)
 
     # 3. V9.0 PRECISION LAYOUT BUDGETS
@@ -1977,13 +1975,15 @@ def render_minimal_quote_card(
             h_op = typo_spec.halo_opacity if getattr(typo_spec, "halo_opacity", 0) > 0 else 45
             h_col = typo_spec.halo_color[:3] if hasattr(typo_spec, "halo_color") else (0, 0, 0)
             
-            bg = draw_radial_halo(bg, (main_zd["x_center"], main_zd["y"] + main_zd["block_h"] // 2), radius, h_col, h_op)
+            haloed = draw_radial_halo(bg, (main_zd["x_center"], main_zd["y"] + main_zd["block_h"] // 2), radius, h_col, h_op)
+            if haloed is not bg:
+                bg, bg_stats = haloed, ImageStats(haloed, target_size)
 
     bg_rgba = bg.convert("RGBA")
     g_rgba = typo_spec.glow_rgba if typo_spec else glow_rgba
 
     # Calculate global zone brightness to detect high-contrast legibility danger
-    zone_brightness_avg = _detect_center_brightness(bg, target_size)
+    zone_brightness_avg = _detect_center_brightness(bg, target_size, stats=bg_stats)
     dynamic_text_shadow = (0, 0, 0, 160) if zone_brightness_avg > 140 else (0, 0, 0, 100)
 
     # 6. Render Loop (v9.1 Cinematic Dual-Language)
@@ -2095,14 +2095,8 @@ def render_quote_card(background_local_path: Optional[str], quote: str,
     # 2. Procedural Fallback if no bg loaded
     if bg is None:
         print("🎨 [Renderer] Generating procedural spiritual background...")
-        bg = Image.new("RGB", (W, H), (14, 10, 18)) # Obsidian base
-        draw_inner = ImageDraw.Draw(bg)
-        # Vertical gradient: Deep Charcoal to Obsidian
-        for y in range(H):
-            r = int(14 + (24 - 14) * (1 - y/H))
-            g = int(10 + (20 - 10) * (1 - y/H))
-            b = int(18 + (28 - 18) * (1 - y/H))
-            draw_inner.line([(0, y), (W, y)], fill=(r, g, b))
+        # Vertical gradient: Deep Charcoal (top) to Obsidian base (bottom)
+        bg = blend_colors((W, H), (24, 20, 28), (14, 10, 18), vertical_mask((W, H), lambda t: 255 * (1 - t)))
         
         # Add subtle noise or grain for premium feel
         noise = Image.effect_noise((W, H), 12).convert("L")
@@ -2112,10 +2106,7 @@ def render_quote_card(background_local_path: Optional[str], quote: str,
     base_dir  = os.path.dirname(
         os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     fp = os.path.join(base_dir, "assets", "fonts", "Inter.ttf")
-    try:
-        fs, fl = ImageFont.truetype(fp, 36), ImageFont.truetype(fp, 72)
-    except Exception:
-        fs = fl = ImageFont.load_default()
+    fs, fl = get_font(fp, 36), get_font(fp, 72)
     # ov = Image.new("RGBA", (W, H), (0, 0, 0, 120))
     # bg = Image.alpha_composite(bg.convert("RGBA"), ov).convert("RGB")
     draw = ImageDraw.Draw(bg)
@@ -1,87 +1,128 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, cast, String
+from sqlalchemy import func, or_, case, literal
+from sqlalchemy.dialects.postgresql import array
 from app.models import SourceDocument, SourceChunk, ContentItem, ContentSource
 from typing import List, Dict, Any
 import re
 
-def retrieve_relevant_chunks(db: Session, org_id: int, query: str, k: int = 5, topic_slug: str = None) -> List[Dict[str, Any]]:
-    """Retrieves relevant knowledge snippets from BOTH documents and structured library entries."""
+# Rank boosts folded into the SQL score (same weights as the legacy keyword scorer,
+# which counted 1 per matched keyword, 5 per keyword tagged as a topic, 25 for topic_slug)
+TOPIC_KEYWORD_BOOST = 5
+TOPIC_SLUG_BOOST = 25
+
+def _build_tsquery(keywords: set[str]):
+    """OR-combines plain word tokens into an english tsquery (any keyword may match)."""
+    return func.to_tsquery("english", " | ".join(sorted(keywords)))
+
+def _text_score(search_vector, keywords: set[str], tsquery):
+    """
+    1 per query keyword found in `search_vector`, on the same scale as the topic boosts.
+    ts_rank_cd (well below 1) only breaks ties between rows matching as many keywords.
+    """
+    matched = sum(
+        (case((search_vector.op("@@")(func.to_tsquery("english", kw)), 1), else_=0) for kw in sorted(keywords)),
+        literal(0),
+    )
+    return matched + func.ts_rank_cd(search_vector, tsquery)
+
+def _structured_reference(entry: ContentItem, src_name: str) -> str:
+    item_ref = src_name
+    meta = entry.meta or {}
+    if entry.item_type == 'quran':
+        # Try multiple keys for surah and verse
+        surah = meta.get('surah_number') or meta.get('surah') or meta.get('sura') or meta.get('sura_no')
+        verse = meta.get('verse_number') or meta.get('verse_start') or meta.get('verse') or meta.get('ayah') or meta.get('ayah_no') or meta.get('ayah_number')
+        if surah and verse:
+            item_ref = f"Qur'an {surah}:{verse}"
+        # Removed Surah-only fallback to enforce strict citation requirements
+    elif entry.item_type == 'hadith':
+        coll = meta.get('collection') or meta.get('book') or meta.get('source_title') or "Hadith"
+        num = meta.get('hadith_number') or meta.get('number') or meta.get('id') or meta.get('ref_num')
+        if num:
+            item_ref = f"{coll} #{num}"
+        elif coll:
+            item_ref = coll
+    return item_ref
+
+def retrieve_relevant_chunks(db: Session, org_id: int, query: str, k: int = 5, topic_slug: str = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Retrieves relevant knowledge snippets from BOTH documents and structured library entries.
+
+    Ranking happens in Postgres: `search_vector` (GIN-indexed tsvector) is matched against an
+    OR tsquery of the query keywords. Scores keep the legacy scale: 1 per matched keyword
+    (ts_rank_cd breaks ties) plus the topic boosts. Each source is limited to its top
+    `offset + k` rows in SQL and the merged list is sliced to the requested page.
+    """
     if not query and not topic_slug:
         return []
-    
+
     keywords = set(re.findall(r'\w+', query.lower())) if query else set()
-    
+    offset = max(0, offset)
+    window = offset + k
+    if window <= 0:
+        return []
+
     scored_results = []
-    
+    tsquery = _build_tsquery(keywords) if keywords else None
+
     # --- 1. SEARCH UNSTRUCTURED CHUNKS (SourceDocs) ---
-    if keywords:
-        chunks = db.query(SourceChunk, SourceDocument.title, SourceDocument.original_url)\
+    if tsquery is not None:
+        chunk_rank = _text_score(SourceChunk.search_vector, keywords, tsquery).label("rank")
+        chunks = db.query(SourceChunk.chunk_text, SourceChunk.chunk_metadata, SourceDocument.title, SourceDocument.original_url, chunk_rank)\
             .join(SourceDocument, SourceChunk.document_id == SourceDocument.id)\
-            .filter(SourceChunk.org_id == org_id)\
+            .filter(SourceChunk.org_id == org_id, SourceChunk.search_vector.op("@@")(tsquery))\
+            .order_by(chunk_rank.desc(), SourceChunk.id)\
+            .limit(window)\
             .all()
-            
-        for chunk, doc_title, doc_url in chunks:
-            text_lower = chunk.chunk_text.lower()
-            score = sum(1 for kw in keywords if kw in text_lower)
-            if score > 0:
-                scored_results.append({
-                    "score": score,
-                    "type": "unstructured",
-                    "source": doc_title,
-                    "url": doc_url,
-                    "text": chunk.chunk_text,
-                    "metadata": chunk.chunk_metadata
-                })
+
+        for chunk_text, chunk_metadata, doc_title, doc_url, rank in chunks:
+            scored_results.append({
+                "score": float(rank),
+                "type": "unstructured",
+                "source": doc_title,
+                "url": doc_url,
+                "text": chunk_text,
+                "metadata": chunk_metadata
+            })
 
     # --- 2. SEARCH STRUCTURED ENTRIES (ContentItems) ---
     # Merge items where org_id matches OR is NULL (System)
-    entries = db.query(ContentItem, ContentSource.name)\
+    score_expr = literal(0.0)
+    match_clauses = []
+    if tsquery is not None:
+        score_expr = score_expr + _text_score(ContentItem.search_vector, keywords, tsquery)
+        match_clauses.append(ContentItem.search_vector.op("@@")(tsquery))
+
+        # Topic keyword boost (explicit tags), once per keyword the item is tagged with
+        for kw in sorted(keywords):
+            score_expr = score_expr + case((ContentItem.topics_slugs.has_key(kw), TOPIC_KEYWORD_BOOST), else_=0)
+        match_clauses.append(ContentItem.topics_slugs.has_any(array(sorted(keywords))))
+
+    # Topic Slug match (EXACT GROUNDING)
+    if topic_slug:
+        slug_hit = ContentItem.topics_slugs.has_key(topic_slug)
+        score_expr = score_expr + case((slug_hit, TOPIC_SLUG_BOOST), else_=0)
+        match_clauses.append(slug_hit)
+
+    item_rank = score_expr.label("rank")
+    entries = db.query(ContentItem, ContentSource.name, item_rank)\
         .join(ContentSource, ContentItem.source_id == ContentSource.id)\
-        .filter(or_(ContentItem.org_id == org_id, ContentItem.org_id == None))\
+        .filter(or_(ContentItem.org_id == org_id, ContentItem.org_id == None), or_(*match_clauses))\
+        .order_by(item_rank.desc(), ContentItem.id)\
+        .limit(window)\
         .all()
-        
-    for entry, src_name in entries:
-        score = 0
-        text_lower = (entry.text or "").lower()
-        
-        # Keyword matches
-        if keywords:
-            score += sum(1 for kw in keywords if kw in text_lower)
-            entry_topics = [t.lower() for t in (entry.topics or [])]
-            score += sum(5 for kw in keywords if kw in entry_topics)
-
-        # Topic Slug match (EXACT GROUNDING)
-        if topic_slug and topic_slug in (entry.topics_slugs or []):
-            score += 25 # High priority for the linked topic
-        
-        if score > 0:
-            item_ref = src_name
-            item_type = entry.item_type
-            if item_type == 'quran':
-                # Try multiple keys for surah and verse
-                surah = entry.meta.get('surah_number') or entry.meta.get('surah') or entry.meta.get('sura') or entry.meta.get('sura_no')
-                verse = entry.meta.get('verse_number') or entry.meta.get('verse_start') or entry.meta.get('verse') or entry.meta.get('ayah') or entry.meta.get('ayah_no') or entry.meta.get('ayah_number')
-                if surah and verse:
-                    item_ref = f"Qur'an {surah}:{verse}"
-                # Removed Surah-only fallback to enforce strict citation requirements
-            elif item_type == 'hadith':
-                coll = entry.meta.get('collection') or entry.meta.get('book') or entry.meta.get('source_title') or "Hadith"
-                num = entry.meta.get('hadith_number') or entry.meta.get('number') or entry.meta.get('id') or entry.meta.get('ref_num')
-                if num:
-                    item_ref = f"{coll} #{num}"
-                elif coll:
-                    item_ref = coll
 
-            scored_results.append({
-                "score": score,
-                "type": "structured",
-                "item_type": item_type,
-                "source": item_ref,
-                "text": entry.text,
-                "arabic": entry.arabic_text,
-                "metadata": entry.meta
-            })
-    
-    # Sort and return top k
+    for entry, src_name, rank in entries:
+        scored_results.append({
+            "score": float(rank),
+            "type": "structured",
+            "item_type": entry.item_type,
+            "source": _structured_reference(entry, src_name),
+            "text": entry.text,
+            "arabic": entry.arabic_text,
+            "metadata": entry.meta
+        })
+
+    # Merge the two pre-ranked windows and return the requested page
     scored_results.sort(key=lambda x: x["score"], reverse=True)
-    return scored_results[:k]
+    return scored_results[offset:offset + k]
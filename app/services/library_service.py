@@ -105,70 +105,16 @@ def create_library_entry(db: Session, org_id: Optional[int], data: ContentItemCr
     db.add(item)
     db.commit()
     db.refresh(item)
-from app.models import ContentSource, ContentItem, LibraryTopicSynonym
+    return item
 
 def suggest_library_topics(db: Session, text: str, max_results: int = 5):
     """
     Suggests the best matching library topics based on input text.
     Uses layered scoring: Exact Match > Synonym Match > Partial Match.
+    Served from the in-memory topic dictionary (see topic_dictionary).
     """
     if not text:
         return []
 
-    import re
-    # Normalize input
-    clean_text = text.lower().strip()
-    words = set(re.findall(r'\w+', clean_text))
-    
-    # Get all distinct topics (slugs) from ContentItem
-    # In a real app with many topics, we'd cache this or use a search index.
-    all_items = db.query(ContentItem.topic, ContentItem.topics_slugs).all()
-    unique_topics = {} # slug -> display_name
-    for item in all_items:
-        if item.topic:
-            slug = generate_topics_slugs(item.topic, [])[0]
-            unique_topics[slug] = item.topic
-        for s in (item.topics_slugs or []):
-            if s not in unique_topics:
-                unique_topics[s] = s.replace('_', ' ').title()
-
-    # Get synonyms
-    synonyms_map = {s.slug: s.synonyms for s in db.query(LibraryTopicSynonym).all()}
-    
-    suggestions = []
-    
-    for slug, display in unique_topics.items():
-        score = 0.0
-        reason = ""
-        
-        # 1. Exact slug match
-        if slug in words:
-            score = 1.0
-            reason = "exact keyword match"
-        
-        # 2. Synonym match
-        elif any(syn in words for syn in synonyms_map.get(slug, [])):
-            score = 0.9
-            reason = "synonym match"
-            
-        # 3. Partial slug match
-        elif any(word in slug for word in words if len(word) > 3):
-            score = 0.7
-            reason = "partial topic match"
-            
-        # 4. Fuzzy word match (simple containment)
-        elif any(slug in word for word in words):
-            score = 0.6
-            reason = "contextual match"
-
-        if score > 0:
-            suggestions.append({
-                "topic": display,
-                "slug": slug,
-                "score": score,
-                "reason": reason
-            })
-
-    # Sort by score desc
-    suggestions.sort(key=lambda x: x['score'], reverse=True)
-    return suggestions[:max_results]
+    from app.services import topic_dictionary
+    return topic_dictionary.suggest(db, text, max_results)
@@ -3,14 +3,12 @@
 
 from typing import Any
 import json
-from openai import OpenAI
 from app.config import settings
+from app.services.llm_gateway import get_openai_client, get_async_openai_client
 
 def get_client():
-    """Returns a live OpenAI client, or None if key is not configured."""
-    if not settings.openai_api_key:
-        return None
-    return OpenAI(api_key=settings.openai_api_key)
+    """Returns the shared (pooled) OpenAI client, or None if key is not configured."""
+    return get_openai_client()
 
 def generate_draft(
     source_text: str,
@@ -110,7 +108,7 @@ def generate_draft(
     
     return json.loads(response.choices[0].message.content)
 
-def generate_topic_caption(
+def _topic_caption_prompt(
     topic: str,
     style: str = "islamic_reminder",
     tone: str = "medium",
@@ -119,19 +117,8 @@ def generate_topic_caption(
     content_profile_prompt: str | None = None,
     creativity_level: int = 3,
     extra_context: dict[str, Any] | None = None
-) -> dict[str, Any]:
-    """Generates a caption based on a topic and various style parameters using OpenAI."""
-    client = get_client()
-    if not client:
-        # Return a structured failure dict rather than crashing — runner's guardrails handle it
-        return {
-            "caption": "",
-            "hashtags": [],
-            "alt_text": "",
-            "validation_failed": True,
-            "fail_reason": "llm_client_unavailable"
-        }
-    
+) -> tuple[str, str]:
+    """(system message, user prompt) for a topic caption request."""
     style_content = {
         "islamic_reminder": "an Islamic reminder style with wisdom and spiritual depth",
         "educational": "an educational and informative tone",
@@ -226,25 +213,12 @@ def generate_topic_caption(
     }}
     """
 
-    print(f"[DEBUG] Prompting LLM for topic: {topic}")
-    
     system_msg = content_profile_prompt if content_profile_prompt else "You are a professional social media manager specializing in high-engagement content."
     system_msg += f" Creativity Level: {creativity_level}/5."
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Upgraded from gpt-3.5-turbo to match quran/hadith caption services quality
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-    except Exception as e:
-        print(f"[LLM] OpenAI API call failed: {e}")
-        raise RuntimeError(f"LLM Generation failed: {str(e)}")
-    
-    result = json.loads(response.choices[0].message.content)
+    return system_msg, prompt
+
+def _validate_topic_caption(result: dict[str, Any], topic: str) -> dict[str, Any]:
+    """Applies the strict caption guardrails, flagging `validation_failed` / `fail_reason` on the result."""
     caption = result.get("caption", "").strip()
     
     # STRICT VALIDATION
@@ -281,6 +255,51 @@ def generate_topic_caption(
 
     return result
 
+def generate_topic_caption(
+    topic: str,
+    style: str = "islamic_reminder",
+    tone: str = "medium",
+    language: str = "english",
+    banned_phrases: list[str] | None = None,
+    content_profile_prompt: str | None = None,
+    creativity_level: int = 3,
+    extra_context: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Generates a caption based on a topic and various style parameters using OpenAI."""
+    client = get_client()
+    if not client:
+        # Return a structured failure dict rather than crashing — runner's guardrails handle it
+        return {
+            "caption": "",
+            "hashtags": [],
+            "alt_text": "",
+            "validation_failed": True,
+            "fail_reason": "llm_client_unavailable"
+        }
+    
+    system_msg, prompt = _topic_caption_prompt(
+        topic, style=style, tone=tone, language=language, banned_phrases=banned_phrases,
+        content_profile_prompt=content_profile_prompt, creativity_level=creativity_level,
+        extra_context=extra_context
+    )
+
+    print(f"[DEBUG] Prompting LLM for topic: {topic}")
+
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",  # Upgraded from gpt-3.5-turbo to match quran/hadith caption services quality
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+    except Exception as e:
+        print(f"[LLM] OpenAI API call failed: {e}")
+        raise RuntimeError(f"LLM Generation failed: {str(e)}")
+    
+    return _validate_topic_caption(json.loads(response.choices[0].message.content), topic)
+
 def generate_topic_variations(topic: str, count: int = 5) -> list[str]:
     """Generates X sub-angles or variations for a given topic to provide variety."""
     from app.services.caption_engine import get_openai_client as get_real_client
@@ -319,6 +338,104 @@ def generate_topic_variations(topic: str, count: int = 5) -> list[str]:
         print("[LLM][FALLBACK] Using deterministic topic variation fallback")
         return get_fallback()
 
+def generate_topic_variations_batch(topics: list[str], count: int = 5) -> dict[str, list[str]]:
+    """
+    Sub-angles for several topics in one request (batch planning).
+    Topics missing from the response fall back to generate_topic_variations.
+    """
+    unique_topics = list(dict.fromkeys(t for t in topics if t))
+    if len(unique_topics) <= 1:
+        return {t: generate_topic_variations(t, count=count) for t in unique_topics}
+
+    from app.services.caption_engine import get_openai_client as get_real_client
+    client = get_real_client()
+    variations: dict[str, list[str]] = {}
+
+    if client:
+        listing = "\n".join(f"{i}. {t}" for i, t in enumerate(unique_topics))
+        prompt = (
+            f"For each numbered topic below, generate {count} diverse sub-angles or specific perspectives "
+            f"for a social media post.\n\nTOPICS:\n{listing}\n\n"
+            'Return JSON: {"topics": [{"index": 0, "variations": ["...", "..."]}]}'
+        )
+        try:
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            )
+            data = json.loads(response.choices[0].message.content)
+            for entry in data.get("topics") or []:
+                idx = entry.get("index") if isinstance(entry, dict) else None
+                values = entry.get("variations") if isinstance(entry, dict) else None
+                if isinstance(idx, int) and 0 <= idx < len(unique_topics) and isinstance(values, list) and values:
+                    variations[unique_topics[idx]] = [str(v) for v in values][:count]
+        except Exception as e:
+            print(f"[LLM][ERROR] Batched topic variation failed: {str(e)}")
+
+    for t in unique_topics:
+        if t not in variations:
+            variations[t] = generate_topic_variations(t, count=count)
+    return variations
+
+def generate_topic_captions_batch(requests: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Generates several topic captions with one structured request per system prompt.
+
+    Each request holds generate_topic_caption keyword arguments. Results come back in
+    order and pass the same guardrails; entries the model skipped are generated one by one.
+    """
+    if len(requests) <= 1:
+        return [generate_topic_caption(**r) for r in requests]
+
+    client = get_client()
+    if not client:
+        return [generate_topic_caption(**r) for r in requests]
+
+    built = [_topic_caption_prompt(**r) for r in requests]
+    groups: dict[str, list[int]] = {}
+    for i, (system_msg, _) in enumerate(built):
+        groups.setdefault(system_msg, []).append(i)
+
+    results: list[dict[str, Any] | None] = [None] * len(requests)
+    for system_msg, indexes in groups.items():
+        briefs = "\n\n".join(f"=== POST {n} ===\n{built[i][1]}" for n, i in enumerate(indexes))
+        prompt = (
+            f"You will write {len(indexes)} independent social media posts. Follow each brief on its own; "
+            f"do not reuse wording across posts.\n\n{briefs}\n\n"
+            'Return JSON: {"posts": [{"index": 0, "caption": "...", "hashtags": ["..."], "alt_text": "..."}]} '
+            "with exactly one entry per POST number."
+        )
+        print(f"[DEBUG] Prompting LLM for {len(indexes)} batched topic captions")
+        try:
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": system_msg},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            posts = json.loads(response.choices[0].message.content).get("posts") or []
+        except Exception as e:
+            print(f"[LLM] Batched caption call failed: {e}")
+            posts = []
+
+        for entry in posts:
+            n = entry.get("index") if isinstance(entry, dict) else None
+            if isinstance(n, int) and 0 <= n < len(indexes) and results[indexes[n]] is None:
+                i = indexes[n]
+                entry = {k: entry.get(k) for k in ("caption", "hashtags", "alt_text")}
+                entry["caption"] = entry["caption"] or ""
+                results[i] = _validate_topic_caption(entry, requests[i]["topic"])
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        print(f"[LLM] Batched captions incomplete ({len(missing)} missing), generating individually")
+    for i in missing:
+        results[i] = generate_topic_caption(**requests[i])
+    return results
+
 def generate_caption_from_content_item(
     content_item: Any, # Use Any because of circular import risk with models
     style: str = "islamic_reminder",
@@ -433,42 +550,59 @@ def generate_ai_image(prompt_text: str) -> str | None:
         print(f"[LLM] Error generating AI image: {e}")
         return None
 
+REFINE_DIRECTIVES = {
+    "emotional": "Rewrite this Islamic social media post to be more emotionally resonant, heart-felt, and spiritually moving. Maintain sincerity and avoid exaggeration.",
+    "shorter": "Make this post significantly shorter and more concise (max 2-3 sentences) while keeping the core spiritual message intact.",
+    "ayah": "Find a relevant and authentic Quran ayah (verse) in English that complements this message. Add it at the beginning with proper citation (Surah:Verse).",
+    "hadith": "Find a relevant and authentic Hadith in English that supports this message. Add it with proper citation.",
+    "clarity": "Improve the clarity, flow, and professional tone of this post. Use bullet points if helpful for legibility."
+}
+
+def _refine_mock(text: str, refinement_type: str) -> str:
+    # Mock responses for UX testing
+    if refinement_type == "shorter":
+        return "Trusting Allah's plan is the essence of Sabr. Even in silence, He is working for your good."
+    elif refinement_type == "emotional":
+        return "Let your heart find rest in the remembrance of the Most Merciful. Every tear and every prayer is seen by Him. ❤️"
+    return text + f"\n\n[Refined for {refinement_type.upper()}: This is a mock response because the OpenAI client is currently disabled in this environment.]"
+
+def _refine_request(text: str, refinement_type: str) -> dict[str, Any]:
+    directive = REFINE_DIRECTIVES.get(refinement_type, "Improve this social media post.")
+    prompt = f"{directive}\n\nOriginal Text: {text}\n\nRefined Text:"
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional social media editor specializing in Islamic content."},
+            {"role": "user", "content": prompt}
+        ]
+    }
+
 def refine_caption(text: str, refinement_type: str) -> str:
     """Refines an existing caption based on a specific goal."""
     client = get_client()
-    
-    prompts = {
-        "emotional": "Rewrite this Islamic social media post to be more emotionally resonant, heart-felt, and spiritually moving. Maintain sincerity and avoid exaggeration.",
-        "shorter": "Make this post significantly shorter and more concise (max 2-3 sentences) while keeping the core spiritual message intact.",
-        "ayah": "Find a relevant and authentic Quran ayah (verse) in English that complements this message. Add it at the beginning with proper citation (Surah:Verse).",
-        "hadith": "Find a relevant and authentic Hadith in English that supports this message. Add it with proper citation.",
-        "clarity": "Improve the clarity, flow, and professional tone of this post. Use bullet points if helpful for legibility."
-    }
-    
-    directive = prompts.get(refinement_type, "Improve this social media post.")
-    
     if not client:
-        # Mock responses for UX testing
-        if refinement_type == "shorter":
-            return "Trusting Allah's plan is the essence of Sabr. Even in silence, He is working for your good."
-        elif refinement_type == "emotional":
-            return "Let your heart find rest in the remembrance of the Most Merciful. Every tear and every prayer is seen by Him. ❤️"
-        return text + f"\n\n[Refined for {refinement_type.upper()}: This is a mock response because the OpenAI client is currently disabled in this environment.]"
+        return _refine_mock(text, refinement_type)
 
-    prompt = f"{directive}\n\nOriginal Text: {text}\n\nRefined Text:"
-    
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional social media editor specializing in Islamic content."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        response = client.chat.completions.create(**_refine_request(text, refinement_type))
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"[LLM] Refinement failed: {e}")
+        return text # Return original if failed
+
+async def arefine_caption(text: str, refinement_type: str) -> str:
+    """Async variant of refine_caption for `async def` route handlers (does not block the event loop)."""
+    client = get_async_openai_client()
+    if not client:
+        return _refine_mock(text, refinement_type)
+
+    try:
+        response = await client.chat.completions.create(**_refine_request(text, refinement_type))
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"[LLM] Refinement failed: {e}")
         return text # Return original if failed
+
 def generate_card_framing_from_source(source_text: str, intent: str, tone: str, custom_prompt: str, source_type: str, reference: str) -> dict[str, Any]:
     """
     Generates the framing text (eyebrow and supporting reflection) for a sacred source text.
@@ -0,0 +1,171 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — LLM Gateway
+============================
+Single place where OpenAI clients are built.
+
+Every service shares one sync client (and one async client for FastAPI
+handlers) backed by a persistent httpx connection pool, so repeated calls in
+an automation run reuse the same TLS connections instead of opening a new
+pool per call. Timeouts, retries and pool size come from settings.
+
+Each HTTP exchange with the API is reported through `log_event("llm_call")`
+with endpoint, model, status, latency and token usage.
+"""
+
+import json
+import threading
+import time
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.config import settings
+from app.logging_setup import log_event
+
+_STARTED_KEY = "sabeel_started_at"
+
+_client: Optional[OpenAI] = None
+_client_key: Optional[str] = None
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_key: Optional[str] = None
+_clients_lock = threading.Lock()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_connections,
+    )
+
+
+def _mark_start(request: httpx.Request) -> None:
+    request.extensions[_STARTED_KEY] = time.perf_counter()
+
+
+def _report(response: httpx.Response) -> None:
+    request = response.request
+    started = request.extensions.get(_STARTED_KEY)
+    latency_ms = round((time.perf_counter() - started) * 1000, 1) if started else None
+
+    model = usage = None
+    if "json" in response.headers.get("content-type", ""):
+        try:
+            body = json.loads(response.content)
+            model = body.get("model")
+            usage = body.get("usage") or {}
+        except (ValueError, AttributeError):
+            pass
+
+    if model is None and request.content:
+        try:
+            model = json.loads(request.content).get("model")
+        except (ValueError, AttributeError):
+            pass
+
+    usage = usage or {}
+    log_event(
+        "llm_call",
+        level="info" if response.status_code < 400 else "warning",
+        endpoint=request.url.path,
+        model=model,
+        status=response.status_code,
+        latency_ms=latency_ms,
+        prompt_tokens=usage.get("prompt_tokens"),
+        completion_tokens=usage.get("completion_tokens"),
+        total_tokens=usage.get("total_tokens"),
+    )
+
+
+def _is_stream(response: httpx.Response) -> bool:
+    return "text/event-stream" in response.headers.get("content-type", "")
+
+
+def _on_response(response: httpx.Response) -> None:
+    if not _is_stream(response):
+        response.read()
+    _report(response)
+
+
+async def _on_request_async(request: httpx.Request) -> None:
+    _mark_start(request)
+
+
+async def _on_response_async(response: httpx.Response) -> None:
+    if not _is_stream(response):
+        await response.aread()
+    _report(response)
+
+
+def get_openai_client() -> Optional[OpenAI]:
+    """Shared, pooled OpenAI client, or None if no API key is configured."""
+    global _client, _client_key
+    api_key = settings.openai_api_key
+    if not api_key:
+        return None
+    if _client is not None and _client_key == api_key:
+        return _client
+
+    with _clients_lock:
+        if _client is None or _client_key != api_key:
+            http_client = httpx.Client(
+                timeout=_timeout(),
+                limits=_limits(),
+                event_hooks={"request": [_mark_start], "response": [_on_response]},
+            )
+            _client = OpenAI(
+                api_key=api_key,
+                http_client=http_client,
+                timeout=_timeout(),
+                max_retries=settings.openai_max_retries,
+            )
+            _client_key = api_key
+        return _client
+
+
+def get_async_openai_client() -> Optional[AsyncOpenAI]:
+    """
+    Shared async OpenAI client for `async def` route handlers, so LLM calls
+    are awaited instead of blocking the event loop. None if no API key.
+    """
+    global _async_client, _async_client_key
+    api_key = settings.openai_api_key
+    if not api_key:
+        return None
+    if _async_client is not None and _async_client_key == api_key:
+        return _async_client
+
+    with _clients_lock:
+        if _async_client is None or _async_client_key != api_key:
+            http_client = httpx.AsyncClient(
+                timeout=_timeout(),
+                limits=_limits(),
+                event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+            )
+            _async_client = AsyncOpenAI(
+                api_key=api_key,
+                http_client=http_client,
+                timeout=_timeout(),
+                max_retries=settings.openai_max_retries,
+            )
+            _async_client_key = api_key
+        return _async_client
+
+
+async def close_clients() -> None:
+    """Closes the shared connection pools (application shutdown)."""
+    global _client, _client_key, _async_client, _async_client_key
+    with _clients_lock:
+        client, async_client = _client, _async_client
+        _client = _client_key = _async_client = _async_client_key = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
@@ -0,0 +1,124 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Media Library Selection
+========================================
+Tag lookups and rotation over an org's MediaAsset library, done in SQL.
+
+MediaAsset.tags keeps the tags as entered; every write goes through
+`set_asset_tags`, which mirrors them lowercased into `media_asset_tags`
+(indexed on org_id, tag). Picking an asset is a single indexed query per
+rotation mode, so orgs with large libraries never load every asset:
+
+  - "random":      uniform pick among matching assets
+  - "lru":         least recently used first (never-used assets lead)
+  - "round_robin": next asset id after the automation's cursor, wrapping
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import MediaAsset, MediaAssetTag, TopicAutomation
+
+ROTATION_MODES = ("random", "lru", "round_robin")
+
+
+def normalize_tags(tags) -> list[str]:
+    """Lowercased, stripped, de-duplicated tags (order kept)."""
+    seen = []
+    for t in tags or []:
+        tag = str(t).strip().lower()
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def set_asset_tags(db: Session, asset: MediaAsset, tags) -> None:
+    """Sets asset.tags and rewrites its indexed tag rows. The caller commits."""
+    asset.tags = list(tags or [])
+    wanted = normalize_tags(tags)
+    # Keep surviving rows: the unit of work inserts before it deletes, so re-adding
+    # an unchanged tag would trip the (asset_id, tag) unique constraint
+    kept = [row for row in asset.tag_rows if row.tag in wanted]
+    existing = {row.tag for row in kept}
+    asset.tag_rows = kept + [MediaAssetTag(org_id=asset.org_id, tag=t) for t in wanted if t not in existing]
+
+
+def backfill_asset_tags(db: Session, batch_size: int = 500) -> int:
+    """
+    Creates tag rows for assets that predate media_asset_tags. Processed assets
+    are stamped (tags_backfilled_at), so untagged ones are not rescanned on every
+    startup. Returns assets processed.
+    """
+    tagged = select(MediaAssetTag.asset_id)
+    processed = 0
+    last_id = 0
+    while True:
+        assets = (
+            db.query(MediaAsset)
+            .filter(
+                MediaAsset.id > last_id,
+                MediaAsset.tags_backfilled_at.is_(None),
+                MediaAsset.id.not_in(tagged),
+            )
+            .order_by(MediaAsset.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not assets:
+            return processed
+        now = datetime.now(timezone.utc)
+        for asset in assets:
+            db.add_all(MediaAssetTag(asset_id=asset.id, org_id=asset.org_id, tag=t) for t in normalize_tags(asset.tags))
+            asset.tags_backfilled_at = now
+        db.commit()
+        processed += len(assets)
+        last_id = assets[-1].id
+
+
+def pick_tagged_asset(
+    db: Session,
+    org_id: int,
+    tags: list[str],
+    rotation_mode: str = "random",
+    automation_id: int | None = None,
+) -> MediaAsset | None:
+    """
+    Picks one org asset carrying any of `tags` according to `rotation_mode`,
+    stamps its last_used_at and, for round-robin, advances the automation's cursor.
+    The caller commits.
+    """
+    wanted = normalize_tags(tags)
+    if not wanted:
+        return None
+
+    matching = (
+        select(MediaAssetTag.asset_id)
+        .where(MediaAssetTag.org_id == org_id, MediaAssetTag.tag.in_(wanted))
+        .distinct()
+    )
+    query = db.query(MediaAsset).filter(MediaAsset.id.in_(matching))
+
+    automation = None
+    if rotation_mode == "round_robin" and automation_id:
+        automation = db.get(TopicAutomation, automation_id)
+        cursor = (automation.last_media_asset_id if automation else None) or 0
+        asset = (
+            query.filter(MediaAsset.id > cursor).order_by(MediaAsset.id).first()
+            or query.order_by(MediaAsset.id).first()
+        )
+    elif rotation_mode == "lru":
+        asset = query.order_by(MediaAsset.last_used_at.asc().nulls_first(), MediaAsset.id).first()
+    else:
+        asset = query.order_by(func.random()).first()
+
+    if asset is None:
+        return None
+
+    asset.last_used_at = datetime.now(timezone.utc)
+    if automation is not None:
+        automation.last_media_asset_id = asset.id
+    return asset
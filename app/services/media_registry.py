@@ -0,0 +1,188 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Process-wide index of local media: public filename (the part after /uploads/)
+-> storage location, plus content hash -> filename for the files this process
+wrote.
+
+Publish preflight and the stale scavenger resolve a media URL with one dict
+lookup instead of stat-ing, sleeping and globbing the application tree:
+
+  - writers (uploads, renders, AI image downloads) call register() right
+    after the file is on disk; media_storage.store_file does it for
+    everything stored on local disk;
+  - the uploads directory is listed once on first use (warm()), so files from
+    before the restart are known without hashing them;
+  - a miss costs one stat of UPLOADS_DIR/<filename>, which picks up files
+    another worker process wrote since warm-up; locate(verify=True) also
+    stats a hit, for callers that must not trust a cached entry;
+  - deletes go through forget(); with MEDIA_REGISTRY_WATCH and watchfiles
+    installed, a watcher thread also follows files added or removed behind
+    the app's back.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+
+from app.config import settings
+from app.logging_setup import log_event
+
+try:
+    from watchfiles import Change, watch
+    _WATCHFILES_AVAILABLE = True
+except ImportError:
+    _WATCHFILES_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class MediaEntry:
+    filename: str
+    path: str
+    digest: str | None = None  # sha256 hex; only for files registered by a writer
+
+
+_lock = threading.Lock()
+_entries: dict[str, MediaEntry] = {}
+_by_digest: dict[str, str] = {}
+_warmed = False
+_watcher: threading.Thread | None = None
+_stop_watch = threading.Event()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _put(entry: MediaEntry) -> MediaEntry:
+    with _lock:
+        previous = _entries.get(entry.filename)
+        if previous is not None and previous.digest and _by_digest.get(previous.digest) == entry.filename:
+            del _by_digest[previous.digest]
+        _entries[entry.filename] = entry
+        if entry.digest:
+            _by_digest[entry.digest] = entry.filename
+    return entry
+
+
+def register(path: str, filename: str | None = None, digest: str | None = None) -> MediaEntry:
+    """
+    Records a media file a writer just stored. `filename` is its public name
+    (default: basename of `path`); the content hash is computed when not given.
+    """
+    filename = filename or os.path.basename(path)
+    return _put(MediaEntry(filename, os.path.abspath(path), digest or file_digest(path)))
+
+
+def forget(filename: str) -> None:
+    with _lock:
+        entry = _entries.pop(filename, None)
+        if entry is not None and entry.digest and _by_digest.get(entry.digest) == filename:
+            del _by_digest[entry.digest]
+
+
+def warm() -> int:
+    """Indexes the files already in the uploads directory (names only, no hashing)."""
+    global _warmed
+    found = []
+    try:
+        with os.scandir(settings.uploads_dir) as it:
+            found = [MediaEntry(e.name, e.path) for e in it if e.is_file()]
+    except FileNotFoundError:
+        pass
+    with _lock:
+        for entry in found:
+            _entries.setdefault(entry.filename, entry)
+        _warmed = True
+    return len(found)
+
+
+def locate(filename: str, verify: bool = False) -> str | None:
+    """
+    Storage path of a public media filename, or None if it isn't stored locally.
+    `verify` stats a cached entry first and drops it if the file is gone (for
+    callers that act on a missing file, e.g. marking a post stale).
+    """
+    if not _warmed:
+        warm()
+    entry = _entries.get(filename)
+    if entry is not None:
+        if not verify or os.path.isfile(entry.path):
+            return entry.path
+        forget(filename)
+    # Written by another worker process since warm-up
+    path = os.path.join(settings.uploads_dir, filename)
+    if os.path.isfile(path):
+        return _put(MediaEntry(filename, path)).path
+    return None
+
+
+def find_by_digest(digest: str) -> MediaEntry | None:
+    """A registered file with this content hash, if any."""
+    filename = _by_digest.get(digest)
+    return _entries.get(filename) if filename else None
+
+
+def locate_url(media_url: str) -> str | None:
+    """locate() for a /uploads/ media URL; None for any other URL."""
+    if not media_url or "/uploads/" not in media_url:
+        return None
+    return locate(media_url.split("/uploads/")[-1])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UPLOADS DIRECTORY WATCH
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _apply_changes(changes) -> None:
+    for change, path in changes:
+        filename = os.path.basename(path)
+        if change == Change.deleted:
+            entry = _entries.get(filename)
+            if entry is not None and entry.path == os.path.abspath(path):
+                forget(filename)
+        elif os.path.isfile(path):
+            path = os.path.abspath(path)
+            entry = _entries.get(filename)
+            if entry is None or entry.path != path:
+                _put(MediaEntry(filename, path))
+            elif entry.digest:
+                # Usually the echo of our own write; keep the digest current if it wasn't
+                digest = file_digest(path)
+                if digest != entry.digest:
+                    _put(MediaEntry(filename, path, digest))
+
+
+def _watch_loop(uploads_dir: str) -> None:
+    try:
+        for changes in watch(uploads_dir, stop_event=_stop_watch, recursive=False, raise_interrupt=False):
+            _apply_changes(changes)
+    except Exception as e:
+        log_event("media_registry_watch_failed", error=str(e))
+
+
+def start_watch() -> bool:
+    """Follows the uploads directory in a daemon thread (MEDIA_REGISTRY_WATCH, needs watchfiles)."""
+    global _watcher
+    if not settings.media_registry_watch or not _WATCHFILES_AVAILABLE:
+        return False
+    with _lock:
+        if _watcher is not None and _watcher.is_alive():
+            return True
+        _stop_watch.clear()
+        _watcher = threading.Thread(
+            target=_watch_loop, args=(settings.uploads_dir,), name="media-registry-watch", daemon=True
+        )
+        _watcher.start()
+    return True
+
+
+def stop_watch() -> None:
+    global _watcher
+    _stop_watch.set()
+    if _watcher is not None:
+        _watcher.join(timeout=5)
+        _watcher = None
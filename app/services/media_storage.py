@@ -0,0 +1,487 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Content-addressed media storage.
+
+Every stored file is keyed by the sha256 of its bytes (`<digest><ext>`), so
+identical uploads, renders and AI downloads are kept once: storing bytes that
+are already there only costs hashing them.
+
+Drivers (MEDIA_STORAGE_BACKEND):
+  - local: files live flat in UPLOADS_DIR and are served from /uploads/<key>;
+  - s3:    any S3-compatible store (AWS, MinIO, R2 ...). Files stream up with
+           boto3's multipart transfer and are served from
+           MEDIA_S3_PUBLIC_BASE_URL (default: endpoint/bucket).
+
+Locally stored media is pushed to Cloudinary (when configured) on a
+background executor instead of on the request path. The key -> CDN URL
+mapping is kept in media_cdn_copies, so any process resolves the CDN copy of
+a local media URL by key (cdn_url()); the scheduler retries pushes that
+failed or were lost to a restart (retry_cdn_pushes()).
+
+Objects are shared, so deleting a post or asset only releases its object
+(release()); a scheduler sweep deletes it once it has stayed unreferenced
+for MEDIA_RELEASE_GRACE_MINUTES (sweep_released_media()).
+
+Usage:
+    stored = store_file(path)               # takes ownership of `path`
+    stored = store_stream(upload.file, upload.filename)
+    stored.url, stored.key, stored.local_path, stored.deduplicated
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.logging_setup import log_event
+from app.services import media_registry
+from app.services.static_bundles import IMMUTABLE_CACHE_CONTROL
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+    _BOTO3_AVAILABLE = True
+except ImportError:
+    boto3 = None
+    _BOTO3_AVAILABLE = False
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}(\.[0-9a-z]+)?$")
+_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredMedia:
+    key: str
+    url: str
+    local_path: str | None   # None for remote drivers
+    deduplicated: bool       # bytes were already stored: nothing written or uploaded
+
+
+def content_key(digest: str, ext: str = "") -> str:
+    return f"{digest}{ext.lower()}"
+
+
+def is_content_key(filename: str) -> bool:
+    return bool(_KEY_RE.match(filename or ""))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DRIVERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class LocalMediaStorage:
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.local_path(key))
+
+    def put_file(self, key: str, path: str, content_type: str | None = None) -> None:
+        """Moves `path` into place (atomic rename within UPLOADS_DIR)."""
+        os.makedirs(self.root, exist_ok=True)
+        os.replace(path, self.local_path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+        media_registry.forget(key)
+
+    def url(self, key: str) -> str:
+        from app.config import build_public_media_url
+        return build_public_media_url(key)
+
+
+class S3MediaStorage:
+    name = "s3"
+
+    def __init__(self, client, bucket: str, prefix: str = "", public_base_url: str | None = None,
+                 chunk_mb: int = 8):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_base_url = (public_base_url or "").rstrip("/")
+        chunk = max(chunk_mb, 5) * 1024 * 1024  # S3 minimum part size is 5 MiB
+        self.transfer_config = TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk)
+        self._known: set[str] = set()  # keys seen in the bucket, skips the HEAD request
+
+    def local_path(self, key: str) -> None:
+        return None
+
+    def exists(self, key: str) -> bool:
+        if key in self._known:
+            return True
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        self._known.add(key)
+        return True
+
+    def put_file(self, key: str, path: str, content_type: str | None = None) -> None:
+        """Streams `path` up (multipart above MEDIA_MULTIPART_CHUNK_MB), then removes it."""
+        extra = {"CacheControl": IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra["ContentType"] = content_type
+        with open(path, "rb") as f:
+            self.client.upload_fileobj(f, self.bucket, self.prefix + key, ExtraArgs=extra,
+                                       Config=self.transfer_config)
+        self._known.add(key)
+        os.remove(path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+        self._known.discard(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_base_url}/{self.prefix}{key}"
+
+
+def _build_storage():
+    if (settings.media_storage_backend or "local").lower() != "s3":
+        return LocalMediaStorage(settings.uploads_dir)
+    if not _BOTO3_AVAILABLE:
+        raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 needs boto3")
+    bucket = settings.media_s3_bucket or settings.s3_bucket_name
+    if not bucket:
+        raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 needs MEDIA_S3_BUCKET (or S3_BUCKET_NAME)")
+    endpoint = settings.media_s3_endpoint_url
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=settings.s3_access_key,
+        aws_secret_access_key=settings.s3_secret_key,
+        region_name=settings.s3_region if settings.s3_region and "http" not in settings.s3_region else None,
+        endpoint_url=endpoint,
+    )
+    public_base = settings.media_s3_public_base_url or (
+        f"{endpoint.rstrip('/')}/{bucket}" if endpoint else f"https://{bucket}.s3.amazonaws.com"
+    )
+    return S3MediaStorage(client, bucket, settings.media_s3_prefix, public_base, settings.media_multipart_chunk_mb)
+
+
+_lock = threading.Lock()
+_storage = None
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                _storage = _build_storage()
+    return _storage
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STORING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def store_file(path: str, ext: str | None = None, digest: str | None = None) -> StoredMedia:
+    """
+    Stores the file at `path` under its content key and takes ownership of it:
+    it is moved into place, uploaded and removed, or removed as a duplicate.
+    """
+    storage = get_storage()
+    ext = (os.path.splitext(path)[1] if ext is None else ext).lower()
+    digest = digest or media_registry.file_digest(path)
+    key = content_key(digest, ext)
+
+    with _key_lock(key) as conn:
+        if conn is not None:
+            _cancel_release(conn, key)  # stored again: the caller is about to reference it
+        deduplicated = storage.exists(key)
+        if deduplicated:
+            if storage.local_path(key) != os.path.abspath(path):
+                os.remove(path)
+        else:
+            storage.put_file(key, path, mimetypes.guess_type(key)[0])
+
+    local_path = storage.local_path(key)
+    if local_path:
+        media_registry.register(local_path, key, digest)
+    stored = StoredMedia(key=key, url=storage.url(key), local_path=local_path, deduplicated=deduplicated)
+    log_event("media_stored", key=key, backend=storage.name, deduplicated=deduplicated)
+    if local_path:
+        schedule_cdn_push(stored)  # no-op once pushed, or while pushing in this process
+    return stored
+
+
+def store_stream(fileobj, filename: str | None = None) -> StoredMedia:
+    """
+    Stores an uploaded stream: spooled to UPLOADS_DIR in chunks while it is
+    hashed (one pass), then handed to store_file().
+    """
+    os.makedirs(settings.uploads_dir, exist_ok=True)
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(prefix=".incoming_", dir=settings.uploads_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := fileobj.read(_CHUNK):
+                hasher.update(chunk)
+                out.write(chunk)
+        return store_file(tmp_path, ext=os.path.splitext(filename or "")[1], digest=hasher.hexdigest())
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _key_lock(key: str, engine=None):
+    """Cross-process lock on a content key, shared by store_file() and sweep_released_media()."""
+    if engine is None:
+        try:
+            from app.db import engine
+        except RuntimeError:
+            return nullcontext()  # no DATABASE_URL (standalone scripts): nothing is swept
+    from app.services.scheduler_leader import advisory_lock, lock_key
+    return advisory_lock(engine, "media_key", lock_key(key))
+
+
+def _cancel_release(conn, key: str) -> None:
+    from app.models import MediaRelease
+    conn.execute(delete(MediaRelease).where(MediaRelease.key == key))
+    conn.commit()
+
+
+def _is_referenced(db, key: str, post_id: int | None = None, asset_id: int | None = None) -> bool:
+    from app.models import MediaAsset, Post
+
+    posts = db.query(Post.id).filter(Post.media_key == key)
+    assets = db.query(MediaAsset.id).filter(MediaAsset.media_key == key)
+    if post_id is not None:
+        posts = posts.filter(Post.id != post_id)
+    if asset_id is not None:
+        assets = assets.filter(MediaAsset.id != asset_id)
+    return bool(posts.first() or assets.first())
+
+
+def release(db, url: str, post_id: int | None = None, asset_id: int | None = None) -> bool:
+    """
+    Queues the stored object behind `url` for deletion unless another post or
+    media asset (other than `post_id` / `asset_id`) still points at it. The
+    queue entry commits with the caller's transaction; sweep_released_media()
+    deletes the object later, after re-checking references, so a store of the
+    same bytes whose post isn't committed yet keeps its file. Returns True if queued.
+    """
+    from app.models import MediaRelease, media_key_of
+
+    key = media_key_of(url)
+    if key is None or _is_referenced(db, key, post_id, asset_id):
+        return False
+    if db.query(MediaRelease.id).filter(MediaRelease.key == key).first() is None:
+        db.add(MediaRelease(key=key))
+    return True
+
+
+def sweep_released_media(db, limit: int = 100) -> int:
+    """
+    Deletes objects released more than MEDIA_RELEASE_GRACE_MINUTES ago that are
+    still unreferenced. Each key is handled under the same lock store_file()
+    takes, and a store in the meantime cancels its release. Returns the number deleted.
+    """
+    from app.models import MediaRelease
+
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.media_release_grace_minutes)
+    keys = db.scalars(
+        select(MediaRelease.key).where(MediaRelease.released_at < cutoff)
+        .order_by(MediaRelease.released_at).limit(limit)
+    ).all()
+
+    deleted = 0
+    for key in keys:
+        with _key_lock(key, db.get_bind()):
+            claimed = db.query(MediaRelease).filter(
+                MediaRelease.key == key, MediaRelease.released_at < cutoff
+            ).delete(synchronize_session=False)
+            if claimed and not _is_referenced(db, key):
+                get_storage().delete(key)
+                deleted += 1
+            db.commit()
+    if deleted:
+        log_event("media_released", deleted=deleted)
+    return deleted
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BACKGROUND CDN PUSH
+# ─────────────────────────────────────────────────────────────────────────────
+
+_cdn_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="media-cdn")
+_cdn_pushes: dict[str, Future] = {}   # key -> Future[CDN URL | None], pushes in flight here
+CDN_RETRY_AFTER = timedelta(minutes=5)  # younger pending rows belong to a push in flight
+
+
+def _uploads_key(media_url: str | None) -> str | None:
+    if not media_url or "/uploads/" not in media_url:
+        return None
+    key = media_url.split("/uploads/")[-1]
+    return key if is_content_key(key) else None
+
+
+def cdn_url(media_url: str | None, wait: float = 0) -> str | None:
+    """
+    CDN URL of a locally stored media URL once a push of its key landed, in
+    any process (media_cdn_copies). `wait` bounds how long to wait for a push
+    still in flight in this process.
+    """
+    key = _uploads_key(media_url)
+    if key is None:
+        return None
+    push = _cdn_pushes.get(key)
+    if push is not None and wait:
+        try:
+            url = push.result(timeout=wait)
+            if url:
+                return url
+        except Exception:
+            pass
+
+    from app.db import SessionLocal
+    from app.models import MediaCdnCopy
+
+    db = SessionLocal()
+    try:
+        return db.scalar(select(MediaCdnCopy.cdn_url).where(MediaCdnCopy.key == key))
+    except Exception as e:
+        log_event("media_cdn_lookup_failed", key=key, error=str(e))
+        return None
+    finally:
+        db.close()
+
+
+def _cdn_push_enabled() -> bool:
+    if not settings.media_cdn_push:
+        return False
+    from app.services.cloudinary_service import is_cloudinary_configured
+    return is_cloudinary_configured()
+
+
+def schedule_cdn_push(stored: StoredMedia) -> bool:
+    """
+    Records that `stored` needs a CDN copy and pushes it in the background,
+    unless it already has one. Pushes lost to a failure or restart are
+    retried by retry_cdn_pushes().
+    """
+    if not stored.local_path or stored.key in _cdn_pushes or not _cdn_push_enabled():
+        return False
+    try:
+        if not _record_pending(stored.key):
+            return False
+    except Exception as e:
+        log_event("media_cdn_record_failed", key=stored.key, error=str(e))
+    return _submit_push(stored.key, stored.local_path) is not None
+
+
+def _record_pending(key: str) -> bool:
+    """Adds the media_cdn_copies row for `key`; False if the key already has a CDN copy."""
+    from sqlalchemy.exc import IntegrityError
+    from app.db import SessionLocal
+    from app.models import MediaCdnCopy
+
+    db = SessionLocal()
+    try:
+        copy = db.query(MediaCdnCopy).filter(MediaCdnCopy.key == key).first()
+        if copy is not None:
+            return copy.cdn_url is None
+        db.add(MediaCdnCopy(key=key, attempts=0))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # recorded concurrently by another worker
+        return True
+    finally:
+        db.close()
+
+
+def _submit_push(key: str, local_path: str) -> Future | None:
+    with _lock:
+        if key in _cdn_pushes:
+            return None
+        push = _cdn_pushes[key] = _cdn_executor.submit(_push_to_cdn, key, local_path)
+    return push
+
+
+def _push_to_cdn(key: str, local_path: str) -> str | None:
+    from app.services.cloudinary_service import upload_to_cloudinary
+    url = None
+    try:
+        url = upload_to_cloudinary(local_path, public_id=f"sabeel/{key.split('.')[0]}")
+        if url:
+            log_event("media_cdn_pushed", key=key)
+    except Exception as e:
+        log_event("media_cdn_push_failed", key=key, error=str(e))
+    try:
+        _record_push(key, url)
+    except Exception as e:
+        log_event("media_cdn_record_failed", key=key, error=str(e))
+    finally:
+        with _lock:
+            _cdn_pushes.pop(key, None)
+    return url
+
+
+def _record_push(key: str, url: str | None) -> None:
+    """Stores the CDN URL of `key`, or counts a failed attempt."""
+    from app.db import SessionLocal
+    from app.models import MediaCdnCopy
+
+    values = ({MediaCdnCopy.cdn_url: url, MediaCdnCopy.pushed_at: datetime.now(timezone.utc)} if url
+              else {MediaCdnCopy.attempts: MediaCdnCopy.attempts + 1})
+    db = SessionLocal()
+    try:
+        db.query(MediaCdnCopy).filter(MediaCdnCopy.key == key).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def retry_cdn_pushes(db, limit: int = 20) -> int:
+    """
+    Pushes stored media whose CDN copy never landed (the push failed, or the
+    process died first), up to MEDIA_CDN_MAX_ATTEMPTS tries per key. Keys whose
+    file is gone from this disk count as a failed attempt. Returns the number pushed.
+    """
+    from app.models import MediaCdnCopy
+
+    if not _cdn_push_enabled():
+        return 0
+    keys = db.scalars(
+        select(MediaCdnCopy.key)
+        .where(
+            MediaCdnCopy.cdn_url.is_(None),
+            MediaCdnCopy.attempts < settings.media_cdn_max_attempts,
+            MediaCdnCopy.created_at < datetime.now(timezone.utc) - CDN_RETRY_AFTER,
+        )
+        .order_by(MediaCdnCopy.created_at)
+        .limit(limit)
+    ).all()
+
+    pushes = []
+    for key in keys:
+        local_path = media_registry.locate(key, verify=True)
+        if local_path is None:
+            _record_push(key, None)
+            continue
+        push = _submit_push(key, local_path)
+        if push is not None:
+            pushes.append(push)
+    return sum(1 for push in pushes if push.result())
@@ -0,0 +1,152 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Page Fragments
+===============================
+Compiled Jinja2 templates for the server-rendered app pages, plus a small
+per-org cache for the expensive fragments (account switcher, planner board,
+dashboard week strip and feed).
+
+Fragments live in app/templates/fragments, whole pages (admin console,
+knowledge library) in app/templates/pages. All are compiled once per process
+(`warm_templates` at startup; auto_reload is off).
+
+Cache keys carry a generation counter per org. Committing a session that
+inserted, updated or deleted a Post or IGAccount bumps the generation of the
+affected orgs; bulk UPDATE/DELETE statements on those tables bump a global
+generation. Stale entries are never looked up again and age out by TTL/LRU.
+Changes made by another worker process are only seen once the TTL expires.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.config import settings
+from app.db_events import EVERYTHING, register_invalidation
+from app.models import IGAccount, Post
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+FRAGMENTS = ("account_switcher.html", "calendar_board.html", "dashboard_week.html", "dashboard_feed.html")
+PAGES = ("admin_login.html", "admin_register.html", "admin_console.html", "admin_onboarding.html", "library.html")
+
+
+def post_kind(caption: str, story: bool = False) -> str:
+    """QURAN / HADITH / (STORY) / REFLECTION label shown on post cards."""
+    if any(x in caption for x in ["Surah", "Verse", "Ayah", "Quran"]):
+        return "QURAN"
+    if any(x in caption for x in ["Hadith", "Prophet", "Sahih", "Bukhari", "Muslim"]):
+        return "HADITH"
+    if story and "Story" in caption:
+        return "STORY"
+    return "REFLECTION"
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+)
+env.filters["post_kind"] = post_kind
+
+
+def warm_templates() -> int:
+    """Compiles every fragment and page template up front. Returns the number compiled."""
+    for name in FRAGMENTS:
+        env.get_template(f"fragments/{name}")
+    for name in PAGES:
+        env.get_template(f"pages/{name}")
+    return len(FRAGMENTS) + len(PAGES)
+
+
+def render_fragment(name: str, **context) -> str:
+    return env.get_template(f"fragments/{name}").render(**context)
+
+
+def render_page(name: str, **context) -> str:
+    return env.get_template(f"pages/{name}").render(**context)
+
+
+def fragment_macros(name: str):
+    """The template's module, to call its macros (e.g. fragment_macros("dashboard_week.html").cells(days))."""
+    return env.get_template(f"fragments/{name}").module
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FRAGMENT CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, value)
+_org_generations: dict[int, int] = {}
+_global_generation = 0
+
+
+def fragment_key(name: str, org_ids, *parts) -> tuple:
+    """
+    Cache key for fragment `name` built from `org_ids` data. Take it before
+    querying: a commit landing mid-render then leaves the entry under an old
+    generation instead of caching stale HTML under the new one.
+    """
+    with _lock:
+        generations = tuple((o, _org_generations.get(o, 0)) for o in sorted(set(org_ids)))
+        return (name, _global_generation, generations) + parts
+
+
+def get_fragment(key: tuple):
+    with _lock:
+        hit = _entries.get(key)
+        if hit is None:
+            return None
+        if hit[0] < time.monotonic():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return hit[1]
+
+
+def set_fragment(key: tuple, value):
+    """Stores and returns `value`."""
+    with _lock:
+        _entries[key] = (time.monotonic() + settings.fragment_cache_ttl_seconds, value)
+        _entries.move_to_end(key)
+        while len(_entries) > settings.fragment_cache_max_entries:
+            _entries.popitem(last=False)
+    return value
+
+
+def invalidate_orgs(org_ids=None) -> None:
+    """Retires cached fragments of `org_ids` (all orgs when None)."""
+    global _global_generation
+    with _lock:
+        if org_ids is None:
+            _global_generation += 1
+            return
+        for org_id in org_ids:
+            _org_generations[org_id] = _org_generations.get(org_id, 0) + 1
+
+
+def clear_fragments() -> None:
+    with _lock:
+        _entries.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INVALIDATION HOOKS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _collect_org(obj, kind: str, changes: set) -> None:
+    if getattr(obj, "org_id", None) is not None:
+        changes.add(obj.org_id)
+
+
+def _invalidate(changes: set) -> None:
+    invalidate_orgs(None if EVERYTHING in changes else changes)
+
+
+register_invalidation((Post, IGAccount), _invalidate, collect=_collect_org)
@@ -4,15 +4,22 @@
 import requests
 import time
 from datetime import datetime, timezone
-from app.config import settings
 from app.logging_setup import log_event
+from app.services import media_registry, media_storage
 
 GRAPH_URL = "https://graph.facebook.com/v24.0"
+CDN_PUSH_WAIT_SECONDS = 30
 
 def publish_to_instagram(*, caption: str, media_url: str, ig_user_id: str, access_token: str) -> dict:
     if not ig_user_id or not access_token:
         return {"ok": False, "error": "Missing ig_user_id or access_token"}
 
+    # Prefer the CDN copy of locally stored media (background push, media_storage)
+    cdn_url = media_storage.cdn_url(media_url, wait=CDN_PUSH_WAIT_SECONDS)
+    if cdn_url:
+        log_event("ig_media_cdn_url_used", url=cdn_url)
+        media_url = cdn_url
+
     if "localhost" in media_url or "127.0.0.1" in media_url:
         return {
             "ok": False, 
@@ -32,57 +39,36 @@ def publish_to_instagram(*, caption: str, media_url: str, ig_user_id: str, acces
             
         # 2. Local Loopback Trust (Railway/Hairpin NAT bypass)
         if "/uploads/" in media_url:
-            import os
             local_filename = media_url.split("/uploads/")[-1]
-            local_path = os.path.join(settings.uploads_dir, local_filename)
-            
+            local_path = media_registry.locate(local_filename)
+
             should_bypass = False
-            if not os.path.exists(local_path):
-                # WAIT-AND-HUNT: Micro-latency protection for ephemeral disk sync
-                found_asset = False
-                print(f"⚠️ [MEDIA_PREFLIGHT] Missing asset on first look: {local_path}")
-                
-                for attempt in range(3):
-                    print(f"🔍 [MEDIA_PREFLIGHT] Hunt Attempt {attempt+1}: {local_filename} not found. Waiting 500ms...")
-                    time.sleep(0.5)
-                    
-                    if os.path.exists(local_path):
-                        print(f"🎯 [MEDIA_PREFLIGHT] Asset synchronized successfully at {local_path}!")
-                        found_asset = True
-                        break
-                    
-                    print(f"   - Deep scan for fingerprint: {local_filename} in /app")
-                    import glob
-                    candidates = glob.glob(f"/app/**/{local_filename}", recursive=True)
-                    if candidates:
-                        local_path = candidates[0]
-                        print(f"🎯 [MEDIA_PREFLIGHT] FOUND MISPLACED FILE at {local_path}. Correcting path...")
-                        found_asset = True
-                        break
-                
-                if not found_asset:
-                    print(f"❌ [MEDIA_PREFLIGHT] STALE DETECTED: File {local_filename} is missing from ephemeral storage.")
-                    return {"ok": False, "error": "MEDIA_STALE_OR_MISSING"}
-
-            if os.path.exists(local_path):
-                # Deep Verify Magic Bytes Locally
-                try:
-                    with open(local_path, "rb") as f:
-                        header = f.read(8).hex()
-                        if header.startswith("ffd8") or header.startswith("89504e47"):
-                            print(f"✅ [IG_PUBLISH] Loopback Trust: Valid magic bytes found at {local_path}")
-                            log_event("ig_media_preflight_loopback_trust_verified", path=local_path)
-                            should_bypass = True
-                        else:
-                            print(f"⚠️ [IG_PUBLISH] Loopback Fail: Invalid magic bytes ({header[:8]}...) at {local_path}")
-                            log_event("ig_media_preflight_fail", reason="invalid_local_magic_bytes", header=header)
-                            preflight_error = "Generated image file is corrupted or invalid."
-                except Exception as e:
-                    print(f"❌ [IG_PUBLISH] Loopback Error: Could not read {local_path}: {e}")
-                    log_event("ig_media_preflight_local_read_error", error=str(e))
-            else:
-                print(f"❌ [IG_PUBLISH] Loopback Fail: File NOT FOUND at {local_path}")
-                log_event("ig_media_preflight_local_not_found", path=local_path)
+            if local_path is None:
+                print(f"❌ [MEDIA_PREFLIGHT] STALE DETECTED: File {local_filename} is missing from ephemeral storage.")
+                log_event("ig_media_preflight_local_not_found", filename=local_filename)
+                return {"ok": False, "error": "MEDIA_STALE_OR_MISSING"}
+
+            # Deep Verify Magic Bytes Locally
+            try:
+                with open(local_path, "rb") as f:
+                    header = f.read(8).hex()
+                    if header.startswith("ffd8") or header.startswith("89504e47"):
+                        print(f"✅ [IG_PUBLISH] Loopback Trust: Valid magic bytes found at {local_path}")
+                        log_event("ig_media_preflight_loopback_trust_verified", path=local_path)
+                        should_bypass = True
+                    else:
+                        print(f"⚠️ [IG_PUBLISH] Loopback Fail: Invalid magic bytes ({header[:8]}...) at {local_path}")
+                        log_event("ig_media_preflight_fail", reason="invalid_local_magic_bytes", header=header)
+                        preflight_error = "Generated image file is corrupted or invalid."
+            except FileNotFoundError:
+                # Removed behind the registry's back
+                media_registry.forget(local_filename)
+                print(f"❌ [MEDIA_PREFLIGHT] STALE DETECTED: File {local_filename} is missing from ephemeral storage.")
+                log_event("ig_media_preflight_local_not_found", filename=local_filename, path=local_path)
+                return {"ok": False, "error": "MEDIA_STALE_OR_MISSING"}
+            except Exception as e:
+                print(f"❌ [IG_PUBLISH] Loopback Error: Could not read {local_path}: {e}")
+                log_event("ig_media_preflight_local_read_error", error=str(e))
 
         # 3. Network Ping (If not already trusted via local check)
         if not should_bypass and not preflight_error:
@@ -3,7 +3,7 @@
 
 import logging
 import re
-from openai import OpenAI
+from app.services.llm_gateway import get_openai_client
 from app.config import settings
 from app.models import ContentItem
 
@@ -59,7 +59,7 @@ def generate_ai_caption_from_quran(item_or_payload: any, style: str = "reflectiv
         logger.error("❌ [QuranCaption] Missing OpenAI API Key.")
         return f"{item.text} ({item.title})\n\nTrust in the wisdom of your Creator.\n\nHe knows what you do not."
 
-    client = OpenAI(api_key=settings.openai_api_key)
+    client = get_openai_client()
     
     tone_map = {
         "reflective": "Grounded and quiet. Focus on the internal shift of the heart.",
@@ -1,21 +1,30 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.config import settings
+from app.logging_setup import log_event
 from app.quran_foundation import get_surah_verses
 from app.models import ContentSource, ContentItem
+from app.services import quran_store
 from app.services.library_service import generate_topics_slugs
 import logging
 import datetime
+import json
+import os
 import time
 
 logger = logging.getLogger(__name__)
 
-def sync_surah_to_library(db: Session, chapter_id: int, translation_id: str = "131") -> int:
-    """
-    Synchronizes an entire Surah (chapter) from Quran Foundation into the Global Library.
-    Returns the number of new verses added.
-    Optimized with bulk existence checks.
-    """
-    # 1. Get or create the Global QF Source
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SYNC_STATUS_FILE = os.path.join(BASE_DIR, "sync_status.json")
+SYNC_CHECKPOINT_FILE = os.path.join(BASE_DIR, "quran_sync_checkpoint.json")
+SURAH_COUNT = 114
+QURAN_VERSE_COUNT = 6236
+
+
+def _get_global_source(db: Session) -> ContentSource:
+    """Get or create the Global QF Source."""
     source = db.query(ContentSource).filter(
         ContentSource.source_type == "quran_foundation",
         ContentSource.org_id == None 
@@ -33,94 +42,155 @@ def sync_surah_to_library(db: Session, chapter_id: int, translation_id: str = "1
         )
         db.add(source)
         db.flush()
+    return source
 
-    # 2. Fetch Verses via the QF Service (with RETRY logic)
-    print(f"📡 [SYNC] Ingesting Surah {chapter_id} verses...")
-    verses = None
+
+def _fetch_surah(chapter_id: int, translation_id: str) -> list:
+    """All verses of a surah (with RETRY logic). Raises if the surah stays incomplete."""
+    last_error = None
     for attempt in range(3):
         try:
-            verses = get_surah_verses(chapter_id, translation_id)
-            if verses: break
+            return get_surah_verses(chapter_id, translation_id, strict=True)
         except Exception as e:
+            last_error = e
             logger.warning(f"⚠️ [SYNC] API Attempt {attempt+1} failed for Surah {chapter_id}: {e}")
             time.sleep(2 * (attempt + 1))
+    raise last_error
 
-    if not verses:
-        logger.error(f"❌ [SYNC] Max retries reached or no verses returned for chapter {chapter_id}")
-        return 0
 
-    # 3. Optimized: Fetch all existing verses for THIS surah in one go
-    existing_titles = {
-        item.title for item in db.query(ContentItem.title).filter(
-            ContentItem.source_id == source.id,
-            ContentItem.title.like(f"Surah {chapter_id}, Verse %")
-        ).all()
-    }
-
-    # 4. Process and Ingest Verses
-    new_count = 0
-    verse_idx = 0
+def _verse_rows(source_id: int, chapter_id: int, verses: list, translation_id: str) -> list:
+    """content_items rows for one surah."""
+    ingested_at = datetime.datetime.now().isoformat()
+    topics = [f"Surah {chapter_id}"]
+    topics_slugs = generate_topics_slugs("Quran", topics, "Scripture")
+    rows = []
     for v in verses:
-        verse_idx += 1
         verse_number = v.get("verse_number")
-        title = f"Surah {chapter_id}, Verse {verse_number}"
-        
-        if title in existing_titles:
-            continue
-            
         # Extract English translation
         translations = v.get("translations", [])
-        english_text = translations[0].get("text", "") if translations else ""
-        
-        # Build Item
-        item = ContentItem(
-            org_id=None,
-            source_id=source.id,
-            item_type="quran",
-            title=title,
-            text=english_text,
-            arabic_text=v.get("text_uthmani"),
-            translation="Sahih International",
-            meta={
+        rows.append({
+            "org_id": None,
+            "source_id": source_id,
+            "item_type": "quran",
+            "title": f"Surah {chapter_id}, Verse {verse_number}",
+            "text": translations[0].get("text", "") if translations else "",
+            "arabic_text": v.get("text_uthmani"),
+            "translation": "Sahih International",
+            "meta": {
                 "surah_number": chapter_id,
                 "verse_number": verse_number,
                 "verse_key": v.get("verse_key"),
                 "translation_id": translation_id,
-                "ingested_at": datetime.datetime.now().isoformat()
+                "ingested_at": ingested_at
             },
-            tags=["quran", f"surah_{chapter_id}"],
-            topic="Quran",
-            topics=[f"Surah {chapter_id}"],
-            topics_slugs=generate_topics_slugs("Quran", [f"Surah {chapter_id}"], "Scripture")
-        )
-        db.add(item)
-        new_count += 1
-        
-        # STEP 7: Progress logging every 50 verses
-        if verse_idx % 50 == 0:
-            logger.info(f"[SYNC] Surah {chapter_id}: Synchronizing verse {verse_idx}...")
-        
+            "tags": ["quran", f"surah_{chapter_id}"],
+            "topic": "Quran",
+            "topics": list(topics),
+            "topics_slugs": list(topics_slugs),
+            "use_count": 0,
+        })
+    return rows
+
+
+def _insert_verses(db: Session, source_id: int, chapter_id: int, rows: list) -> int:
+    """
+    One multi-row INSERT ... ON CONFLICT DO NOTHING for the surah; returns the
+    number of new rows. The unique (source_id, title) index on quran items makes
+    concurrent or repeated syncs idempotent; the title pre-check keeps legacy
+    databases (where that index could not be built) duplicate-free too.
+    """
+    existing_titles = {
+        title for (title,) in db.query(ContentItem.title).filter(
+            ContentItem.source_id == source_id,
+            ContentItem.title.like(f"Surah {chapter_id}, Verse %")
+        ).all()
+    }
+    rows = [r for r in rows if r["title"] not in existing_titles]
+    if not rows:
+        return 0
+    table = ContentItem.__table__
+    stmt = pg_insert(table).on_conflict_do_nothing().returning(table.c.id)
+    return len(db.execute(stmt, rows).all())
+
+
+def sync_surah_to_library(db: Session, chapter_id: int, translation_id: str = "131") -> int:
+    """
+    Synchronizes an entire Surah (chapter) from Quran Foundation into the Global Library.
+    Returns the number of new verses added.
+    """
+    source = _get_global_source(db)
+
+    print(f"📡 [SYNC] Ingesting Surah {chapter_id} verses...")
+    try:
+        verses = _fetch_surah(chapter_id, translation_id)
+    except Exception as e:
+        logger.error(f"❌ [SYNC] Max retries reached or no verses returned for chapter {chapter_id}: {e}")
+        return 0
+
+    new_count = _insert_verses(db, source.id, chapter_id, _verse_rows(source.id, chapter_id, verses, translation_id))
     db.commit()
     if new_count > 0:
+        quran_store.invalidate()
         logger.info(f"✅ [SYNC] Successfully manifested {new_count} new verses from Surah {chapter_id}")
     return new_count
 
-def save_sync_status(status_msg, is_error=False):
-    """Utility to persist sync status for the UI."""
-    import json
-    import os
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    status_file = os.path.join(base_dir, "sync_status.json")
+
+def _write_json(path: str, payload: dict):
+    """Write-then-rename so readers never see a half-written file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def save_sync_status(status_msg, is_error=False, **progress):
+    """Utility to persist sync status (and optional progress counters) for the UI."""
+    payload = {
+        "message": status_msg,
+        "is_error": is_error,
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+    if progress:
+        payload["progress"] = progress
     try:
-        with open(status_file, "w") as f:
-            json.dump({
-                "message": status_msg,
-                "is_error": is_error,
-                "timestamp": datetime.datetime.now().isoformat()
-            }, f)
+        _write_json(SYNC_STATUS_FILE, payload)
     except Exception as e:
         logger.error(f"Failed to save sync status: {e}")
 
+
+def load_sync_status() -> dict:
+    try:
+        with open(SYNC_STATUS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_checkpoint(translation_id: str) -> dict:
+    """The unfinished run to resume, or a fresh checkpoint."""
+    try:
+        with open(SYNC_CHECKPOINT_FILE) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        checkpoint = None
+    if not checkpoint or checkpoint.get("finished") or checkpoint.get("translation_id") != translation_id:
+        checkpoint = {
+            "translation_id": translation_id,
+            "started_at": datetime.datetime.now().isoformat(),
+            "completed": [],
+            "inserted": 0,
+            "finished": False,
+        }
+    return checkpoint
+
+
+def _save_checkpoint(checkpoint: dict):
+    # A lost checkpoint only costs a re-fetch: committed verses are skipped on insert
+    try:
+        _write_json(SYNC_CHECKPOINT_FILE, checkpoint)
+    except Exception as e:
+        logger.error(f"Failed to save sync checkpoint: {e}")
+
 def validate_sync_ready(db):
     """
     Step 5: Pre-check before allowing bulk sync.
@@ -180,48 +250,95 @@ def validate_sync_ready(db):
     logger.info("✅ [HEALTH] Pre-sync verification passed")
     return True
 
-def sync_entire_quran(db_factory: callable):
+def sync_entire_quran(db_factory: callable, translation_id: str = "131", max_workers: int = None):
     """
-    Background worker to sync all 114 Surahs sequentially.
-    Step 7: Implements safe trigger and granular logging.
+    Background worker to sync all 114 Surahs.
+    Surahs are fetched by a pool of QF_MAX_WORKERS threads (sharing one HTTP
+    session and the QF rate limit) and written by this thread, one bulk insert
+    and commit per surah. Committed surahs are recorded in
+    quran_sync_checkpoint.json, so a crashed or interrupted run picks up where
+    it stopped the next time it is triggered.
     """
     db = db_factory()
     try:
         # STEP 7: PRE-SYNC CHECK
         validate_sync_ready(db)
+        source_id = _get_global_source(db).id
+        db.commit()
     except Exception as e:
         logger.error(str(e))
-        db.close()
         return
     finally:
         db.close()
 
+    checkpoint = _load_checkpoint(translation_id)
+    done = set(checkpoint["completed"])
+    resumed = len(done)
+    pending = [c for c in range(1, SURAH_COUNT + 1) if c not in done]
+    workers = max(1, max_workers or settings.qf_max_workers)
+    failed = []
     total_new = 0
     t0 = time.time()
-    save_sync_status("🚀 Initializing Global Quran Repository...")
-    logger.info("🚀 [SYNC] STARTING FULL QURAN FOUNDATION SYNC (114 SURAHS)...")
-    
-    for chapter_id in range(1, 115):
-        db = db_factory()
-        try:
-            # Note: sync_surah_to_library currently logs per surah.
-            # We'll add a more granular log here if needed or just keep current surah-level.
-            count = sync_surah_to_library(db, chapter_id)
-            total_new += count
-            
-            # Progress reporting every 10 surahs (roughly 500-1000 verses)
-            if chapter_id % 10 == 0:
-                msg = f"📡 [SYNC] Running: {chapter_id}/114 Surahs manifest..."
-                logger.info(msg)
-                save_sync_status(msg)
-        except Exception as e:
-            logger.error(f"❌ [SYNC] Error Surah {chapter_id}: {e}")
-            # Optional: Add retry logic here if desired, but sequential skip safer
-        finally:
-            db.close()
-            
+
+    if resumed:
+        save_sync_status(f"🔁 Resuming Quran sync at {resumed}/{SURAH_COUNT} Surahs...")
+    else:
+        save_sync_status("🚀 Initializing Global Quran Repository...")
+    logger.info(f"🚀 [SYNC] STARTING FULL QURAN FOUNDATION SYNC ({len(pending)} SURAHS, {workers} WORKERS)...")
+    log_event("quran_sync_started", pending=len(pending), resumed=resumed, workers=workers)
+
+    db = db_factory()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qf-sync") as pool:
+            futures = {pool.submit(_fetch_surah, c, translation_id): c for c in pending}
+            for future in as_completed(futures):
+                chapter_id = futures[future]
+                try:
+                    verses = future.result()
+                    count = _insert_verses(db, source_id, chapter_id, _verse_rows(source_id, chapter_id, verses, translation_id))
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    failed.append(chapter_id)
+                    log_event("quran_sync_surah_failed", level="error", surah=chapter_id, error=str(e)[:300])
+                    continue
+
+                if count:
+                    quran_store.invalidate()
+                total_new += count
+                done.add(chapter_id)
+                checkpoint["completed"] = sorted(done)
+                checkpoint["inserted"] += count
+                _save_checkpoint(checkpoint)
+
+                elapsed = time.time() - t0
+                eta = elapsed / (len(done) - resumed) * (SURAH_COUNT - len(done) - len(failed))
+                log_event("quran_sync_surah", surah=chapter_id, verses=len(verses), inserted=count,
+                          done=len(done), total=SURAH_COUNT, elapsed_s=round(elapsed, 2))
+                save_sync_status(
+                    f"📡 [SYNC] Running: {len(done)}/{SURAH_COUNT} Surahs manifest, {checkpoint['inserted']} verses added (ETA {eta:.0f}s)...",
+                    surahs_done=len(done),
+                    surahs_total=SURAH_COUNT,
+                    verses_added=checkpoint["inserted"],
+                    failed=sorted(failed),
+                    elapsed_seconds=round(elapsed, 1),
+                    eta_seconds=round(eta, 1),
+                )
+    finally:
+        db.close()
+
     duration = time.time() - t0
+    log_event("quran_sync_finished", inserted=total_new, done=len(done), failed=len(failed), duration_s=round(duration, 2))
+    if failed:
+        msg = f"❌ [SYNC] {len(failed)} Surahs failed ({', '.join(map(str, sorted(failed)))}). Added {total_new} records in {duration:.2f}s; trigger the sync again to resume."
+        logger.error(msg)
+        save_sync_status(msg, is_error=True, surahs_done=len(done), surahs_total=SURAH_COUNT, failed=sorted(failed))
+        return
+
+    checkpoint["finished"] = True
+    checkpoint["finished_at"] = datetime.datetime.now().isoformat()
+    _save_checkpoint(checkpoint)
     msg = f"✅ [SYNC] COMPLETE. Added {total_new} records. Total time: {duration:.2f}s"
     print("📖 Quran Sync Completed Successfully")
     logger.info(msg)
-    save_sync_status(msg)
+    save_sync_status(msg, surahs_done=len(done), surahs_total=SURAH_COUNT, verses_added=checkpoint["inserted"])
@@ -0,0 +1,191 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Quran Search Index
+===================================
+Tokenized inverted index over the Quran corpus (translation text, title and
+topic slugs), built once per verse-store load (see quran_store).
+
+  - Alias expansion happens at index time: a verse whose tokens match an alias
+    of a TOPIC_ALIAS_MAP key ("patience", "steadfastness") is also posted under
+    that key ("sabr"), at a lower weight. Queries never fan out into ORs.
+  - Ranking: verses matching more query tokens first, then by a tf-idf score
+    with field weights (title > slugs > text), then official source and
+    surah:ayah order.
+  - Prefix matching (typeahead): the last query token also matches every
+    indexed token it prefixes ("merc" -> mercy, merciful).
+"""
+
+import bisect
+import heapq
+import json
+import math
+import re
+from collections import OrderedDict, defaultdict
+
+TOPIC_ALIAS_MAP = {
+    "sabr": ["patience", "steadfast", "steadfastness", "persevere", "enduring", "perseverance"],
+    "patience": ["sabr", "steadfastness", "endurance", "perseverance"],
+    "salah": ["prayer", "prayers", "worship"],
+    "prayer": ["salah", "salat", "supplication"],
+    "shukr": ["gratitude", "thanks", "thankfulness", "appreciative"],
+    "gratitude": ["shukr", "thankfulness", "appreciation"],
+    "tawakkul": ["trust", "reliance", "trust in allah", "relying"],
+    "trust": ["tawakkul", "reliance", "confidence"],
+    "rahmah": ["mercy", "compassion", "merciful", "grace"],
+    "mercy": ["rahmah", "compassion", "forgiveness"],
+    "forgiveness": ["pardon", "forgiving", "maghfirah", "repentance"],
+    "hardship": ["ease", "trial", "test", "adversity", "struggle"],
+    "ease": ["hardship", "relief"],
+    "generosity": ["giving", "charity", "zakat", "sadakah"],
+    "knowledge": ["ilm", "learning", "wisdom", "education"],
+    "death": ["hereafter", "soul", "resurrection", "mortality"],
+}
+
+FIELD_WEIGHTS = (("title", 3.0), ("slugs", 2.0), ("text", 1.0))
+ALIAS_WEIGHT = 0.5      # posting reached through an alias of the query token
+PREFIX_WEIGHT = 0.6     # typeahead: indexed token that merely starts with the query token
+MAX_PREFIX_TERMS = 64   # cap the expansion of very short prefixes
+RANKED_CACHE_SIZE = 512 # single-word rankings kept per index
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall((text or "").lower())
+
+
+def _alias_keys():
+    """alias token (or phrase) -> TOPIC_ALIAS_MAP keys it stands for."""
+    keys = defaultdict(set)
+    for key, aliases in TOPIC_ALIAS_MAP.items():
+        for alias in aliases:
+            keys[" ".join(tokenize(alias))].add(key)
+    return keys
+
+
+class QuranSearchIndex:
+    def __init__(self, rows, source_id=None):
+        """`rows`: quran_store column snapshots (id, title, text, topics_slugs, meta, source_id)."""
+        self.ids = []
+        self.order = []
+        postings = defaultdict(dict)  # token -> {doc: weight}
+
+        alias_keys = _alias_keys()
+        single_aliases = {a: k for a, k in alias_keys.items() if " " not in a}
+        phrase_aliases = {a: k for a, k in alias_keys.items() if " " in a}
+        alias_cache = {}
+
+        def aliases_of(token):
+            # Substring-style matching of the old ILIKE search: "steadfast" also covers "steadfastness"
+            keys = alias_cache.get(token)
+            if keys is None:
+                keys = set()
+                for alias, alias_for in single_aliases.items():
+                    if token == alias or (len(alias) >= 4 and token.startswith(alias)):
+                        keys |= alias_for
+                alias_cache[token] = keys
+            return keys
+
+        for row in sorted(rows, key=lambda r: r["id"]):
+            doc = len(self.ids)
+            meta = row.get("meta") or {}
+            self.ids.append(row["id"])
+            self.order.append((
+                0 if source_id and row.get("source_id") == source_id else 1,
+                meta.get("surah_number") or 999,
+                meta.get("verse_number") or 999,
+            ))
+            fields = {
+                "title": tokenize(row.get("title")),
+                "slugs": tokenize(json.dumps(row.get("topics_slugs") or [], ensure_ascii=False)),
+                "text": tokenize(row.get("text")),
+            }
+            weights = defaultdict(float)
+            for field, field_weight in FIELD_WEIGHTS:
+                tokens = fields[field]
+                for token in tokens:
+                    weights[token] += field_weight
+                    for key in aliases_of(token):
+                        weights[key] += field_weight * ALIAS_WEIGHT
+                if tokens and phrase_aliases:
+                    joined = f" {' '.join(tokens)} "
+                    for phrase, alias_for in phrase_aliases.items():
+                        if f" {phrase} " in joined:
+                            for key in alias_for:
+                                weights[key] += field_weight * ALIAS_WEIGHT
+            for token, weight in weights.items():
+                # Saturating term frequency: repeats help, but not linearly
+                postings[token][doc] = weight / (weight + 1.0)
+
+        # token -> {doc: idf-weighted score}
+        total = max(len(self.ids), 1)
+        self.postings = {}
+        for token, docs in postings.items():
+            idf = math.log(1 + total / len(docs))
+            self.postings[token] = {doc: idf * weight for doc, weight in docs.items()}
+        self.vocabulary = sorted(self.postings)
+        self._ranked = OrderedDict()  # token -> docs best first (single-word queries), LRU
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _prefixed(self, prefix: str) -> list:
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        terms = []
+        for term in self.vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _ranked_docs(self, token: str) -> list:
+        docs = self.postings.get(token)
+        if docs is None:
+            return []  # not in the vocabulary: nothing to rank or cache
+        ranked = self._ranked.get(token)
+        if ranked is None:
+            ranked = self._ranked[token] = sorted(docs, key=lambda d: (-docs[d], self.order[d]))
+            while len(self._ranked) > RANKED_CACHE_SIZE:
+                self._ranked.popitem(last=False)
+        else:
+            try:
+                self._ranked.move_to_end(token)
+            except KeyError:
+                pass  # evicted by another thread meanwhile
+        return ranked
+
+    def search(self, query: str, limit: int = 15, prefix: bool = False) -> list:
+        """Top `limit` item ids for `query`, best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit <= 0:
+            return []
+        if len(tokens) == 1 and not prefix:
+            return [self.ids[d] for d in self._ranked_docs(tokens[0])[:limit]]
+
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for i, token in enumerate(tokens):
+            terms = {token: 1.0}
+            if prefix and i == len(tokens) - 1:
+                for term in self._prefixed(token):
+                    terms.setdefault(term, PREFIX_WEIGHT)
+            best = {}
+            for term, term_weight in terms.items():
+                docs = self.postings.get(term)
+                if docs is None:
+                    continue
+                if term_weight == 1.0 and not best:
+                    best = dict(docs)
+                    continue
+                for doc, weight in docs.items():
+                    score = term_weight * weight
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] += score
+                matched[doc] += 1
+
+        top = heapq.nsmallest(limit, scores, key=lambda d: (-matched[d], -scores[d], self.order[d]))
+        return [self.ids[d] for d in top]
@@ -4,8 +4,9 @@
 import logging
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, text
 from app.models import ContentItem, ContentSource
+from app.services import quran_store
+from app.services.quran_search import TOPIC_ALIAS_MAP
 from app.services.quran_serialization import normalize_quran_verse
 
 logger = logging.getLogger(__name__)
@@ -24,26 +25,10 @@ def get_quran_ayah(db: Session, surah: int, ayah: int) -> Optional[ContentItem]:
     """
     Retrieves a specific ayah by surah and ayah number.
     Reference: Surah {surah}, Verse {ayah}
+    Served from the in-memory verse store (global source first, then any
+    matching title).
     """
-    title = f"Surah {surah}, Verse {ayah}"
-    source = get_quran_source(db)
-    
-    query = db.query(ContentItem).filter(
-        ContentItem.item_type == "quran",
-        ContentItem.title == title
-    )
-    
-    if source:
-        # Prioritize the verified global source
-        item = query.filter(ContentItem.source_id == source.id).first()
-        if item: return item
-        
-    # Fallback to any matching title if global source match fails
-    return query.first()
-    
-    if not item:
-        logger.warning(f"⚠️ [QuranService] Ayah not found: {title}")
-    return item
+    return quran_store.item(db, quran_store.id_for_title(db, f"Surah {surah}, Verse {ayah}"))
 
 def normalize_reference_input(text: str) -> str:
     """
@@ -119,7 +104,7 @@ def get_quran_ayah_exact(surah: int, ayah: int, db: Session) -> dict:
     if translator == "131":
         translator = "Sahih International"
     
-    payload = normalize_quran_verse(item)
+    payload = quran_store.payload(db, item.id)
     
     if not payload["translation_text"]:
         logger.error(f"❌ [QURAN][ERROR] Translation missing for: {surah}:{ayah}")
@@ -128,7 +113,7 @@ def get_quran_ayah_exact(surah: int, ayah: int, db: Session) -> dict:
     logger.info(f"✅ [QURAN] Exact verse fetch success: {surah}:{ayah}")
     return payload
 
-def resolve_quran_input(user_input: str, db: Session) -> dict:
+def resolve_quran_input(user_input: str, db: Session, limit: int = 15, prefix: bool = False) -> dict:
     """
     If the input looks like a direct reference, use exact lookup only.
     If it does not, route to search mode.
@@ -151,9 +136,9 @@ def resolve_quran_input(user_input: str, db: Session) -> dict:
     
     # Otherwise, it's a search
     logger.info(f"🔎 [QURAN] Route to keyword search path: '{user_input}'")
-    results = search_quran(db, user_input)
+    results = search_quran(db, user_input, limit=limit, prefix=prefix)
     # Formatting for return
-    return [normalize_quran_verse(r) for r in results]
+    return [quran_store.payload(db, r.id) for r in results]
 
 def build_quran_quote_payload(user_input: str, db: Session) -> dict:
     """
@@ -174,9 +159,9 @@ def build_quran_quote_payload(user_input: str, db: Session) -> dict:
             item_data = data[0]
             # Convert search result format back to exact format if needed
             # Actually, let's just use the item_id to get exact if it came from search
-            item = db.query(ContentItem).filter(ContentItem.id == item_data["id"]).first()
-            surah = item.meta.get("surah_number")
-            ayah = item.meta.get("verse_number")
+            meta = quran_store.row(db, item_data["id"])["meta"] or {}
+            surah = meta.get("surah_number")
+            ayah = meta.get("verse_number")
             exact_data = get_quran_ayah_exact(surah, ayah, db)
         else:
             exact_data = data
@@ -197,102 +182,33 @@ def build_quran_quote_payload(user_input: str, db: Session) -> dict:
         logger.error(f"❌ [QURAN][ERROR] Failed to build quote payload: {e}")
         raise e
 
-TOPIC_ALIAS_MAP = {
-    "sabr": ["patience", "steadfast", "steadfastness", "persevere", "enduring", "perseverance"],
-    "patience": ["sabr", "steadfastness", "endurance", "perseverance"],
-    "salah": ["prayer", "prayers", "worship"],
-    "prayer": ["salah", "salat", "supplication"],
-    "shukr": ["gratitude", "thanks", "thankfulness", "appreciative"],
-    "gratitude": ["shukr", "thankfulness", "appreciation"],
-    "tawakkul": ["trust", "reliance", "trust in allah", "relying"],
-    "trust": ["tawakkul", "reliance", "confidence"],
-    "rahmah": ["mercy", "compassion", "merciful", "grace"],
-    "mercy": ["rahmah", "compassion", "forgiveness"],
-    "forgiveness": ["pardon", "forgiving", "maghfirah", "repentance"],
-    "hardship": ["ease", "trial", "test", "adversity", "struggle"],
-    "ease": ["hardship", "relief"],
-    "generosity": ["giving", "charity", "zakat", "sadakah"],
-    "knowledge": ["ilm", "learning", "wisdom", "education"],
-    "death": ["hereafter", "soul", "resurrection", "mortality"],
-}
-
-def search_quran(db: Session, query: str, limit: int = 15) -> List[ContentItem]:
+def search_quran(db: Session, query: str, limit: int = 15, prefix: bool = False) -> List[ContentItem]:
     """
-    Searches for verses by keyword in English text or within topic slugs.
-    Uses TOPIC_ALIAS_MAP to expand search relevance.
+    Ranked keyword search over the English text, titles and topic slugs.
+    TOPIC_ALIAS_MAP aliases are expanded at index time (see quran_search);
+    `prefix` also matches words starting with the last query word (typeahead).
     """
-    # 1. Expand query with aliases
     query = query.strip().lower()
     if not query:
         return []
 
-    search_terms = [query]
-    if query in TOPIC_ALIAS_MAP:
-        search_terms.extend(TOPIC_ALIAS_MAP[query])
-    
-    # Also check if any word in the query has an alias
-    words = query.split()
-    for w in words:
-        if w in TOPIC_ALIAS_MAP:
-            search_terms.extend(TOPIC_ALIAS_MAP[w])
-            
-    # Deduplicate
-    search_terms = list(set(search_terms))
-    
-    # 2. Build Query
-    # Use OR across all terms for maximum discovery
-    from sqlalchemy import cast, String
-    filters = []
-    for term in search_terms:
-        pattern = f"%{term}%"
-        filters.append(ContentItem.text.ilike(pattern))
-        filters.append(ContentItem.title.ilike(pattern))
-        # Use cast(..., String) for robust partial match on JSONB array
-        filters.append(cast(ContentItem.topics_slugs, String).ilike(pattern))
+    # 1. Ranked top-N from the precomputed index
+    results = quran_store.search_ids(db, query, limit, prefix=prefix)
 
-    logger.info(f"📡 [QuranSearch] Searching for {len(search_terms)} terms. Using cast(topics_slugs, String) for Postgres safety.")
-    results = db.query(ContentItem).filter(
-        ContentItem.item_type == "quran",
-        or_(*filters)
-    ).all() # Get all and sort in Python for more complex logic
-    
-    # 3. Arabic Recovery & Source Prioritization
-    source = get_quran_source(db)
+    # 2. Arabic Recovery: swap in a copy of the same verse that carries Arabic
     final_results = []
-    for item in results:
-        # Arabic Recovery (if needed)
-        if not item.arabic_text:
-            surah = item.meta.get("surah_number")
-            ayah = item.meta.get("verse_number")
-            if surah and ayah:
-                better_item = db.query(ContentItem).filter(
-                    ContentItem.item_type == "quran",
-                    text("meta->>'surah_number' = :s").bindparams(s=str(surah)),
-                    text("meta->>'verse_number' = :a").bindparams(a=str(ayah)),
-                    ContentItem.arabic_text != None,
-                    ContentItem.arabic_text != ""
-                ).first()
-                if better_item:
-                    item = better_item
-        
-        final_results.append(item)
-    
-    # 4. Final Sort: Official source first, then by Surah:Ayah
-    def final_sort_key(it):
-        is_global = 0 if source and it.source_id == source.id else 1
-        s_num = it.meta.get("surah_number") or 999
-        a_num = it.meta.get("verse_number") or 999
-        return (is_global, s_num, a_num)
+    for item_id in results:
+        if not quran_store.row(db, item_id)["arabic_text"]:
+            item_id = quran_store.arabic_fallback_id(db, item_id) or item_id
+        final_results.append(item_id)
+    final_results = [quran_store.item(db, item_id) for item_id in dict.fromkeys(final_results)]
 
-    final_results.sort(key=final_sort_key)
-    
     logger.info(f"🔎 [QuranService] Search for '{query}' returned {len(final_results)} results.")
-    return final_results[:limit]
+    return final_results
 
 def get_verse_by_id(db: Session, item_id: int) -> Optional[dict]:
     """Retrieves normalized verse by integer ID."""
-    item = db.query(ContentItem).filter(ContentItem.id == item_id, ContentItem.item_type == "quran").first()
-    return normalize_quran_verse(item) if item else None
+    return quran_store.payload(db, item_id)
 
 
 def get_surah_list():
@@ -311,32 +227,9 @@ def get_surah_list():
 
 def get_surah_verses(db: Session, surah_num: int) -> List[dict]:
     """Retrieves all normalized verses for a specific surah."""
-    # We filter by title pattern "Surah {num}, Verse %" and sort by parsed verse number
-    # This is safer than meta filtering if JSON support is inconsistent.
-    title_prefix = f"Surah {surah_num}, Verse "
-    source = get_quran_source(db)
-    
-    query = db.query(ContentItem).filter(
-        ContentItem.item_type == "quran",
-        ContentItem.title.ilike(f"{title_prefix}%")
-    )
-    
-    if source:
-        results = query.filter(ContentItem.source_id == source.id).all()
-        if not results:
-            results = query.all()
-    else:
-        results = query.all()
-    
-    # Sort manually by ayah number safely
-    def sort_key(item):
-        try:
-            return int(item.title.split("Verse ")[-1])
-        except:
-            return 0
-            
-    sorted_results = sorted(results, key=sort_key)
-    return [normalize_quran_verse(r) for r in sorted_results]
+    # Title pattern "Surah {num}, Verse %" sorted by verse number, preferring the
+    # global source (see quran_store).
+    return [quran_store.payload(db, item_id) for item_id in quran_store.surah_ids(db, surah_num)]
 
 def get_quran_ayahs_by_theme(db: Session, theme: str, limit: int = 5) -> List[ContentItem]:
     """
@@ -344,12 +237,8 @@ def get_quran_ayahs_by_theme(db: Session, theme: str, limit: int = 5) -> List[Co
     Used by the Caption Engine for grounded generation.
     """
     theme = theme.lower().strip()
-    from sqlalchemy import cast, String
-    results = db.query(ContentItem).filter(
-        ContentItem.item_type == "quran",
-        cast(ContentItem.topics_slugs, String).ilike(f"%{theme}%")
-    ).limit(limit).all()
-    return results
+    item_ids = quran_store.match_ids(db, [theme], slugs_only=True)[:limit]
+    return [quran_store.item(db, item_id) for item_id in item_ids]
 
 def get_verse_by_reference(db: Session, reference: str) -> Optional[ContentItem]:
     """
@@ -364,12 +253,15 @@ def get_verse_by_reference(db: Session, reference: str) -> Optional[ContentItem]
 
 def get_verse_by_key(db: Session, key: str) -> Optional[dict]:
     """Alias for get_verse_by_reference that returns normalized data."""
-    item = get_verse_by_reference(db, key)
-    return normalize_quran_verse(item) if item else None
+    try:
+        surah, ayah = parse_quran_reference(key)
+    except Exception:
+        return None
+    return quran_store.payload(db, quran_store.id_for_key(db, f"{surah}:{ayah}"))
 
 def get_quran_ayah_by_id(db: Session, item_id: int) -> Optional[ContentItem]:
     """Retrieves raw ContentItem by ID."""
-    return db.query(ContentItem).filter(ContentItem.id == item_id, ContentItem.item_type == "quran").first()
+    return quran_store.item(db, item_id)
 
 def get_quran_ayah_by_key(db: Session, key: str) -> Optional[ContentItem]:
     """Retrieves raw ContentItem by key (surah:ayah)."""
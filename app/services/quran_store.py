@@ -0,0 +1,279 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Process-wide, in-memory store of the Quran corpus (ContentItem rows with
+item_type "quran").
+
+The corpus is static (6,236 verses), so it is loaded once per process on
+first use (two queries) and then served from memory:
+
+  - title "Surah X, Verse Y" / verse key "X:Y" -> item (global QF source first)
+  - surah -> items in ayah order
+  - id -> column snapshot, normalized verse payload (memoized)
+  - lower-cased text / title / topic slugs for substring matching, and a
+    ranked QuranSearchIndex built on first search (see quran_search)
+
+Items come back as ContentItem instances attached to the caller's session
+with merge(load=False), so there is no SELECT and callers can still modify and
+commit them. use_count / last_used_at / updated_at are left out of the
+snapshot; reading one loads it from the row, so usage counters never go
+stale.
+
+The Quran sync calls invalidate() after inserting verses. Committing ORM
+changes to quran items (other than their usage columns), deleting a content
+source, or a bulk UPDATE/DELETE on content_items that sets more than usage
+columns does the same. Other worker processes reload after
+QURAN_STORE_TTL_SECONDS.
+"""
+
+import copy
+import json
+import re
+import threading
+import time
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.db_events import EVERYTHING, register_invalidation
+from app.models import ContentItem, ContentSource
+from app.services.quran_search import QuranSearchIndex
+from app.services.quran_serialization import normalize_quran_verse
+
+_USAGE_COLUMNS = {"use_count", "last_used_at", "updated_at"}
+_COLUMNS = [
+    attr.key for attr in inspect(ContentItem).column_attrs
+    if attr.key not in _USAGE_COLUMNS and not attr.deferred
+]
+_SURAH_PREFIX = re.compile(r"^surah (\d+), verse ", re.IGNORECASE)
+_IDENTITY = inspect(ContentItem).identity_key_from_primary_key
+
+
+class _Corpus:
+    def __init__(self, rows, source_id, generation):
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        self.source_id = source_id
+        self.rows = {row["id"]: row for row in rows}
+        self.payloads = {}
+        self.by_title = {}
+        self.by_key = {}
+        self.arabic_by_ref = {}
+        self.haystacks = []
+        self._search_index = None
+        self._search_lock = threading.Lock()
+
+        surahs = {}
+        # Global source first, then lowest id: the first row seen wins each key
+        ordered = sorted(rows, key=lambda r: (r["source_id"] != source_id, r["id"]))
+        for row in ordered:
+            title = row["title"] or ""
+            self.by_title.setdefault(title, row["id"])
+            m = _SURAH_PREFIX.match(title)
+            if m:
+                surahs.setdefault(int(m.group(1)), []).append(row)
+            meta = row["meta"] or {}
+            ref = (str(meta.get("surah_number")), str(meta.get("verse_number")))
+            if row["arabic_text"]:
+                self.arabic_by_ref.setdefault(ref, row["id"])
+
+        for title, item_id in self.by_title.items():
+            m = re.fullmatch(r"Surah (\d+), Verse (\d+)", title)
+            if m:
+                self.by_key[f"{int(m.group(1))}:{int(m.group(2))}"] = item_id
+
+        self.by_surah = {}
+        for surah, items in surahs.items():
+            preferred = [r for r in items if source_id is not None and r["source_id"] == source_id]
+            self.by_surah[surah] = [r["id"] for r in sorted(preferred or items, key=_ayah_sort_key)]
+
+        for row in sorted(rows, key=lambda r: r["id"]):
+            self.haystacks.append((
+                row["id"],
+                (row["text"] or "").lower(),
+                (row["title"] or "").lower(),
+                json.dumps(row["topics_slugs"] or [], ensure_ascii=False).lower(),
+            ))
+
+
+    @property
+    def search_index(self) -> QuranSearchIndex:
+        if self._search_index is None:
+            with self._search_lock:
+                if self._search_index is None:
+                    self._search_index = QuranSearchIndex(self.rows.values(), self.source_id)
+        return self._search_index
+
+
+def _ayah_sort_key(row):
+    try:
+        return int(row["title"].split("Verse ")[-1])
+    except Exception:
+        return 0
+
+
+_lock = threading.Lock()
+_current = None
+_generation = 0
+
+
+def _load(db: Session) -> _Corpus:
+    generation = _generation
+    rows = db.execute(
+        select(*[getattr(ContentItem, k) for k in _COLUMNS]).where(ContentItem.item_type == "quran")
+    ).mappings().all()
+    source_id = db.execute(
+        select(ContentSource.id).where(
+            ContentSource.source_type == "quran_foundation",
+            ContentSource.org_id == None
+        ).limit(1)
+    ).scalar()
+    return _Corpus([dict(r) for r in rows], source_id, generation)
+
+
+def _corpus(db: Session) -> _Corpus:
+    global _current
+    corpus = _current
+    if corpus is not None and corpus.loaded_at + settings.quran_store_ttl_seconds > time.monotonic():
+        return corpus
+    with _lock:
+        corpus = _current
+        if corpus is None or corpus.loaded_at + settings.quran_store_ttl_seconds <= time.monotonic():
+            corpus = _load(db)
+            # An invalidate() that landed mid-load means the rows may predate it
+            if corpus.generation == _generation:
+                _current = corpus
+    return corpus
+
+
+def invalidate() -> None:
+    """Drops the corpus; the next lookup reloads it."""
+    global _current, _generation
+    with _lock:
+        _generation += 1
+        _current = None
+
+
+def warm(db: Session) -> int:
+    """Loads the corpus and builds its search index. Returns the number of verses indexed."""
+    return len(_corpus(db).search_index)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOOKUPS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def source_id(db: Session):
+    """Id of the global Quran Foundation source (None if not synced)."""
+    return _corpus(db).source_id
+
+
+def id_for_title(db: Session, title: str):
+    return _corpus(db).by_title.get(title)
+
+
+def id_for_key(db: Session, verse_key: str):
+    """Id for a verse key like "2:255"."""
+    return _corpus(db).by_key.get(verse_key)
+
+
+def surah_ids(db: Session, surah: int) -> list:
+    return list(_corpus(db).by_surah.get(surah, []))
+
+
+def row(db: Session, item_id):
+    """Read-only column snapshot of a quran item (None if unknown)."""
+    return _corpus(db).rows.get(item_id)
+
+
+def item(db: Session, item_id):
+    """The quran ContentItem `item_id`, bound to `db` without a query."""
+    snapshot = _corpus(db).rows.get(item_id)
+    if snapshot is None:
+        return None
+    existing = db.identity_map.get(_IDENTITY((item_id,)))
+    if existing is not None:
+        return existing
+    obj = ContentItem(**{k: copy.deepcopy(v) if isinstance(v, (dict, list)) else v for k, v in snapshot.items()})
+    make_transient_to_detached(obj)
+    return db.merge(obj, load=False)
+
+
+def payload(db: Session, item_id):
+    """normalize_quran_verse() output for `item_id` (a fresh copy), or None."""
+    corpus = _corpus(db)
+    snapshot = corpus.rows.get(item_id)
+    if snapshot is None:
+        return None
+    normalized = corpus.payloads.get(item_id)
+    if normalized is None:
+        normalized = corpus.payloads[item_id] = normalize_quran_verse(snapshot)
+    return copy.deepcopy(normalized)
+
+
+def match_ids(db: Session, terms, slugs_only: bool = False) -> list:
+    """
+    Ids (in id order) whose text, title or topic slugs contain any of `terms`,
+    case-insensitively: the in-memory equivalent of the ILIKE '%term%' filters.
+    """
+    terms = [t.lower() for t in terms if t]
+    matched = []
+    for item_id, text, title, slugs in _corpus(db).haystacks:
+        for term in terms:
+            if term in slugs or (not slugs_only and (term in text or term in title)):
+                matched.append(item_id)
+                break
+    return matched
+
+
+def search_ids(db: Session, query: str, limit: int = 15, prefix: bool = False) -> list:
+    """Ranked top-`limit` ids for `query` from the search index (see quran_search)."""
+    return _corpus(db).search_index.search(query, limit, prefix=prefix)
+
+
+def arabic_fallback_id(db: Session, item_id):
+    """Another item for the same surah/ayah that carries Arabic text, if any."""
+    corpus = _corpus(db)
+    meta = (corpus.rows.get(item_id) or {}).get("meta") or {}
+    surah, ayah = meta.get("surah_number"), meta.get("verse_number")
+    if not surah or not ayah:
+        return None
+    return corpus.arabic_by_ref.get((str(surah), str(ayah)))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INVALIDATION HOOKS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _changes_corpus(obj, kind: str) -> bool:
+    if isinstance(obj, ContentSource):
+        # Deleting a source takes its items along; a new global QF source changes source_id
+        return kind == "deleted" or obj.source_type == "quran_foundation"
+    if not isinstance(obj, ContentItem) or obj.item_type != "quran":
+        return False
+    if kind != "dirty":
+        return True
+    state = inspect(obj)
+    return any(state.attrs[k].history.has_changes() for k in _COLUMNS)
+
+
+def _collect(obj, kind: str, changes: set) -> None:
+    if _changes_corpus(obj, kind):
+        changes.add(EVERYTHING)
+
+
+def _usage_only(orm_execute_state) -> bool:
+    """Bulk statements that only touch usage columns (or other tables) leave the corpus alone."""
+    if orm_execute_state.bind_mapper.class_ is not ContentItem:
+        return True
+    values = getattr(orm_execute_state.statement, "_values", None)
+    return bool(orm_execute_state.is_update and values and {getattr(k, "key", k) for k in values} <= _USAGE_COLUMNS)
+
+
+def _invalidate(changes: set) -> None:
+    invalidate()
+
+
+register_invalidation((ContentItem, ContentSource), _invalidate, collect=_collect, skip_bulk=_usage_only)
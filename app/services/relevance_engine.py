@@ -1,40 +1,40 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
+import hashlib
 import json
-from typing import Dict, Any
-from app.services.llm import get_client
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
-def validate_source_relevance(topic: str, content_text: str, reference: str = "") -> Dict[str, Any]:
-    """
-    Uses LLM to verify if a candidate piece of content is semantically relevant to a topic.
-    RELEVANCE GATE v2.0 (GPT-4o-Mini)
-    """
-    client = get_client()
-    if not client:
-        return {"accepted": True, "confidence": "low", "reason": "ai_offline_permissive"}
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-    # Optimization: If topic is very short, expand it slightly for the auditor
-    audit_topic = topic
-    if len(topic) < 15:
-        audit_topic = f"{topic} (including related concepts of spiritual wisdom, practice, and character)"
+from app.config import settings
+from app.db import SessionLocal
+from app.logging_setup import log_event
+from app.models import RelevanceVerdict
+from app.services.llm import get_client
+
+RELEVANCE_MODEL = "gpt-4o-mini"
 
-    prompt = f"""
+RELEVANCE_PROMPT = """
     You are a Content Integrity Auditor for Sabeel Studio, a premium Islamic platform.
-    
+
     TOPIC: {audit_topic}
     CONTENT (Reference: {reference}):
     "{content_text}"
-    
+
     TASK:
     Audit this candidate verse/text for a social media post about the provided topic.
-    
+
     STRICT REJECTION RULES:
     1. REJECT (accepted: false) if the text is about a specific historical event or story (e.g.Lot, Pharaoh, People of the City) that does NOT clearly illustrate the topic's attribute.
     2. REJECT if the connection is forced or weak.
     3. REJECT if the text is primarily about punishment, hellfire, or negative outcomes, unless the topic is specifically about 'Warning' or 'Consequences'.
     4. REJECT if the text is irrelevant (e.g. topic is 'Patience' but text is 15:67 "And the people of the city came rejoicing").
-    
+
     STRICT ACCEPTANCE RULES:
     1. ACCEPT only if a reader would immediately see the connection without needing a complex explanation.
     2. ACCEPT if the verse is one of the "Golden Verses" for this topic (e.g. 2:153 for Patience, 2:186 for Supplication).
@@ -47,9 +47,39 @@ def validate_source_relevance(topic: str, content_text: str, reference: str = ""
     }}
     """
 
+# Cached verdicts are only reused for the exact prompt + model that produced them:
+# any edit to RELEVANCE_PROMPT changes the version and retires old entries.
+PROMPT_VERSION = "v2-" + hashlib.sha256(f"{RELEVANCE_MODEL}\n{RELEVANCE_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+MAX_CONCURRENT_AUDITS = 3
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+def verdict_cache_key(topic: str, content_text: str, reference: str = "") -> str:
+    """Content-addressed key: sha256 of (normalized topic, reference, text, prompt version)."""
+    payload = json.dumps([_normalize(topic), _normalize(reference), _normalize(content_text), PROMPT_VERSION])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _audit_with_llm(topic: str, content_text: str, reference: str = "") -> Tuple[Dict[str, Any], bool]:
+    """Runs the LLM audit. Returns (verdict, cacheable) — errors and offline verdicts are never cached."""
+    client = get_client()
+    if not client:
+        return {"accepted": True, "confidence": "low", "reason": "ai_offline_permissive"}, False
+
+    # Optimization: If topic is very short, expand it slightly for the auditor
+    audit_topic = topic
+    if len(topic) < 15:
+        audit_topic = f"{topic} (including related concepts of spiritual wisdom, practice, and character)"
+
+    prompt = RELEVANCE_PROMPT.format(audit_topic=audit_topic, reference=reference, content_text=content_text)
+
     try:
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=RELEVANCE_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0
@@ -59,9 +89,133 @@ def validate_source_relevance(topic: str, content_text: str, reference: str = ""
         if result.get("confidence") == "low":
             result["accepted"] = False
             result["reason"] = f"Low confidence match: {result.get('reason')}"
-            
+
         print(f"🛡️ [RELEVANCE_GATE] topic='{topic}' ref='{reference}' -> {result['accepted']} ({result['confidence']})")
-        return result
+        return result, True
     except Exception as e:
         print(f"⚠️ [RELEVANCE_GATE] Error: {e}")
-        return {"accepted": False, "confidence": "low", "reason": f"error: {str(e)}"}
+        return {"accepted": False, "confidence": "low", "reason": f"error: {str(e)}"}, False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VERDICT CACHE (relevance_verdicts)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _load_cached(keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    if not keys:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = db.query(RelevanceVerdict).filter(
+            RelevanceVerdict.cache_key.in_(list(keys)),
+            RelevanceVerdict.expires_at > datetime.now(timezone.utc),
+        ).all()
+        return {
+            r.cache_key: {"accepted": r.accepted, "confidence": r.confidence, "reason": r.reason, "cached": True}
+            for r in rows
+        }
+    except Exception as e:
+        print(f"⚠️ [RELEVANCE_CACHE] Lookup failed: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def _store(entries: Sequence[Tuple[str, str, str, Dict[str, Any]]]) -> None:
+    """Upserts (cache_key, topic, reference, verdict) rows with a fresh TTL."""
+    if not entries:
+        return
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.relevance_cache_ttl_days)
+    rows = [{
+        "cache_key": key,
+        "prompt_version": PROMPT_VERSION,
+        "topic": topic,
+        "reference": reference,
+        "accepted": bool(verdict.get("accepted")),
+        "confidence": verdict.get("confidence"),
+        "reason": verdict.get("reason"),
+        "expires_at": expires_at,
+    } for key, topic, reference, verdict in entries]
+
+    db = SessionLocal()
+    try:
+        stmt = pg_insert(RelevanceVerdict).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RelevanceVerdict.cache_key],
+            set_={
+                "accepted": stmt.excluded.accepted,
+                "confidence": stmt.excluded.confidence,
+                "reason": stmt.excluded.reason,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ [RELEVANCE_CACHE] Store failed: {e}")
+    finally:
+        db.close()
+
+
+def purge_stale_verdicts(db) -> int:
+    """Deletes expired verdicts and those produced by an older prompt version."""
+    deleted = db.query(RelevanceVerdict).filter(or_(
+        RelevanceVerdict.expires_at <= datetime.now(timezone.utc),
+        RelevanceVerdict.prompt_version != PROMPT_VERSION,
+    )).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLIC API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def audit_candidates(topic: str, candidates: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Audits (content_text, reference) candidates for `topic`, in order.
+    Cached verdicts are served from Postgres; misses run concurrently against the LLM
+    and are written back to the cache.
+    """
+    if not candidates:
+        return []
+
+    keys = [verdict_cache_key(topic, text, ref) for text, ref in candidates]
+    cached = _load_cached(keys)
+
+    results: List[Optional[Dict[str, Any]]] = [cached.get(k) for k in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+
+    if misses:
+        # Identical candidates in the same batch are audited once
+        unique_misses = {}
+        for i in misses:
+            unique_misses.setdefault(keys[i], i)
+
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_AUDITS, len(unique_misses))) as pool:
+            futures = {
+                key: pool.submit(_audit_with_llm, topic, candidates[i][0], candidates[i][1])
+                for key, i in unique_misses.items()
+            }
+            audited = {key: f.result() for key, f in futures.items()}
+
+        for i in misses:
+            results[i] = dict(audited[keys[i]][0])
+
+        _store([
+            (key, topic, candidates[i][1], audited[key][0])
+            for key, i in unique_misses.items() if audited[key][1]
+        ])
+
+    log_event("relevance_audit_batch", topic=topic, candidates=len(candidates),
+              cache_hits=len(candidates) - len(misses), llm_calls=len({keys[i] for i in misses}))
+    return results
+
+
+def validate_source_relevance(topic: str, content_text: str, reference: str = "") -> Dict[str, Any]:
+    """
+    Uses LLM to verify if a candidate piece of content is semantically relevant to a topic.
+    RELEVANCE GATE v2.0 (GPT-4o-Mini), backed by the persistent verdict cache.
+    """
+    return audit_candidates(topic, [(content_text, reference)])[0]
@@ -6,56 +6,166 @@ rotation_engine.py — Intelligent Topic & Style Rotation for Automations
 ========================================================================
 
 Provides no-repeat rotation logic for automation topic and style pools.
-Used by automation_runner.py and automation_service.py.
+Used by automation_runner.py, automation_planner.py and automation_service.py.
 
 Key design decisions:
-- Zero schema migrations: state is stored in existing ContentUsage.meta (JSON column)
-  and TopicAutomation.flags (JSON column).
-- Graceful degradation: if usage records are missing or DB fails, falls back to
-  random selection so automation never silently fails.
+- Topic picks are kept in a compact ledger (RotationRecord: automation_id,
+  topic_hash, style_id, used_at). The no-repeat window is one aggregated
+  `GROUP BY automation_id, topic_hash ... MAX(used_at)` over the composite
+  index, for one automation or for a whole planning batch.
+- prune_rotation_ledger() (daily scheduler job) drops rows older than
+  ROTATION_LEDGER_RETENTION_DAYS, never inside an automation's avoid window.
+- The last style is the style_id of the automation's newest ledger row.
+- Graceful degradation: if the ledger can't be read, falls back to random
+  selection so automation never silently fails.
 - Works for both single-topic automations (pool=[topic_prompt]) and multi-topic.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import random
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
-logger = logging.getLogger(__name__)
+from app.config import settings
+from app.models import RotationRecord, TopicAutomation
 
-# ─────────────────────────────────────────────────────────────────────────────
-# CONSTANTS
-# ─────────────────────────────────────────────────────────────────────────────
+logger = logging.getLogger(__name__)
 
-_META_TOPIC_KEY = "rotation_topic"        # key inside ContentUsage.meta
-_META_STYLE_KEY = "rotation_style_id"     # key inside ContentUsage.meta
-_META_PAIR_KEY  = "rotation_pair"         # key inside ContentUsage.meta
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PUBLIC API
 # ─────────────────────────────────────────────────────────────────────────────
 
-def pick_topic(
-    topic_pool: list[str],
-    automation_id: int,
+def topic_hash(topic: str) -> int:
+    """Stable signed 64-bit key of a topic string (RotationRecord.topic_hash)."""
+    digest = hashlib.blake2b(topic.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def load_topic_history(
+    automation_ids: list[int],
     db: Session,
     avoid_days: int = 30,
+) -> dict[int, dict[int, datetime]]:
+    """
+    Last use of every topic picked inside the avoid window, for many automations
+    in one query. Returns {automation_id: {topic_hash: last_used_at}}; automations
+    without recent picks map to {}.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=avoid_days)
+    history: dict[int, dict[int, datetime]] = {a_id: {} for a_id in automation_ids}
+    if not automation_ids:
+        return history
+    rows = db.execute(
+        select(RotationRecord.automation_id, RotationRecord.topic_hash, func.max(RotationRecord.used_at))
+        .where(RotationRecord.automation_id.in_(automation_ids), RotationRecord.used_at >= cutoff)
+        .group_by(RotationRecord.automation_id, RotationRecord.topic_hash)
+    )
+    for automation_id, key, used_at in rows:
+        # SQLite hands back naive datetimes
+        history[automation_id][key] = used_at if used_at.tzinfo else used_at.replace(tzinfo=timezone.utc)
+    return history
+
+
+def read_topic_history(
+    automation_ids: list[int],
+    db: Session,
+    avoid_days: int = 30,
+) -> dict[int, dict[int, datetime]]:
+    """
+    load_topic_history() that never fails the caller: the read runs in a
+    savepoint, and if the ledger can't be read every automation gets an empty
+    history (choose_topic then picks at random).
+    """
+    try:
+        # Savepoint: a failed read must not leave the caller's transaction aborted
+        with db.begin_nested():
+            return load_topic_history(automation_ids, db, avoid_days)
+    except Exception as e:
+        logger.warning(f"[ROTATION] load_topic_history failed gracefully: {e}")
+        return {a_id: {} for a_id in automation_ids}
+
+
+def choose_topic(
+    topic_pool: list[str],
+    last_used: dict[int, datetime],
+    avoid_days: int = 30,
 ) -> str:
     """
-    Pick the best next topic from the pool.
+    Pick the best next topic from the pool, given its recent history.
 
     Algorithm:
-    1. Build a set of topics used within `avoid_days` (the exclusion window).
-    2. Candidates = pool entries NOT in the exclusion window.
+    1. Topics whose last use (`last_used`, from load_topic_history) falls
+       within `avoid_days` are excluded.
+    2. Candidates = pool entries NOT in the exclusion window; pick randomly
+       (equal probability) to avoid pattern.
     3. If no candidates (all excluded), relax to the full pool and pick the
        LEAST recently used topic.
-    4. Within candidates, pick randomly (equal probability) to avoid pattern.
-    5. If the pool has only one entry, always return it.
+    4. If the pool has only one entry, always return it.
+    """
+    if not topic_pool:
+        return ""
+    if len(topic_pool) == 1:
+        return topic_pool[0]
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=avoid_days)
+    used_at = {t: last_used.get(topic_hash(t), _EPOCH) for t in topic_pool}
+    candidates = [t for t in topic_pool if used_at[t] < cutoff]
+    if candidates:
+        chosen = random.choice(candidates)
+        logger.info(f"[ROTATION] topic={chosen!r} (from {len(candidates)} fresh candidates, "
+                    f"{len(topic_pool) - len(candidates)} excluded)")
+        return chosen
+
+    # All topics are within the window — pick the least recently used
+    chosen = min(topic_pool, key=used_at.__getitem__)
+    logger.info(f"[ROTATION] topic={chosen!r} (all excluded, relaxed to LRU)")
+    return chosen
+
+
+def pick_topics(
+    topic_pools: dict[int, list[str]],
+    db: Session,
+    avoid_days: int | dict[int, int] = 30,
+) -> dict[int, str]:
+    """
+    Batch pick_topic(): one topic per automation, with a single ledger query.
+
+    Args:
+        topic_pools: {automation_id: topic pool}.
+        db:          SQLAlchemy session.
+        avoid_days:  One window for all automations, or {automation_id: days}.
+
+    Returns:
+        {automation_id: topic}.
+    """
+    windows = avoid_days if isinstance(avoid_days, dict) else dict.fromkeys(topic_pools, avoid_days)
+    needs_history = [a_id for a_id, pool in topic_pools.items() if len(pool) > 1]
+    history = read_topic_history(
+        needs_history, db, max((windows.get(a_id, 30) for a_id in needs_history), default=30),
+    )
+    return {
+        a_id: choose_topic(pool, history.get(a_id, {}), windows.get(a_id, 30))
+        for a_id, pool in topic_pools.items()
+    }
+
+
+def pick_topic(
+    topic_pool: list[str],
+    automation_id: int,
+    db: Session,
+    avoid_days: int = 30,
+) -> str:
+    """
+    Pick the best next topic from the pool (see choose_topic for the algorithm).
 
     Args:
         topic_pool:   List of topic strings configured by the user.
@@ -66,59 +176,7 @@ def pick_topic(
     Returns:
         A topic string from the pool.
     """
-    if not topic_pool:
-        return ""
-    if len(topic_pool) == 1:
-        return topic_pool[0]
-
-    try:
-        usages = _load_topic_usages(automation_id, db)
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(days=avoid_days)
-
-        # Topics used recently (within window)
-        recently_used: set[str] = set()
-        last_used_at: dict[str, datetime] = {}
-
-        for u in usages:
-            topic_val = u.get(_META_TOPIC_KEY)
-            used_at_str = u.get("used_at")
-            if not topic_val or not used_at_str:
-                continue
-            try:
-                used_at = datetime.fromisoformat(used_at_str)
-                # Normalize to UTC-aware
-                if used_at.tzinfo is None:
-                    used_at = used_at.replace(tzinfo=timezone.utc)
-            except Exception:
-                continue
-
-            last_used_at[topic_val] = max(last_used_at.get(topic_val, used_at), used_at)
-            if used_at >= cutoff:
-                recently_used.add(topic_val)
-
-        # Candidates: not used within the avoid window
-        candidates = [t for t in topic_pool if t not in recently_used]
-
-        if candidates:
-            chosen = random.choice(candidates)
-            logger.info(f"[ROTATION] automation_id={automation_id} topic={chosen!r} "
-                        f"(from {len(candidates)} fresh candidates, {len(recently_used)} excluded)")
-            return chosen
-
-        # All topics are within the window — pick the least recently used
-        pool_sorted = sorted(
-            topic_pool,
-            key=lambda t: last_used_at.get(t, datetime.min.replace(tzinfo=timezone.utc))
-        )
-        chosen = pool_sorted[0]
-        logger.info(f"[ROTATION] automation_id={automation_id} topic={chosen!r} "
-                    f"(all excluded, relaxed to LRU)")
-        return chosen
-
-    except Exception as e:
-        logger.warning(f"[ROTATION] pick_topic failed gracefully: {e}")
-        return random.choice(topic_pool)
+    return pick_topics({automation_id: topic_pool}, db, avoid_days)[automation_id]
 
 
 def pick_style(
@@ -136,7 +194,7 @@ def pick_style(
 
     Args:
         style_dna_pool: List of StyleDNA IDs configured for this automation.
-        last_style_id:  The style DNA ID used in the previous run (from flags).
+        last_style_id:  The style DNA ID used in the previous run (last_style_id()).
 
     Returns:
         A StyleDNA ID integer, or None if the pool is empty.
@@ -163,11 +221,8 @@ def record_topic_used(
     db: Session,
 ) -> None:
     """
-    Record a topic (and optional style) usage in ContentUsage.meta.
-    This powers the no-repeat window for the next run.
-
-    Also updates TopicAutomation.flags["last_style_id"] so the next call to
-    pick_style() can avoid the current style.
+    Record a topic (and optional style) pick in the rotation ledger.
+    This powers the no-repeat window and last_style_id() for the next run.
 
     Args:
         automation_id: ID of the automation.
@@ -176,33 +231,15 @@ def record_topic_used(
         db:            SQLAlchemy session.
     """
     try:
-        from app.models import ContentUsage, TopicAutomation
-        now = datetime.now(timezone.utc)
-
-        usage = ContentUsage(
-            automation_id=automation_id,
-            content_item_id=None,      # not a content item
-            status="rotation_record",
-            used_at=now,
-            meta={
-                _META_TOPIC_KEY: topic,
-                _META_STYLE_KEY: style_id,
-                _META_PAIR_KEY: f"{topic}|{style_id}",
-                "used_at": now.isoformat(),
-                "record_type": "rotation",
-            },
-        )
-        db.add(usage)
-
-        # Persist last_style_id into automation.flags for next run
-        if style_id is not None:
-            auto = db.get(TopicAutomation, automation_id)
-            if auto:
-                flags = dict(auto.flags or {})
-                flags["last_style_id"] = style_id
-                auto.flags = flags
-
-        db.flush()  # Don't commit here — caller controls the transaction
+        # Savepoint: a failed insert must not poison the caller's transaction
+        with db.begin_nested():
+            db.add(RotationRecord(
+                automation_id=automation_id,
+                topic_hash=topic_hash(topic),
+                style_id=style_id,
+                used_at=datetime.now(timezone.utc),
+            ))
+        # Don't commit here — caller controls the transaction
         logger.info(f"[ROTATION] Recorded usage: automation_id={automation_id} "
                     f"topic={topic!r} style_id={style_id}")
 
@@ -210,30 +247,31 @@ def record_topic_used(
         logger.warning(f"[ROTATION] record_topic_used failed gracefully: {e}")
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# INTERNAL HELPERS
-# ─────────────────────────────────────────────────────────────────────────────
-
-def _load_topic_usages(automation_id: int, db: Session) -> list[dict]:
-    """
-    Load rotation usage records for an automation from ContentUsage.
-    Returns a list of meta dicts, most recent first.
-    """
+def last_style_id(automation_id: int, db: Session) -> Optional[int]:
+    """StyleDNA ID of the automation's latest styled run, for pick_style()."""
     try:
-        from app.models import ContentUsage
-        from sqlalchemy import select, desc
-
-        stmt = (
-            select(ContentUsage)
-            .where(
-                ContentUsage.automation_id == automation_id,
-                ContentUsage.status == "rotation_record",
+        with db.begin_nested():
+            return db.scalar(
+                select(RotationRecord.style_id)
+                .where(RotationRecord.automation_id == automation_id, RotationRecord.style_id != None)
+                .order_by(RotationRecord.used_at.desc())
+                .limit(1)
             )
-            .order_by(desc(ContentUsage.used_at))
-            .limit(200)   # Enough for 30-day window at 3× daily
-        )
-        rows = db.execute(stmt).scalars().all()
-        return [row.meta for row in rows if row.meta]
     except Exception as e:
-        logger.warning(f"[ROTATION] _load_topic_usages failed: {e}")
-        return []
+        logger.warning(f"[ROTATION] last_style_id failed gracefully: {e}")
+        return None
+
+
+def prune_rotation_ledger(db: Session, retention_days: int | None = None) -> int:
+    """
+    Deletes ledger rows older than `retention_days` (default
+    ROTATION_LEDGER_RETENTION_DAYS), stretched to the longest avoid window of
+    any automation so pruning never re-opens a topic early. Commits and
+    returns the number of rows removed.
+    """
+    retention_days = retention_days or settings.rotation_ledger_retention_days
+    longest_window = db.scalar(select(func.max(TopicAutomation.avoid_repeat_days))) or 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max(retention_days, longest_window))
+    result = db.execute(delete(RotationRecord).where(RotationRecord.used_at < cutoff))
+    db.commit()
+    return result.rowcount or 0
@@ -1,19 +1,29 @@
 # Copyright (c) 2026 Mohammed Hassan. All rights reserved.
 # Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
 
-from datetime import datetime, timezone
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
 from typing import Callable
 import pytz
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, and_
 from sqlalchemy.orm import Session
 
 from app.models import Post, IGAccount, TopicAutomation
+from app.services import media_registry, media_storage
 from app.services.publisher import publish_to_instagram
 from app.services.automation_runner import run_automation_once
 from app.services.backups import backup_postgres_database
+from app.config import settings
+from app.logging_setup import log_event
+
+# Serializes reconciliation: UI edits can reload jobs from several request threads
+_sync_lock = threading.Lock()
 
 def run_automation_job(db_factory: Callable[[], Session], automation_id: int):
     """Execution wrapper for background automation jobs."""
@@ -23,124 +33,358 @@ def run_automation_job(db_factory: Callable[[], Session], automation_id: int):
     finally:
         db.close()
 
-def sync_automation_jobs(sched: BackgroundScheduler, db_factory: Callable[[], Session]):
-    """
-    Syncs the scheduler with all enabled TopicAutomations in the database.
-    Removes existing auto jobs and re-adds them.
-    """
-    import time
-    t0 = time.time()
-    
-    # 1. Clean up old jobs
-    for job in list(sched.get_jobs()):
-        if job.id.startswith("auto_"):
-            sched.remove_job(job.id)
+def run_rotation_ledger_prune(db_factory: Callable[[], Session]):
+    """Daily retention job for the topic rotation ledger."""
+    from app.services.rotation_engine import prune_rotation_ledger
+    db = db_factory()
+    try:
+        log_event("rotation_ledger_pruned", deleted=prune_rotation_ledger(db))
+    finally:
+        db.close()
+
+def run_cdn_push_retry(db_factory: Callable[[], Session]):
+    """Periodic retry of media CDN pushes that failed or were lost to a restart."""
+    db = db_factory()
+    try:
+        pushed = media_storage.retry_cdn_pushes(db)
+        if pushed:
+            log_event("media_cdn_pushes_retried", pushed=pushed)
+    finally:
+        db.close()
+
+def run_media_release_sweep(db_factory: Callable[[], Session]):
+    """Periodic deletion of released (unreferenced) media objects."""
+    db = db_factory()
+    try:
+        media_storage.sweep_released_media(db)
+    finally:
+        db.close()
 
-    # 2. Add enabled jobs
+def run_automation_plan_job(db_factory: Callable[[], Session], automation_id: int):
+    """Execution wrapper for batch day-planning jobs (planning_mode="batch_daily")."""
+    from app.services.automation_planner import plan_automation_day
     db = db_factory()
     try:
-        enabled_autos = db.query(TopicAutomation).filter(TopicAutomation.enabled == True).all()
-        for auto in enabled_autos:
-            acc = db.query(IGAccount).get(auto.ig_account_id)
-            if not acc: continue
-            
-            time_str = auto.post_time_local or acc.daily_post_time or "09:00"
-            tz_str = auto.timezone or acc.timezone or "UTC"
+        plan_automation_day(db, automation_id)
+    finally:
+        db.close()
+
+def _job_name(automation_id: int, hour: int, minute: int, tz_str: str, jitter) -> str:
+    """
+    Job name encoding the schedule, e.g. "automation 12 @ 09:30 Europe/London".
+    Reconciliation compares names, so unchanged jobs need no trigger built.
+    """
+    name = f"automation {automation_id} @ {hour:02d}:{minute:02d} {tz_str}"
+    return f"{name} ~{jitter}s" if jitter else name
+
+
+def _desired_automation_jobs(db: Session) -> dict:
+    """
+    job id -> (func, automation_id, hour, minute, timezone, jitter) for every
+    enabled automation whose IG account exists, from one joined query.
+    """
+    rows = db.execute(
+        select(
+            TopicAutomation.id,
+            TopicAutomation.post_time_local,
+            TopicAutomation.timezone,
+            TopicAutomation.posts_per_day,
+            TopicAutomation.post_spacing_hours,
+            TopicAutomation.planning_mode,
+            IGAccount.daily_post_time,
+            IGAccount.timezone.label("account_timezone"),
+        )
+        .join(IGAccount, IGAccount.id == TopicAutomation.ig_account_id)
+        .where(TopicAutomation.enabled == True)
+    ).all()
+
+    desired = {}
+    for row in rows:
+        time_str = row.post_time_local or row.daily_post_time or "09:00"
+        tz_str = row.timezone or row.account_timezone or "UTC"
+        try:
+            base_hour, minute = map(int, time_str.split(":"))
+            posts_per_day = row.posts_per_day or 1
+            spacing = row.post_spacing_hours if row.post_spacing_hours is not None else 4
+
+            if row.planning_mode == "batch_daily" and posts_per_day > 1:
+                # One planning pass ahead of the first slot; the publish tick publishes the drafts
+                plan_at = (base_hour * 60 + minute - settings.automation_plan_lead_minutes) % (24 * 60)
+                desired[f"auto_plan_{row.id}"] = (
+                    run_automation_plan_job, row.id, plan_at // 60, plan_at % 60, tz_str,
+                    settings.automation_plan_jitter_seconds or None,
+                )
+                continue
+
+            for i in range(posts_per_day):
+                post_hour = (base_hour + (i * spacing)) % 24
+                desired[f"auto_{row.id}_{i}"] = (run_automation_job, row.id, post_hour, minute, tz_str, None)
+        except Exception as e:
+            print(f"FAILED TO SCHEDULE AUTO {row.id}: {e}")
+    return desired
+
+
+def sync_automation_jobs(sched: BackgroundScheduler, db_factory: Callable[[], Session]) -> dict:
+    """
+    Reconciles the scheduler's auto_* jobs with the enabled TopicAutomations:
+    adds missing jobs, reschedules jobs whose time / timezone changed and
+    removes jobs of disabled / deleted automations. Unchanged jobs are left
+    alone, so the scheduler is never emptied mid-sync. Returns the counts.
+    """
+    started = time.perf_counter()
+    added = updated = removed = failed = 0
+    with _sync_lock:
+        # Read under the lock: a sync that queried before a concurrent edit must not apply after it
+        db = db_factory()
+        try:
+            desired = _desired_automation_jobs(db)
+        finally:
+            db.close()
+        existing = {job.id: job for job in sched.get_jobs() if job.id.startswith("auto_")}
+
+        for job_id in existing.keys() - desired.keys():
+            sched.remove_job(job_id)
+            removed += 1
+
+        for job_id, (func, automation_id, hour, minute, tz_str, jitter) in desired.items():
+            job = existing.get(job_id)
+            name = _job_name(automation_id, hour, minute, tz_str, jitter)
+            if job is not None and job.name == name:
+                continue
             try:
-                base_hour, minute = map(int, time_str.split(":"))
-                posts_per_day = getattr(auto, 'posts_per_day', 1)
-                spacing = getattr(auto, 'post_spacing_hours', 4)
-                
-                for i in range(posts_per_day):
-                    post_hour = (base_hour + (i * spacing)) % 24
+                trigger = CronTrigger(hour=hour, minute=minute, timezone=tz_str, jitter=jitter)
+                if job is None:
                     sched.add_job(
-                        run_automation_job,
-                        trigger=CronTrigger(hour=post_hour, minute=minute, timezone=tz_str),
-                        args=[db_factory, auto.id],
-                        id=f"auto_{auto.id}_{i}",
+                        func,
+                        trigger=trigger,
+                        args=[db_factory, automation_id],
+                        id=job_id,
+                        name=name,
                         replace_existing=True,
                         max_instances=1
                     )
+                    added += 1
+                else:
+                    sched.modify_job(job_id, name=name)
+                    sched.reschedule_job(job_id, trigger=trigger)
+                    updated += 1
+            except Exception as e:
+                print(f"FAILED TO SCHEDULE AUTO {automation_id}: {e}")
+                failed += 1
+
+    counts = {
+        "jobs": len(desired),
+        "added": added,
+        "updated": updated,
+        "removed": removed,
+        "failed": failed,
+        "unchanged": len(desired) - added - updated - failed,
+    }
+    log_event("automation_jobs_synced", duration_ms=int((time.perf_counter() - started) * 1000), **counts)
+    return counts
+
+def _claim_due_posts(db: Session, now: datetime) -> list[tuple[int, int, datetime]]:
+    """
+    Atomically claims a batch of due posts for this process.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED and flipped to "publishing" in the
+    same short transaction, so concurrent ticks (other workers or replicas) skip
+    them instead of double-publishing. Claims left behind by a crashed worker are
+    re-claimed once they are older than the claim timeout. The claim is stamped
+    `updated_at = now`; _publish_account_queue renews it as each post starts.
+    """
+    stale_before = now - timedelta(minutes=settings.publish_claim_timeout_minutes)
+    stmt = (
+        select(Post)
+        .join(IGAccount, IGAccount.id == Post.ig_account_id)
+        .where(IGAccount.active == True)
+        .where(Post.scheduled_time <= now)
+        .where(or_(
+            Post.status == "scheduled",
+            and_(Post.status == "publishing", Post.updated_at < stale_before),
+        ))
+        .order_by(Post.scheduled_time.asc())
+        .limit(settings.publish_batch_size)
+        .with_for_update(skip_locked=True, of=Post)
+    )
+    posts = db.execute(stmt).scalars().all()
+    claimed = []
+    for post in posts:
+        post.status = "publishing"
+        post.updated_at = now
+        scheduled = post.scheduled_time
+        if scheduled and scheduled.tzinfo is None:
+            scheduled = scheduled.replace(tzinfo=timezone.utc)
+        claimed.append((post.id, post.ig_account_id, scheduled))
+    db.commit()
+    return claimed
+
+def _publish_claimed_post(db: Session, post: Post) -> bool:
+    """Publishes one claimed post and records the outcome. Returns True on success."""
+    acc = db.get(IGAccount, post.ig_account_id)
+    if not acc or not acc.active:
+        post.status = "scheduled"
+        db.commit()
+        return False
+
+    # PROACTIVE SHIELD: Stale Scavenger check
+    # If the media is local (/uploads/) and physically missing, fail the post early
+    media_url = post.media_url
+    if post.media_url and "/uploads/" in post.media_url:
+        filename = post.media_url.split("/uploads/")[-1]
+        if media_registry.locate(filename, verify=True) is None:
+            cdn_url = media_storage.cdn_url(post.media_url)
+            if cdn_url:
+                # The local copy is gone but its CDN copy landed: publish from the CDN.
+                # The row keeps its content-key URL; media_cdn_copies maps it to the CDN.
+                print(f"♻️ [SCAVENGER] Post {post.id}: {filename} missing from disk, using its CDN copy.")
+                media_url = cdn_url
+            else:
+                print(f"⚠️ [SCAVENGER] Purging stale post {post.id} (file {filename} missing from disk).")
+                post.status = "failed"
+                post.flags = {**(post.flags or {}), "publish_error": "Media wiped from ephemeral storage after restart (stale scavenger)."}
+                db.commit()
+                return False
+
+    caption_full = post.caption or ""
+    if post.hashtags:
+        caption_full += "\n\n" + " ".join(post.hashtags)
+
+    result = publish_to_instagram(
+        caption=caption_full, 
+        media_url=media_url,
+        ig_user_id=acc.ig_user_id,
+        access_token=acc.access_token
+    )
+
+    if isinstance(result, dict) and result.get("ok"):
+        post.status = "published"
+        post.published_time = datetime.now(timezone.utc)
+        db.commit()
+        return True
+
+    post.status = "failed"
+    error_info = result.get("error") if isinstance(result, dict) else str(result)
+    post.flags = {**(post.flags or {}), "publish_error": error_info}
+    db.commit()
+    return False
+
+def _renew_claim(db: Session, post_id: int, claimed_at: datetime) -> datetime | None:
+    """
+    Re-stamps a post's claim just before it is published, so posts waiting behind
+    slow ones in the same account queue don't age past the claim timeout and get
+    re-claimed by another worker. Returns the new stamp, or None if the claim was
+    lost (re-claimed meanwhile, or the post was changed).
+    """
+    renewed_at = datetime.now(timezone.utc)
+    result = db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.status == "publishing", Post.updated_at == claimed_at)
+        .values(updated_at=renewed_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return renewed_at if result.rowcount else None
+
+def _publish_account_queue(
+    db_factory: Callable[[], Session], ig_account_id: int, post_ids: list[int], claimed_at: datetime
+) -> int:
+    """
+    Worker task: publishes one IG account's claimed posts in order.
+    Posts for the same account are never published concurrently.
+    """
+    db = db_factory()
+    published = 0
+    try:
+        for post_id in post_ids:
+            if _renew_claim(db, post_id, claimed_at) is None:
+                continue
+            post = db.get(Post, post_id)
+            if not post:
+                continue
+            started = time.perf_counter()
+            try:
+                ok = _publish_claimed_post(db, post)
             except Exception as e:
-                print(f"FAILED TO SCHEDULE AUTO {auto.id}: {e}")
+                db.rollback()
+                print(f"❌ [PUBLISH_POOL] post {post_id} crashed: {e}")
+                post = db.get(Post, post_id)
+                if post:
+                    post.status = "failed"
+                    post.flags = {**(post.flags or {}), "publish_error": f"Publish worker error: {e}"}
+                    db.commit()
+                ok = False
+            published += int(ok)
+            log_event(
+                "publish_post_done",
+                post_id=post_id,
+                ig_account_id=ig_account_id,
+                ok=ok,
+                duration_ms=int((time.perf_counter() - started) * 1000),
+            )
     finally:
         db.close()
-        print(f"DIAGNOSTIC: sync_automation_jobs took {time.time()-t0:.4f}s")
+    return published
 
 def publish_due_posts(db_factory: Callable[[], Session]) -> int:
     """
     Check for any scheduled posts that are due (scheduled_time <= now).
     This runs every minute to handle all accounts/orgs.
+
+    Due posts are claimed with FOR UPDATE SKIP LOCKED, then published by a bounded
+    thread pool (PUBLISH_MAX_WORKERS) with one sequential queue per IG account, so a
+    slow Graph API response only delays that account's posts.
     """
     db = db_factory()
     try:
         now = datetime.now(timezone.utc)
-        stmt = (
-            select(Post)
-            .where(Post.status == "scheduled")
-            .where(Post.scheduled_time <= now)
-            .order_by(Post.scheduled_time.asc())
-        )
-        posts = db.execute(stmt).scalars().all()
-        
-        if not posts:
+        claimed = _claim_due_posts(db, now)
+        if not claimed:
             return 0
 
-        published = 0
-        for post in posts:
-            acc = db.get(IGAccount, post.ig_account_id)
-            if not acc or not acc.active:
-                continue
-
-            # PROACTIVE SHIELD: Stale Scavenger check
-            # If the media is local (/uploads/) and physically missing, fail the post early
-            if post.media_url and "/uploads/" in post.media_url:
-                import os
-                from app.config import settings
-                filename = post.media_url.split("/uploads/")[-1]
-                local_path = os.path.join(settings.uploads_dir, filename)
-                if not os.path.exists(local_path):
-                    print(f"⚠️ [SCAVENGER] Purging stale post {post.id} (file {filename} missing from disk).")
-                    post.status = "failed"
-                    post.flags = {**(post.flags or {}), "publish_error": "Media wiped from ephemeral storage after restart (stale scavenger)."}
-                    db.commit()
-                    continue
+    finally:
+        db.close()
 
-            caption_full = post.caption or ""
-            if post.hashtags:
-                caption_full += "\n\n" + " ".join(post.hashtags)
+    lags = [(now - scheduled).total_seconds() for _, _, scheduled in claimed if scheduled]
+    queues: dict[int, list[int]] = defaultdict(list)
+    for post_id, ig_account_id, _ in claimed:
+        queues[ig_account_id].append(post_id)
 
-            result = publish_to_instagram(
-                caption=caption_full, 
-                media_url=post.media_url,
-                ig_user_id=acc.ig_user_id,
-                access_token=acc.access_token
-            )
+    log_event(
+        "publish_queue_lag",
+        claimed=len(claimed),
+        accounts=len(queues),
+        max_lag_seconds=int(max(lags)) if lags else 0,
+        avg_lag_seconds=int(sum(lags) / len(lags)) if lags else 0,
+    )
 
-            if isinstance(result, dict) and result.get("ok"):
-                post.status = "published"
-                post.published_time = datetime.now(timezone.utc)
-                db.commit()
-                published += 1
-            else:
-                post.status = "failed"
-                error_info = result.get("error") if isinstance(result, dict) else str(result)
-                post.flags = {**(post.flags or {}), "publish_error": error_info}
-                db.commit()
+    started = time.perf_counter()
+    published = 0
+    workers = max(1, min(settings.publish_max_workers, len(queues)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish") as pool:
+        futures = [pool.submit(_publish_account_queue, db_factory, acc_id, ids, now) for acc_id, ids in queues.items()]
+        for fut in as_completed(futures):
+            try:
+                published += fut.result()
+            except Exception as e:
+                print(f"❌ [PUBLISH_POOL] account queue failed: {e}")
 
-        return published
-    finally:
-        db.close()
+    log_event(
+        "publish_tick_done",
+        claimed=len(claimed),
+        published=published,
+        workers=workers,
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
+    return published
 
-# Global reference to scheduler for reloading
+# Global reference to scheduler (and the session factory its jobs use) for reloading.
+# With leader election, _global_scheduler is only set in the process that leads.
 _global_scheduler = None
+_global_db_factory = None
+_global_leader = None
 
-def start_scheduler(db_factory: Callable[[], Session]):
-    """
-    Start a BackgroundScheduler that checks for due posts every minute 
-    and handles topic automations.
-    """
-    global _global_scheduler
+def _build_scheduler(db_factory: Callable[[], Session]) -> BackgroundScheduler:
     sched = BackgroundScheduler()
     
     # 1. Standard per-minute publishing check
@@ -154,8 +398,17 @@ def start_scheduler(db_factory: Callable[[], Session]):
         max_instances=1
     )
 
-    # 2. Daily Automation Jobs
+    # 2. Daily Automation Jobs (+ a periodic resync in case a reload was missed)
     sync_automation_jobs(sched, db_factory)
+    sched.add_job(
+        sync_automation_jobs,
+        trigger="interval",
+        minutes=settings.scheduler_resync_minutes,
+        args=[sched, db_factory],
+        id="resync_automation_jobs",
+        replace_existing=True,
+        max_instances=1
+    )
 
     # 3. Daily Database Backups
     sched.add_job(
@@ -166,11 +419,101 @@ def start_scheduler(db_factory: Callable[[], Session]):
         max_instances=1
     )
 
-    sched.start()
-    _global_scheduler = sched
+    # 4. Rotation ledger retention
+    sched.add_job(
+        run_rotation_ledger_prune,
+        trigger=CronTrigger(hour=3, minute=30, timezone="UTC"),
+        args=[db_factory],
+        id="daily_rotation_ledger_prune",
+        replace_existing=True,
+        max_instances=1
+    )
+
+    # 5. Media CDN pushes that failed or were lost to a restart
+    sched.add_job(
+        run_cdn_push_retry,
+        trigger="interval",
+        minutes=settings.media_cdn_retry_minutes,
+        args=[db_factory],
+        id="retry_cdn_pushes",
+        replace_existing=True,
+        max_instances=1
+    )
+
+    # 6. Released media: deleted once it has stayed unreferenced for the grace period
+    sched.add_job(
+        run_media_release_sweep,
+        trigger="interval",
+        minutes=settings.media_release_sweep_minutes,
+        args=[db_factory],
+        id="sweep_released_media",
+        replace_existing=True,
+        max_instances=1
+    )
     return sched
 
-def reload_automation_jobs(db_factory: Callable[[], Session]):
-    """Helper to refresh automation jobs when settings change in UI."""
+def start_scheduler(db_factory: Callable[[], Session]):
+    """
+    Start a BackgroundScheduler that checks for due posts every minute 
+    and handles topic automations.
+
+    With SCHEDULER_LEADER_ELECTION (default) every process campaigns for a
+    Postgres advisory lock and only the leader runs the scheduler, so N web
+    workers / replicas don't fire every job N times. Returns the SchedulerLeader
+    in that mode, the running scheduler otherwise.
+    """
+    global _global_scheduler, _global_db_factory, _global_leader
+    _global_db_factory = db_factory
+
+    if not settings.scheduler_leader_election:
+        sched = _build_scheduler(db_factory)
+        sched.start()
+        _global_scheduler = sched
+        return sched
+
+    from app.services.scheduler_leader import SchedulerLeader
+
+    def on_elected():
+        global _global_scheduler
+        sched = _build_scheduler(db_factory)
+        sched.start()
+        _global_scheduler = sched
+
+    def on_demoted():
+        global _global_scheduler
+        sched, _global_scheduler = _global_scheduler, None
+        if sched:
+            sched.shutdown(wait=False)
+
+    db = db_factory()
+    try:
+        engine = db.get_bind()
+    finally:
+        db.close()
+    _global_leader = SchedulerLeader(
+        engine,
+        on_elected=on_elected,
+        on_demoted=on_demoted,
+        on_notify=reload_automation_jobs,
+        poll_seconds=settings.scheduler_leader_poll_seconds,
+    ).start()
+    return _global_leader
+
+def reload_automation_jobs():
+    """
+    Helper to refresh automation jobs when settings change in UI (call it after
+    committing). Uses the scheduler's own session factory, never the request's
+    session, so new jobs don't capture a session bound to a finished request.
+    In a process that isn't the scheduler leader, the leader is notified instead.
+    """
     if _global_scheduler:
-        sync_automation_jobs(_global_scheduler, db_factory)
\ No newline at end of file
+        sync_automation_jobs(_global_scheduler, _global_db_factory)
+    elif _global_leader:
+        from app.services.scheduler_leader import notify_jobs_changed
+        db = _global_db_factory()
+        try:
+            notify_jobs_changed(db.get_bind())
+        except Exception as e:
+            print(f"⚠️ [SCHEDULER] Could not notify the scheduler leader: {e}")
+        finally:
+            db.close()
@@ -0,0 +1,201 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Cluster-wide coordination for the background scheduler (Postgres advisory locks).
+
+Every app process (uvicorn worker / replica) starts a SchedulerLeader, but only
+the one holding the "scheduler" advisory lock runs jobs; the others stand by and
+retry every SCHEDULER_LEADER_POLL_SECONDS. The lock lives on a dedicated
+connection, so when the leader exits or its connection drops Postgres releases it
+and a standby takes over.
+
+Automation jobs are derived from the database, so a new leader simply rebuilds
+them (sync_automation_jobs). Processes that are not leading forward "jobs
+changed" to the leader with NOTIFY (notify_jobs_changed).
+
+try_advisory_lock() is the non-blocking per-object variant, used to keep one
+automation from running in two processes at once; advisory_lock() blocks, for
+short critical sections such as storing / deleting a media object.
+"""
+
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from app.logging_setup import log_event
+
+JOBS_CHANNEL = "scheduler_jobs_changed"
+
+
+def lock_key(name: str) -> int:
+    """Stable int4 advisory-lock key for a lock name."""
+    return zlib.crc32(name.encode()) - 2 ** 31
+
+
+@contextmanager
+def try_advisory_lock(engine: Engine, name: str, object_id: int = 0):
+    """
+    Non-blocking cross-process lock on (name, object_id). Yields True when held,
+    False when another process holds it. Non-Postgres binds (tests) always get it.
+    """
+    if getattr(getattr(engine, "dialect", None), "name", None) != "postgresql":
+        yield True
+        return
+
+    key = lock_key(name)
+    conn = engine.connect()
+    try:
+        acquired = bool(conn.execute(select(func.pg_try_advisory_lock(key, object_id))).scalar())
+        conn.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    conn.execute(select(func.pg_advisory_unlock(key, object_id)))
+                    conn.commit()
+                except Exception:
+                    # Never hand a connection still holding the lock back to the pool
+                    conn.invalidate()
+    finally:
+        conn.close()
+
+
+@contextmanager
+def advisory_lock(engine: Engine, name: str, object_id: int = 0):
+    """
+    Blocking cross-process lock on (name, object_id). Yields the connection
+    holding it, for work that belongs under the lock. Non-Postgres binds (tests)
+    get a plain connection.
+    """
+    conn = engine.connect()
+    try:
+        if getattr(engine.dialect, "name", None) != "postgresql":
+            yield conn
+            return
+        key = lock_key(name)
+        conn.execute(select(func.pg_advisory_lock(key, object_id)))
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            try:
+                conn.execute(select(func.pg_advisory_unlock(key, object_id)))
+                conn.commit()
+            except Exception:
+                conn.invalidate()
+    finally:
+        conn.close()
+
+
+def notify_jobs_changed(engine: Engine) -> None:
+    """Asks the current leader (whichever process it is) to resync automation jobs."""
+    with engine.begin() as conn:
+        conn.execute(select(func.pg_notify(JOBS_CHANNEL, "")))
+
+
+class SchedulerLeader:
+    """
+    Leader election thread. `on_elected` / `on_demoted` run on this thread when
+    leadership is won / lost; `on_notify` when a jobs-changed NOTIFY arrives while
+    leading.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        on_notify: Optional[Callable[[], None]] = None,
+        name: str = "scheduler",
+        poll_seconds: float = 10,
+    ):
+        # Own connection outside the app pool: the lock must outlive every request
+        self._engine = create_engine(engine.url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_notify = on_notify
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "SchedulerLeader":
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-leader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """Stops campaigning; leadership is released within poll_seconds."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout if timeout is not None else self.poll_seconds + 5)
+
+    def _promote(self):
+        self.is_leader = True
+        log_event("scheduler_leader_elected", lock=self.name)
+        print(f"👑 [SCHEDULER] This process is now the {self.name} leader.")
+        self.on_elected()
+
+    def _demote(self, reason: str):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        log_event("scheduler_leader_lost", lock=self.name, reason=reason)
+        print(f"⚠️ [SCHEDULER] Lost {self.name} leadership: {reason}")
+        try:
+            self.on_demoted()
+        except Exception as e:
+            print(f"❌ [SCHEDULER] Demotion cleanup failed: {e}")
+
+    def _wait_for_notify(self, conn) -> bool:
+        """Blocks up to poll_seconds; True if a jobs-changed NOTIFY arrived."""
+        driver = conn.connection.driver_connection
+        notifies = getattr(driver, "notifies", None)
+        if not callable(notifies):
+            # Driver without blocking notifies (psycopg2): the leader's periodic resync covers it
+            self._stop.wait(self.poll_seconds)
+            return False
+        return any(True for _ in notifies(timeout=self.poll_seconds, stop_after=1))
+
+    def _run(self):
+        key = lock_key(self.name)
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self._engine.connect()
+                    conn.exec_driver_sql(f"LISTEN {JOBS_CHANNEL}")
+                if self.is_leader:
+                    conn.exec_driver_sql("SELECT 1")  # still connected, so still holding the lock
+                elif conn.execute(select(func.pg_try_advisory_lock(key))).scalar():
+                    self._promote()
+                if self._wait_for_notify(conn) and self.is_leader and self.on_notify:
+                    try:
+                        self.on_notify()
+                    except Exception as e:
+                        print(f"❌ [SCHEDULER] Job resync after NOTIFY failed: {e}")
+            except Exception as e:
+                self._demote(str(e))
+                if conn is not None:
+                    # Dropping the connection releases the lock if the server still sees us
+                    try:
+                        conn.invalidate()
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                print(f"⚠️ [SCHEDULER] Leader election error, retrying in {self.poll_seconds}s: {e}")
+                self._stop.wait(self.poll_seconds)
+
+        self._demote("shutdown")
+        if conn is not None:
+            conn.close()
+        self._engine.dispose()
@@ -0,0 +1,211 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Sabeel Studio — Static Bundles
+===============================
+The app shell used to inline the studio script, the studio modal markup and
+the layout stylesheet into every page. They are identical across pages and
+users, so they are built once per process into content-hashed files:
+
+  /static/dist/studio.<hash>.js             STUDIO_SCRIPTS_JS
+  /static/dist/studio-components.<hash>.js  STUDIO_COMPONENTS_HTML, injected in place
+  /static/dist/app.<hash>.css               the <style> block of APP_LAYOUT_HTML
+
+each with a gzip (and, when the brotli package is installed, brotli) sibling.
+The filename changes whenever the content does, so responses are served with
+an immutable one-year Cache-Control and the hash as ETag.
+
+The per-user bit of the modal markup (the account <option> list) stays in the
+page, in a <template> the components bundle reads from.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+from app.logging_setup import log_event
+
+try:
+    import brotli
+    _BROTLI_AVAILABLE = True
+except ImportError:
+    _BROTLI_AVAILABLE = False
+
+BUNDLE_URL_PREFIX = "/static/dist"
+BUNDLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "dist")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+ACCOUNT_OPTIONS_TEMPLATE_ID = "studioAccountOptions"
+
+_STYLE_RE = re.compile(r"<style>\n?(.*?)\s*</style>", re.S)
+_SCRIPT_RE = re.compile(r"^\s*<script>(.*)</script>\s*$", re.S)
+
+_CONTENT_TYPES = {
+    ".js": "application/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+}
+
+
+@dataclass
+class Bundle:
+    name: str
+    filename: str
+    etag: str
+    content_type: str
+    body: bytes
+    gzip_body: bytes
+    br_body: bytes | None = None
+
+    @property
+    def url(self) -> str:
+        return f"{BUNDLE_URL_PREFIX}/{self.filename}"
+
+
+_bundles: dict[str, Bundle] = {}
+_by_filename: dict[str, Bundle] = {}
+_layout_template: str | None = None
+_build_lock = threading.Lock()
+
+
+def _components_script(components_html: str) -> str:
+    """JS that inserts the studio modal markup where its <script> tag sits."""
+    return (
+        "(function () {\n"
+        f"  var html = {json.dumps(components_html)};\n"
+        f"  var tpl = document.getElementById({json.dumps(ACCOUNT_OPTIONS_TEMPLATE_ID)});\n"
+        "  var options = tpl ? tpl.innerHTML : '';\n"
+        "  document.currentScript.insertAdjacentHTML('beforebegin', html.split('{account_options}').join(options));\n"
+        "})();\n"
+    )
+
+
+def _sources():
+    """(name, text) of every bundle, plus the layout with its <style> block swapped for a placeholder."""
+    from app.routes.ui_assets import APP_LAYOUT_HTML, STUDIO_COMPONENTS_HTML, STUDIO_SCRIPTS_JS
+
+    script = _SCRIPT_RE.match(STUDIO_SCRIPTS_JS)
+    studio_js = script.group(1).strip() + "\n" if script else STUDIO_SCRIPTS_JS
+
+    style = _STYLE_RE.search(APP_LAYOUT_HTML)
+    # The layout is a str.format template: its CSS braces are doubled
+    app_css = style.group(1).replace("{{", "{").replace("}}", "}") + "\n"
+    layout = APP_LAYOUT_HTML[:style.start()] + "{app_css_link}" + APP_LAYOUT_HTML[style.end():]
+
+    return [
+        ("studio.js", studio_js),
+        ("studio-components.js", _components_script(STUDIO_COMPONENTS_HTML)),
+        ("app.css", app_css),
+    ], layout
+
+
+def _write(path: str, data: bytes) -> None:
+    if os.path.exists(path):
+        return  # content-addressed: same name, same bytes
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_static_bundles(out_dir: str = BUNDLE_DIR) -> dict[str, Bundle]:
+    """
+    Builds every bundle, writes it (and its precompressed variants) to `out_dir`
+    and swaps in the new set. Safe to call again; unchanged files are not rewritten.
+    """
+    global _bundles, _by_filename, _layout_template
+
+    with _build_lock:
+        sources, layout = _sources()
+        bundles = {}
+        for name, text in sources:
+            body = text.encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            stem, ext = os.path.splitext(name)
+            bundles[name] = Bundle(
+                name=name,
+                filename=f"{stem}.{digest}{ext}",
+                etag=f'"{digest}"',
+                content_type=_CONTENT_TYPES[ext],
+                body=body,
+                # mtime=0 keeps the gzip output byte-identical across builds
+                gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+                br_body=brotli.compress(body, quality=11) if _BROTLI_AVAILABLE else None,
+            )
+
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            for b in bundles.values():
+                path = os.path.join(out_dir, b.filename)
+                _write(path, b.body)
+                _write(path + ".gz", b.gzip_body)
+                if b.br_body is not None:
+                    _write(path + ".br", b.br_body)
+        except OSError as e:
+            # Read-only filesystem: bundles are still served from memory
+            print(f"⚠️ [BUNDLES] Could not write to {out_dir}: {e}")
+
+        _bundles = bundles
+        _by_filename = {b.filename: b for b in bundles.values()}
+        _layout_template = layout.replace(
+            "{app_css_link}", f'<link rel="stylesheet" href="{bundles["app.css"].url}">'
+        )
+
+    log_event("static_bundles_built", bundles={
+        b.filename: {"raw": len(b.body), "gzip": len(b.gzip_body), "br": len(b.br_body) if b.br_body else None}
+        for b in bundles.values()
+    })
+    return bundles
+
+
+def _ensure_built() -> None:
+    if _layout_template is None:
+        build_static_bundles()
+
+
+def bundle_url(name: str) -> str:
+    """Fingerprinted URL of a bundle, e.g. bundle_url("studio.js")."""
+    _ensure_built()
+    return _bundles[name].url
+
+
+def layout_template() -> str:
+    """APP_LAYOUT_HTML with its inline stylesheet replaced by a link to app.<hash>.css."""
+    _ensure_built()
+    return _layout_template
+
+
+def studio_components_tag(account_options: str) -> str:
+    """Replaces the inlined STUDIO_COMPONENTS_HTML: per-user options plus the cached markup bundle."""
+    return (
+        f'<template id="{ACCOUNT_OPTIONS_TEMPLATE_ID}">{account_options}</template>\n'
+        f'  <script src="{bundle_url("studio-components.js")}"></script>'
+    )
+
+
+def studio_scripts_tag() -> str:
+    """Replaces the inlined STUDIO_SCRIPTS_JS."""
+    return f'<script src="{bundle_url("studio.js")}"></script>'
+
+
+def get_bundle(filename: str) -> Bundle | None:
+    _ensure_built()
+    return _by_filename.get(filename)
+
+
+def negotiate_encoding(bundle: Bundle, accept_encoding: str) -> tuple[bytes, str | None]:
+    """Picks the smallest precompressed body the client accepts: (body, content-encoding)."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in (accept_encoding or "").split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    if bundle.br_body is not None and "br" in accepted:
+        return bundle.br_body, "br"
+    if "gzip" in accepted:
+        return bundle.gzip_body, "gzip"
+    return bundle.body, None
@@ -0,0 +1,221 @@
+# Copyright (c) 2026 Mohammed Hassan. All rights reserved.
+# Proprietary and confidential. Unauthorized copying, modification, distribution, or use is prohibited.
+
+"""
+Process-wide topic dictionary behind suggest_library_topics (/library/topic-suggest).
+
+Every topic slug used by a ContentItem (slug of `topic` + `topics_slugs`), its
+display name and the LibraryTopicSynonym mappings, indexed so a suggestion is
+a handful of dict / bisect lookups per input word instead of a scan of the
+whole library:
+
+  - exact:      word == slug                 -> slug set
+  - synonym:    word in synonyms(slug)       -> synonym -> slugs
+  - partial:    word (len > 3) inside slug   -> sorted suffix list, bisect on the word
+  - contextual: slug inside word             -> every substring of the word, looked up
+
+Loaded on first use. Committed ContentItem inserts are added incrementally;
+edits or deletes of topics, bulk statements on content_items and any synonym
+change drop the dictionary so the next lookup reloads it. Other worker
+processes (and Core bulk inserts such as the Quran sync) are picked up after
+TOPIC_DICTIONARY_TTL_SECONDS.
+"""
+
+import bisect
+import re
+import threading
+import time
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db_events import EVERYTHING, register_invalidation
+from app.models import ContentItem, LibraryTopicSynonym
+from app.services.library_service import generate_topics_slugs
+
+_TOPIC_COLUMNS = ("topic", "topics_slugs")
+_USAGE_COLUMNS = {"use_count", "last_used_at", "updated_at"}
+_WORD = re.compile(r"\w+")
+
+
+def _slugify(topic: str) -> str:
+    slugs = generate_topics_slugs(topic, [])
+    return slugs[0] if slugs else ""
+
+
+class _TopicDictionary:
+    def __init__(self, generation):
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        self.displays = {}      # slug -> display name
+        self._display_rank = {}  # slug -> id of the item whose topic names it (0: title-cased slug)
+        self.by_synonym = {}    # synonym -> slugs
+        self.suffixes = []      # sorted (suffix, slug) of every slug
+        self.max_slug_len = 0
+        self._sorted = False
+
+    def add_topic(self, topic, item_id: int) -> None:
+        """Display name from an item's `topic`: the newest item naming the slug wins."""
+        slug = _slugify(topic) if topic else ""
+        if not slug:
+            return
+        if item_id >= self._display_rank.get(slug, 0):
+            self._add_slug(slug)
+            self.displays[slug] = topic
+            self._display_rank[slug] = item_id
+
+    def add_slug(self, slug) -> None:
+        if slug and slug not in self.displays:
+            self._add_slug(slug)
+            self.displays[slug] = slug.replace("_", " ").title()
+            self._display_rank[slug] = 0
+
+    def _add_slug(self, slug: str) -> None:
+        if slug in self.displays:
+            return
+        if self._sorted:
+            for i in range(len(slug)):
+                bisect.insort(self.suffixes, (slug[i:], slug))
+        else:
+            self.suffixes.extend((slug[i:], slug) for i in range(len(slug)))
+        self.max_slug_len = max(self.max_slug_len, len(slug))
+
+    def finish_load(self) -> None:
+        """Sorts the suffix list once after the bulk load; later additions insort."""
+        self.suffixes.sort()
+        self._sorted = True
+
+    def set_synonyms(self, mappings) -> None:
+        self.by_synonym = {}
+        for slug, synonyms in mappings:
+            for synonym in synonyms or []:
+                self.by_synonym.setdefault(synonym, set()).add(slug)
+
+    def _containing(self, word: str):
+        """Slugs that contain `word`."""
+        i = bisect.bisect_left(self.suffixes, (word,))
+        while i < len(self.suffixes) and self.suffixes[i][0].startswith(word):
+            yield self.suffixes[i][1]
+            i += 1
+
+    def suggest(self, text: str, max_results: int = 5) -> list:
+        words = set(_WORD.findall(text.lower().strip()))
+        best = {}  # slug -> (score, reason)
+
+        def hit(slug, score, reason):
+            if slug in self.displays and score > best.get(slug, (0.0,))[0]:
+                best[slug] = (score, reason)
+
+        for word in words:
+            # 1. Exact slug match
+            hit(word, 1.0, "exact keyword match")
+            # 2. Synonym match
+            for slug in self.by_synonym.get(word, ()):
+                hit(slug, 0.9, "synonym match")
+            # 3. Partial slug match
+            if len(word) > 3:
+                for slug in self._containing(word):
+                    hit(slug, 0.7, "partial topic match")
+            # 4. Fuzzy word match (slug contained in the word)
+            for start in range(len(word)):
+                for end in range(start + 1, min(len(word), start + self.max_slug_len) + 1):
+                    hit(word[start:end], 0.6, "contextual match")
+
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1][0], kv[0]))[:max_results]
+        return [
+            {"topic": self.displays[slug], "slug": slug, "score": score, "reason": reason}
+            for slug, (score, reason) in ranked
+        ]
+
+
+_lock = threading.Lock()
+_current = None
+_generation = 0
+
+
+def _load(db: Session) -> _TopicDictionary:
+    dictionary = _TopicDictionary(_generation)
+    # Newest item first per topic name; the highest id names a slug
+    for topic, item_id in db.execute(
+        select(ContentItem.topic, func.max(ContentItem.id))
+        .where(ContentItem.topic != None)
+        .group_by(ContentItem.topic)
+    ):
+        dictionary.add_topic(topic, item_id)
+    for (slugs,) in db.execute(select(ContentItem.topics_slugs).distinct()):
+        for slug in slugs or []:
+            dictionary.add_slug(slug)
+    dictionary.set_synonyms(db.execute(select(LibraryTopicSynonym.slug, LibraryTopicSynonym.synonyms)).all())
+    dictionary.finish_load()
+    return dictionary
+
+
+def _dictionary(db: Session) -> _TopicDictionary:
+    global _current
+    dictionary = _current
+    if dictionary is not None and dictionary.loaded_at + settings.topic_dictionary_ttl_seconds > time.monotonic():
+        return dictionary
+    with _lock:
+        dictionary = _current
+        if dictionary is None or dictionary.loaded_at + settings.topic_dictionary_ttl_seconds <= time.monotonic():
+            dictionary = _load(db)
+            # An invalidate() that landed mid-load means the rows may predate it
+            if dictionary.generation == _generation:
+                _current = dictionary
+    return dictionary
+
+
+def invalidate() -> None:
+    """Drops the dictionary; the next suggestion reloads it."""
+    global _current, _generation
+    with _lock:
+        _generation += 1
+        _current = None
+
+
+def suggest(db: Session, text: str, max_results: int = 5) -> list:
+    return _dictionary(db).suggest(text, max_results)
+
+
+def _add_items(items) -> None:
+    with _lock:
+        if _current is None:
+            return
+        for item_id, topic, slugs in items:
+            _current.add_topic(topic, item_id)
+            for slug in slugs or []:
+                _current.add_slug(slug)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MAINTENANCE HOOKS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _collect(obj, kind: str, changes: set) -> None:
+    """Inserted items with topics are added in place; anything else rebuilds the dictionary."""
+    if isinstance(obj, LibraryTopicSynonym):
+        changes.add(EVERYTHING)
+    elif kind == "dirty":
+        state = inspect(obj)
+        if any(state.attrs[k].history.has_changes() for k in _TOPIC_COLUMNS):
+            changes.add(EVERYTHING)
+    elif obj.topic or obj.topics_slugs:
+        changes.add(EVERYTHING if kind == "deleted" else (obj.id, obj.topic, tuple(obj.topics_slugs or ())))
+
+
+def _usage_only(orm_execute_state) -> bool:
+    if orm_execute_state.bind_mapper.class_ is not ContentItem or not orm_execute_state.is_update:
+        return False
+    values = getattr(orm_execute_state.statement, "_values", None)
+    return bool(values) and {getattr(k, "key", k) for k in values} <= _USAGE_COLUMNS
+
+
+def _apply(changes: set) -> None:
+    if EVERYTHING in changes:
+        invalidate()
+    else:
+        _add_items(changes)
+
+
+register_invalidation((ContentItem, LibraryTopicSynonym), _apply, collect=_collect, skip_bulk=_usage_only)
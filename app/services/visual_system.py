@@ -7,6 +7,7 @@ from typing import Optional, Tuple, List
 
 try:
     from PIL import Image, ImageFilter
+    from app.services.image_stats import ImageStats
 except ImportError:
     Image = None
 
@@ -1219,42 +1220,6 @@ _LIGHTING_CLAUSES = {
 # BACKGROUND ANALYZER
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _sample_zone(image, size: tuple,
-                 y1f: float, y2f: float,
-                 x1f: float = 0.10, x2f: float = 0.90) -> dict:
-    """
-    Sample brightness, std-dev detail, and dominant hue of a rectangular zone.
-
-    Returns:
-        brightness  (float 0-255)
-        detail      (float 0-1)  std-dev normalized
-        avg_r, avg_g, avg_b  (float)
-    """
-    W, H = size
-    x1, y1 = int(W * x1f), int(H * y1f)
-    x2, y2 = int(W * x2f), int(H * y2f)
-    crop = image.crop((x1, y1, x2, y2)).resize((48, 48))
-
-    gray = list(crop.convert("L").getdata())
-    n    = len(gray)
-    brightness = sum(gray) / n if n else 128.0
-
-    mean    = brightness
-    std_dev = (sum((p - mean) ** 2 for p in gray) / n) ** 0.5 if n else 0.0
-    detail  = min(1.0, std_dev / 52.0)
-
-    rgb   = crop.convert("RGB").getdata()
-    avg_r = sum(p[0] for p in rgb) / n if n else 128.0
-    avg_g = sum(p[1] for p in rgb) / n if n else 128.0
-    avg_b = sum(p[2] for p in rgb) / n if n else 128.0
-
-    return {
-        "brightness": brightness,
-        "detail":     detail,
-        "r": avg_r, "g": avg_g, "b": avg_b,
-    }
-
-
 def _classify_palette(r: float, g: float, b: float,
                        brightness: float) -> tuple:
     """
@@ -1346,7 +1311,7 @@ def _typography_mode(center_brightness: float, palette_mode: str,
         return "DARK"
 
 
-def analyze_background(image, size: tuple) -> "AnalysisResult":
+def analyze_background(image, size: tuple, stats: Optional["ImageStats"] = None) -> "AnalysisResult":
     """
     Analyze a rendered background image and return a rich AnalysisResult.
 
@@ -1355,18 +1320,20 @@ def analyze_background(image, size: tuple) -> "AnalysisResult":
       B (main quote row):  30-70%
       C (support row):     72-88%
 
-    All sampling uses 48×48 downsamples for speed (<30ms on 1080×1080).
+    All zones are read from one downsampled array (see image_stats); pass
+    `stats` when the caller already built it for this image.
     """
+    stats = stats or ImageStats(image, size)
     # Full-image overview
-    full  = _sample_zone(image, size, 0.0, 1.0)
+    full  = stats.zone(0.0, 1.0)
     # Center of image (where text lives)
-    cen   = _sample_zone(image, size, 0.25, 0.75, 0.20, 0.80)
-    edge  = _sample_zone(image, size, 0.0, 0.12)
+    cen   = stats.zone(0.25, 0.75, 0.20, 0.80)
+    edge  = stats.zone(0.0, 0.12)
 
     # Per text-zone sampling
-    zA = _sample_zone(image, size, 0.08, 0.25)
-    zB = _sample_zone(image, size, 0.30, 0.70)
-    zC = _sample_zone(image, size, 0.72, 0.88)
+    zA = stats.zone(0.08, 0.25)
+    zB = stats.zone(0.30, 0.70)
+    zC = stats.zone(0.72, 0.88)
 
     # Center contrast headroom — how far from 128 (more = easier to contrast)
     center_contrast = abs(cen["brightness"] - 128.0) / 128.0
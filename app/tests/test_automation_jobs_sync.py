@@ -0,0 +1,74 @@
+"""
+Reconciliation of the scheduler's auto_* jobs with the enabled TopicAutomations,
+against a BackgroundScheduler that is never started and an in-memory SQLite session.
+"""
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import IGAccount, Org, TopicAutomation
+from app.services.scheduler import sync_automation_jobs
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    tables = [Org.__table__, IGAccount.__table__, TopicAutomation.__table__]
+    Org.metadata.create_all(engine, tables=tables)
+    factory = sessionmaker(bind=engine)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def sched():
+    sched = BackgroundScheduler(timezone="UTC")
+    yield sched
+    sched.remove_all_jobs()
+
+
+def _automation(db, acc, **kw):
+    fields = dict(org_id=acc.org_id, ig_account_id=acc.id, name="auto", topic_prompt="sabr",
+                  enabled=True, post_time_local="09:00", timezone="UTC")
+    fields.update(kw)
+    automation = TopicAutomation(**fields)
+    db.add(automation)
+    db.commit()
+    return automation.id
+
+
+def test_sync_adds_reschedules_removes_and_keeps_jobs(session_factory, sched):
+    db = session_factory()
+    org = Org(name="org")
+    db.add(org)
+    db.flush()
+    acc = IGAccount(org_id=org.id, name="acc", ig_user_id="1", access_token="t", timezone="UTC")
+    db.add(acc)
+    db.commit()
+    kept = _automation(db, acc)
+    moved = _automation(db, acc, post_time_local="12:00", posts_per_day=2, post_spacing_hours=3)
+    dropped = _automation(db, acc)
+
+    counts = sync_automation_jobs(sched, session_factory)
+    assert counts == {"jobs": 4, "added": 4, "updated": 0, "removed": 0, "failed": 0, "unchanged": 0}
+    assert {job.id for job in sched.get_jobs()} == {f"auto_{kept}_0", f"auto_{moved}_0", f"auto_{moved}_1",
+                                                    f"auto_{dropped}_0"}
+    assert sched.get_job(f"auto_{moved}_1").name == f"automation {moved} @ 15:00 UTC"
+
+    db.get(TopicAutomation, moved).post_time_local = "13:30"
+    db.get(TopicAutomation, dropped).enabled = False
+    db.commit()
+    untouched = sched.get_job(f"auto_{kept}_0").trigger
+
+    counts = sync_automation_jobs(sched, session_factory)
+    assert counts == {"jobs": 3, "added": 0, "updated": 2, "removed": 1, "failed": 0, "unchanged": 1}
+    assert sched.get_job(f"auto_{dropped}_0") is None
+    assert sched.get_job(f"auto_{moved}_1").name == f"automation {moved} @ 16:30 UTC"
+    assert str(sched.get_job(f"auto_{moved}_0").trigger.fields[5]) == "13"
+    assert sched.get_job(f"auto_{kept}_0").trigger is untouched
+
+    counts = sync_automation_jobs(sched, session_factory)
+    assert counts["unchanged"] == 3 and counts["added"] == counts["updated"] == counts["removed"] == 0
+    db.close()
@@ -0,0 +1,83 @@
+"""
+SQL-side item selection against a real Postgres (random() / ln() in ORDER BY).
+Set TEST_DATABASE_URL to run; tables are created in a throwaway schema.
+"""
+import os
+import uuid
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, ContentItem, ContentSource, Org
+from app.services.content_sources import mark_items_used, select_items_for_automation
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture
+def db():
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def _source(db, use_counts):
+    org = Org(name="org")
+    db.add(org)
+    db.flush()
+    source = ContentSource(org_id=org.id, name="src", source_type="manual_library")
+    db.add(source)
+    db.flush()
+    items = [ContentItem(org_id=org.id, source_id=source.id, text=f"item {i}", use_count=n) for i, n in enumerate(use_counts)]
+    db.add_all(items)
+    db.commit()
+    return org.id, source.id, [it.id for it in items]
+
+
+def _select(db, org_id, source_id, k, mode, cursor=None):
+    return select_items_for_automation(
+        db, org_id=org_id, source_id=source_id, items_per_post=k, selection_mode=mode, last_item_cursor=cursor,
+    )
+
+
+def test_round_robin_wraps_around(db):
+    org_id, source_id, ids = _source(db, [0] * 5)
+
+    cursor, pages = None, []
+    for _ in range(3):
+        picked, cursor = _select(db, org_id, source_id, 3, "round_robin", cursor)
+        pages.append([ids.index(it.id) for it in picked])
+    assert pages == [[0, 1, 2], [3, 4, 0], [1, 2, 3]]
+    assert cursor == str(ids[3])
+
+
+def test_weighted_random_prefers_least_used_and_marks_in_one_update(db):
+    org_id, source_id, ids = _source(db, [0, 0, 50])
+
+    counts = Counter()
+    for _ in range(300):
+        picked, cursor = _select(db, org_id, source_id, 2, "random", "keep")
+        assert cursor == "keep" and len({it.id for it in picked}) == 2
+        counts.update(it.id for it in picked)
+    assert counts[ids[2]] < counts[ids[0]] / 3
+
+    picked, _ = _select(db, org_id, source_id, 2, "round_robin")
+    mark_items_used(db, picked)
+    assert [it.use_count for it in picked] == [1, 1]
+    assert all(it.last_used_at is not None for it in picked)
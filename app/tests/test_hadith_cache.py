@@ -0,0 +1,34 @@
+from app.services.hadith_cache import EditionIndex
+
+EDITION = {
+    "metadata": {"name": "Sahih al-Bukhari"},
+    "hadiths": [
+        {"hadithnumber": 1, "text": "Actions are judged by intentions."},
+        {"hadithnumber": 2, "text": "Patience is at the first stroke of a calamity. Patience brings reward."},
+        {"hadithnumber": 3.0, "text": "Whoever is patient, Allah will make him patient."},
+        {"hadithnumber": 4, "text": "The strong man is the one who controls himself when angry."},
+    ],
+}
+
+
+def test_lookup_by_number_normalizes_keys():
+    idx = EditionIndex.build("eng-test", EDITION)
+    assert idx.get(3)["text"].startswith("Whoever")
+    assert idx.get("1")["hadithnumber"] == 1
+    assert idx.get(99) is None
+
+
+def test_search_requires_all_tokens_and_ranks_by_frequency():
+    idx = EditionIndex.build("eng-test", EDITION)
+    hits = idx.search("patience", limit=10)
+    assert [h["hadithnumber"] for h in hits] == [2]
+
+    assert idx.search("patience calamity", limit=10)[0]["hadithnumber"] == 2
+    assert idx.search("patience angry", limit=10) == []
+
+
+def test_search_treats_last_token_as_prefix():
+    idx = EditionIndex.build("eng-test", EDITION)
+    numbers = {h["hadithnumber"] for h in idx.search("patie", limit=10)}
+    assert numbers == {2, 3.0}
+    assert len(idx.search("patie", limit=1)) == 1
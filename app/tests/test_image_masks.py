@@ -0,0 +1,22 @@
+from app.services.image_masks import vertical_mask, horizontal_mask, radial_mask, edge_fade_profile
+
+
+def test_vertical_mask_matches_row_profile():
+    mask = vertical_mask((40, 10), lambda t: 255 * t)
+    assert mask.size == (40, 10)
+    assert mask.getpixel((0, 0)) == 0
+    assert mask.getpixel((39, 5)) == 127
+    assert mask.getpixel((12, 9)) == mask.getpixel((30, 9)) == 229
+
+
+def test_edge_fade_profile_is_mirrored():
+    mask = horizontal_mask((100, 4), edge_fade_profile(0.3, 200, 1.8))
+    assert mask.getpixel((0, 0)) == mask.getpixel((99, 3)) == 200
+    assert mask.getpixel((10, 1)) == mask.getpixel((89, 1))
+    assert mask.getpixel((50, 2)) == 0
+
+
+def test_radial_mask_is_zero_at_center_and_clipped():
+    mask = radial_mask((21, 21), lambda t: 255 * t * 2, radius=10)
+    assert mask.getpixel((10, 10)) == 0
+    assert mask.getpixel((0, 0)) == 255
@@ -0,0 +1,26 @@
+from PIL import Image
+
+from app.services.image_stats import ImageStats
+
+
+def test_zone_statistics():
+    image = Image.new("RGB", (1080, 1080), (200, 100, 50))
+    image.paste((0, 0, 0), (0, 540, 1080, 1080))  # bottom half black
+    stats = ImageStats(image)
+
+    top = stats.zone(0.0, 0.4)
+    assert round(top["r"]) == 200 and round(top["g"]) == 100 and round(top["b"]) == 50
+    assert top["detail"] == 0.0
+    assert stats.brightness(0.6, 1.0) == 0.0
+
+    # Straddling the edge: half bright, half black, maximal detail
+    mixed = stats.zone(0.25, 0.75)
+    assert abs(mixed["brightness"] - top["brightness"] / 2) < 3
+    assert mixed["detail"] == 1.0
+
+
+def test_zones_refer_to_the_given_size():
+    image = Image.new("RGB", (200, 100), (255, 255, 255))
+    image.paste((0, 0, 0), (100, 0, 200, 100))  # right half outside the 100x100 area
+    assert ImageStats(image, (100, 100)).brightness(0.0, 1.0, 0.0, 1.0) == 255.0
+    assert ImageStats(Image.new("L", (10, 10), 7)).zone(0.0, 0.01)["brightness"] == 7.0
@@ -0,0 +1,38 @@
+"""
+Tag backfill over an in-memory SQLite session.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import MediaAsset, MediaAssetTag, Org
+from app.services.media_library import backfill_asset_tags
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    tables = [Org.__table__, MediaAsset.__table__, MediaAssetTag.__table__]
+    Org.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_backfill_runs_once_even_for_assets_without_tags(db):
+    org = Org(name="org")
+    db.add(org)
+    db.flush()
+    db.add_all([
+        MediaAsset(org_id=org.id, url="/m/a.jpg", tags=["Nature", "nature ", "sky"]),
+        MediaAsset(org_id=org.id, url="/m/b.jpg", tags=[]),
+        MediaAsset(org_id=org.id, url="/m/c.jpg", tags=["  "]),
+    ])
+    db.commit()
+
+    assert backfill_asset_tags(db, batch_size=2) == 3
+    assert sorted(t for (t,) in db.query(MediaAssetTag.tag)) == ["nature", "sky"]
+    assert db.query(MediaAsset).filter(MediaAsset.tags_backfilled_at.is_(None)).count() == 0
+    assert backfill_asset_tags(db) == 0
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+from watchfiles import Change
+
+from app.config import settings
+from app.services import media_registry
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "uploads_dir", str(tmp_path))
+    monkeypatch.setattr(media_registry, "_entries", {})
+    monkeypatch.setattr(media_registry, "_by_digest", {})
+    monkeypatch.setattr(media_registry, "_warmed", False)
+    return tmp_path
+
+
+def test_locate_register_and_forget(uploads):
+    (uploads / "old.jpg").write_bytes(b"\xff\xd8old")
+    assert media_registry.locate("old.jpg") == str(uploads / "old.jpg")   # from warm-up
+    assert media_registry.locate("missing.jpg") is None
+
+    (uploads / "other_worker.jpg").write_bytes(b"\xff\xd8x")             # after warm-up
+    assert media_registry.locate_url("https://x/uploads/other_worker.jpg") == str(uploads / "other_worker.jpg")
+
+    path = uploads / "qcard_1.jpg"
+    path.write_bytes(b"\xff\xd8card")
+    entry = media_registry.register(str(path))
+    assert media_registry.find_by_digest(entry.digest) == entry
+    os.remove(path)
+    assert media_registry.locate("qcard_1.jpg") == str(path)              # no stat on a hit
+    assert media_registry.locate("qcard_1.jpg", verify=True) is None      # stat drops the entry
+    assert media_registry.find_by_digest(entry.digest) is None
+
+    path.write_bytes(b"\xff\xd8card")
+    entry = media_registry.register(str(path))
+    media_registry.forget("qcard_1.jpg")
+    assert media_registry.find_by_digest(entry.digest) is None
+    os.remove(path)
+    assert media_registry.locate("qcard_1.jpg") is None
+
+
+def test_watch_changes(uploads):
+    path = uploads / "qcard_2.jpg"
+    path.write_bytes(b"\xff\xd8one")
+    entry = media_registry.register(str(path))
+
+    media_registry._apply_changes({(Change.added, str(path))})            # echo of our own write
+    assert media_registry.find_by_digest(entry.digest) == entry
+
+    path.write_bytes(b"\xff\xd8two")
+    media_registry._apply_changes({(Change.modified, str(path))})
+    assert media_registry.find_by_digest(entry.digest) is None
+    assert media_registry.find_by_digest(media_registry.file_digest(str(path))).filename == "qcard_2.jpg"
+
+    os.remove(path)
+    media_registry._apply_changes({(Change.deleted, str(path))})
+    assert media_registry.locate("qcard_2.jpg") is None
@@ -0,0 +1,190 @@
+"""
+Content-addressed media storage. The S3 test runs against any S3-compatible
+server (e.g. a local MinIO): set TEST_S3_ENDPOINT_URL, plus TEST_S3_ACCESS_KEY /
+TEST_S3_SECRET_KEY if they differ from MinIO's defaults. The CDN push test needs
+TEST_DATABASE_URL (a real Postgres; tables go in a throwaway schema).
+"""
+import io
+import os
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+import boto3
+import pytest
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import Base, MediaAsset, MediaCdnCopy, MediaRelease, Org
+from app.services import cloudinary_service, media_registry, media_storage
+
+TEST_S3_ENDPOINT_URL = os.getenv("TEST_S3_ENDPOINT_URL")
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+KEY_LOCK = media_storage._key_lock
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "uploads_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "media_cdn_push", False)
+    monkeypatch.setattr(media_storage, "_storage", None)
+    monkeypatch.setattr(media_registry, "_entries", {})
+    monkeypatch.setattr(media_registry, "_by_digest", {})
+    monkeypatch.setattr(media_storage, "_key_lock", lambda key, engine=None: nullcontext())  # no database
+    return tmp_path
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_local_identical_bytes_are_stored_once(uploads):
+    first = media_storage.store_file(_write(uploads / "qcard_1.jpg", b"\xff\xd8same"))
+    assert not first.deduplicated and media_storage.is_content_key(first.key)
+    assert first.url.endswith(f"/uploads/{first.key}") and first.local_path == str(uploads / first.key)
+
+    second = media_storage.store_file(_write(uploads / "qcard_2.jpg", b"\xff\xd8same"))
+    upload = media_storage.store_stream(io.BytesIO(b"\xff\xd8same"), "Photo.JPG")
+    assert second.deduplicated and upload.deduplicated
+    assert second.key == upload.key == first.key
+    assert os.listdir(uploads) == [first.key]
+    assert media_registry.locate(first.key) == first.local_path
+
+    other = media_storage.store_stream(io.BytesIO(b"\xff\xd8other"), "photo.png")
+    assert other.key.endswith(".png") and other.key != first.key
+
+    media_storage.get_storage().delete(other.key)
+    assert media_registry.locate(other.key) is None
+
+
+@pytest.mark.skipif(not TEST_S3_ENDPOINT_URL, reason="TEST_S3_ENDPOINT_URL not set")
+def test_s3_multipart_upload_and_dedup(uploads, monkeypatch):
+    bucket = f"media-test-{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(settings, "media_storage_backend", "s3")
+    monkeypatch.setattr(settings, "media_s3_bucket", bucket)
+    monkeypatch.setattr(settings, "media_s3_endpoint_url", TEST_S3_ENDPOINT_URL)
+    monkeypatch.setattr(settings, "media_s3_public_base_url", None)
+    monkeypatch.setattr(settings, "media_multipart_chunk_mb", 5)
+    monkeypatch.setattr(settings, "s3_access_key", os.getenv("TEST_S3_ACCESS_KEY", "minioadmin"))
+    monkeypatch.setattr(settings, "s3_secret_key", os.getenv("TEST_S3_SECRET_KEY", "minioadmin"))
+    monkeypatch.setattr(settings, "s3_region", "us-east-1")
+    storage = media_storage.get_storage()
+    storage.client.create_bucket(Bucket=bucket)
+
+    calls = []
+    storage.client.meta.events.register("before-call.s3", lambda model, **kw: calls.append(model.name))
+
+    data = os.urandom(12 * 1024 * 1024)
+    stored = media_storage.store_stream(io.BytesIO(data), "big.jpg")
+    assert stored.local_path is None and not stored.deduplicated
+    assert stored.url == f"{TEST_S3_ENDPOINT_URL}/{bucket}/media/{stored.key}"
+    assert "CreateMultipartUpload" in calls and calls.count("UploadPart") == 3
+    assert os.listdir(uploads) == []
+
+    calls.clear()
+    again = media_storage.store_stream(io.BytesIO(data), "copy.jpg")
+    assert again.deduplicated and again.key == stored.key and calls == []
+
+    s3 = boto3.client("s3", endpoint_url=TEST_S3_ENDPOINT_URL, region_name="us-east-1",
+                      aws_access_key_id=settings.s3_access_key, aws_secret_access_key=settings.s3_secret_key)
+    head = s3.head_object(Bucket=bucket, Key=f"media/{stored.key}")
+    assert head["ContentLength"] == len(data) and head["ContentType"] == "image/jpeg"
+
+    storage.delete(stored.key)
+    storage.client.delete_bucket(Bucket=bucket)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        monkeypatch.setenv("DATABASE_URL", TEST_DATABASE_URL)  # app.db won't import without one
+    schema = f"test_cdn_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr("app.db.SessionLocal", factory)
+    monkeypatch.setattr("app.db.engine", engine)
+    yield factory
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_cdn_push_is_recorded_retried_and_resolved_by_key(uploads, session_factory, monkeypatch):
+    pushed = []
+    results = iter([None, "https://cdn.example/sabeel/copy.jpg"])   # first push fails
+    monkeypatch.setattr(settings, "media_cdn_push", True)
+    monkeypatch.setattr(cloudinary_service, "is_cloudinary_configured", lambda: True)
+    monkeypatch.setattr(cloudinary_service, "upload_to_cloudinary",
+                        lambda path, public_id=None: pushed.append(public_id) or next(results))
+
+    stored = media_storage.store_stream(io.BytesIO(b"\xff\xd8cdn"), "card.jpg")
+    assert media_storage.cdn_url(stored.url, wait=5) is None       # waits for the (failed) push
+    assert pushed == [f"sabeel/{stored.key.split('.')[0]}"]
+
+    db = session_factory()
+    assert media_storage.retry_cdn_pushes(db) == 0                  # still owned by the push in flight
+    db.execute(update(MediaCdnCopy).values(created_at=MediaCdnCopy.created_at - timedelta(minutes=10)))
+    db.commit()
+    assert media_storage.retry_cdn_pushes(db) == 1
+    copy = db.query(MediaCdnCopy).one()
+    assert copy.key == stored.key and copy.attempts == 1 and copy.pushed_at is not None
+
+    # Resolved by key from the table, e.g. in the worker that publishes
+    assert media_storage.cdn_url(f"https://other-host/uploads/{stored.key}") == "https://cdn.example/sabeel/copy.jpg"
+    assert media_storage.store_stream(io.BytesIO(b"\xff\xd8cdn"), "again.jpg").deduplicated
+    assert len(pushed) == 2 and not media_storage._cdn_pushes        # already on the CDN: no push
+    db.close()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_release_is_swept_after_grace_unless_stored_or_referenced_again(uploads, session_factory, monkeypatch):
+    monkeypatch.setattr(media_storage, "_key_lock", KEY_LOCK)
+    db = session_factory()
+    org = Org(name="org")
+    db.add(org)
+    db.commit()
+
+    def backdate_releases():
+        db.execute(update(MediaRelease).values(released_at=MediaRelease.released_at - timedelta(hours=2)))
+        db.commit()
+
+    stored = media_storage.store_file(_write(uploads / "a.jpg", b"\xff\xd8keep"))
+    asset = MediaAsset(org_id=org.id, url=stored.url)
+    db.add(asset)
+    db.commit()
+    assert not media_storage.release(db, stored.url)                      # still referenced
+    assert media_storage.release(db, stored.url, asset_id=asset.id)
+    db.delete(asset)
+    db.commit()
+    assert media_storage.sweep_released_media(db) == 0                     # inside the grace period
+
+    # Stored again (its post not committed yet): the release is cancelled
+    media_storage.store_file(_write(uploads / "b.jpg", b"\xff\xd8keep"))
+    assert db.query(MediaRelease).count() == 0
+    backdate_releases()
+    assert media_storage.sweep_released_media(db) == 0 and os.path.isfile(stored.local_path)
+
+    # Referenced again by the time the sweep runs: kept, release dropped
+    assert media_storage.release(db, stored.url)
+    db.commit()
+    db.add(MediaAsset(org_id=org.id, url=stored.url))
+    db.commit()
+    backdate_releases()
+    assert media_storage.sweep_released_media(db) == 0 and os.path.isfile(stored.local_path)
+    assert db.query(MediaRelease).count() == 0
+
+    db.query(MediaAsset).delete()
+    assert media_storage.release(db, stored.url)
+    db.commit()
+    backdate_releases()
+    assert media_storage.sweep_released_media(db) == 1
+    assert not os.path.exists(stored.local_path) and media_registry.locate(stored.key) is None
+    db.close()
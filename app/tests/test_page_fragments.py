@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models import IGAccount, Org
+from app.services import page_fragments
+
+
+def _acc(id, username, active=False, org_id=1):
+    return SimpleNamespace(id=id, org_id=org_id, username=username, name=None, active=active, profile_picture_url=None)
+
+
+def test_switcher_template_escapes_and_marks_active():
+    accs = [_acc(1, "main", active=True), _acc(2, "<script>")]
+    html = page_fragments.render_fragment("account_switcher.html", accounts=accs, active_acc=accs[0])
+
+    assert "setActiveAccount('1')" in html and "setActiveAccount('2')" in html
+    assert "@&lt;script&gt;" in html
+    assert html.count("bg-emerald-500 shadow-[0_0_8px") == 1
+    assert "Connect Account" in page_fragments.render_fragment("account_switcher.html", accounts=[], active_acc=None)
+
+
+def test_fragment_cache_invalidates_per_org():
+    page_fragments.clear_fragments()
+    key = page_fragments.fragment_key("t", [1], "x")
+    page_fragments.set_fragment(key, "cached")
+    other = page_fragments.fragment_key("t", [2], "x")
+    page_fragments.set_fragment(other, "other")
+
+    assert page_fragments.get_fragment(page_fragments.fragment_key("t", [1], "x")) == "cached"
+
+    page_fragments.invalidate_orgs([1])
+    assert page_fragments.get_fragment(page_fragments.fragment_key("t", [1], "x")) is None
+    assert page_fragments.get_fragment(page_fragments.fragment_key("t", [2], "x")) == "other"
+
+    page_fragments.invalidate_orgs(None)
+    assert page_fragments.get_fragment(page_fragments.fragment_key("t", [2], "x")) is None
+
+
+def test_post_kind():
+    assert page_fragments.post_kind("From Surah Al-Baqarah") == "QURAN"
+    assert page_fragments.post_kind("Sahih Bukhari") == "HADITH"
+    assert page_fragments.post_kind("A Story", story=True) == "STORY"
+    assert page_fragments.post_kind("A Story") == "REFLECTION"
+
+
+def test_pages_compile_and_render_verbatim():
+    assert page_fragments.warm_templates() == len(page_fragments.FRAGMENTS) + len(page_fragments.PAGES)
+    html = page_fragments.render_page("admin_console.html")
+    assert html.startswith("<!doctype html>") and html.rstrip().endswith("</html>")
+    assert "tbody.innerHTML = users.map(u => `" in html
+
+
+def test_commits_retire_fragments_of_the_changed_org():
+    engine = create_engine("sqlite://")
+    Org.metadata.create_all(engine, tables=[Org.__table__, IGAccount.__table__])
+    db = sessionmaker(bind=engine)()
+    org, other = Org(name="a"), Org(name="b")
+    db.add_all([org, other])
+    db.commit()
+    page_fragments.clear_fragments()
+
+    def cache(org_id):
+        page_fragments.set_fragment(page_fragments.fragment_key("t", [org_id]), "cached")
+
+    def cached(org_id):
+        return page_fragments.get_fragment(page_fragments.fragment_key("t", [org_id])) is not None
+
+    cache(org.id)
+    cache(other.id)
+    db.add(IGAccount(org_id=org.id, name="acc", ig_user_id="1", access_token="t"))
+    db.flush()
+    db.rollback()
+    assert cached(org.id) and cached(other.id)
+
+    db.add(IGAccount(org_id=org.id, name="acc", ig_user_id="1", access_token="t"))
+    db.commit()
+    assert not cached(org.id) and cached(other.id)
+
+    db.execute(update(IGAccount).values(active=False))
+    db.commit()
+    assert not cached(other.id)
+    db.close()
+    engine.dispose()
@@ -0,0 +1,76 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Org, OrgMember, User
+from app.security import principal_cache
+
+
+def _sessions():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def test_hit_attaches_user_without_query_and_invalidates_on_commit():
+    principal_cache.clear()
+    engine, Session = _sessions()
+    with Session() as db:
+        db.add(User(id=1, email="a@b.c", name="A", is_active=True))
+        db.commit()
+        principal_cache.put_user("k", db.get(User, 1))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    with Session() as db:
+        hit, user, org_id = principal_cache.get_user(db, "k")
+        assert hit and org_id is None and user in db
+        assert user.email == "a@b.c"
+        assert statements == []
+
+        user.name = "B"
+        db.commit()
+
+    # The commit touched the user: the next lookup is a miss
+    assert principal_cache.get_user(Session(), "k")[0] is False
+    with Session() as db:
+        assert db.get(User, 1).name == "B"
+
+
+def test_negative_api_key_entry_and_ttl_cap():
+    principal_cache.clear()
+    principal_cache.put_user("unknown", None)
+    hit, user, org_id = principal_cache.get_user(None, "unknown")
+    assert hit and user is None and org_id is None
+
+    principal_cache.invalidate_api_keys()
+    assert principal_cache.get_user(None, "unknown")[0] is False
+
+    principal_cache.put_user("expired", None, expires_at=0)
+    assert principal_cache.get_user(None, "expired")[0] is False
+
+
+def test_first_org_is_cached_and_dropped_with_memberships():
+    principal_cache.clear()
+    engine = create_engine("sqlite://")
+    for model in (Org, User, OrgMember):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([Org(id=1, name="one"), Org(id=2, name="two"), User(id=1, email="a@b.c", is_active=True)])
+        db.add(OrgMember(user_id=1, org_id=2, role="admin"))
+        db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    with Session() as db:
+        user = db.get(User, 1)
+        statements.clear()
+        assert principal_cache.first_org_id(db, user) == 2
+        assert principal_cache.first_org_id(db, user) == 2
+        assert len(statements) == 1
+
+        db.delete(db.query(OrgMember).filter(OrgMember.org_id == 2).one())
+        db.add(OrgMember(user_id=1, org_id=1, role="admin"))
+        db.commit()
+        assert principal_cache.first_org_id(db, user) == 1
@@ -0,0 +1,77 @@
+"""
+Claiming and publishing due posts against a real Postgres. Set TEST_DATABASE_URL
+to run; tables are created in a throwaway schema.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, IGAccount, Org, Post
+from app.services import scheduler
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture
+def session_factory():
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+def test_claim_is_renewed_per_post_and_lost_claims_are_skipped(session_factory, monkeypatch):
+    db = session_factory()
+    org = Org(name="org")
+    db.add(org)
+    db.flush()
+    acc = IGAccount(org_id=org.id, name="acc", ig_user_id="1", access_token="t", active=True)
+    db.add(acc)
+    db.flush()
+    due = datetime.now(timezone.utc) - timedelta(minutes=1)
+    posts = [Post(org_id=org.id, ig_account_id=acc.id, status="scheduled", scheduled_time=due + timedelta(seconds=i),
+                  media_url="https://cdn.example/a.jpg", caption=f"post {i}")
+             for i in range(3)]
+    db.add_all(posts)
+    db.commit()
+    first, second, third = (p.id for p in posts)
+
+    seen = []
+
+    def fake_publish(*, caption, **kwargs):
+        check = session_factory()
+        try:
+            stamps = dict(check.query(Post.id, Post.updated_at).all())
+        finally:
+            check.close()
+        seen.append((caption, stamps))
+        if caption == "post 0":
+            # Another worker re-claims the third post while the first one is publishing
+            with session_factory() as other:
+                other.execute(update(Post).where(Post.id == third).values(updated_at=datetime.now(timezone.utc)))
+                other.commit()
+        return {"ok": True}
+
+    monkeypatch.setattr(scheduler, "publish_to_instagram", fake_publish)
+    assert scheduler.publish_due_posts(session_factory) == 2
+
+    (_, during_first), (caption, during_second) = seen
+    assert caption == "post 1"
+    assert during_second[second] > during_first[second]   # renewed as it started
+    db.expire_all()
+    statuses = dict(db.query(Post.id, Post.status).all())
+    assert statuses == {first: "published", second: "published", third: "publishing"}
+    db.close()
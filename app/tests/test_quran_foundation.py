@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from app import quran_foundation
+
+
+def _pages(pages, total_records):
+    def fake_get(path, params=None, raise_errors=False):
+        page = params["page"]
+        if page > len(pages):
+            return {}
+        return {
+            "verses": [{"verse_number": n} for n in pages[page - 1]],
+            "pagination": {"next_page": page + 1, "total_records": total_records},
+        }
+    return fake_get
+
+
+def test_strict_fetch_rejects_partial_surah(monkeypatch):
+    monkeypatch.setattr(quran_foundation, "qf_get", _pages([[1, 2], [3]], total_records=5))
+
+    # Lenient mode keeps the old behaviour: whatever pages came back
+    assert len(quran_foundation.get_surah_verses(2)) == 3
+    with pytest.raises(RuntimeError):
+        quran_foundation.get_surah_verses(2, strict=True)
+
+    monkeypatch.setattr(quran_foundation, "qf_get", _pages([[1, 2], [3]], total_records=3))
+    assert [v["verse_number"] for v in quran_foundation.get_surah_verses(2, strict=True)] == [1, 2, 3]
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = quran_foundation._RateLimiter(50)
+    t0 = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - t0 >= 5 / 50 - 0.005
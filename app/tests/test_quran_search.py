@@ -0,0 +1,46 @@
+from app.services.quran_search import QuranSearchIndex
+
+
+def _row(id, text, title=None, slugs=(), source_id=1, surah=1, ayah=1):
+    return {"id": id, "text": text, "title": title or f"Surah {surah}, Verse {ayah}", "topics_slugs": list(slugs),
+            "source_id": source_id, "meta": {"surah_number": surah, "verse_number": ayah}}
+
+
+INDEX_ROWS = [
+    _row(1, "And be patient, for indeed Allah is with the patient", surah=8, ayah=46),
+    _row(2, "Seek help through steadfastness and prayer", surah=2, ayah=45),
+    _row(3, "Put your trust in Allah", surah=3, ayah=159),
+    _row(4, "My mercy encompasses all things", slugs=["mercy"], surah=7, ayah=156),
+    _row(5, "He is the Forgiving, the Merciful", surah=10, ayah=107),
+]
+INDEX = QuranSearchIndex(INDEX_ROWS, source_id=1)
+
+
+def test_aliases_are_expanded_at_index_time():
+    # "sabr" never appears in the text: it reaches "steadfastness" through TOPIC_ALIAS_MAP
+    assert INDEX.search("sabr") == [2]
+    # Multi-word alias phrase ("trust in allah") and plain alias ("prayer" -> salah)
+    assert INDEX.search("tawakkul") == [3]
+    assert INDEX.search("salah") == [2]
+
+
+def test_ranking_and_prefix():
+    # Direct slug + text hit beats an alias-only hit ("merciful" is an alias of rahmah, not mercy)
+    assert INDEX.search("mercy") == [4]
+    assert INDEX.search("rahmah") == [4, 5]
+    # More matched query words first
+    assert INDEX.search("steadfastness prayer allah")[0] == 2
+    assert INDEX.search("merc") == []
+    assert INDEX.search("merc", prefix=True) == [4, 5]
+    assert INDEX.search("help merc", limit=1, prefix=True) == [2]
+
+
+def test_single_word_rankings_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr("app.services.quran_search.RANKED_CACHE_SIZE", 2)
+    index = QuranSearchIndex(INDEX_ROWS, source_id=1)
+    for word in ("nonsense", "qwerty", "zzz"):
+        assert index.search(word) == []
+    assert not index._ranked                      # tokens without postings are not cached
+    for word in ("mercy", "patient", "trust", "mercy"):
+        index.search(word)
+    assert list(index._ranked) == ["trust", "mercy"]
@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.services import quran_service, quran_store
+
+
+def _row(id, surah, ayah, source_id=1, arabic="ع", text="Indeed, with hardship comes ease", slugs=("quran",)):
+    return {
+        "id": id, "org_id": None, "source_id": source_id, "owner_user_id": None, "item_type": "quran",
+        "title": f"Surah {surah}, Verse {ayah}", "text": text, "arabic_text": arabic, "translation": None,
+        "url": None, "meta": {"surah_number": surah, "verse_number": ayah, "translation_id": "131"},
+        "tags": [], "topic": "Quran", "topics": [], "topics_slugs": list(slugs), "created_at": None,
+    }
+
+
+def _load(rows, source_id=1):
+    quran_store.invalidate()
+    quran_store._current = quran_store._Corpus(rows, source_id, quran_store._generation)
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    return sessionmaker(bind=engine)(), statements
+
+
+def test_lookups_are_served_without_queries():
+    _load([
+        _row(1, 94, 6),
+        _row(2, 94, 5, text="So verily, with hardship there is relief"),
+        _row(3, 94, 5, source_id=7),               # org copy: loses to the global source
+        _row(4, 2, 153, arabic="", text="Seek help", slugs=("patience",)),
+        _row(5, 2, 153, source_id=7, text="Seek help"),  # carries the Arabic for 2:153
+    ])
+    db, statements = _session()
+
+    item = quran_service.get_quran_ayah(db, 94, 5)
+    assert item.id == 2 and item in db
+    assert quran_service.get_verse_by_key(db, "Surah 94:5")["translation_text"].startswith("So verily")
+    assert [v["ayah_number"] for v in quran_service.get_surah_verses(db, 94)] == [5, 6]
+
+    # Search: alias expansion, Arabic recovery from the org copy
+    assert [i.id for i in quran_service.search_quran(db, "sabr")] == [5]
+    # "ease" is an alias of hardship: 94:6 outranks 94:5; equal scores put the global source first
+    assert [i.id for i in quran_service.search_quran(db, "HARDSHIP")] == [1, 3, 2]
+    assert quran_service.search_quran(db, "hards") == []
+    assert len(quran_service.search_quran(db, "with hards", prefix=True)) == 3
+    assert statements == []
+
+
+def test_payloads_are_copies():
+    _load([_row(1, 1, 1)])
+    db, _ = _session()
+    quran_service.get_verse_by_id(db, 1)["topics"].append("mutated")
+    assert quran_service.get_verse_by_id(db, 1)["topics"] == []
+    assert quran_service.get_verse_by_id(db, 2) is None
@@ -0,0 +1,109 @@
+"""
+Topic rotation ledger against a real Postgres.
+Set TEST_DATABASE_URL to run; tables are created in a throwaway schema.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, IGAccount, Org, RotationRecord, TopicAutomation
+from app.services.rotation_engine import (
+    choose_topic,
+    last_style_id,
+    pick_topics,
+    prune_rotation_ledger,
+    record_topic_used,
+    topic_hash,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+POOL = ["patience", "gratitude", "mercy"]
+
+
+def _ago(days):
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def test_choose_topic_window_and_lru():
+    history = {topic_hash("patience"): _ago(2), topic_hash("gratitude"): _ago(40)}
+    assert {choose_topic(POOL[:2], history, avoid_days=30) for _ in range(20)} == {"gratitude"}
+
+    history[topic_hash("gratitude")] = _ago(1)
+    assert choose_topic(POOL[:2], history, avoid_days=30) == "patience"   # all recent: least recently used
+    assert choose_topic(["only"], history) == "only" and choose_topic([], history) == ""
+
+
+@pytest.fixture
+def db():
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def _automations(db, count):
+    org = Org(name="org")
+    db.add(org)
+    db.flush()
+    acc = IGAccount(org_id=org.id, name="acc", ig_user_id="1", access_token="t")
+    db.add(acc)
+    db.flush()
+    automations = [
+        TopicAutomation(org_id=org.id, ig_account_id=acc.id, name=f"a{i}", topic_prompt="p", topic_pool=POOL)
+        for i in range(count)
+    ]
+    db.add_all(automations)
+    db.commit()
+    return [a.id for a in automations]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_ledger_batch_pick_and_retention(db):
+    first, second = _automations(db, 2)
+    record_topic_used(first, "patience", 7, db)
+    record_topic_used(first, "gratitude", None, db)
+    record_topic_used(second, "mercy", None, db)
+    db.commit()
+    assert last_style_id(first, db) == 7 and last_style_id(second, db) is None
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    picks = pick_topics({first: POOL, second: POOL}, db, avoid_days={first: 30, second: 30})
+    assert picks[first] == "mercy" and picks[second] in {"patience", "gratitude"}
+    queries = [s for s in statements if "SAVEPOINT" not in s]
+    assert len(queries) == 1 and "GROUP BY" in queries[0]
+
+    db.add(RotationRecord(automation_id=first, topic_hash=topic_hash("mercy"), used_at=_ago(200)))
+    db.commit()
+    assert prune_rotation_ledger(db, retention_days=90) == 1
+    assert db.scalar(select(func.count()).select_from(RotationRecord)) == 3
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_unreadable_ledger_falls_back_without_aborting_the_transaction(db):
+    first, = _automations(db, 1)
+    db.execute(text("DROP TABLE rotation_ledger"))
+    db.commit()
+
+    automation = db.get(TopicAutomation, first)
+    automation.name = "renamed"   # pending work of the caller survives the failed reads
+    assert pick_topics({first: POOL}, db)[first] in POOL
+    assert last_style_id(first, db) is None
+    db.commit()
+    assert db.scalar(select(TopicAutomation.name).where(TopicAutomation.id == first)) == "renamed"
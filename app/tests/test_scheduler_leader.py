@@ -0,0 +1,126 @@
+"""
+Multi-process leader election against a real Postgres. Set TEST_DATABASE_URL
+(e.g. postgresql+psycopg://postgres@localhost/postgres) to run it.
+"""
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+WORKER = textwrap.dedent("""
+    import os, sys, time
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from sqlalchemy import create_engine, text
+    from app.services.scheduler_leader import SchedulerLeader
+
+    engine = create_engine(sys.argv[1])
+    state = {}
+
+    def record(kind):
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO leader_test_events (pid, kind) VALUES (:pid, :kind)"),
+                         {"pid": os.getpid(), "kind": kind})
+
+    def on_elected():
+        record("elected")
+        sched = state["sched"] = BackgroundScheduler()
+        sched.add_job(record, "interval", seconds=0.2, args=["tick"])
+        sched.start()
+
+    def on_demoted():
+        state.pop("sched").shutdown(wait=False)
+
+    SchedulerLeader(engine, on_elected, on_demoted, on_notify=lambda: record("notified"), poll_seconds=0.3).start()
+    while True:
+        time.sleep(1)
+""")
+
+LOCK_PROBE = textwrap.dedent("""
+    import sys
+    from sqlalchemy import create_engine
+    from app.services.scheduler_leader import try_advisory_lock
+
+    with try_advisory_lock(create_engine(sys.argv[1]), "automation_run", 42) as held:
+        print(held)
+""")
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS leader_test_events"))
+        conn.execute(text(
+            "CREATE TABLE leader_test_events (id serial PRIMARY KEY, pid int, kind text, at timestamptz DEFAULT clock_timestamp())"
+        ))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE leader_test_events"))
+    engine.dispose()
+
+
+def _events(engine, kind):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pid FROM leader_test_events WHERE kind = :kind ORDER BY at, id"), {"kind": kind}).scalars().all()
+
+
+def _wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.1)
+
+
+def test_jobs_run_in_exactly_one_process(engine):
+    from app.services.scheduler_leader import notify_jobs_changed
+
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, TEST_DATABASE_URL], cwd=ROOT) for _ in range(4)]
+    try:
+        _wait_for(lambda: len(_events(engine, "tick")) >= 10)
+        time.sleep(1)  # give the standbys a few election rounds
+        elected = _events(engine, "elected")
+        ticks = _events(engine, "tick")
+        assert len(elected) == 1
+        assert set(ticks) == {elected[0]}
+
+        notify_jobs_changed(engine)
+        _wait_for(lambda: _events(engine, "notified"))
+        time.sleep(0.5)
+        assert _events(engine, "notified") == elected
+
+        # Crash the leader: a standby takes over, and the two never tick concurrently
+        os.kill(elected[0], signal.SIGKILL)
+        _wait_for(lambda: len(_events(engine, "elected")) == 2)
+        time.sleep(1)
+        elected = _events(engine, "elected")
+        ticks = _events(engine, "tick")
+        assert len(elected) == 2 and elected[0] != elected[1]
+        handovers = sum(1 for a, b in zip(ticks, ticks[1:]) if a != b)
+        assert handovers == 1 and ticks[-1] == elected[1]
+    finally:
+        for worker in workers:
+            worker.kill()
+            worker.wait()
+
+
+def test_advisory_lock_excludes_other_processes(engine):
+    from app.services.scheduler_leader import try_advisory_lock
+
+    def probe():
+        out = subprocess.run([sys.executable, "-c", LOCK_PROBE, TEST_DATABASE_URL], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip().splitlines()[-1]
+
+    with try_advisory_lock(engine, "automation_run", 42) as held:
+        assert held
+        assert probe() == "False"
+    assert probe() == "True"
@@ -0,0 +1,43 @@
+import gzip
+import os
+
+from app.routes.ui_assets import STUDIO_SCRIPTS_JS
+from app.services import static_bundles
+
+
+def test_bundles_are_fingerprinted_and_precompressed(tmp_path):
+    bundles = static_bundles.build_static_bundles(out_dir=str(tmp_path))
+
+    studio = bundles["studio.js"]
+    assert studio.filename.startswith("studio.") and studio.filename.endswith(".js")
+    assert studio.etag.strip('"') in studio.filename
+    assert "<script>" not in studio.body.decode("utf-8")
+    assert studio.body.decode("utf-8").strip() in STUDIO_SCRIPTS_JS
+    assert gzip.decompress(studio.gzip_body) == studio.body
+    assert (tmp_path / studio.filename).read_bytes() == studio.body
+    assert os.path.exists(tmp_path / (studio.filename + ".gz"))
+
+    css = bundles["app.css"].body.decode("utf-8")
+    assert "{{" not in css and ":root {" in css
+
+    # Deterministic: same content, same names
+    again = static_bundles.build_static_bundles(out_dir=str(tmp_path))
+    assert [b.filename for b in again.values()] == [b.filename for b in bundles.values()]
+
+
+def test_layout_references_bundles_instead_of_inlining():
+    layout = static_bundles.layout_template()
+    assert "<style>" not in layout
+    assert static_bundles.bundle_url("app.css") in layout
+
+    tag = static_bundles.studio_components_tag('<option value="7">@acc</option>')
+    assert '<option value="7">@acc</option>' in tag
+    assert static_bundles.bundle_url("studio-components.js") in tag
+
+
+def test_negotiate_encoding_prefers_compressed():
+    bundle = static_bundles.build_static_bundles()["studio.js"]
+    body, encoding = static_bundles.negotiate_encoding(bundle, "gzip, deflate")
+    assert encoding == "gzip" and body == bundle.gzip_body
+    assert static_bundles.negotiate_encoding(bundle, "") == (bundle.body, None)
+    assert static_bundles.negotiate_encoding(bundle, "gzip;q=0")[1] is None
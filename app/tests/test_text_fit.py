@@ -0,0 +1,25 @@
+import os
+
+from PIL import Image, ImageDraw
+
+from app.services import image_renderer
+
+FONT = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "fonts", "Inter.ttf")
+TEXT = "Indeed, with hardship comes ease. Every trial carries within it the seed of relief."
+
+
+def test_get_font_is_cached_per_path_and_size():
+    assert image_renderer.get_font(FONT, 40) is image_renderer.get_font(FONT, 40)
+    assert image_renderer.get_font(FONT, 40) is not image_renderer.get_font(FONT, 42)
+
+
+def test_fit_text_to_zone_memoizes_layout():
+    image_renderer.clear_layout_caches()
+    draw_tmp = ImageDraw.Draw(Image.new("RGB", (1080, 1350)))
+    first = image_renderer.fit_text_to_zone(TEXT, FONT, 600, 120, 64, draw_tmp, base_ls=0.12)
+    second = image_renderer.fit_text_to_zone(TEXT, FONT, 600, 120, 64, draw_tmp, base_ls=0.12)
+
+    assert first == second
+    assert first[1] is second[1]
+    assert first[0] is not second[0]  # callers get their own line list
+    assert first[2] <= 120
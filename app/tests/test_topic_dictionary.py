@@ -0,0 +1,38 @@
+from app.services.topic_dictionary import _TopicDictionary
+
+
+def _dictionary():
+    dictionary = _TopicDictionary(0)
+    dictionary.add_topic("Patience", 1)
+    dictionary.add_topic("Family Ties", 2)
+    dictionary.add_slug("family_ties")
+    dictionary.add_slug("ease")
+    dictionary.add_slug("prayer")
+    dictionary.set_synonyms([("patience", ["sabr", "steadfast"]), ("unused_slug", ["sabr"])])
+    dictionary.finish_load()
+    return dictionary
+
+
+def test_layered_scoring():
+    dictionary = _dictionary()
+    by_slug = {s["slug"]: s for s in dictionary.suggest("Sabr with my family while praying for easement")}
+
+    assert by_slug["patience"]["reason"] == "synonym match" and by_slug["patience"]["topic"] == "Patience"
+    assert by_slug["family_ties"]["reason"] == "partial topic match"
+    assert by_slug["family_ties"]["topic"] == "Family Ties"   # the item's topic beats the title-cased slug
+    assert by_slug["ease"]["reason"] == "contextual match"    # "ease" inside "easement"
+    assert "prayer" not in by_slug and "unused_slug" not in by_slug
+
+    ranked = dictionary.suggest("ease patience", max_results=2)
+    assert [(s["slug"], s["score"]) for s in ranked] == [("ease", 1.0), ("patience", 1.0)]
+
+
+def test_incremental_additions():
+    dictionary = _dictionary()
+    dictionary.add_slug("tawakkul")
+    dictionary.add_topic("Ease!", 9)
+
+    assert dictionary.suggest("tawakkul")[0]["reason"] == "exact keyword match"
+    assert dictionary.suggest("taw") == []                    # partial matches need words over 3 letters
+    assert dictionary.suggest("tawakkulness")[0]["slug"] == "tawakkul"
+    assert dictionary.suggest("ease")[0]["topic"] == "Ease!"  # newest item names the slug
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for card text layout and rendering.
+
+Times the text-fit layout of a card's zones and a full preset card render,
+with cold layout caches (fonts, reshaped Arabic and fit results cleared before
+every run, i.e. the pre-cache behaviour) versus warm caches (re-render of the
+same card, as in /posts/preview_render and /studio/generate-visual).
+
+Usage:
+    python scripts/bench_card_render.py [runs]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from app.services import image_renderer  # noqa: E402
+
+SEGMENTS = [
+    {"text": "إِنَّ مَعَ الْعُسْرِ يُسْرًا", "size": 72, "is_arabic": True, "color": (255, 255, 255)},
+    {"text": "Indeed, with hardship comes ease. Every trial carries within it the seed of relief, "
+             "and patience is the door through which that relief arrives.", "size": 56, "is_arabic": False,
+     "color": (255, 255, 255)},
+    {"text": "Qur'an 94:6", "size": 34, "is_arabic": False, "color": (255, 255, 255)},
+]
+
+
+# Tight zone budgets (w, h) so the fit loop has to shrink the text several times
+ZONES = [(860, 90), (860, 260), (860, 60)]
+FONT_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "fonts", "Inter.ttf")
+
+
+def _fit_card(draw_tmp):
+    for seg, (max_w, max_h) in zip(SEGMENTS, ZONES):
+        image_renderer.fit_text_to_zone(
+            seg["text"], FONT_PATH, max_w, max_h, seg["size"], draw_tmp,
+            min_size=24, base_ls=0.12, is_arabic=seg["is_arabic"],
+        )
+
+
+def _render_card(output_dir):
+    image_renderer.render_minimal_quote_card(SEGMENTS, output_dir, style="quran", mode="preset")
+
+
+def _time(fn, runs: int, cold: bool) -> float:
+    timings = []
+    for _ in range(runs):
+        if cold:
+            image_renderer.clear_layout_caches()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings.append(time.perf_counter() - started)
+    return sum(timings) / len(timings) * 1000
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    draw_tmp = ImageDraw.Draw(Image.new("RGB", (1080, 1350)))
+    with tempfile.TemporaryDirectory() as output_dir:
+        _time(lambda: _render_card(output_dir), 1, cold=True)  # warm up imports / lazy inits
+        results = {
+            "text fit (3 zones)": (
+                _time(lambda: _fit_card(draw_tmp), runs, cold=True),
+                _time(lambda: _fit_card(draw_tmp), runs, cold=False),
+            ),
+            "full preset card": (
+                _time(lambda: _render_card(output_dir), runs, cold=True),
+                _time(lambda: _render_card(output_dir), runs, cold=False),
+            ),
+        }
+    print(f"runs={runs}")
+    for label, (cold_ms, warm_ms) in results.items():
+        print(f"{label:<20} cold {cold_ms:8.1f} ms/card   warm {warm_ms:8.1f} ms/card   "
+              f"({cold_ms / max(warm_ms, 1e-6):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark for the background analysis done on every card render.
+
+A render with adaptive typography samples the background for
+analyze_background (6 zones), _build_adaptive_palette (3 zones, fallback
+path) and _detect_center_brightness (twice). Compares the previous per-zone
+crop + resize + list(getdata()) sums with app.services.image_stats (one
+downsampled NumPy array per image).
+
+Usage:
+    python scripts/bench_image_stats.py [runs] [image]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image  # noqa: E402
+
+from app.services.image_stats import ImageStats  # noqa: E402
+
+SIZE = (1080, 1080)
+ANALYSIS_ZONES = [(0.0, 1.0, 0.10, 0.90), (0.25, 0.75, 0.20, 0.80), (0.0, 0.12, 0.10, 0.90),
+                  (0.08, 0.25, 0.10, 0.90), (0.30, 0.70, 0.10, 0.90), (0.72, 0.88, 0.10, 0.90)]
+PALETTE_ZONES = [(0.08, 0.25, 0.12, 0.88), (0.30, 0.70, 0.12, 0.88), (0.72, 0.88, 0.12, 0.88)]
+DEFAULT_IMAGE = os.path.join(os.path.dirname(__file__), "..", "app", "static", "img", "gallery", "vsbg_1703898d266c.jpg")
+
+
+def legacy_zone(image, y1f, y2f, x1f, x2f):
+    W, H = SIZE
+    crop = image.crop((int(W * x1f), int(H * y1f), int(W * x2f), int(H * y2f))).resize((48, 48))
+    gray = list(crop.convert("L").getdata())
+    n = len(gray)
+    mean = sum(gray) / n
+    std_dev = (sum((p - mean) ** 2 for p in gray) / n) ** 0.5
+    rgb = crop.convert("RGB").getdata()
+    return mean, std_dev, sum(p[0] for p in rgb) / n, sum(p[1] for p in rgb) / n, sum(p[2] for p in rgb) / n
+
+
+def legacy_brightness(image, y1f, y2f, x1f, x2f):
+    W, H = SIZE
+    pixels = list(image.crop((int(W * x1f), int(H * y1f), int(W * x2f), int(H * y2f))).convert("L").getdata())
+    return sum(pixels) / len(pixels)
+
+
+def legacy_render(image):
+    for zone in ANALYSIS_ZONES:
+        legacy_zone(image, *zone)
+    for zone in PALETTE_ZONES:
+        legacy_brightness(image, *zone)
+    for _ in range(2):
+        legacy_brightness(image, 0.25, 0.75, 0.25, 0.75)
+
+
+def stats_render(image):
+    stats = ImageStats(image, SIZE)
+    for zone in ANALYSIS_ZONES:
+        stats.zone(*zone)
+    for zone in PALETTE_ZONES:
+        stats.brightness(*zone)
+    for _ in range(2):
+        stats.brightness(0.25, 0.75, 0.25, 0.75)
+
+
+def _time(fn, image, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(image)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_IMAGE
+    image = Image.open(path).convert("RGB").resize(SIZE)
+
+    legacy_ms = _time(legacy_render, image, runs)
+    stats_ms = _time(stats_render, image, runs)
+    print(f"image={os.path.basename(path)} {SIZE[0]}x{SIZE[1]} runs={runs}")
+    print(f"per render: getdata sums {legacy_ms:.2f} ms   image_stats {stats_ms:.2f} ms   ({legacy_ms / stats_ms:.1f}x)")
+
+    single_legacy = _time(lambda im: legacy_zone(im, *ANALYSIS_ZONES[4]), image, runs)
+    single_stats = _time(lambda im: ImageStats(im, SIZE).zone(*ANALYSIS_ZONES[4]), image, runs)
+    print(f"one zone incl. downsample: getdata sums {single_legacy:.2f} ms   image_stats {single_stats:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for resolving /uploads/ media during publish preflight.
+
+Builds a throwaway app tree with a large uploads directory (plus some nested
+source/static folders) and compares the previous lookups with
+app.services.media_registry:
+  - hit:  os.path.exists per post (stale scavenger + preflight);
+  - miss: exists + 3 x (500 ms sleep + recursive glob of the app tree).
+    The sleeps are reported separately; only the globs are timed.
+
+Usage:
+    python scripts/bench_media_registry.py [uploads] [lookups]
+"""
+import glob
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings  # noqa: E402
+from app.services import media_registry  # noqa: E402
+
+HUNT_ATTEMPTS = 3
+HUNT_SLEEP_S = 0.5
+
+
+def build_tree(root: str, uploads: int) -> str:
+    uploads_dir = os.path.join(root, "uploads")
+    os.makedirs(uploads_dir)
+    for i in range(uploads):
+        with open(os.path.join(uploads_dir, f"qcard_{i}.jpg"), "wb") as f:
+            f.write(b"\xff\xd8\xff\xe0")
+    for package in range(40):
+        pkg = os.path.join(root, "app", f"pkg_{package}", "static")
+        os.makedirs(pkg)
+        for i in range(100):
+            open(os.path.join(pkg, f"asset_{i}.css"), "w").close()
+    return uploads_dir
+
+
+def legacy_hit(uploads_dir, filename):
+    return os.path.exists(os.path.join(uploads_dir, filename))
+
+
+def legacy_miss_globs(root, uploads_dir, filename):
+    os.path.exists(os.path.join(uploads_dir, filename))
+    for _ in range(HUNT_ATTEMPTS):
+        os.path.exists(os.path.join(uploads_dir, filename))
+        if glob.glob(f"{root}/**/{filename}", recursive=True):
+            return True
+    return False
+
+
+def _time_us(fn, names):
+    timings = []
+    for name in names:
+        started = time.perf_counter()
+        fn(name)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    root = tempfile.mkdtemp(prefix="bench_media_")
+    try:
+        uploads_dir = build_tree(root, uploads)
+        settings.uploads_dir = uploads_dir
+
+        started = time.perf_counter()
+        indexed = media_registry.warm()
+        warm_ms = (time.perf_counter() - started) * 1000
+
+        hits = [f"qcard_{random.randrange(uploads)}.jpg" for _ in range(lookups)]
+        misses = [f"qcard_missing_{i}.jpg" for i in range(5)]
+
+        legacy_hit_us = _time_us(lambda n: legacy_hit(uploads_dir, n), hits)
+        registry_hit_us = _time_us(media_registry.locate, hits)
+        legacy_miss_ms = _time_us(lambda n: legacy_miss_globs(root, uploads_dir, n), misses) / 1000
+        registry_miss_us = _time_us(media_registry.locate, misses)
+
+        print(f"uploads={uploads} lookups={lookups} warm-up={warm_ms:.1f} ms ({indexed} files)")
+        print(f"present file: os.path.exists {legacy_hit_us:.2f} us   registry {registry_hit_us:.2f} us")
+        print(f"missing file: {HUNT_ATTEMPTS} recursive globs {legacy_miss_ms:.1f} ms "
+              f"(+{HUNT_ATTEMPTS * HUNT_SLEEP_S * 1000:.0f} ms of sleeps)   registry {registry_miss_us:.2f} us")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark for duplicate media through app.services.media_storage.
+
+Stores the same upload `copies` times (plus one unique upload per copy for
+contrast) and reports bytes kept and time per store. Uses a throwaway uploads
+directory; set MEDIA_STORAGE_BACKEND=s3 (+ MEDIA_S3_ENDPOINT_URL, MEDIA_S3_BUCKET,
+S3_ACCESS_KEY, S3_SECRET_KEY) to run it against an S3-compatible server such
+as a local MinIO. The bucket must exist.
+
+Usage:
+    python scripts/bench_media_storage.py [copies] [size_mb]
+"""
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings  # noqa: E402
+from app.services import media_storage  # noqa: E402
+
+
+def _store_ms(data: bytes):
+    started = time.perf_counter()
+    stored = media_storage.store_stream(io.BytesIO(data), "upload.jpg")
+    return (time.perf_counter() - started) * 1000, stored
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 2 * 1024 * 1024
+    root = tempfile.mkdtemp(prefix="bench_storage_")
+    settings.uploads_dir = root
+    settings.media_cdn_push = False
+    try:
+        storage = media_storage.get_storage()
+        payload = os.urandom(size)
+
+        first_ms, first = _store_ms(payload)
+        duplicate_ms = [_store_ms(payload)[0] for _ in range(copies - 1)]
+        unique = [_store_ms(os.urandom(size)) for _ in range(copies - 1)]
+
+        keys = {first.key} | {stored.key for _, stored in unique}
+        print(f"backend={storage.name} copies={copies} size={size / 1048576:.1f} MiB")
+        print(f"first store {first_ms:.1f} ms   duplicate median {statistics.median(duplicate_ms):.1f} ms   "
+              f"unique median {statistics.median(ms for ms, _ in unique):.1f} ms")
+        print(f"objects kept: {len(keys)} for {copies * 2 - 1} stores "
+              f"({copies - 1} duplicates cost 0 bytes instead of {(copies - 1) * size / 1048576:.0f} MiB)")
+        if storage.name == "local":
+            print(f"bytes on disk: {sum(os.path.getsize(os.path.join(root, f)) for f in os.listdir(root)) / 1048576:.0f} MiB")
+        for key in keys:
+            storage.delete(key)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark for Quran keyword search over the full corpus (6,236 verses).
+
+Compares the ranked inverted index (app.services.quran_search) with the
+previous approach: expand TOPIC_ALIAS_MAP aliases per query, substring-match
+every alias against every verse's text / title / slugs (what the ILIKE '%term%'
+filters did), then sort all matches. Also times the index build and a
+typeahead session (one prefix query per keystroke).
+
+By default a synthetic corpus with the real surah/verse counts is used. Pass
+--db to benchmark the synced corpus from DATABASE_URL instead.
+
+Usage:
+    python scripts/bench_quran_search.py [--db] [runs]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.quran_search import TOPIC_ALIAS_MAP, QuranSearchIndex  # noqa: E402
+from app.services.quran_serialization import SURAH_MAP  # noqa: E402
+
+QUERIES = ["patience", "sabr", "mercy", "forgiveness", "hardship", "trust in allah", "knowledge",
+           "those who believe", "prayer", "gratitude", "paradise", "day of judgment"]
+TYPEAHEAD = "steadfast"
+
+COMMON = (
+    "and indeed allah is with those who believe in the day of judgment lord heavens earth mercy "
+    "merciful forgiving patience patient steadfast prayer worship guidance signs messenger book "
+    "truth wrongdoers fire paradise gardens rivers beneath provision grateful thanks trust reliance "
+    "hardship ease relief trial knowledge wisdom soul death hereafter charity giving repentance"
+).split()
+
+
+def synthetic_rows():
+    """Zipf-distributed text: a few hundred common words over a ~6k-word vocabulary, like the translation."""
+    rnd = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = list(dict.fromkeys(COMMON + ["".join(rnd.choices(letters, k=rnd.randint(4, 10))) for _ in range(6000)]))
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rows = []
+    for surah, info in sorted(SURAH_MAP.items()):
+        for ayah in range(1, info["verses"] + 1):
+            rows.append({
+                "id": len(rows) + 1, "source_id": 1, "title": f"Surah {surah}, Verse {ayah}",
+                "text": " ".join(rnd.choices(vocabulary, weights, k=rnd.randint(8, 60))),
+                "topics_slugs": ["quran", f"surah-{surah}"],
+                "meta": {"surah_number": surah, "verse_number": ayah},
+            })
+    return rows
+
+
+def db_rows():
+    from app.db import SessionLocal
+    from app.services import quran_store
+    with SessionLocal() as db:
+        quran_store.source_id(db)  # loads the corpus
+    return list(quran_store._current.rows.values())
+
+
+def scan_search(rows, query, limit=15):
+    """The pre-index behaviour: per-query alias OR + substring scan + full sort."""
+    query = query.strip().lower()
+    terms = [query] + TOPIC_ALIAS_MAP.get(query, [])
+    for w in query.split():
+        terms += TOPIC_ALIAS_MAP.get(w, [])
+    terms = set(terms)
+    hits = []
+    for row in rows:
+        hay = ((row["text"] or "").lower(), (row["title"] or "").lower(),
+               json.dumps(row["topics_slugs"] or [], ensure_ascii=False).lower())
+        if any(t in h for t in terms for h in hay):
+            hits.append(row)
+    hits.sort(key=lambda r: ((r["meta"] or {}).get("surah_number") or 999, (r["meta"] or {}).get("verse_number") or 999))
+    return [r["id"] for r in hits[:limit]]
+
+
+def _time(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+
+
+def main():
+    args = [a for a in sys.argv[1:] if a != "--db"]
+    runs = int(args[0]) if args else 20
+    rows = db_rows() if "--db" in sys.argv else synthetic_rows()
+
+    started = time.perf_counter()
+    index = QuranSearchIndex(rows, source_id=1)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"corpus={len(rows)} verses  vocabulary={len(index.vocabulary)} tokens  index build {build_ms:.0f} ms  runs={runs}")
+
+    started = time.perf_counter()
+    index.search(QUERIES[0], 15)
+    print(f"first '{QUERIES[0]}' query (ranks the posting list, then cached) {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    scan_all, index_all = [], []
+    for query in QUERIES:
+        scan_p50, _ = _time(lambda: scan_search(rows, query), runs)
+        index_p50, _ = _time(lambda: index.search(query, 15), runs)
+        scan_all.append(scan_p50)
+        index_all.append(index_p50)
+        print(f"{query:<20} scan {scan_p50:8.2f} ms   index {index_p50:7.3f} ms   ({scan_p50 / max(index_p50, 1e-6):6.0f}x)")
+
+    keystrokes = [TYPEAHEAD[:n] for n in range(2, len(TYPEAHEAD) + 1)]
+    scan_p50, _ = _time(lambda: [scan_search(rows, k) for k in keystrokes], runs)
+    index_p50, index_p95 = _time(lambda: [index.search(k, 15, prefix=True) for k in keystrokes], runs)
+    print(f"typeahead '{TYPEAHEAD}' ({len(keystrokes)} keystrokes): scan {scan_p50:.1f} ms   "
+          f"index {index_p50:.2f} ms (p95 {index_p95:.2f} ms)")
+    print(f"mean per query: scan {statistics.mean(scan_all):.2f} ms   index {statistics.mean(index_all):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
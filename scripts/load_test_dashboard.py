@@ -0,0 +1,120 @@
+"""
+Load test for the dashboard request path.
+
+Fires concurrent GETs at /app (and optionally /app/calendar) with a logged-in
+session cookie while a probe coroutine hits a cheap endpoint (/health) on the
+side. The dashboard percentiles show how the page itself behaves under load;
+the probe percentiles show whether dashboard queries stall the event loop for
+every other request on the worker (they should stay flat when handlers await
+the async session instead of querying synchronously).
+
+Usage:
+    python scripts/load_test_dashboard.py --base-url http://localhost:8000 \\
+        --token <access_token cookie> [--concurrency 50] [--requests 1000] [--calendar]
+
+The token can also be passed as LOADTEST_TOKEN.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def _report(label: str, samples: list[float], statuses: Counter, elapsed: float) -> None:
+    if not samples:
+        print(f"{label:<12} no samples")
+        return
+    print(
+        f"{label:<12} n={len(samples):<5} rps={len(samples) / elapsed:7.1f}  "
+        f"p50={_percentile(samples, 50):7.1f}ms  p95={_percentile(samples, 95):7.1f}ms  "
+        f"p99={_percentile(samples, 99):7.1f}ms  max={max(samples):7.1f}ms  "
+        f"mean={statistics.fmean(samples):7.1f}ms  status={dict(statuses)}"
+    )
+
+
+async def _run(args) -> None:
+    paths = ["/app", "/app/calendar"] if args.calendar else ["/app"]
+    cookies = {"access_token": args.token} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency + 5, max_keepalive_connections=args.concurrency + 5)
+
+    page_samples: list[float] = []
+    page_statuses: Counter = Counter()
+    probe_samples: list[float] = []
+    probe_statuses: Counter = Counter()
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=args.base_url, cookies=cookies, limits=limits,
+                                 timeout=args.timeout, follow_redirects=False) as client:
+        # Warm-up: open connections, fill server-side caches
+        for path in paths:
+            await client.get(path)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(paths[i % len(paths)])
+
+        async def worker():
+            while True:
+                try:
+                    path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    page_statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    page_statuses[type(e).__name__] += 1
+                    continue
+                page_samples.append((time.perf_counter() - started) * 1000)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    response = await client.get(args.probe_path)
+                    probe_statuses[response.status_code] += 1
+                    probe_samples.append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError as e:
+                    probe_statuses[type(e).__name__] += 1
+                await asyncio.sleep(args.probe_interval)
+
+        started = time.perf_counter()
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s")
+    _report("dashboard", page_samples, page_statuses, elapsed)
+    _report(f"probe {args.probe_path}", probe_samples, probe_statuses, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.getenv("LOADTEST_TOKEN"), help="access_token cookie value")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--calendar", action="store_true", help="alternate /app and /app/calendar")
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Page payload report for the app shell.
+
+Renders the app layout around a fixed sample body twice: the old way, with
+STUDIO_SCRIPTS_JS, STUDIO_COMPONENTS_HTML and the layout stylesheet inlined,
+and the new way, referencing the fingerprinted bundles. Prints the HTML size
+per page view (raw and gzip), the bundle sizes, and the bytes a visitor
+transfers over N page views once the bundles are browser-cached.
+
+Usage:
+    python scripts/report_page_payload.py [page_views]
+"""
+import gzip
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.routes.ui_assets import (  # noqa: E402
+    APP_LAYOUT_HTML,
+    CONNECT_INSTAGRAM_MODAL_HTML,
+    STUDIO_COMPONENTS_HTML,
+    STUDIO_SCRIPTS_JS,
+)
+from app.services import static_bundles  # noqa: E402
+
+ACCOUNT_OPTIONS = '<option value="1">@sabeel.studio</option><option value="2">@daily.reminders</option>'
+CONTENT = '<section class="card p-10"><h1 class="heading-premium">Home</h1>' + "<p>Sample body</p>" * 40 + "</section>"
+
+
+def _render(layout: str, studio_modal: str, studio_js: str) -> bytes:
+    return layout.format(
+        title="Home", content=CONTENT, user_name="Demo", org_name="Demo Org", admin_link="",
+        active_dashboard="active", active_calendar="", active_automations="", active_library="", active_media="",
+        studio_modal=studio_modal, studio_js=studio_js, connected_account_info="",
+        connect_instagram_modal=CONNECT_INSTAGRAM_MODAL_HTML, navbar_account_switcher="",
+        account_options=ACCOUNT_OPTIONS, extra_js="", org_id="1",
+    ).encode("utf-8")
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:8.1f} KB"
+
+
+def main() -> None:
+    views = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    bundles = static_bundles.build_static_bundles()
+
+    before = _render(APP_LAYOUT_HTML, STUDIO_COMPONENTS_HTML.replace("{account_options}", ACCOUNT_OPTIONS), STUDIO_SCRIPTS_JS)
+    after = _render(
+        static_bundles.layout_template(),
+        static_bundles.studio_components_tag(ACCOUNT_OPTIONS),
+        static_bundles.studio_scripts_tag(),
+    )
+    before_gz = len(gzip.compress(before, 6))
+    after_gz = len(gzip.compress(after, 6))
+
+    print(f"{'':<42}{'raw':>11}{'gzip':>11}{'br':>11}")
+    print(f"{'page HTML, inlined (before)':<42}{_kb(len(before))} {_kb(before_gz)}")
+    print(f"{'page HTML, bundled (after)':<42}{_kb(len(after))} {_kb(after_gz)}")
+    bundle_gz = 0
+    for b in bundles.values():
+        bundle_gz += len(b.gzip_body)
+        br = _kb(len(b.br_body)) if b.br_body else "       n/a"
+        print(f"  {b.filename:<40}{_kb(len(b.body))} {_kb(len(b.gzip_body))} {br}")
+
+    print()
+    print(f"gzip transfer over {views} page views (cold cache, then cached bundles):")
+    print(f"  before: {_kb(before_gz * views)}")
+    print(f"  after:  {_kb(after_gz * views + bundle_gz)}")
+
+
+if __name__ == "__main__":
+    main()